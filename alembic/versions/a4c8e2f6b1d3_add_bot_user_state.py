@@ -0,0 +1,32 @@
+"""Add bot_user_state table
+
+Revision ID: a4c8e2f6b1d3
+Revises: f1b6d8e3a9c5
+Create Date: 2026-10-17
+
+Состояние диалогов (context.user_data) для PERSISTENCE_BACKEND=postgres.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c8e2f6b1d3"
+down_revision: Union[str, None] = "f1b6d8e3a9c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bot_user_state",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("data", sa.Text(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("bot_user_state")
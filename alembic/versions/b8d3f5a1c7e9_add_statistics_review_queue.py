@@ -0,0 +1,46 @@
+"""Add review queue index on statistics
+
+Revision ID: b8d3f5a1c7e9
+Revises: a4c8e2f6b1d3
+Create Date: 2026-10-17
+
+Интервальное повторение (bot/database/review.py): срок next_review теперь
+заполняется при каждом ответе, очередь повторения читается по индексу
+(user_id, next_review). Слова, на которые уже отвечали, получают срок «сейчас»,
+чтобы сразу попасть в очередь. Индекс строится через CREATE INDEX CONCURRENTLY
+вне транзакции (см. e5a9c3b7d2f1).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b8d3f5a1c7e9"
+down_revision: Union[str, None] = "a4c8e2f6b1d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        sa.text("UPDATE statistics SET next_review = LOCALTIMESTAMP WHERE next_review IS NULL")
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_statistics_user_id_next_review",
+            "statistics",
+            ["user_id", "next_review"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_statistics_user_id_next_review",
+            table_name="statistics",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,54 @@
+"""Add user_stats_summary table
+
+Revision ID: c3f1a9d2b7e4
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-17
+
+Счетчики пользователя для проверки достижений без агрегатных запросов.
+Таблица заполняется по существующей истории в этой же миграции.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f1a9d2b7e4"
+down_revision: Union[str, None] = "a1b2c3d4e5f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats_summary",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("sessions_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("words_added", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("words_mastered", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_accuracy", sa.DECIMAL(precision=5, scale=2), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.telegram_id"]),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    # Заполняем счетчики по уже накопленной истории
+    op.execute(
+        """
+        INSERT INTO user_stats_summary (user_id, sessions_count, words_added, words_mastered,
+                                        last_accuracy)
+        SELECT u.telegram_id,
+               (SELECT count(*) FROM training_sessions ts WHERE ts.user_id = u.telegram_id),
+               (SELECT count(*) FROM words w WHERE w.user_id = u.id),
+               (SELECT count(*) FROM statistics s
+                WHERE s.user_id = u.telegram_id AND s.mastered_level >= 3),
+               (SELECT ts.accuracy FROM training_sessions ts
+                WHERE ts.user_id = u.telegram_id
+                ORDER BY ts.created_at DESC
+                LIMIT 1)
+        FROM users u
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats_summary")
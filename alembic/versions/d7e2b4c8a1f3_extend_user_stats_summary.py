@@ -0,0 +1,97 @@
+"""Extend user_stats_summary for the statistics menu
+
+Revision ID: d7e2b4c8a1f3
+Revises: c3f1a9d2b7e4
+Create Date: 2026-10-17
+
+Итоги тренировок, число изученных слов и счетчики за текущий день, чтобы меню
+статистики читало одну строку вместо агрегатов по истории. Новые колонки
+заполняются по существующей истории (так же, как python -m bot.database.rebuild_stats).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d7e2b4c8a1f3"
+down_revision: Union[str, None] = "c3f1a9d2b7e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_stats_summary",
+        sa.Column("total_questions", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "user_stats_summary",
+        sa.Column("total_correct", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "user_stats_summary",
+        sa.Column(
+            "accuracy_sum", sa.DECIMAL(precision=14, scale=2), server_default="0", nullable=False
+        ),
+    )
+    op.add_column(
+        "user_stats_summary",
+        sa.Column("words_studied", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column("user_stats_summary", sa.Column("today_date", sa.Date(), nullable=True))
+    op.add_column(
+        "user_stats_summary",
+        sa.Column("today_sessions", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "user_stats_summary",
+        sa.Column("today_questions", sa.Integer(), server_default="0", nullable=False),
+    )
+
+    # Заполняем новые колонки по уже накопленной истории
+    op.execute(
+        """
+        INSERT INTO user_stats_summary AS us (
+            user_id, total_questions, total_correct, accuracy_sum, words_studied,
+            today_date, today_sessions, today_questions
+        )
+        SELECT u.telegram_id,
+               ts.total_questions,
+               ts.total_correct,
+               ts.accuracy_sum,
+               (SELECT count(*) FROM statistics s WHERE s.user_id = u.telegram_id),
+               CURRENT_DATE,
+               ts.today_sessions,
+               ts.today_questions
+        FROM users u
+        CROSS JOIN LATERAL (
+            SELECT COALESCE(sum(t.total_questions), 0) AS total_questions,
+                   COALESCE(sum(t.correct_answers), 0) AS total_correct,
+                   COALESCE(sum(t.accuracy), 0) AS accuracy_sum,
+                   count(*) FILTER (WHERE t.created_at >= CURRENT_DATE) AS today_sessions,
+                   COALESCE(sum(t.total_questions) FILTER (WHERE t.created_at >= CURRENT_DATE), 0)
+                       AS today_questions
+            FROM training_sessions t
+            WHERE t.user_id = u.telegram_id
+        ) ts
+        ON CONFLICT (user_id) DO UPDATE
+        SET total_questions = EXCLUDED.total_questions,
+            total_correct = EXCLUDED.total_correct,
+            accuracy_sum = EXCLUDED.accuracy_sum,
+            words_studied = EXCLUDED.words_studied,
+            today_date = EXCLUDED.today_date,
+            today_sessions = EXCLUDED.today_sessions,
+            today_questions = EXCLUDED.today_questions
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user_stats_summary", "today_questions")
+    op.drop_column("user_stats_summary", "today_sessions")
+    op.drop_column("user_stats_summary", "today_date")
+    op.drop_column("user_stats_summary", "words_studied")
+    op.drop_column("user_stats_summary", "accuracy_sum")
+    op.drop_column("user_stats_summary", "total_correct")
+    op.drop_column("user_stats_summary", "total_questions")
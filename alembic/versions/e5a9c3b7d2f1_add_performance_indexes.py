@@ -0,0 +1,65 @@
+"""Add indexes for handler queries
+
+Revision ID: e5a9c3b7d2f1
+Revises: d7e2b4c8a1f3
+Create Date: 2026-10-17
+
+Составные и частичные индексы под запросы обработчиков (см.
+scripts/explain_handler_queries.py). Индексы строятся через
+CREATE INDEX CONCURRENTLY вне транзакции, поэтому миграцию можно применять
+на работающей БД без блокировки записи. Если построение прервалось, PostgreSQL
+оставляет индекс в состоянии INVALID: его нужно удалить (DROP INDEX CONCURRENTLY)
+и повторить миграцию.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a9c3b7d2f1"
+down_revision: Union[str, None] = "d7e2b4c8a1f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (имя, таблица, колонки, условие частичного индекса)
+INDEXES = [
+    # Последние тренировки пользователя (statistics_detailed)
+    (
+        "ix_training_sessions_user_id_created_at",
+        "training_sessions",
+        ["user_id", sa.text("created_at DESC")],
+        None,
+    ),
+    # Слова для повторения (statistics_detailed)
+    ("ix_statistics_user_id_mastered_level", "statistics", ["user_id", "mastered_level"], None),
+    # Загрузка статистики слова при его удалении
+    ("ix_statistics_word_id", "statistics", ["word_id"], None),
+    # Личные слова пользователя: список, подсчет, пул слов тренировки
+    ("ix_words_user_id_english_word", "words", ["user_id", "english_word", "id"], None),
+    # Общие публичные слова: пул слов тренировки и подсчет словаря
+    ("ix_words_shared_public", "words", ["id"], "user_id IS NULL AND is_public"),
+    # Ответы тренировки
+    ("ix_answers_session_id", "answers", ["session_id"], None),
+    # Загрузка ответов на слово при его удалении
+    ("ix_answers_word_id", "answers", ["word_id"], None),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
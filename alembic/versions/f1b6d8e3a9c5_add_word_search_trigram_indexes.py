@@ -0,0 +1,44 @@
+"""Add trigram indexes for word search
+
+Revision ID: f1b6d8e3a9c5
+Revises: e5a9c3b7d2f1
+Create Date: 2026-10-17
+
+Расширение pg_trgm и GIN-индексы по lower(english_word) и
+lower(russian_translation) для поиска по словарю (bot/database/search.py):
+они обслуживают и LIKE '%...%', и оператор сходства %. Индексы строятся через
+CREATE INDEX CONCURRENTLY вне транзакции. Для CREATE EXTENSION нужны права
+владельца БД (или расширение должно быть установлено заранее).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f1b6d8e3a9c5"
+down_revision: Union[str, None] = "e5a9c3b7d2f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_words_english_word_trgm", "english_word"),
+    ("ix_words_russian_translation_trgm", "russian_translation"),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        for name, column in INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON words USING gin (lower({column}) gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name="words", postgresql_concurrently=True, if_exists=True)
+    # Расширение не удаляется: им могут пользоваться другие объекты БД
@@ -15,6 +15,15 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FILE = os.getenv("LOG_FILE", "logs/bot.log")
+# Формат записей: text или json (одна JSON-строка с update_id и user_id)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# Ротация файла лога: по времени (when для TimedRotatingFileHandler, например
+# midnight) или, если не задано, по размеру (0 — без ротации)
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+# Одинаковые предупреждения и ошибки пишутся не чаще раза в окно (секунд, 0 — все)
+LOG_DUPLICATE_WINDOW = float(os.getenv("LOG_DUPLICATE_WINDOW", "60"))
 
 # Bot Name
 BOT_NAME = "LinguaFlow_Bot"
@@ -23,3 +32,116 @@ BOT_NAME = "LinguaFlow_Bot"
 MAX_WORD_LENGTH = 255  # Соответствует String(255) в модели Word
 MAX_EXAMPLE_LENGTH = 2000  # Соответствует Text в модели Word
 MAX_TRANSLATION_LENGTH = 500  # Запас для русского перевода
+
+# Размер страницы в списке «Мои слова» и в результатах поиска
+MY_WORDS_PAGE_SIZE = 20
+SEARCH_PAGE_SIZE = 10
+
+# Пул слов для выборки вопросов тренировки
+WORD_POOL_SHARED_TTL = float(os.getenv("WORD_POOL_SHARED_TTL", "300"))  # секунд
+WORD_POOL_MAX_USERS = int(os.getenv("WORD_POOL_MAX_USERS", "10000"))
+
+# Колода вопросов тренировки: сколько вопросов готовить заранее и при каком
+# остатке догружать следующие в фоне
+TRAINING_DECK_SIZE = int(os.getenv("TRAINING_DECK_SIZE", "20"))
+TRAINING_DECK_REFILL_AT = int(os.getenv("TRAINING_DECK_REFILL_AT", "5"))
+
+# Подготовка следующего вопроса, пока пользователь читает результат ответа:
+# максимум фоновых задач и неполученных результатов на процесс
+QUESTION_PREFETCH_MAX_TASKS = int(os.getenv("QUESTION_PREFETCH_MAX_TASKS", "1000"))
+
+# Журнал ответов с отложенной пакетной записью (по умолчанию выключен)
+ANSWER_JOURNAL_ENABLED = os.getenv("ANSWER_JOURNAL_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+ANSWER_JOURNAL_FLUSH_MS = int(os.getenv("ANSWER_JOURNAL_FLUSH_MS", "200"))
+ANSWER_JOURNAL_BATCH_SIZE = int(os.getenv("ANSWER_JOURNAL_BATCH_SIZE", "500"))
+ANSWER_JOURNAL_MAX_QUEUE = int(os.getenv("ANSWER_JOURNAL_MAX_QUEUE", "10000"))
+ANSWER_JOURNAL_PUT_TIMEOUT_MS = int(os.getenv("ANSWER_JOURNAL_PUT_TIMEOUT_MS", "50"))
+ANSWER_JOURNAL_MAX_RETRIES = int(os.getenv("ANSWER_JOURNAL_MAX_RETRIES", "5"))
+
+# Кэш соответствия telegram_id -> users.id
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "100000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "3600"))  # секунд
+USER_CACHE_NEGATIVE_TTL = float(os.getenv("USER_CACHE_NEGATIVE_TTL", "5"))  # секунд
+
+# Поиск по словарю: postgres (pg_trgm), memory (индекс в памяти) или auto
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto").lower()
+
+# Хранение состояния диалогов (context.user_data): none (только в памяти), sqlite или postgres
+PERSISTENCE_BACKEND = os.getenv("PERSISTENCE_BACKEND", "none").lower()
+PERSISTENCE_SQLITE_PATH = os.getenv("PERSISTENCE_SQLITE_PATH", "data/bot_state.sqlite3")
+PERSISTENCE_UPDATE_INTERVAL = float(os.getenv("PERSISTENCE_UPDATE_INTERVAL", "1"))  # секунд
+
+# Получение обновлений: polling (getUpdates) или webhook (встроенный HTTP-сервер)
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")  # публичный HTTPS-адрес для setWebhook
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN")  # если не задан, генерируется при запуске
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+
+# Параллельная обработка обновлений (обновления одного пользователя — по порядку)
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", "20"))  # не больше пула соединений БД
+UPDATE_MAX_PENDING = int(os.getenv("UPDATE_MAX_PENDING", "1000"))
+
+# Адрес Bot API (для локальной заглушки), например http://127.0.0.1:8081/bot
+BOT_API_BASE_URL = os.getenv("BOT_API_BASE_URL")
+
+# Несколько процессов-воркеров (python -m bot.supervisor): обновления распределяются
+# по telegram_id, воркер i слушает 127.0.0.1:WORKER_BASE_PORT + i
+BOT_WORKERS = int(os.getenv("BOT_WORKERS", "4"))
+WORKER_BASE_PORT = int(os.getenv("WORKER_BASE_PORT", "8100"))
+WORKER_HEALTH_INTERVAL = float(os.getenv("WORKER_HEALTH_INTERVAL", "10"))  # секунд
+WORKER_STOP_TIMEOUT = float(os.getenv("WORKER_STOP_TIMEOUT", "30"))  # секунд
+
+# Интервальное повторение: интервал до следующего повторения в минутах для уровней
+# освоения 0..5 (по умолчанию 10 мин, 1, 3, 7, 16 и 35 дней)
+REVIEW_INTERVALS_MINUTES = [
+    int(minutes)
+    for minutes in os.getenv("REVIEW_INTERVALS_MINUTES", "10,1440,4320,10080,23040,50400").split(
+        ","
+    )
+]
+
+# Локальный эндпоинт /metrics в формате Prometheus (0 — выключен); воркеры
+# супервизора слушают METRICS_PORT + номер воркера
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Учет SQL-запросов: медленный оператор (мс), бюджет операторов на обновление и
+# строгий режим (обработчик, превысивший бюджет, завершается ошибкой — для CI)
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "100"))
+SQL_QUERY_BUDGET = int(os.getenv("SQL_QUERY_BUDGET", "10"))
+SQL_QUERY_BUDGET_STRICT = os.getenv("SQL_QUERY_BUDGET_STRICT", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# Исходящие сообщения Bot API (bot/send_scheduler.py): бюджеты отправки бота в секунду,
+# личного чата в секунду и группы в минуту, запас на всплеск в чате, повторы после 429
+# и размер пула HTTP-соединений к Bot API
+TELEGRAM_RATE_LIMIT = os.getenv("TELEGRAM_RATE_LIMIT", "true").lower() in ("1", "true", "yes")
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+TELEGRAM_GROUP_RATE_PER_MINUTE = float(os.getenv("TELEGRAM_GROUP_RATE_PER_MINUTE", "20"))
+TELEGRAM_CHAT_BURST = int(os.getenv("TELEGRAM_CHAT_BURST", "3"))
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", "3"))
+TELEGRAM_POOL_SIZE = int(os.getenv("TELEGRAM_POOL_SIZE", "256"))
+
+# Пропуск правок сообщений, не меняющих показанное, и устаревших правок
+# (bot/edit_coalescing.py); сколько последних сообщений помнить
+EDIT_COALESCING = os.getenv("EDIT_COALESCING", "true").lower() in ("1", "true", "yes")
+EDIT_CACHE_SIZE = int(os.getenv("EDIT_CACHE_SIZE", "10000"))
+
+# Импорт личного словаря из CSV/TSV (bot/database/word_import.py): размер файла
+# (Bot API отдает ботам файлы до 20 МБ), число строк, слов в одной вставке и
+# интервал обновления сообщения о ходе импорта в секундах
+IMPORT_MAX_FILE_SIZE_MB = float(os.getenv("IMPORT_MAX_FILE_SIZE_MB", "10"))
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "100000"))
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+IMPORT_PROGRESS_INTERVAL = float(os.getenv("IMPORT_PROGRESS_INTERVAL", "3"))
@@ -0,0 +1,121 @@
+"""Проверка достижений по счетчикам пользователя
+
+Условия достижений (JSONB ``achievements.condition``) компилируются один раз в
+функции-предикаты над счетчиками ``user_stats_summary``. Счетчики обновляются в
+момент событий (новая тренировка, добавление/удаление слова, ответ), поэтому
+для проверки не нужны агрегатные запросы: достаточно одной строки счетчиков.
+"""
+
+import logging
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.database.models import Achievement
+
+logger = logging.getLogger(__name__)
+
+Counters = Mapping[str, float]
+Evaluator = Callable[[Counters], bool]
+
+# Значения счетчиков для пользователя, у которого еще нет строки в user_stats_summary
+ZERO_COUNTERS: dict[str, float] = {
+    "sessions_count": 0,
+    "words_added": 0,
+    "words_mastered": 0,
+    "last_accuracy": 0,
+}
+
+
+def _first_training(condition: dict) -> Evaluator:
+    return lambda counters: counters["sessions_count"] > 0
+
+
+def _words_added(condition: dict) -> Evaluator:
+    required_count = condition.get("count", 10)
+    return lambda counters: counters["words_added"] >= required_count
+
+
+def _accuracy(condition: dict) -> Evaluator:
+    threshold = condition.get("threshold", 90)
+    return lambda counters: counters["last_accuracy"] >= threshold
+
+
+def _words_mastered(condition: dict) -> Evaluator:
+    required_count = condition.get("count", 100)
+    return lambda counters: counters["words_mastered"] >= required_count
+
+
+# Тип условия -> функция, строящая предикат по параметрам условия
+RULE_COMPILERS: dict[str, Callable[[dict], Evaluator]] = {
+    "first_training": _first_training,
+    "words_added": _words_added,
+    "accuracy": _accuracy,
+    "words_mastered": _words_mastered,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledAchievement:
+    """Достижение с заранее построенным предикатом"""
+
+    id: int
+    name: str
+    description: str | None
+    icon: str | None
+    evaluator: Evaluator | None  # None — условие не поддерживается, не разблокируется
+
+
+def compile_condition(condition) -> Evaluator | None:
+    """Построить предикат по JSON-условию или вернуть None для неизвестного условия"""
+    if not condition or not isinstance(condition, dict):
+        return None
+    compiler = RULE_COMPILERS.get(condition.get("type"))
+    return compiler(condition) if compiler else None
+
+
+class AchievementEngine:
+    """Набор скомпилированных достижений, общий для процесса"""
+
+    def __init__(self):
+        self.achievements: list[CompiledAchievement] = []
+        self.loaded = False
+
+    async def load(self, session: AsyncSession):
+        """Загрузить достижения из БД и скомпилировать их условия"""
+        result = await session.execute(select(Achievement).order_by(Achievement.id))
+        compiled = []
+        for achievement in result.scalars().all():
+            evaluator = compile_condition(achievement.condition)
+            if evaluator is None:
+                logger.info(
+                    f"Achievement {achievement.id} ({achievement.name}) has unsupported "
+                    f"condition {achievement.condition!r} and will stay locked"
+                )
+            compiled.append(
+                CompiledAchievement(
+                    id=achievement.id,
+                    name=achievement.name,
+                    description=achievement.description,
+                    icon=achievement.icon,
+                    evaluator=evaluator,
+                )
+            )
+        self.achievements = compiled
+        self.loaded = True
+
+    def newly_unlocked(self, counters: Counters, unlocked_ids: set[int]) -> list[int]:
+        """ID достижений, условия которых выполнены, но которые еще не разблокированы"""
+        return [
+            achievement.id
+            for achievement in self.achievements
+            if achievement.id not in unlocked_ids
+            and achievement.evaluator is not None
+            and achievement.evaluator(counters)
+        ]
+
+
+# Движок на процесс; достижения загружаются при старте бота (bot.main.post_init)
+achievement_engine = AchievementEngine()
@@ -0,0 +1,530 @@
+"""Журнал ответов с отложенной пакетной записью
+
+При включенном ``ANSWER_JOURNAL_ENABLED`` обработчик ответа не пишет в БД сам,
+а кладет событие в ограниченный буфер процесса. Фоновая задача сбрасывает буфер
+каждые ``ANSWER_JOURNAL_FLUSH_MS`` мс или по накоплении ``ANSWER_JOURNAL_BATCH_SIZE``
+событий: одним многострочным INSERT в ``answers`` и агрегированными обновлениями
+``training_sessions`` и ``statistics`` в одной транзакции.
+
+Гарантии сохранности:
+
+* событие, принятое ``submit``, записывается не позже чем через интервал сброса,
+  если БД доступна;
+* при ошибке записи пакет возвращается в начало буфера и повторяется; после
+  ``ANSWER_JOURNAL_MAX_RETRIES`` неудач события пишутся в лог с уровнем ERROR
+  и отбрасываются;
+* при штатной остановке (``stop`` вызывается из ``post_stop`` в ``bot.main``,
+  в том числе по SIGINT/SIGTERM) буфер сбрасывается полностью;
+* при аварийном завершении процесса теряется не более содержимого буфера
+  (до ``ANSWER_JOURNAL_MAX_QUEUE`` ответов).
+
+Если буфер заполнен и место не освободилось за ``ANSWER_JOURNAL_PUT_TIMEOUT_MS``,
+``submit`` возвращает False, и обработчик пишет ответ синхронно через
+``record_answer`` — так нагрузка выравнивается без потери ответов.
+
+Итоги тренировки читаются из ``training_sessions``, поэтому ``training_end``
+вызывает ``flush_session``: записываются только события этой тренировки, а не
+весь буфер. Глубина буфера, время сброса и исход событий видны на ``/metrics``
+(``bot_answer_journal_*``).
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.config import (
+    ANSWER_JOURNAL_BATCH_SIZE,
+    ANSWER_JOURNAL_ENABLED,
+    ANSWER_JOURNAL_FLUSH_MS,
+    ANSWER_JOURNAL_MAX_QUEUE,
+    ANSWER_JOURNAL_MAX_RETRIES,
+    ANSWER_JOURNAL_PUT_TIMEOUT_MS,
+)
+from bot.database.database import async_session_maker
+from bot.database.review import next_review_sql
+from bot.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+flush_duration = REGISTRY.histogram(
+    "bot_answer_journal_flush_seconds", "Время записи пакета журнала ответов в БД"
+)
+journal_events = REGISTRY.counter(
+    "bot_answer_journal_events_total",
+    "События журнала ответов по исходу: flushed, rejected (записаны синхронно), dropped",
+    ("outcome",),
+)
+_events_flushed = journal_events.labels("flushed")
+_events_rejected = journal_events.labels("rejected")
+_events_dropped = journal_events.labels("dropped")
+
+
+@dataclass(slots=True)
+class AnswerEvent:
+    """Ответ пользователя, ожидающий записи"""
+
+    session_id: int
+    user_id: int  # ID пользователя в Telegram
+    word_id: int
+    user_answer: str
+    is_correct: bool
+    question_type: str = "multiple_choice"
+    answered_at: datetime = field(default_factory=datetime.now)
+
+
+MAX_LOGGED_SESSIONS = 20
+
+
+def _session_ids_excerpt(batch: list[AnswerEvent]) -> str:
+    """Тренировки пакета для лога: первые MAX_LOGGED_SESSIONS и число остальных"""
+    session_ids = sorted({event.session_id for event in batch})
+    excerpt = ", ".join(map(str, session_ids[:MAX_LOGGED_SESSIONS]))
+    if len(session_ids) > MAX_LOGGED_SESSIONS:
+        excerpt += f" and {len(session_ids) - MAX_LOGGED_SESSIONS} more"
+    return excerpt
+
+
+# Строки, ссылающиеся на удаленные слова или тренировки, отбрасываются соединением,
+# чтобы одно устаревшее событие не ломало запись всего пакета
+INSERT_ANSWERS_SQL = text(
+    """
+    INSERT INTO answers (session_id, user_id, word_id, question_type, user_answer, is_correct,
+                         answered_at)
+    SELECT v.session_id, v.user_id, v.word_id, v.question_type, v.user_answer, v.is_correct,
+           v.answered_at
+    FROM unnest(
+        CAST(:session_ids AS integer[]),
+        CAST(:user_ids AS bigint[]),
+        CAST(:word_ids AS integer[]),
+        CAST(:question_types AS varchar[]),
+        CAST(:user_answers AS varchar[]),
+        CAST(:is_correct AS boolean[]),
+        CAST(:answered_at AS timestamp[])
+    ) AS v(session_id, user_id, word_id, question_type, user_answer, is_correct, answered_at)
+    JOIN training_sessions ts ON ts.id = v.session_id
+    JOIN words w ON w.id = v.word_id
+    """
+)
+
+# Итоги тренировок (число ответов, точность последней тренировки, сумма точностей,
+# ответы за сегодня) сразу переносятся в user_stats_summary
+UPDATE_SESSIONS_SQL = text(
+    """
+    WITH v AS (
+        SELECT *
+        FROM unnest(
+            CAST(:session_ids AS integer[]),
+            CAST(:answered AS integer[]),
+            CAST(:correct AS integer[])
+        ) AS v(session_id, answered, correct)
+    ),
+    old AS (
+        SELECT ts.id, ts.accuracy
+        FROM training_sessions ts
+        JOIN v ON v.session_id = ts.id
+    ),
+    updated AS (
+        UPDATE training_sessions ts
+        SET total_questions = COALESCE(ts.total_questions, 0) + v.answered,
+            correct_answers = COALESCE(ts.correct_answers, 0) + v.correct,
+            accuracy = ROUND(
+                (COALESCE(ts.correct_answers, 0) + v.correct) * 100.0
+                / (COALESCE(ts.total_questions, 0) + v.answered),
+                2
+            )
+        FROM v
+        WHERE ts.id = v.session_id
+        RETURNING ts.id, ts.user_id, ts.accuracy, ts.created_at, v.answered, v.correct
+    ),
+    per_user AS (
+        SELECT u.user_id,
+               (array_agg(u.accuracy ORDER BY u.id DESC))[1] AS last_accuracy,
+               SUM(u.answered) AS answered,
+               SUM(u.correct) AS correct,
+               SUM(u.accuracy - COALESCE(o.accuracy, 0)) AS accuracy_delta,
+               COALESCE(SUM(u.answered) FILTER (WHERE u.created_at >= CURRENT_DATE), 0)
+                   AS today_answered
+        FROM updated u
+        LEFT JOIN old o ON o.id = u.id
+        GROUP BY u.user_id
+    )
+    INSERT INTO user_stats_summary AS us (
+        user_id, last_accuracy, total_questions, total_correct, accuracy_sum,
+        today_date, today_questions
+    )
+    SELECT user_id,
+           last_accuracy,
+           answered,
+           correct,
+           accuracy_delta,
+           CASE WHEN today_answered > 0 THEN CURRENT_DATE END,
+           today_answered
+    FROM per_user
+    ON CONFLICT (user_id) DO UPDATE
+    SET last_accuracy = EXCLUDED.last_accuracy,
+        total_questions = us.total_questions + EXCLUDED.total_questions,
+        total_correct = us.total_correct + EXCLUDED.total_correct,
+        accuracy_sum = us.accuracy_sum + EXCLUDED.accuracy_sum,
+        today_questions = CASE
+            WHEN us.today_date = CURRENT_DATE THEN us.today_questions + EXCLUDED.today_questions
+            ELSE us.today_questions
+        END
+    """
+)
+
+# Последовательность изменений уровня ±1 с ограничением 0..5 сворачивается в одну
+# функцию вида LEAST(GREATEST(level + shift, low), high), см. _LevelChange.
+# Срок повторения считается от итогового уровня пакета (см. bot/database/review.py).
+# Число освоенных слов (уровень 3+) в user_stats_summary меняется по переходам уровня,
+# число изученных — по новым строкам statistics.
+_NEW_LEVEL_SQL = """(
+            SELECT LEAST(GREATEST(COALESCE(s.mastered_level, 0) + v.shift, v.low), v.high)
+            FROM v
+            WHERE v.user_id = s.user_id AND v.word_id = s.word_id
+        )"""
+UPSERT_STATISTICS_SQL = text(
+    f"""
+    WITH v AS (
+        SELECT *
+        FROM unnest(
+            CAST(:user_ids AS bigint[]),
+            CAST(:word_ids AS integer[]),
+            CAST(:shifts AS integer[]),
+            CAST(:lows AS integer[]),
+            CAST(:highs AS integer[])
+        ) AS v(user_id, word_id, shift, low, high)
+        WHERE EXISTS (SELECT 1 FROM words w WHERE w.id = v.word_id)
+    ),
+    old AS (
+        SELECT s.user_id, s.word_id, s.mastered_level
+        FROM statistics s
+        JOIN v ON v.user_id = s.user_id AND v.word_id = s.word_id
+    ),
+    upserted AS (
+        INSERT INTO statistics AS s (user_id, word_id, mastered_level, next_review)
+        SELECT user_id,
+               word_id,
+               LEAST(GREATEST(shift, low), high),
+               {next_review_sql("LEAST(GREATEST(shift, low), high)")}
+        FROM v
+        ON CONFLICT (user_id, word_id) DO UPDATE
+        SET mastered_level = {_NEW_LEVEL_SQL},
+            next_review = {next_review_sql(_NEW_LEVEL_SQL)}
+        RETURNING s.user_id, s.word_id, s.mastered_level
+    ),
+    deltas AS (
+        SELECT u.user_id,
+               SUM(CAST(u.mastered_level >= 3 AS integer)
+                   - CAST(COALESCE(o.mastered_level, 0) >= 3 AS integer)) AS mastered,
+               SUM(CAST(o.user_id IS NULL AS integer)) AS studied
+        FROM upserted u
+        LEFT JOIN old o ON o.user_id = u.user_id AND o.word_id = u.word_id
+        GROUP BY u.user_id
+    )
+    INSERT INTO user_stats_summary AS us (user_id, words_mastered, words_studied)
+    SELECT user_id, mastered, studied
+    FROM deltas
+    WHERE mastered <> 0 OR studied <> 0
+    ON CONFLICT (user_id) DO UPDATE
+    SET words_mastered = us.words_mastered + EXCLUDED.words_mastered,
+        words_studied = us.words_studied + EXCLUDED.words_studied
+    """
+)
+
+
+class _LevelChange:
+    """Композиция изменений уровня освоения: level -> min(max(level + shift, low), high)"""
+
+    __slots__ = ("shift", "low", "high")
+
+    def __init__(self):
+        # Тождественное преобразование для уровней 0..5
+        self.shift, self.low, self.high = 0, 0, 5
+
+    def apply(self, is_correct: bool):
+        """Добавить шаг ±1 с ограничением 0..5 после уже накопленных"""
+        step = 1 if is_correct else -1
+        self.shift += step
+        self.low = min(max(self.low + step, 0), 5)
+        self.high = min(max(self.high + step, 0), 5)
+
+
+async def write_answer_batch(session: AsyncSession, events: list[AnswerEvent]):
+    """Записать пакет ответов тремя операторами (без commit)"""
+    await session.execute(
+        INSERT_ANSWERS_SQL,
+        {
+            "session_ids": [e.session_id for e in events],
+            "user_ids": [e.user_id for e in events],
+            "word_ids": [e.word_id for e in events],
+            "question_types": [e.question_type for e in events],
+            "user_answers": [e.user_answer for e in events],
+            "is_correct": [e.is_correct for e in events],
+            "answered_at": [e.answered_at for e in events],
+        },
+    )
+
+    sessions: dict[int, list[int]] = {}
+    levels: dict[tuple[int, int], _LevelChange] = {}
+    for event in events:
+        counters = sessions.setdefault(event.session_id, [0, 0])
+        counters[0] += 1
+        counters[1] += int(event.is_correct)
+        levels.setdefault((event.user_id, event.word_id), _LevelChange()).apply(event.is_correct)
+
+    await session.execute(
+        UPDATE_SESSIONS_SQL,
+        {
+            "session_ids": list(sessions),
+            "answered": [answered for answered, _ in sessions.values()],
+            "correct": [correct for _, correct in sessions.values()],
+        },
+    )
+    await session.execute(
+        UPSERT_STATISTICS_SQL,
+        {
+            "user_ids": [user_id for user_id, _ in levels],
+            "word_ids": [word_id for _, word_id in levels],
+            "shifts": [change.shift for change in levels.values()],
+            "lows": [change.low for change in levels.values()],
+            "highs": [change.high for change in levels.values()],
+        },
+    )
+
+
+class AnswerJournal:
+    """Ограниченный буфер ответов с фоновым пакетным сбросом в БД"""
+
+    def __init__(
+        self,
+        enabled: bool = ANSWER_JOURNAL_ENABLED,
+        max_queue: int = ANSWER_JOURNAL_MAX_QUEUE,
+        batch_size: int = ANSWER_JOURNAL_BATCH_SIZE,
+        flush_interval: float = ANSWER_JOURNAL_FLUSH_MS / 1000,
+        put_timeout: float = ANSWER_JOURNAL_PUT_TIMEOUT_MS / 1000,
+        max_retries: int = ANSWER_JOURNAL_MAX_RETRIES,
+    ):
+        self.enabled = enabled
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+
+        self._buffer: list[AnswerEvent] = []
+        # Пакеты, которые сейчас пишутся в БД; условие оповещает об окончании записи
+        self._in_flight: list[list[AnswerEvent]] = []
+        self._written = asyncio.Condition()
+        self._task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+        self._has_events = asyncio.Event()
+        self._batch_ready = asyncio.Event()
+        self._has_space = asyncio.Event()
+        self._has_space.set()
+        self._failures = 0
+        self._stopping = False
+
+        # Метрики
+        self.flushed_events = 0
+        self.flush_count = 0
+        self.flush_errors = 0
+        self.rejected_events = 0
+        self.dropped_events = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._buffer)
+
+    def metrics(self) -> dict[str, float]:
+        """Текущие значения метрик журнала"""
+        return {
+            "queue_depth": self.queue_depth,
+            "flushed_events": self.flushed_events,
+            "flush_count": self.flush_count,
+            "flush_errors": self.flush_errors,
+            "rejected_events": self.rejected_events,
+            "dropped_events": self.dropped_events,
+            "last_flush_ms": self.last_flush_ms,
+            "max_flush_ms": self.max_flush_ms,
+            "avg_flush_ms": self.total_flush_ms / self.flush_count if self.flush_count else 0.0,
+        }
+
+    async def start(self):
+        """Запустить фоновый сброс (ничего не делает, если журнал выключен)"""
+        if self.enabled and not self.running:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name="answer-journal")
+            logger.info(
+                f"Answer journal started: batch={self.batch_size}, "
+                f"interval={self.flush_interval * 1000:.0f}ms, queue={self.max_queue}"
+            )
+
+    async def stop(self):
+        """Остановить фоновый сброс и записать все накопленные события"""
+        if self._task is not None:
+            # Задача не отменяется, а завершается сама после текущего сброса,
+            # чтобы не потерять пакет, который уже извлечен из буфера
+            self._stopping = True
+            self._has_events.set()
+            self._batch_ready.set()
+            await self._task
+            self._task = None
+
+        while self._buffer:
+            pending = len(self._buffer)
+            await self.flush()
+            if len(self._buffer) >= pending and self._failures:
+                await asyncio.sleep(min(0.1 * self._failures, 1.0))
+        logger.info(f"Answer journal stopped: {self.metrics()}")
+
+    async def submit(self, event: AnswerEvent) -> bool:
+        """Поставить ответ в очередь на запись
+
+        Returns:
+            True, если событие принято журналом; False, если журнал не запущен
+            или буфер переполнен — тогда ответ нужно записать синхронно
+        """
+        if not self.running or self._stopping:
+            return False
+
+        if len(self._buffer) >= self.max_queue:
+            self._has_space.clear()
+            try:
+                await asyncio.wait_for(self._has_space.wait(), self.put_timeout)
+            except TimeoutError:
+                self.rejected_events += 1
+                _events_rejected.inc()
+                return False
+            if len(self._buffer) >= self.max_queue:
+                self.rejected_events += 1
+                _events_rejected.inc()
+                return False
+
+        self._buffer.append(event)
+        self._has_events.set()
+        if len(self._buffer) >= self.batch_size:
+            self._batch_ready.set()
+        return True
+
+    async def flush(self):
+        """Немедленно записать накопленные события пакетами по batch_size"""
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[: self.batch_size]
+                del self._buffer[: self.batch_size]
+                self._has_space.set()
+
+                try:
+                    await self._write(batch)
+                except Exception as e:
+                    self.flush_errors += 1
+                    self._failures += 1
+                    if self._failures > self.max_retries:
+                        self.dropped_events += len(batch)
+                        _events_dropped.inc(len(batch))
+                        # Traceback уже в записях о неудачных попытках
+                        logger.error(
+                            f"Answer journal: dropping {len(batch)} events after "
+                            f"{self._failures} failed flushes ({e}); "
+                            f"sessions: {_session_ids_excerpt(batch)}"
+                        )
+                        self._failures = 0
+                        continue
+                    logger.error(f"Answer journal flush failed, will retry: {e}", exc_info=True)
+                    # Пакет возвращается в начало буфера, порядок ответов сохраняется
+                    self._buffer[:0] = batch
+                    break
+
+                self._failures = 0
+
+            if len(self._buffer) < self.batch_size:
+                self._batch_ready.clear()
+            if not self._buffer:
+                self._has_events.clear()
+
+    async def flush_session(self, session_id: int):
+        """Записать сейчас только события одной тренировки (для ее итогов)
+
+        Если пакет с ответами этого пользователя уже пишется, сначала
+        дожидается его: изменения уровня одного слова применяются по порядку.
+        При ошибке события возвращаются в буфер и будут записаны общим сбросом.
+        """
+        events = [e for e in self._buffer if e.session_id == session_id]
+        if not events:
+            return
+        user_id = events[0].user_id
+        async with self._written:
+            await self._written.wait_for(
+                lambda: not any(e.user_id == user_id for batch in self._in_flight for e in batch)
+            )
+
+        # За время ожидания события могли уйти в общий сброс
+        events = [e for e in self._buffer if e.session_id == session_id]
+        if not events:
+            return
+        self._buffer[:] = [e for e in self._buffer if e.session_id != session_id]
+        self._has_space.set()
+        try:
+            await self._write(events)
+        except Exception as e:
+            self.flush_errors += 1
+            logger.error(f"Answer journal session flush failed, will retry: {e}", exc_info=True)
+            self._buffer[:0] = events
+            self._has_events.set()
+
+    async def _write(self, batch: list[AnswerEvent]):
+        """Записать пакет в отдельной транзакции и учесть метрики"""
+        self._in_flight.append(batch)
+        started = time.perf_counter()
+        try:
+            async with async_session_maker() as session:
+                await write_answer_batch(session, batch)
+                await session.commit()
+        finally:
+            self._in_flight.remove(batch)
+            async with self._written:
+                self._written.notify_all()
+
+        elapsed = time.perf_counter() - started
+        flush_duration.observe(elapsed)
+        _events_flushed.inc(len(batch))
+        elapsed_ms = elapsed * 1000
+        self.flush_count += 1
+        self.flushed_events += len(batch)
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
+
+    async def _run(self):
+        """Фоновый цикл: ждать первое событие, затем интервал или полный пакет"""
+        while not self._stopping:
+            await self._has_events.wait()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            await self.flush()
+            if self._failures and not self._stopping:
+                # Пауза перед повтором, чтобы не нагружать недоступную БД
+                await asyncio.sleep(min(self.flush_interval * 2**self._failures, 5.0))
+
+
+# Журнал на процесс; запускается из bot.main, если включен в конфигурации
+answer_journal = AnswerJournal()
+
+REGISTRY.gauge(
+    "bot_answer_journal_queue_depth",
+    "События журнала ответов, ожидающие записи",
+    lambda: answer_journal.queue_depth,
+)
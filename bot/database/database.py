@@ -1,9 +1,26 @@
 """Настройка подключения к базе данных"""
 
+import time
+
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from bot.config import DATABASE_URL
+from bot.database.query_stats import install_query_hooks
+from bot.metrics import REGISTRY, db_pool_checkout_wait
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, измеряющий ожидание свободного соединения (bot/metrics.py)"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started)
+
 
 # FIX: Настроен пул соединений для предотвращения исчерпания соединений при высокой нагрузке (P0.4)
 engine = create_async_engine(
@@ -14,11 +31,33 @@ engine = create_async_engine(
     max_overflow=20,       # Максимальное переполнение пула
     pool_pre_ping=True,     # Проверка соединений перед использованием
     pool_recycle=3600,      # Переиспользование соединений (1 час)
+    poolclass=InstrumentedQueuePool,
+)
+# Число операторов и время БД на обновление, медленные запросы (bot/database/query_stats.py)
+install_query_hooks(engine)
+
+REGISTRY.gauge(
+    "bot_db_pool_checked_out",
+    "Соединений пула БД, выданных сессиям",
+    lambda: engine.sync_engine.pool.checkedout(),
+)
+REGISTRY.gauge(
+    "bot_db_pool_overflow",
+    "Соединений сверх pool_size (отрицательное — еще не открытые до pool_size)",
+    lambda: engine.sync_engine.pool.overflow(),
 )
 
 # Создание фабрики сессий
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Фабрика сессий без явной транзакции (BEGIN/COMMIT не отправляются): для операций,
+# которые выполняются одним атомарным оператором и не должны тратить лишние round trip
+autocommit_session_maker = async_sessionmaker(
+    engine.execution_options(isolation_level="AUTOCOMMIT"),
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 # Базовый класс для моделей
 Base = declarative_base()
 
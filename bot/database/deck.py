@@ -0,0 +1,129 @@
+"""Колода вопросов тренировки, подготовленная заранее
+
+При начале тренировки (и когда колода заканчивается) ``ask_question`` выбирает
+``TRAINING_DECK_SIZE + 3`` случайных слова из пула одним запросом по первичному
+ключу и собирает из них ``TRAINING_DECK_SIZE`` вопросов с вариантами ответа.
+Колода хранится в ``context.user_data["deck"]``, поэтому следующие вопросы
+показываются без обращения к БД. Вопрос — компактный список с текстами уже для
+направления тренировки::
+
+    [word_id, вопрос, правильный ответ, неверный 1, неверный 2, неверный 3]
+
+Когда в колоде остается ``TRAINING_DECK_REFILL_AT`` вопросов, следующие
+догружаются фоновой задачей (``refill_deck``). Добавление и удаление слова в
+словаре и начало новой тренировки сбрасывают колоду (``invalidate_deck``):
+номер версии колоды увеличивается, и уже запущенная догрузка отбрасывает свой
+результат, чтобы в колоду не попали удаленные слова.
+"""
+
+import logging
+import random
+
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.config import TRAINING_DECK_REFILL_AT, TRAINING_DECK_SIZE
+from bot.database.database import async_session_maker
+from bot.database.models import Word
+from bot.database.repository import get_user_id_by_telegram_id
+from bot.database.word_pool import word_pool
+
+logger = logging.getLogger(__name__)
+
+DECK_KEY = "deck"
+VERSION_KEY = "deck_version"
+
+# Пользователи, для которых уже выполняется догрузка колоды (на процесс)
+_refilling: set[int] = set()
+
+
+def make_question(correct_word: Word, wrong_words: list[Word], direction: str) -> list:
+    """Вопрос колоды по правильному слову и неверным вариантам
+
+    Если неверных вариантов меньше 3, они дополняются повторами.
+    """
+    wrong_words = list(wrong_words)
+    while len(wrong_words) < 3:
+        wrong_words.append(wrong_words[0] if wrong_words else correct_word)
+
+    if direction == "en_ru":
+        prompt, answer = correct_word.english_word, correct_word.russian_translation
+        wrong = [w.russian_translation for w in wrong_words[:3]]
+    else:  # ru_en
+        prompt, answer = correct_word.russian_translation, correct_word.english_word
+        wrong = [w.english_word for w in wrong_words[:3]]
+    return [correct_word.id, prompt, answer, *wrong]
+
+
+async def sample_deck_words(
+    session: AsyncSession, db_user_id: int, size: int = TRAINING_DECK_SIZE
+) -> list[Word]:
+    """Слова для колоды из ``size`` вопросов: один запрос по первичному ключу"""
+    return await word_pool.sample(session, db_user_id, size + 3)
+
+
+def make_deck(words: list[Word], direction: str, size: int = TRAINING_DECK_SIZE) -> list[list]:
+    """Собрать колоду из выбранных слов (нужно хотя бы 2 разных слова)
+
+    Правильные ответы идут по кругу по ``words``, неверные варианты выбираются
+    из остальных слов.
+    """
+    if len(words) < 2:
+        return []
+    deck = []
+    for i in range(size):
+        correct_word = words[i % len(words)]
+        others = [w for w in words if w.id != correct_word.id]
+        deck.append(
+            make_question(correct_word, random.sample(others, min(3, len(others))), direction)
+        )
+    return deck
+
+
+def take_question(user_data: dict) -> list | None:
+    """Взять следующий вопрос из колоды; None — колоды нет или она пуста"""
+    deck = user_data.get(DECK_KEY)
+    return deck.pop(0) if deck else None
+
+
+def invalidate_deck(user_data: dict):
+    """Сбросить колоду и отменить результат уже запущенной догрузки"""
+    user_data.pop(DECK_KEY, None)
+    user_data[VERSION_KEY] = user_data.get(VERSION_KEY, 0) + 1
+
+
+def start_refill(
+    user_data: dict, telegram_id: int, refill_at: int = TRAINING_DECK_REFILL_AT
+) -> bool:
+    """Проверить, пора ли догружать колоду; True — нужно запустить ``refill_deck``"""
+    deck = user_data.get(DECK_KEY)
+    if deck is None or len(deck) > refill_at or telegram_id in _refilling:
+        return False
+    _refilling.add(telegram_id)
+    return True
+
+
+async def refill_deck(
+    user_data: dict, telegram_id: int, direction: str, size: int = TRAINING_DECK_SIZE
+):
+    """Догрузить колоду в фоне (после ``start_refill``)
+
+    Если за время загрузки колода была сброшена, результат отбрасывается.
+    """
+    version = user_data.get(VERSION_KEY, 0)
+    try:
+        async with async_session_maker() as session:
+            db_user_id = await get_user_id_by_telegram_id(session, telegram_id)
+            if db_user_id is None:
+                return
+            words = await sample_deck_words(session, db_user_id, size)
+    except DatabaseError as e:
+        # Колода догрузится синхронно, когда закончится
+        logger.warning(f"Training deck refill failed for {telegram_id}: {e}")
+        return
+    finally:
+        _refilling.discard(telegram_id)
+
+    deck = user_data.get(DECK_KEY)
+    if deck is not None and user_data.get(VERSION_KEY, 0) == version:
+        deck.extend(make_deck(words, direction, size))
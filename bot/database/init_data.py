@@ -2,7 +2,7 @@
 
 import asyncio
 
-from sqlalchemy import select
+from sqlalchemy import select, text
 
 from bot.database.database import Base, async_session_maker, engine
 from bot.database.models import Achievement, Category, Word
@@ -272,6 +272,9 @@ INITIAL_ACHIEVEMENTS = [
 async def init_database():
     """Инициализация базы данных - создание таблиц"""
     async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # GIN-индексы поиска по словарю используют операторы pg_trgm
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
     print("Таблицы базы данных созданы успешно.")
 
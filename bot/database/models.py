@@ -6,7 +6,9 @@ from sqlalchemy import (
     BigInteger,
     Boolean,
     Column,
+    Date,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -33,6 +35,7 @@ class User(Base):
     statistics = relationship("Statistics", back_populates="user")
     user_achievements = relationship("UserAchievement", back_populates="user")
     words = relationship("Word", back_populates="user")
+    stats_summary = relationship("UserStatsSummary", back_populates="user", uselist=False)
 
 
 class Category(Base):
@@ -67,8 +70,31 @@ class Word(Base):
     answers = relationship("Answer", back_populates="word")
     statistics = relationship("Statistics", back_populates="word")
 
-    # Уникальность комбинации слова и пользователя
-    __table_args__ = (UniqueConstraint("english_word", "user_id", name="unique_user_word"),)
+    __table_args__ = (
+        # Уникальность комбинации слова и пользователя
+        UniqueConstraint("english_word", "user_id", name="unique_user_word"),
+        # Личные слова пользователя в алфавитном порядке
+        Index("ix_words_user_id_english_word", "user_id", "english_word", "id"),
+        # Общие публичные слова (пул слов тренировки)
+        Index(
+            "ix_words_shared_public",
+            "id",
+            postgresql_where=user_id.is_(None) & is_public,
+        ),
+        # Поиск по словарю (pg_trgm, см. bot/database/search.py)
+        Index(
+            "ix_words_english_word_trgm",
+            func.lower(english_word).label("english_word_lower"),
+            postgresql_using="gin",
+            postgresql_ops={"english_word_lower": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_words_russian_translation_trgm",
+            func.lower(russian_translation).label("russian_translation_lower"),
+            postgresql_using="gin",
+            postgresql_ops={"russian_translation_lower": "gin_trgm_ops"},
+        ),
+    )
 
 
 class TrainingSession(Base):
@@ -88,6 +114,11 @@ class TrainingSession(Base):
     user = relationship("User", back_populates="training_sessions")
     answers = relationship("Answer", back_populates="session")
 
+    __table_args__ = (
+        # Последние тренировки пользователя
+        Index("ix_training_sessions_user_id_created_at", "user_id", created_at.desc()),
+    )
+
 
 class Answer(Base):
     """Модель ответа"""
@@ -109,6 +140,11 @@ class Answer(Base):
     user = relationship("User", back_populates="answers")
     word = relationship("Word", back_populates="answers")
 
+    __table_args__ = (
+        Index("ix_answers_session_id", "session_id"),
+        Index("ix_answers_word_id", "word_id"),
+    )
+
 
 class Statistics(Base):
     """Модель статистики"""
@@ -118,12 +154,20 @@ class Statistics(Base):
     user_id = Column(BigInteger, ForeignKey("users.telegram_id"), primary_key=True)
     word_id = Column(Integer, ForeignKey("words.id"), primary_key=True)
     mastered_level = Column(Integer, default=0)  # 0-5
-    next_review = Column(TIMESTAMP)
+    next_review = Column(TIMESTAMP)  # срок повторения, см. bot/database/review.py
 
     # Связи
     user = relationship("User", back_populates="statistics")
     word = relationship("Word", back_populates="statistics")
 
+    __table_args__ = (
+        # Слова пользователя по уровню освоения
+        Index("ix_statistics_user_id_mastered_level", "user_id", "mastered_level"),
+        Index("ix_statistics_word_id", "word_id"),
+        # Очередь повторения пользователя
+        Index("ix_statistics_user_id_next_review", "user_id", "next_review"),
+    )
+
 
 class Achievement(Base):
     """Модель достижения"""
@@ -153,3 +197,35 @@ class UserAchievement(Base):
     # Связи
     user = relationship("User", back_populates="user_achievements")
     achievement = relationship("Achievement", back_populates="user_achievements")
+
+
+class UserStatsSummary(Base):
+    """Модель агрегированных счетчиков пользователя (статистика и достижения)"""
+
+    __tablename__ = "user_stats_summary"
+
+    user_id = Column(BigInteger, ForeignKey("users.telegram_id"), primary_key=True)
+    sessions_count = Column(Integer, nullable=False, default=0, server_default="0")
+    words_added = Column(Integer, nullable=False, default=0, server_default="0")  # личные слова
+    words_mastered = Column(Integer, nullable=False, default=0, server_default="0")  # уровень 3+
+    last_accuracy = Column(DECIMAL(5, 2))  # точность последней тренировки с ответами
+    total_questions = Column(Integer, nullable=False, default=0, server_default="0")
+    total_correct = Column(Integer, nullable=False, default=0, server_default="0")
+    accuracy_sum = Column(DECIMAL(14, 2), nullable=False, default=0, server_default="0")
+    words_studied = Column(Integer, nullable=False, default=0, server_default="0")
+    today_date = Column(Date)  # день, к которому относятся счетчики today_*
+    today_sessions = Column(Integer, nullable=False, default=0, server_default="0")
+    today_questions = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Связи
+    user = relationship("User", back_populates="stats_summary")
+
+
+class BotUserState(Base):
+    """Модель сохраненного состояния диалога пользователя (context.user_data)"""
+
+    __tablename__ = "bot_user_state"
+
+    user_id = Column(BigInteger, primary_key=True)  # ID пользователя в Telegram
+    data = Column(Text, nullable=False)  # компактный JSON, см. bot/database/persistence.py
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
@@ -0,0 +1,119 @@
+"""Постраничный просмотр слов по ключу (keyset pagination)
+
+Страница запрашивается не через OFFSET, а относительно граничного слова
+предыдущей страницы: «после» или «до» него в порядке сортировки. Поэтому любая
+страница стоит столько же, сколько первая. Курсор — направление и id граничного
+слова; он помещается в callback_data кнопки (лимит Telegram — 64 байта), а
+ключ сортировки граничного слова запрос вычисляет сам.
+"""
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from bot.database.models import Word
+
+NEXT = "n"
+PREV = "p"
+
+
+@dataclass(frozen=True, slots=True)
+class Cursor:
+    """Граница страницы: слова после (NEXT) или до (PREV) слова word_id"""
+
+    direction: str
+    word_id: int
+
+    def encode(self, prefix: str) -> str:
+        """Строка для callback_data, например ``dictionary_my_words_page:n:123``"""
+        return f"{prefix}:{self.direction}:{self.word_id}"
+
+    @classmethod
+    def decode(cls, data: str, prefix: str) -> "Cursor | None":
+        """Разобрать callback_data; None для первой страницы или неверных данных"""
+        parts = data.split(":")
+        if len(parts) != 3 or parts[0] != prefix or parts[1] not in (NEXT, PREV):
+            return None
+        try:
+            return cls(parts[1], int(parts[2]))
+        except ValueError:
+            return None
+
+
+@dataclass(slots=True)
+class Page:
+    """Страница слов и наличие соседних страниц"""
+
+    items: list[Word]
+    has_prev: bool
+    has_next: bool
+
+    def prev_cursor(self) -> Cursor:
+        return Cursor(PREV, self.items[0].id)
+
+    def next_cursor(self) -> Cursor:
+        return Cursor(NEXT, self.items[-1].id)
+
+
+# fetch(cursor, limit) -> до limit слов в порядке показа, примыкающих к курсору
+Fetch = Callable[[Cursor | None, int], Awaitable[list[Word]]]
+
+
+async def fetch_page(fetch: Fetch, cursor: Cursor | None, page_size: int) -> Page:
+    """Получить страницу, запросив на одно слово больше, чтобы узнать о соседней
+
+    Если граничное слово удалено или за ним ничего не осталось, возвращается
+    первая страница.
+    """
+    items = await fetch(cursor, page_size + 1)
+    if cursor is not None and not items:
+        cursor = None
+        items = await fetch(None, page_size + 1)
+
+    more = len(items) > page_size
+    if cursor is None:
+        return Page(items[:page_size], has_prev=False, has_next=more)
+    if cursor.direction == NEXT:
+        return Page(items[:page_size], has_prev=True, has_next=more)
+    # При движении назад лишнее слово — самое раннее
+    return Page(items[-page_size:], has_prev=more, has_next=True)
+
+
+def user_words_query(user_id: int, cursor: Cursor | None, limit: int) -> Select:
+    """Запрос страницы личных слов пользователя (users.id) по порядку (english_word, id)
+
+    Запрос обслуживается индексом ix_words_user_id_english_word. Для PREV слова
+    возвращаются в обратном порядке.
+    """
+    stmt = select(Word).where(Word.user_id == user_id)
+    if cursor is None:
+        stmt = stmt.order_by(Word.english_word, Word.id)
+    else:
+        bound = aliased(Word)
+        boundary = (
+            select(bound.english_word)
+            .where(bound.id == cursor.word_id, bound.user_id == user_id)
+            .scalar_subquery()
+        )
+        key = tuple_(Word.english_word, Word.id)
+        if cursor.direction == NEXT:
+            stmt = stmt.where(key > tuple_(boundary, cursor.word_id))
+            stmt = stmt.order_by(Word.english_word, Word.id)
+        else:
+            stmt = stmt.where(key < tuple_(boundary, cursor.word_id))
+            stmt = stmt.order_by(Word.english_word.desc(), Word.id.desc())
+    return stmt.limit(limit)
+
+
+async def fetch_user_words(
+    session: AsyncSession, user_id: int, cursor: Cursor | None, limit: int
+) -> list[Word]:
+    """Страница личных слов пользователя в порядке показа"""
+    result = await session.execute(user_words_query(user_id, cursor, limit))
+    words = list(result.scalars().all())
+    if cursor is not None and cursor.direction == PREV:
+        words.reverse()
+    return words
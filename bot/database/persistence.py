@@ -0,0 +1,350 @@
+"""Хранение состояния диалогов (context.user_data) между перезапусками бота
+
+Состояние тренировки и словаря (``training_session_id``, ``correct_word_id``,
+``correct_answer_index``, ``dictionary_state``, ``new_word_*`` и др.) хранится в
+``context.user_data``. ``StatePersistence`` — реализация ``BasePersistence``
+python-telegram-bot, которая сохраняет только user_data:
+
+* приложение раз в ``PERSISTENCE_UPDATE_INTERVAL`` секунд передает данные
+  пользователей, изменившихся с прошлого раза; ``update_user_data`` только
+  запоминает последнее состояние пользователя (повторные изменения сливаются),
+  а фоновая задача пишет все накопленное одним пакетом;
+* пустое состояние не хранится: строка пользователя удаляется;
+* при загрузке все состояния читаются одним запросом, при штатной остановке
+  (``flush``) несохраненные изменения дописываются.
+
+Состояние сериализуется в компактный JSON с короткими ключами (``KEY_ALIASES``).
+
+Хранилища (``PERSISTENCE_BACKEND``):
+
+* ``none`` (по умолчанию) — состояние только в памяти, как раньше;
+* ``sqlite`` — локальный файл SQLite в режиме WAL (``PERSISTENCE_SQLITE_PATH``),
+  для одного процесса бота;
+* ``postgres`` — таблица ``bot_user_state`` в основной БД, общая для нескольких
+  процессов бота (пользователь при этом должен обслуживаться одним процессом,
+  см. ``bot.supervisor``).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+
+from sqlalchemy import text
+from telegram.ext import BasePersistence, PersistenceInput
+
+from bot.config import (
+    PERSISTENCE_BACKEND,
+    PERSISTENCE_SQLITE_PATH,
+    PERSISTENCE_UPDATE_INTERVAL,
+)
+from bot.database.database import async_session_maker
+from bot.update_processor import shard_for
+
+logger = logging.getLogger(__name__)
+
+# Короткие ключи для сериализации; неизвестные ключи сохраняются как есть
+KEY_ALIASES = {
+    "training_session_id": "s",
+    "training_direction": "d",
+    "training_mode": "m",
+    "review_recent": "rr",
+    "deck": "k",
+    "deck_version": "kv",
+    "correct_word_id": "w",
+    "correct_answer_index": "i",
+    "dictionary_state": "ds",
+    "new_word_english": "ne",
+    "new_word_russian": "nr",
+    "search_term": "q",
+}
+_KEYS_BY_ALIAS = {alias: key for key, alias in KEY_ALIASES.items()}
+
+
+def encode_state(data: dict) -> str:
+    """Сериализовать user_data в компактную строку"""
+    return json.dumps(
+        {KEY_ALIASES.get(key, key): value for key, value in data.items()},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def decode_state(raw: str) -> dict:
+    """Восстановить user_data из строки ``encode_state``"""
+    return {_KEYS_BY_ALIAS.get(key, key): value for key, value in json.loads(raw).items()}
+
+
+class StateStore(ABC):
+    """Интерфейс хранилища: загрузка всех состояний и пакетная запись"""
+
+    name = "base"
+
+    @abstractmethod
+    async def load(self) -> dict[int, str]:
+        """Все сохраненные состояния: telegram_id -> сериализованное состояние"""
+
+    @abstractmethod
+    async def write(self, upserts: dict[int, str], deletes: list[int]):
+        """Записать пакет изменений одной транзакцией"""
+
+    async def close(self):
+        """Освободить ресурсы хранилища"""
+        return None  # по умолчанию освобождать нечего
+
+
+class SQLiteStateStore(StateStore):
+    """Локальный файл SQLite в режиме WAL; запросы выполняются в отдельном потоке"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = PERSISTENCE_SQLITE_PATH):
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # В режиме WAL NORMAL не портит файл при сбое, но не ждет fsync на каждый commit
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS bot_user_state (
+                    user_id INTEGER PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _load(self) -> dict[int, str]:
+        return dict(self._connect().execute("SELECT user_id, data FROM bot_user_state"))
+
+    def _write(self, upserts: dict[int, str], deletes: list[int]):
+        connection = self._connect()
+        now = time.time()
+        with connection:
+            connection.executemany(
+                """
+                INSERT INTO bot_user_state (user_id, data, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT (user_id) DO UPDATE
+                SET data = excluded.data, updated_at = excluded.updated_at
+                """,
+                [(user_id, data, now) for user_id, data in upserts.items()],
+            )
+            connection.executemany(
+                "DELETE FROM bot_user_state WHERE user_id = ?", [(user_id,) for user_id in deletes]
+            )
+
+    async def load(self) -> dict[int, str]:
+        return await asyncio.to_thread(self._load)
+
+    async def write(self, upserts: dict[int, str], deletes: list[int]):
+        await asyncio.to_thread(self._write, upserts, deletes)
+
+    async def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class PostgresStateStore(StateStore):
+    """Таблица bot_user_state в основной БД; пакет пишется двумя операторами"""
+
+    name = "postgres"
+
+    LOAD_SQL = text("SELECT user_id, data FROM bot_user_state")
+    UPSERT_SQL = text(
+        """
+        INSERT INTO bot_user_state (user_id, data, updated_at)
+        SELECT v.user_id, v.data, now()
+        FROM unnest(CAST(:user_ids AS bigint[]), CAST(:data AS text[])) AS v(user_id, data)
+        ON CONFLICT (user_id) DO UPDATE
+        SET data = EXCLUDED.data, updated_at = EXCLUDED.updated_at
+        """
+    )
+    DELETE_SQL = text("DELETE FROM bot_user_state WHERE user_id = ANY(CAST(:user_ids AS bigint[]))")
+
+    async def load(self) -> dict[int, str]:
+        async with async_session_maker() as session:
+            result = await session.execute(self.LOAD_SQL)
+            return dict(result.tuples().all())
+
+    async def write(self, upserts: dict[int, str], deletes: list[int]):
+        async with async_session_maker() as session:
+            if upserts:
+                await session.execute(
+                    self.UPSERT_SQL,
+                    {"user_ids": list(upserts), "data": list(upserts.values())},
+                )
+            if deletes:
+                await session.execute(self.DELETE_SQL, {"user_ids": deletes})
+            await session.commit()
+
+
+class StatePersistence(BasePersistence):
+    """Persistence для user_data с объединением изменений и пакетной записью"""
+
+    def __init__(
+        self,
+        store: StateStore,
+        update_interval: float = PERSISTENCE_UPDATE_INTERVAL,
+        shard: tuple[int, int] | None = None,
+    ):
+        super().__init__(
+            store_data=PersistenceInput(
+                bot_data=False, chat_data=False, user_data=True, callback_data=False
+            ),
+            update_interval=update_interval,
+        )
+        self.store = store
+        # (номер воркера, число воркеров): загружаются только состояния своих пользователей
+        self.shard = shard
+        # telegram_id -> сериализованное состояние или None (удалить)
+        self._pending: dict[int, str | None] = {}
+        self._writer: asyncio.Task | None = None
+
+        # Метрики
+        self.written_states = 0
+        self.write_count = 0
+        self.write_errors = 0
+        self.last_write_ms = 0.0
+
+    def metrics(self) -> dict[str, float]:
+        """Текущие значения метрик записи"""
+        return {
+            "pending_states": len(self._pending),
+            "written_states": self.written_states,
+            "write_count": self.write_count,
+            "write_errors": self.write_errors,
+            "last_write_ms": self.last_write_ms,
+        }
+
+    async def get_user_data(self) -> dict[int, dict]:
+        started = time.perf_counter()
+        rows = await self.store.load()
+        user_data = {}
+        for user_id, raw in rows.items():
+            if self.shard is not None and shard_for(user_id, self.shard[1]) != self.shard[0]:
+                continue
+            try:
+                user_data[user_id] = decode_state(raw)
+            except ValueError:
+                logger.warning(f"Skipping unreadable state of user {user_id}: {raw!r}")
+        logger.info(
+            f"Loaded {len(user_data)} user states from {self.store.name} "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return user_data
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        self._pending[user_id] = encode_state(data) if data else None
+        self._schedule_write()
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._pending[user_id] = None
+        self._schedule_write()
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        # Пользователь обслуживается одним процессом, данные в памяти актуальны
+        pass
+
+    def _schedule_write(self):
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending(), name="state-persistence")
+
+    async def _write_pending(self):
+        # Приложение вызывает update_user_data для всех изменившихся пользователей
+        # в одном цикле событий: даем им отработать, чтобы записать их одним пакетом
+        await asyncio.sleep(0)
+        while self._pending:
+            batch, self._pending = self._pending, {}
+            upserts = {user_id: raw for user_id, raw in batch.items() if raw is not None}
+            deletes = [user_id for user_id, raw in batch.items() if raw is None]
+
+            started = time.perf_counter()
+            try:
+                await self.store.write(upserts, deletes)
+            except Exception as e:
+                self.write_errors += 1
+                logger.error(f"Failed to write {len(batch)} user states: {e}", exc_info=True)
+                # Возвращаем пакет, не затирая более новые изменения; повтор — при
+                # следующем обновлении приложения или в flush
+                for user_id, raw in batch.items():
+                    self._pending.setdefault(user_id, raw)
+                return
+
+            self.write_count += 1
+            self.written_states += len(batch)
+            self.last_write_ms = (time.perf_counter() - started) * 1000
+
+    async def drain(self):
+        """Дождаться записи всех накопленных изменений (одна повторная попытка при ошибке)"""
+        if self._writer is not None:
+            await self._writer
+        if self._pending:
+            self._schedule_write()
+            await self._writer
+
+    async def flush(self) -> None:
+        await self.drain()
+        logger.info(f"State persistence flushed: {self.metrics()}")
+        await self.store.close()
+
+    # Остальные данные не сохраняются (store_data), но методы абстрактные
+
+    async def get_chat_data(self) -> dict[int, dict]:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def get_conversations(self, name: str) -> dict:
+        return {}
+
+    async def update_conversation(self, name: str, key: tuple, new_state: object) -> None:
+        pass
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        pass
+
+    async def update_bot_data(self, data: dict) -> None:
+        pass
+
+    async def update_callback_data(self, data: object) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
+
+
+def create_persistence(
+    name: str = PERSISTENCE_BACKEND, shard: tuple[int, int] | None = None
+) -> StatePersistence | None:
+    """Создать persistence по имени хранилища; None — состояние только в памяти"""
+    if name == "none":
+        return None
+    if name == "sqlite":
+        return StatePersistence(SQLiteStateStore(), shard=shard)
+    if name == "postgres":
+        return StatePersistence(PostgresStateStore(), shard=shard)
+    raise ValueError(f"Unknown PERSISTENCE_BACKEND: {name!r}")
@@ -0,0 +1,179 @@
+"""Учет SQL-запросов по обновлениям: число операторов, время БД и медленные запросы
+
+Хуки ``before_cursor_execute``/``after_cursor_execute`` на движке
+(``install_query_hooks`` в bot/database/database.py) измеряют каждый оператор.
+Обертка обработчика (bot/instrumentation.py) открывает ``track_queries`` с
+меткой обработчика, и операторы, выполненные в задаче этого обновления,
+складываются в его ``QueryStats``. Фоновые задачи, запущенные обработчиком
+(догрузка колоды, подготовка вопроса), в счет обновления не входят.
+
+* Оператор дольше ``SQL_SLOW_QUERY_MS`` пишется в лог как медленный — с
+  нормализованным SQL (параметры, литералы и списки заменены на ``?``) и
+  обработчиком, из которого он выполнен. Эти записи, как и записи о
+  превышении бюджета, не подавляются фильтром повторов логгера.
+* Обновление с числом операторов больше ``SQL_QUERY_BUDGET`` пишется в лог
+  как превысившее бюджет; так видны N+1 в обработчиках. При
+  ``SQL_QUERY_BUDGET_STRICT`` обработчик завершается исключением
+  ``QueryBudgetError`` — для проверки в CI (scripts/check_query_budget.py).
+
+Число операторов и время БД на обновление попадают в метрики ``/metrics``.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import re
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from bot.config import SQL_QUERY_BUDGET, SQL_QUERY_BUDGET_STRICT, SQL_SLOW_QUERY_MS
+from bot.metrics import LATENCY_BUCKETS, REGISTRY
+
+logger = logging.getLogger(__name__)
+
+queries_per_update = REGISTRY.histogram(
+    "bot_db_queries_per_update",
+    "SQL-операторов на обработку обновления",
+    ("handler",),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+db_time_per_update = REGISTRY.histogram(
+    "bot_db_time_per_update_seconds",
+    "Время SQL-операторов на обработку обновления",
+    ("handler",),
+    buckets=LATENCY_BUCKETS,
+)
+query_budget_exceeded = REGISTRY.counter(
+    "bot_db_query_budget_exceeded_total",
+    "Обновления, превысившие SQL_QUERY_BUDGET",
+    ("handler",),
+)
+slow_queries = REGISTRY.counter(
+    "bot_db_slow_queries_total", "Операторы дольше SQL_SLOW_QUERY_MS", ("handler",)
+)
+
+_STARTED_KEY = "query_stats_started"
+
+# Каждый медленный запрос и каждое превышение бюджета нужны в логе, даже если
+# они повторяются: DuplicateFilter (bot/utils/logger.py) их не подавляет
+_NOT_DEDUPLICATED = {"deduplicate": False}
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PARAMETERS = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):(?!:)\w+")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\?(?:::\w+)?(?:\s*,\s*\?(?:::\w+)?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+MAX_SQL_LENGTH = 1000
+
+
+class QueryBudgetError(Exception):
+    """Обработчик выполнил больше SQL_QUERY_BUDGET операторов (строгий режим)"""
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """Операторы одного обновления"""
+
+    handler: str
+    task: asyncio.Task | None
+    statements: int = 0
+    db_time: float = 0.0
+
+    @property
+    def over_budget(self) -> bool:
+        return self.statements > SQL_QUERY_BUDGET
+
+
+_current: contextvars.ContextVar[QueryStats | None] = contextvars.ContextVar(
+    "query_stats", default=None
+)
+
+
+def normalize_sql(statement: str) -> str:
+    """SQL без значений: одинаковые по форме запросы дают одну строку"""
+    statement = _STRINGS.sub("?", statement)
+    statement = _PARAMETERS.sub("?", statement)
+    statement = _NUMBERS.sub("?", statement)
+    statement = _LISTS.sub("?", statement)
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    if len(statement) > MAX_SQL_LENGTH:
+        statement = statement[:MAX_SQL_LENGTH] + "…"
+    return statement
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get(_STARTED_KEY)
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    stats = _current.get()
+    if stats is not None and stats.task is asyncio.current_task():
+        stats.statements += 1
+        stats.db_time += elapsed
+        handler = stats.handler
+    else:
+        # Фоновая задача обработчика или код вне обработки обновлений
+        handler = f"{stats.handler} (фон)" if stats is not None else "-"
+
+    if elapsed * 1000 >= SQL_SLOW_QUERY_MS:
+        slow_queries.labels(handler).inc()
+        logger.warning(
+            f"Slow query {elapsed * 1000:.1f} ms in {handler}: {normalize_sql(statement)}",
+            extra=_NOT_DEDUPLICATED,
+        )
+
+
+def _handle_error(exception_context):
+    # Оператор завершился ошибкой: after_cursor_execute не будет вызван
+    connection = exception_context.connection
+    if connection is not None:
+        started = connection.info.get(_STARTED_KEY)
+        if started:
+            started.pop()
+
+
+def install_query_hooks(engine: AsyncEngine):
+    """Подключить учет операторов к движку"""
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+@contextlib.contextmanager
+def track_queries(handler: str):
+    """Учитывать операторы текущей задачи как операторы обновления ``handler``
+
+    При выходе пишет метрики и, если бюджет превышен, предупреждение в лог;
+    в строгом режиме после успешного выполнения поднимает QueryBudgetError.
+    """
+    stats = QueryStats(handler, asyncio.current_task())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        queries_per_update.labels(handler).observe(stats.statements)
+        db_time_per_update.labels(handler).observe(stats.db_time)
+        if stats.over_budget:
+            query_budget_exceeded.labels(handler).inc()
+            logger.warning(
+                f"Query budget exceeded in {handler}: {stats.statements} statements, "
+                f"{stats.db_time * 1000:.1f} ms in DB (budget {SQL_QUERY_BUDGET})",
+                extra=_NOT_DEDUPLICATED,
+            )
+
+    if stats.over_budget and SQL_QUERY_BUDGET_STRICT:
+        raise QueryBudgetError(
+            f"{handler}: {stats.statements} statements (budget {SQL_QUERY_BUDGET})"
+        )
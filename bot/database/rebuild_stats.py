@@ -0,0 +1,108 @@
+"""Пересчет таблицы user_stats_summary по истории тренировок
+
+Счетчики поддерживаются обработчиками инкрементально; скрипт нужен для первичного
+заполнения и для восстановления после ручных правок данных. Ответы, записанные
+во время пересчета, могут быть учтены неточно, поэтому запускать его лучше при
+остановленном боте.
+
+Запуск:
+
+    python -m bot.database.rebuild_stats              # все пользователи
+    python -m bot.database.rebuild_stats --user 12345 # один пользователь (telegram_id)
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.database.database import async_session_maker, engine
+
+REBUILD_STATS_SQL = text(
+    """
+    INSERT INTO user_stats_summary AS us (
+        user_id, sessions_count, words_added, words_mastered, last_accuracy,
+        total_questions, total_correct, accuracy_sum, words_studied,
+        today_date, today_sessions, today_questions
+    )
+    SELECT u.telegram_id,
+           ts.sessions_count,
+           (SELECT count(*) FROM words w WHERE w.user_id = u.id),
+           st.words_mastered,
+           (SELECT t.accuracy FROM training_sessions t
+            WHERE t.user_id = u.telegram_id AND t.total_questions > 0
+            ORDER BY t.created_at DESC, t.id DESC
+            LIMIT 1),
+           ts.total_questions,
+           ts.total_correct,
+           ts.accuracy_sum,
+           st.words_studied,
+           CURRENT_DATE,
+           ts.today_sessions,
+           ts.today_questions
+    FROM users u
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS sessions_count,
+               COALESCE(sum(t.total_questions), 0) AS total_questions,
+               COALESCE(sum(t.correct_answers), 0) AS total_correct,
+               COALESCE(sum(t.accuracy), 0) AS accuracy_sum,
+               count(*) FILTER (WHERE t.created_at >= CURRENT_DATE) AS today_sessions,
+               COALESCE(sum(t.total_questions) FILTER (WHERE t.created_at >= CURRENT_DATE), 0)
+                   AS today_questions
+        FROM training_sessions t
+        WHERE t.user_id = u.telegram_id
+    ) ts
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS words_studied,
+               count(*) FILTER (WHERE s.mastered_level >= 3) AS words_mastered
+        FROM statistics s
+        WHERE s.user_id = u.telegram_id
+    ) st
+    WHERE CAST(:telegram_id AS bigint) IS NULL OR u.telegram_id = :telegram_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET sessions_count = EXCLUDED.sessions_count,
+        words_added = EXCLUDED.words_added,
+        words_mastered = EXCLUDED.words_mastered,
+        last_accuracy = EXCLUDED.last_accuracy,
+        total_questions = EXCLUDED.total_questions,
+        total_correct = EXCLUDED.total_correct,
+        accuracy_sum = EXCLUDED.accuracy_sum,
+        words_studied = EXCLUDED.words_studied,
+        today_date = EXCLUDED.today_date,
+        today_sessions = EXCLUDED.today_sessions,
+        today_questions = EXCLUDED.today_questions
+    """
+)
+
+
+async def rebuild_user_stats(session: AsyncSession, telegram_id: int | None = None) -> int:
+    """Пересчитать счетчики пользователя (или всех пользователей) без commit
+
+    Args:
+        session: Сессия БД
+        telegram_id: ID пользователя в Telegram; None — пересчитать всех
+
+    Returns:
+        Количество пересчитанных строк
+    """
+    result = await session.execute(REBUILD_STATS_SQL, {"telegram_id": telegram_id})
+    return result.rowcount
+
+
+async def main(telegram_id: int | None):
+    """Основная функция пересчета"""
+    try:
+        async with async_session_maker() as session:
+            count = await rebuild_user_stats(session, telegram_id)
+            await session.commit()
+        print(f"Счетчики пересчитаны: {count} польз.")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пересчет user_stats_summary по истории")
+    parser.add_argument("--user", type=int, default=None, help="telegram_id пользователя")
+    args = parser.parse_args()
+    asyncio.run(main(args.user))
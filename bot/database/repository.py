@@ -3,10 +3,94 @@
 FIX: Создан репозиторий для устранения дублирования кода получения пользователя (P1.1)
 """
 
-from sqlalchemy import select
+import time
+from collections import OrderedDict
+
+from sqlalchemy import Row, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from bot.database.models import User
+from bot.config import USER_CACHE_MAX_SIZE, USER_CACHE_NEGATIVE_TTL, USER_CACHE_TTL
+from bot.database.models import Category, User, UserStatsSummary
+from bot.database.review import next_review_sql
+from bot.metrics import REGISTRY
+
+
+class UserIdentityCache:
+    """LRU-кэш соответствия telegram_id -> users.id с ограничением времени жизни
+
+    Соответствие не меняется после регистрации, поэтому положительные записи живут
+    ``ttl`` секунд. Отсутствие пользователя тоже кэшируется, но на короткий
+    ``negative_ttl``, а регистрация через ``remember`` сразу перекрывает такую запись.
+    """
+
+    def __init__(
+        self,
+        max_size: int = USER_CACHE_MAX_SIZE,
+        ttl: float = USER_CACHE_TTL,
+        negative_ttl: float = USER_CACHE_NEGATIVE_TTL,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # telegram_id -> (users.id или None, момент истечения)
+        self._entries: OrderedDict[int, tuple[int | None, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, telegram_id: int) -> tuple[bool, int | None]:
+        """Вернуть (найдено в кэше, users.id или None для незарегистрированного)"""
+        entry = self._entries.get(telegram_id)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[telegram_id]
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(telegram_id)
+        self.hits += 1
+        return True, entry[0]
+
+    def remember(self, telegram_id: int, user_id: int | None):
+        """Запомнить users.id (или отсутствие пользователя при user_id=None)"""
+        ttl = self.ttl if user_id is not None else self.negative_ttl
+        self._entries[telegram_id] = (user_id, time.monotonic() + ttl)
+        self._entries.move_to_end(telegram_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, telegram_id: int):
+        self._entries.pop(telegram_id, None)
+
+    def metrics(self) -> dict[str, float]:
+        """Счетчики попаданий и промахов"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# Кэш на процесс, общий для всех обработчиков
+user_identity_cache = UserIdentityCache()
+
+REGISTRY.gauge(
+    "bot_user_cache_hits",
+    "Попадания кэша telegram_id -> users.id с запуска процесса",
+    lambda: user_identity_cache.hits,
+)
+REGISTRY.gauge(
+    "bot_user_cache_misses",
+    "Промахи кэша telegram_id -> users.id с запуска процесса",
+    lambda: user_identity_cache.misses,
+)
+REGISTRY.gauge(
+    "bot_user_cache_size",
+    "Записей в кэше telegram_id -> users.id",
+    lambda: user_identity_cache.metrics()["size"],
+)
 
 
 async def get_user_by_telegram_id(session: AsyncSession, telegram_id: int) -> User | None:
@@ -20,4 +104,224 @@ async def get_user_by_telegram_id(session: AsyncSession, telegram_id: int) -> Us
         User объект или None, если пользователь не найден
     """
     result = await session.execute(select(User).where(User.telegram_id == telegram_id))
-    return result.scalar_one_or_none()
+    user = result.scalar_one_or_none()
+    user_identity_cache.remember(telegram_id, user.id if user else None)
+    return user
+
+
+async def get_user_id_by_telegram_id(session: AsyncSession, telegram_id: int) -> int | None:
+    """Получить users.id по telegram_id, по возможности без обращения к БД
+
+    Args:
+        session: Сессия БД (используется только при промахе кэша)
+        telegram_id: ID пользователя в Telegram
+
+    Returns:
+        ID пользователя в БД или None, если пользователь не зарегистрирован
+    """
+    cached, user_id = user_identity_cache.get(telegram_id)
+    if cached:
+        return user_id
+
+    result = await session.execute(select(User.id).where(User.telegram_id == telegram_id))
+    user_id = result.scalar_one_or_none()
+    user_identity_cache.remember(telegram_id, user_id)
+    return user_id
+
+
+async def get_default_category_id(session: AsyncSession) -> int | None:
+    """Категория личных слов пользователя: «Разработка ПО» или первая доступная"""
+    result = await session.execute(
+        select(Category.id).where(Category.category_name.like("%Разработка ПО%")).limit(1)
+    )
+    category_id = result.scalar_one_or_none()
+    if category_id is None:
+        result = await session.execute(select(Category.id).limit(1))
+        category_id = result.scalar_one_or_none()
+    return category_id
+
+
+# Запись ответа одним оператором: счетчики сессии считаются на стороне БД,
+# статистика обновляется через INSERT ... ON CONFLICT с ограничением уровня 0..5,
+# счетчики user_stats_summary (освоенные слова, точность) — по переходу уровня через 3.
+# Срок повторения пересчитывается по новому уровню (см. bot/database/review.py).
+# Если слова или сессии нет, ничего не пишется (CTE session_update пуст).
+_NEW_LEVEL_SQL = (
+    "LEAST(GREATEST("
+    "COALESCE(statistics.mastered_level, 0) + 2 * CAST(:correct AS integer) - 1, 0), 5)"
+)
+RECORD_ANSWER_SQL = text(
+    f"""
+    WITH old_session AS (
+        SELECT accuracy
+        FROM training_sessions
+        WHERE id = :session_id
+    ),
+    session_update AS (
+        UPDATE training_sessions
+        SET total_questions = COALESCE(total_questions, 0) + 1,
+            correct_answers = COALESCE(correct_answers, 0) + CAST(:correct AS integer),
+            accuracy = ROUND(
+                (COALESCE(correct_answers, 0) + CAST(:correct AS integer)) * 100.0
+                / (COALESCE(total_questions, 0) + 1),
+                2
+            )
+        WHERE id = :session_id
+          AND EXISTS (SELECT 1 FROM words WHERE id = :word_id)
+        RETURNING id, accuracy, created_at
+    ),
+    answer_insert AS (
+        INSERT INTO answers (session_id, user_id, word_id, question_type, user_answer, is_correct)
+        SELECT id,
+               CAST(:user_id AS bigint),
+               CAST(:word_id AS integer),
+               CAST(:question_type AS varchar),
+               CAST(:user_answer AS varchar),
+               CAST(:correct AS boolean)
+        FROM session_update
+    ),
+    old_level AS (
+        SELECT mastered_level
+        FROM statistics
+        WHERE user_id = :user_id AND word_id = :word_id
+    ),
+    statistics_upsert AS (
+        INSERT INTO statistics (user_id, word_id, mastered_level, next_review)
+        SELECT CAST(:user_id AS bigint),
+               CAST(:word_id AS integer),
+               CAST(:correct AS integer),
+               {next_review_sql("CAST(:correct AS integer)")}
+        FROM session_update
+        ON CONFLICT (user_id, word_id) DO UPDATE
+        SET mastered_level = {_NEW_LEVEL_SQL},
+            next_review = {next_review_sql(_NEW_LEVEL_SQL)}
+        RETURNING mastered_level
+    ),
+    summary_upsert AS (
+        INSERT INTO user_stats_summary AS us (
+            user_id, words_mastered, last_accuracy, total_questions, total_correct,
+            accuracy_sum, words_studied, today_date, today_questions
+        )
+        SELECT CAST(:user_id AS bigint),
+               CAST(su.mastered_level >= 3 AS integer)
+               - CAST(COALESCE((SELECT mastered_level FROM old_level), 0) >= 3 AS integer),
+               session_update.accuracy,
+               1,
+               CAST(:correct AS integer),
+               session_update.accuracy - COALESCE((SELECT accuracy FROM old_session), 0),
+               CAST(NOT EXISTS (SELECT 1 FROM old_level) AS integer),
+               CASE WHEN session_update.created_at >= CURRENT_DATE THEN CURRENT_DATE END,
+               CAST(session_update.created_at >= CURRENT_DATE AS integer)
+        FROM session_update, statistics_upsert su
+        ON CONFLICT (user_id) DO UPDATE
+        SET words_mastered = us.words_mastered + EXCLUDED.words_mastered,
+            last_accuracy = EXCLUDED.last_accuracy,
+            total_questions = us.total_questions + EXCLUDED.total_questions,
+            total_correct = us.total_correct + EXCLUDED.total_correct,
+            accuracy_sum = us.accuracy_sum + EXCLUDED.accuracy_sum,
+            words_studied = us.words_studied + EXCLUDED.words_studied,
+            today_questions = CASE
+                WHEN us.today_date = CURRENT_DATE THEN us.today_questions + EXCLUDED.today_questions
+                ELSE us.today_questions
+            END
+    )
+    SELECT w.english_word,
+           w.russian_translation,
+           w.example_sentence,
+           w.example_sentence_ru,
+           EXISTS (SELECT 1 FROM session_update) AS session_found
+    FROM words w
+    WHERE w.id = :word_id
+    """
+)
+
+
+async def record_answer(
+    session: AsyncSession,
+    session_id: int,
+    user_id: int,
+    word_id: int,
+    user_answer: str,
+    is_correct: bool,
+    question_type: str = "multiple_choice",
+) -> Row | None:
+    """Сохранить ответ, обновить счетчики тренировки и статистику слова
+
+    Все изменения выполняются одним оператором, поэтому при сессии из
+    ``autocommit_session_maker`` запись занимает один round trip.
+
+    Args:
+        session: Сессия БД
+        session_id: ID тренировки
+        user_id: ID пользователя в Telegram
+        word_id: ID слова, на которое дан ответ
+        user_answer: Выбранный вариант ответа
+        is_correct: Правильный ли ответ
+        question_type: Тип вопроса
+
+    Returns:
+        Строка с полями слова (english_word, russian_translation, example_sentence,
+        example_sentence_ru) и флагом session_found или None, если слово не найдено.
+        При session_found = False ответ не записан.
+    """
+    result = await session.execute(
+        RECORD_ANSWER_SQL,
+        {
+            "session_id": session_id,
+            "user_id": user_id,
+            "word_id": word_id,
+            "question_type": question_type,
+            "user_answer": user_answer,
+            "correct": int(is_correct),
+        },
+    )
+    return result.first()
+
+
+async def bump_user_counters(session: AsyncSession, telegram_id: int, **deltas: int):
+    """Изменить счетчики user_stats_summary на заданные величины (без commit)
+
+    Вызывается в той же транзакции, что и само событие (новая тренировка,
+    добавление или удаление слова), чтобы счетчики не расходились с данными.
+
+    Args:
+        session: Сессия БД
+        telegram_id: ID пользователя в Telegram
+        **deltas: Приращения счетчиков, например ``sessions_count=1``
+    """
+    stmt = pg_insert(UserStatsSummary).values(user_id=telegram_id, **deltas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStatsSummary.user_id],
+        set_={name: getattr(UserStatsSummary, name) + stmt.excluded[name] for name in deltas},
+    )
+    await session.execute(stmt)
+
+
+# Новая тренировка: счетчики «за сегодня» обнуляются при смене дня
+RECORD_SESSION_STARTED_SQL = text(
+    """
+    INSERT INTO user_stats_summary AS us (user_id, sessions_count, today_date, today_sessions)
+    VALUES (:telegram_id, 1, CURRENT_DATE, 1)
+    ON CONFLICT (user_id) DO UPDATE
+    SET sessions_count = us.sessions_count + 1,
+        today_sessions = CASE
+            WHEN us.today_date = CURRENT_DATE THEN us.today_sessions + 1
+            ELSE 1
+        END,
+        today_questions = CASE
+            WHEN us.today_date = CURRENT_DATE THEN us.today_questions
+            ELSE 0
+        END,
+        today_date = CURRENT_DATE
+    """
+)
+
+
+async def record_session_started(session: AsyncSession, telegram_id: int):
+    """Учесть начало тренировки в user_stats_summary (без commit)
+
+    Args:
+        session: Сессия БД
+        telegram_id: ID пользователя в Telegram
+    """
+    await session.execute(RECORD_SESSION_STARTED_SQL, {"telegram_id": telegram_id})
@@ -0,0 +1,69 @@
+"""Интервальное повторение слов по системе Лейтнера
+
+Уровень освоения ``statistics.mastered_level`` (0..5) служит номером «коробки»:
+правильный ответ поднимает слово на уровень выше, ошибка — на уровень ниже.
+Вместе с уровнем при каждой записи ответа (``record_answer`` и журнал ответов)
+тем же оператором обновляется ``statistics.next_review`` = «сейчас + интервал
+нового уровня» из ``REVIEW_INTERVALS_MINUTES``, поэтому расписание не требует
+отдельного запроса.
+
+Очередь повторения читается по индексу ``(user_id, next_review)``: ближайшее
+к сроку слово пользователя находится спуском по B-дереву, без сортировки всех
+его слов, и время выборки не зависит от размера словаря.
+"""
+
+from collections.abc import Collection
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.config import REVIEW_INTERVALS_MINUTES
+from bot.database.models import Statistics, Word
+
+if len(REVIEW_INTERVALS_MINUTES) != 6:
+    raise ValueError("REVIEW_INTERVALS_MINUTES must contain 6 values (levels 0..5)")
+
+
+def next_review_sql(level: str) -> str:
+    """SQL-выражение срока повторения для уровня освоения, заданного SQL-выражением ``level``"""
+    intervals = ", ".join(str(minutes) for minutes in REVIEW_INTERVALS_MINUTES)
+    return f"LOCALTIMESTAMP + make_interval(mins => (ARRAY[{intervals}])[({level}) + 1])"
+
+
+def due_words_query(telegram_id: int, limit: int, exclude: Collection[int] = ()):
+    """Слова пользователя, срок повторения которых наступил, от самых просроченных
+
+    Args:
+        telegram_id: ID пользователя в Telegram
+        limit: Максимальное количество слов
+        exclude: ID слов, которые не нужно возвращать (например, ответы на них
+            еще ждут записи в журнале ответов)
+    """
+    stmt = (
+        select(Word, Statistics)
+        .join(Statistics, Statistics.word_id == Word.id)
+        .where(
+            Statistics.user_id == telegram_id,
+            Statistics.next_review <= func.localtimestamp(),
+        )
+        .order_by(Statistics.next_review)
+        .limit(limit)
+    )
+    if exclude:
+        stmt = stmt.where(Statistics.word_id.not_in(list(exclude)))
+    return stmt
+
+
+async def fetch_due_word(
+    session: AsyncSession, telegram_id: int, exclude: Collection[int] = ()
+) -> Word | None:
+    """Следующее слово для повторения или None, если повторять нечего
+
+    Args:
+        session: Сессия БД
+        telegram_id: ID пользователя в Telegram
+        exclude: ID слов, которые нужно пропустить
+    """
+    result = await session.execute(due_words_query(telegram_id, 1, exclude))
+    row = result.first()
+    return row[0] if row else None
@@ -0,0 +1,338 @@
+"""Поиск слов по словарю с ранжированием и устойчивостью к опечаткам
+
+Результаты упорядочиваются так: точное совпадение английского слова или перевода,
+затем совпадение начала, затем вхождение подстроки, затем похожие слова (опечатки)
+по триграммному сходству. Внутри группы — по убыванию сходства.
+
+Бэкенды:
+
+* ``PostgresSearchBackend`` — один запрос с оператором ``%`` и ``LIKE``
+  расширения pg_trgm; GIN-индексы по ``lower(english_word)`` и
+  ``lower(russian_translation)`` создаются миграцией;
+* ``MemorySearchBackend`` — триграммный индекс в памяти процесса для БД без
+  pg_trgm (например, SQLite в тестах); слова загружаются при первом поиске и
+  дальше поддерживаются через ``add_word`` / ``remove_word``.
+
+Результаты отдаются страницами по ключу ранжирования (см. ``bot.database.pagination``).
+
+Бэкенд выбирается настройкой ``SEARCH_BACKEND``: ``postgres``, ``memory`` или
+``auto`` (по диалекту подключения).
+"""
+
+import asyncio
+import logging
+import re
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.config import SEARCH_BACKEND
+from bot.database.database import engine
+from bot.database.models import Word
+from bot.database.pagination import NEXT, PREV, Cursor
+
+logger = logging.getLogger(__name__)
+
+# Порог сходства для «похожих» слов, как pg_trgm.similarity_threshold по умолчанию
+SIMILARITY_THRESHOLD = 0.3
+
+# Группы ранжирования
+EXACT, PREFIX, CONTAINS, FUZZY = range(4)
+
+# Ключ ранжирования: группа, сходство (по убыванию), слово, id. Страницы результатов
+# берутся по ключу граничного слова (см. bot/database/pagination.py)
+_SEARCH_TEMPLATE = r"""
+    WITH ranked AS (
+        SELECT w.*,
+               CASE
+                   WHEN lower(w.english_word) = :term
+                        OR lower(w.russian_translation) = :term THEN 0
+                   WHEN lower(w.english_word) LIKE :prefix ESCAPE '\'
+                        OR lower(w.russian_translation) LIKE :prefix ESCAPE '\' THEN 1
+                   WHEN lower(w.english_word) LIKE :contains ESCAPE '\'
+                        OR lower(w.russian_translation) LIKE :contains ESCAPE '\' THEN 2
+                   ELSE 3
+               END AS rank_bucket,
+               GREATEST(similarity(lower(w.english_word), :term),
+                        similarity(lower(w.russian_translation), :term)) AS rank_score
+        FROM words w
+        WHERE (w.user_id IS NULL OR w.user_id = :user_id)
+          AND (lower(w.english_word) LIKE :contains ESCAPE '\'
+               OR lower(w.russian_translation) LIKE :contains ESCAPE '\'
+               OR lower(w.english_word) % :term
+               OR lower(w.russian_translation) % :term)
+    )
+    SELECT {columns}
+    FROM ranked
+    {where}
+    ORDER BY {order}
+    LIMIT :limit
+"""
+
+_SEARCH_COLUMNS = ", ".join(f"ranked.{column.name}" for column in Word.__table__.columns)
+_BOUNDARY = "(SELECT rank_bucket, -rank_score, english_word, id FROM ranked WHERE id = :cursor_id)"
+_ASCENDING = "rank_bucket, rank_score DESC, english_word, id"
+_DESCENDING = "rank_bucket DESC, rank_score, english_word DESC, id DESC"
+
+# Первая страница, страница после граничного слова и страница до него (в обратном порядке)
+SEARCH_WORDS_SQL = text(
+    _SEARCH_TEMPLATE.format(columns=_SEARCH_COLUMNS, where="", order=_ASCENDING)
+)
+SEARCH_WORDS_AFTER_SQL = text(
+    _SEARCH_TEMPLATE.format(
+        columns=_SEARCH_COLUMNS,
+        where=f"WHERE (rank_bucket, -rank_score, english_word, id) > {_BOUNDARY}",
+        order=_ASCENDING,
+    )
+)
+SEARCH_WORDS_BEFORE_SQL = text(
+    _SEARCH_TEMPLATE.format(
+        columns=_SEARCH_COLUMNS,
+        where=f"WHERE (rank_bucket, -rank_score, english_word, id) < {_BOUNDARY}",
+        order=_DESCENDING,
+    )
+)
+
+
+def normalize(term: str) -> str:
+    """Привести поисковую строку к виду, в котором сравниваются слова"""
+    return " ".join(term.lower().split())
+
+
+def escape_like(term: str) -> str:
+    """Экранировать спецсимволы LIKE, чтобы «%» и «_» в запросе искались буквально"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def trigrams(value: str) -> set[str]:
+    """Множество триграмм строки так же, как их строит pg_trgm"""
+    result = set()
+    for word in _WORD_RE.findall(value.lower()):
+        padded = f"  {word} "
+        result.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def similarity(left: set[str], right: set[str]) -> float:
+    """Сходство по триграммам: доля общих триграмм, как similarity() в pg_trgm"""
+    if not left or not right:
+        return 0.0
+    shared = len(left & right)
+    return shared / (len(left) + len(right) - shared)
+
+
+def rank_bucket(term: str, english: str, russian: str) -> int:
+    """Группа ранжирования для уже нормализованных строк"""
+    if term in (english, russian):
+        return EXACT
+    if english.startswith(term) or russian.startswith(term):
+        return PREFIX
+    if term in english or term in russian:
+        return CONTAINS
+    return FUZZY
+
+
+class SearchBackend(ABC):
+    """Интерфейс бэкенда поиска"""
+
+    name = "base"
+
+    @abstractmethod
+    async def search(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        term: str,
+        limit: int = 10,
+        cursor: Cursor | None = None,
+    ) -> list[Word]:
+        """Найти общие и личные слова пользователя (users.id) в порядке релевантности
+
+        Args:
+            session: Сессия БД
+            user_id: ID пользователя в БД (users.id)
+            term: Поисковая строка
+            limit: Максимальное количество слов
+            cursor: Граница страницы; None — первая страница
+
+        Returns:
+            Слова в порядке релевантности, примыкающие к курсору
+        """
+
+    def add_word(self, word: Word):
+        """Учесть новое слово (для бэкендов со своим индексом)"""
+        return None  # без своего индекса учитывать нечего
+
+    def remove_word(self, word_id: int):
+        """Убрать удаленное слово (для бэкендов со своим индексом)"""
+        return None
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Поиск одним запросом по GIN-индексам pg_trgm"""
+
+    name = "postgres"
+
+    async def search(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        term: str,
+        limit: int = 10,
+        cursor: Cursor | None = None,
+    ) -> list[Word]:
+        term = normalize(term)
+        if not term:
+            return []
+        escaped = escape_like(term)
+        params = {
+            "user_id": user_id,
+            "term": term,
+            "prefix": f"{escaped}%",
+            "contains": f"%{escaped}%",
+            "limit": limit,
+        }
+        if cursor is None:
+            statement = SEARCH_WORDS_SQL
+        else:
+            params["cursor_id"] = cursor.word_id
+            statement = (
+                SEARCH_WORDS_AFTER_SQL if cursor.direction == NEXT else SEARCH_WORDS_BEFORE_SQL
+            )
+
+        result = await session.execute(select(Word).from_statement(statement), params)
+        words = list(result.scalars().all())
+        if cursor is not None and cursor.direction == PREV:
+            words.reverse()
+        return words
+
+
+class MemorySearchBackend(SearchBackend):
+    """Триграммный индекс слов в памяти процесса"""
+
+    name = "memory"
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        # id -> (english, russian, users.id, триграммы english, триграммы russian)
+        self._entries: dict[int, tuple[str, str, int | None, set[str], set[str]]] = {}
+        self._postings: defaultdict[str, set[int]] = defaultdict(set)
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def _ensure_loaded(self, session: AsyncSession):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            result = await session.execute(
+                select(Word.id, Word.english_word, Word.russian_translation, Word.user_id)
+            )
+            for word_id, english, russian, user_id in result.all():
+                self._index(word_id, english, russian, user_id)
+            self._loaded = True
+            logger.debug(f"Memory search: indexed {len(self._entries)} words")
+
+    def _index(self, word_id: int, english: str, russian: str, user_id: int | None):
+        english, russian = normalize(english), normalize(russian)
+        english_trigrams, russian_trigrams = trigrams(english), trigrams(russian)
+        self._entries[word_id] = (english, russian, user_id, english_trigrams, russian_trigrams)
+        for trigram in english_trigrams | russian_trigrams:
+            self._postings[trigram].add(word_id)
+
+    def add_word(self, word: Word):
+        if self._loaded:
+            self._index(word.id, word.english_word, word.russian_translation, word.user_id)
+
+    def remove_word(self, word_id: int):
+        entry = self._entries.pop(word_id, None)
+        if entry is None:
+            return
+        for trigram in entry[3] | entry[4]:
+            postings = self._postings.get(trigram)
+            if postings is not None:
+                postings.discard(word_id)
+                if not postings:
+                    del self._postings[trigram]
+
+    def rank(
+        self, user_id: int, term: str, limit: int = 10, cursor: Cursor | None = None
+    ) -> list[int]:
+        """id найденных слов в порядке релевантности, примыкающие к курсору"""
+        term = normalize(term)
+        if not term:
+            return []
+        term_trigrams = trigrams(term)
+
+        if len(term) < 3 or not term_trigrams:
+            # Короткий запрос почти не дает триграмм: проверяем все слова
+            candidates = self._entries.keys()
+        else:
+            candidates = set()
+            for trigram in term_trigrams:
+                candidates |= self._postings.get(trigram, set())
+
+        ranked = []
+        for word_id in candidates:
+            english, russian, owner, english_trigrams, russian_trigrams = self._entries[word_id]
+            if owner is not None and owner != user_id:
+                continue
+            bucket = rank_bucket(term, english, russian)
+            score = max(
+                similarity(term_trigrams, english_trigrams),
+                similarity(term_trigrams, russian_trigrams),
+            )
+            if bucket == FUZZY and score < self.threshold:
+                continue
+            ranked.append((bucket, -score, english, word_id))
+
+        ranked.sort()
+        ids = [word_id for *_, word_id in ranked]
+        if cursor is None:
+            return ids[:limit]
+        if cursor.word_id not in ids:
+            return []
+        position = ids.index(cursor.word_id)
+        if cursor.direction == NEXT:
+            return ids[position + 1 : position + 1 + limit]
+        return ids[max(position - limit, 0) : position]
+
+    async def search(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        term: str,
+        limit: int = 10,
+        cursor: Cursor | None = None,
+    ) -> list[Word]:
+        await self._ensure_loaded(session)
+        ids = self.rank(user_id, term, limit, cursor)
+        if not ids:
+            return []
+        result = await session.execute(select(Word).where(Word.id.in_(ids)))
+        words_by_id = {word.id: word for word in result.scalars().all()}
+        return [words_by_id[word_id] for word_id in ids if word_id in words_by_id]
+
+
+def create_search_backend(name: str = SEARCH_BACKEND) -> SearchBackend:
+    """Создать бэкенд по имени; ``auto`` выбирает по диалекту подключения к БД"""
+    if name == "auto":
+        name = "postgres" if engine.dialect.name == "postgresql" else "memory"
+    if name == "postgres":
+        return PostgresSearchBackend()
+    if name == "memory":
+        return MemorySearchBackend()
+    raise ValueError(f"Unknown SEARCH_BACKEND: {name!r}")
+
+
+# Бэкенд на процесс, общий для всех обработчиков
+word_search = create_search_backend()
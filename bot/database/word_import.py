@@ -0,0 +1,202 @@
+"""Импорт личного словаря из CSV/TSV-файла
+
+Файл разбирается построчно (``parse_rows``): колонки — английское слово,
+перевод и необязательные пример и перевод примера. Разделитель — табуляция для
+.tsv, иначе определяется по первой строке (табуляция, «;» или «,»); строка
+заголовка пропускается. Строки проверяются теми же ограничениями, что и ввод
+слова в чате (``MAX_WORD_LENGTH``, ``MAX_TRANSLATION_LENGTH``,
+``MAX_EXAMPLE_LENGTH``), повторы английского слова внутри файла отбрасываются.
+
+Слова вставляются пачками по ``IMPORT_CHUNK_SIZE`` одним многострочным
+``INSERT ... ON CONFLICT ON CONSTRAINT unique_user_word DO NOTHING RETURNING``:
+слова, которые уже есть в словаре пользователя, пропускаются без ошибки, а
+счетчик ``words_added`` увеличивается в той же транзакции на число добавленных.
+Каждая пачка — отдельная короткая транзакция на своем соединении из пула,
+поэтому импорт большого файла не держит соединение и блокировки и не мешает
+другим пользователям. Проверка на засеянной БД: scripts/bench_word_import.py.
+"""
+
+import csv
+import io
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass, field
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from bot.config import (
+    IMPORT_CHUNK_SIZE,
+    IMPORT_MAX_ROWS,
+    MAX_EXAMPLE_LENGTH,
+    MAX_TRANSLATION_LENGTH,
+    MAX_WORD_LENGTH,
+)
+from bot.database.database import async_session_maker
+from bot.database.models import Word
+from bot.database.repository import bump_user_counters, get_default_category_id
+from bot.database.search import word_search
+from bot.database.word_pool import word_pool
+
+# Перевод не длиннее колонки words.russian_translation, даже если
+# MAX_TRANSLATION_LENGTH больше: одна такая строка сорвала бы вставку всей пачки
+TRANSLATION_LIMIT = min(MAX_TRANSLATION_LENGTH, Word.russian_translation.type.length)
+
+# Первая ячейка строки заголовка
+HEADER_CELLS = {"english", "english_word", "word", "en", "английский", "слово"}
+
+# Начало файла в UTF-16 (Excel сохраняет «Текст Юникод» так)
+UTF16_BOMS = (b"\xff\xfe", b"\xfe\xff")
+
+# Сколько номеров строк с ошибками показать пользователю
+INVALID_LINES_SHOWN = 10
+
+_INSERT_WORDS = (
+    pg_insert(Word)
+    .on_conflict_do_nothing(constraint="unique_user_word")
+    .returning(Word.id, Word.english_word, Word.russian_translation, Word.user_id)
+)
+
+
+class WordImportError(Exception):
+    """Файл нельзя импортировать; сообщение показывается пользователю"""
+
+
+@dataclass(slots=True)
+class ImportReport:
+    """Итоги импорта, обновляются по мере обработки пачек"""
+
+    rows: int = 0  # строк с данными
+    added: int = 0
+    existing: int = 0  # уже были в словаре
+    repeated: int = 0  # повтор слова в файле
+    invalid: int = 0
+    invalid_lines: list[int] = field(default_factory=list)
+    truncated: bool = False  # строк больше IMPORT_MAX_ROWS
+
+
+def decode(data: bytes) -> str:
+    """Текст файла: UTF-16 с BOM («Юникод» из Excel), UTF-8 или Windows-1251"""
+    encodings = ("utf-16",) if data.startswith(UTF16_BOMS) else ("utf-8-sig", "cp1251")
+    for encoding in encodings:
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError as e:
+            error = e
+    raise WordImportError(
+        "не удалось прочитать файл. Сохраните его как текст в кодировке UTF-8."
+    ) from error
+
+
+def detect_delimiter(text: str, file_name: str | None = None) -> str:
+    """Разделитель колонок по расширению файла или первой строке"""
+    if file_name and file_name.lower().endswith(".tsv"):
+        return "\t"
+    first_line = text.split("\n", 1)[0]
+    for delimiter in ("\t", ";"):
+        if delimiter in first_line:
+            return delimiter
+    return ","
+
+
+def parse_rows(text: str, delimiter: str) -> Iterator[tuple[int, list[str]]]:
+    """(номер строки, ячейки) непустых строк файла без строки заголовка"""
+    reader = csv.reader(io.StringIO(text), delimiter=delimiter)
+    try:
+        for cells in reader:
+            if not any(cell.strip() for cell in cells):
+                continue
+            if reader.line_num == 1 and cells[0].strip().lower() in HEADER_CELLS:
+                continue
+            yield reader.line_num, cells
+    except csv.Error as e:
+        raise WordImportError(f"не удалось разобрать файл (строка {reader.line_num}): {e}") from e
+
+
+def validate_row(cells: list[str]) -> tuple[str, str, str | None, str | None] | None:
+    """(слово, перевод, пример, перевод примера) или None, если строка неверна"""
+    english, russian, example, example_ru = (
+        cell.strip() for cell in [*cells[:4], "", "", "", ""][:4]
+    )
+    if not english or not russian or "\x00" in "".join(cells):
+        return None
+    if len(english) > MAX_WORD_LENGTH or len(russian) > TRANSLATION_LIMIT:
+        return None
+    if len(example) > MAX_EXAMPLE_LENGTH or len(example_ru) > MAX_EXAMPLE_LENGTH:
+        return None
+    return english, russian, example or None, example_ru or None
+
+
+async def _insert_chunk(telegram_id: int, db_user_id: int, rows: list[dict], report: ImportReport):
+    async with async_session_maker() as session:
+        result = await session.execute(_INSERT_WORDS, rows)
+        inserted = result.all()
+        if inserted:
+            await bump_user_counters(session, telegram_id, words_added=len(inserted))
+        await session.commit()
+
+    report.added += len(inserted)
+    report.existing += len(rows) - len(inserted)
+    for word in inserted:
+        word_pool.add_user_word(db_user_id, word.id)
+        word_search.add_word(word)
+
+
+async def import_words(
+    telegram_id: int,
+    db_user_id: int,
+    text: str,
+    delimiter: str,
+    report: ImportReport,
+    on_progress: Callable[[ImportReport], Awaitable] | None = None,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    max_rows: int = IMPORT_MAX_ROWS,
+) -> ImportReport:
+    """Импортировать слова из текста файла в личный словарь пользователя
+
+    ``report`` заполняется по ходу импорта: при ошибке БД в нем остаются итоги
+    уже записанных пачек. ``on_progress`` вызывается после каждой пачки.
+    """
+    async with async_session_maker() as session:
+        category_id = await get_default_category_id(session)
+    if category_id is None:
+        raise WordImportError("категории не найдены. Проверьте инициализацию БД.")
+
+    seen: set[str] = set()
+    chunk: list[dict] = []
+    for line_number, cells in parse_rows(text, delimiter):
+        if report.rows >= max_rows:
+            report.truncated = True
+            break
+        report.rows += 1
+
+        row = validate_row(cells)
+        if row is None:
+            report.invalid += 1
+            if len(report.invalid_lines) < INVALID_LINES_SHOWN:
+                report.invalid_lines.append(line_number)
+            continue
+        english, russian, example, example_ru = row
+        if english in seen:
+            report.repeated += 1
+            continue
+        seen.add(english)
+
+        chunk.append(
+            {
+                "english_word": english,
+                "russian_translation": russian,
+                "category_id": category_id,
+                "example_sentence": example,
+                "example_sentence_ru": example_ru,
+                "user_id": db_user_id,
+                "is_public": False,
+            }
+        )
+        if len(chunk) >= chunk_size:
+            await _insert_chunk(telegram_id, db_user_id, chunk, report)
+            chunk = []
+            if on_progress is not None:
+                await on_progress(report)
+
+    if chunk:
+        await _insert_chunk(telegram_id, db_user_id, chunk, report)
+    return report
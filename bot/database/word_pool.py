@@ -0,0 +1,156 @@
+"""Пул идентификаторов слов для быстрой выборки вопросов тренировки
+
+Вместо ``ORDER BY random()`` по всей таблице ``words`` на каждый вопрос в памяти
+процесса хранятся списки id: общий (слова с ``user_id IS NULL``) и личные списки
+пользователей. Случайные id выбираются по смещению в объединенном списке, а сами
+слова читаются одним запросом по первичному ключу.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.config import WORD_POOL_MAX_USERS, WORD_POOL_SHARED_TTL
+from bot.database.models import Word
+
+logger = logging.getLogger(__name__)
+
+
+class _IdSet:
+    """Список id с удалением за O(1) (перестановка с последним элементом)"""
+
+    __slots__ = ("ids", "positions")
+
+    def __init__(self, ids=()):
+        self.ids: list[int] = list(ids)
+        self.positions: dict[int, int] = {word_id: i for i, word_id in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, word_id: int):
+        if word_id not in self.positions:
+            self.positions[word_id] = len(self.ids)
+            self.ids.append(word_id)
+
+    def discard(self, word_id: int):
+        position = self.positions.pop(word_id, None)
+        if position is None:
+            return
+        last = self.ids.pop()
+        if position < len(self.ids):
+            self.ids[position] = last
+            self.positions[last] = position
+
+
+class WordPool:
+    """Пул кандидатов для вопросов: общие слова + личные слова пользователя
+
+    Общий список перечитывается не чаще одного раза в ``shared_ttl`` секунд,
+    личные списки загружаются при первом обращении и дальше поддерживаются
+    инкрементально через ``add_user_word`` / ``remove_user_word``.
+    """
+
+    def __init__(
+        self, shared_ttl: float = WORD_POOL_SHARED_TTL, max_users: int = WORD_POOL_MAX_USERS
+    ):
+        self.shared_ttl = shared_ttl
+        self.max_users = max_users
+        self._shared = _IdSet()
+        self._shared_loaded_at: float | None = None
+        self._shared_lock = asyncio.Lock()
+        self._users: OrderedDict[int, _IdSet] = OrderedDict()
+
+    async def _get_shared(self, session: AsyncSession) -> _IdSet:
+        """Общий список id, перечитывается по истечении TTL"""
+        now = time.monotonic()
+        if self._shared_loaded_at is not None and now - self._shared_loaded_at < self.shared_ttl:
+            return self._shared
+
+        async with self._shared_lock:
+            # Другая корутина могла уже обновить список, пока мы ждали блокировку
+            if self._shared_loaded_at is None or now - self._shared_loaded_at >= self.shared_ttl:
+                result = await session.execute(
+                    select(Word.id).where(Word.user_id.is_(None), Word.is_public)
+                )
+                self._shared = _IdSet(result.scalars().all())
+                self._shared_loaded_at = time.monotonic()
+                logger.debug(f"Word pool: loaded {len(self._shared)} shared words")
+        return self._shared
+
+    async def _get_user(self, session: AsyncSession, user_id: int) -> _IdSet:
+        """Личный список id пользователя (users.id)"""
+        own = self._users.get(user_id)
+        if own is not None:
+            self._users.move_to_end(user_id)
+            return own
+
+        result = await session.execute(select(Word.id).where(Word.user_id == user_id))
+        own = _IdSet(result.scalars().all())
+        self._users[user_id] = own
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return own
+
+    def add_user_word(self, user_id: int, word_id: int):
+        """Добавить новое личное слово в пул (если список пользователя уже загружен)"""
+        own = self._users.get(user_id)
+        if own is not None:
+            own.add(word_id)
+
+    def remove_user_word(self, user_id: int, word_id: int):
+        """Убрать удаленное личное слово из пула"""
+        own = self._users.get(user_id)
+        if own is not None:
+            own.discard(word_id)
+
+    def invalidate_shared(self):
+        """Принудительно перечитать общий список при следующей выборке"""
+        self._shared_loaded_at = None
+
+    async def sample(self, session: AsyncSession, user_id: int, k: int) -> list[Word]:
+        """Выбрать до ``k`` различных случайных слов, доступных пользователю
+
+        Args:
+            session: Сессия БД
+            user_id: ID пользователя в БД (users.id)
+            k: Нужное количество слов (целевое слово + дистракторы)
+
+        Returns:
+            Список слов в случайном порядке; короче ``k``, если слов в пуле меньше
+        """
+        shared = await self._get_shared(session)
+        own = await self._get_user(session, user_id)
+
+        # Одна повторная попытка на случай, если часть id уже удалена из БД
+        for _ in range(2):
+            total = len(shared) + len(own)
+            if total == 0:
+                return []
+
+            positions = random.sample(range(total), min(k, total))
+            ids = [
+                shared.ids[p] if p < len(shared) else own.ids[p - len(shared)] for p in positions
+            ]
+
+            result = await session.execute(select(Word).where(Word.id.in_(ids)))
+            words_by_id = {word.id: word for word in result.scalars().all()}
+
+            missing = [word_id for word_id in ids if word_id not in words_by_id]
+            for word_id in missing:
+                shared.discard(word_id)
+                own.discard(word_id)
+
+            if not missing or len(words_by_id) >= min(k, len(shared) + len(own)):
+                break
+
+        return [words_by_id[word_id] for word_id in ids if word_id in words_by_id]
+
+
+# Пул на процесс, общий для всех обработчиков
+word_pool = WordPool()
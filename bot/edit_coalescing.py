@@ -0,0 +1,146 @@
+"""Пропуск повторных и устаревших правок сообщений бота
+
+Почти каждый обработчик нажатия заканчивается ``query.edit_message_text``.
+При повторном нажатии той же кнопки (``main_menu``, ``statistics_menu``,
+``dictionary_menu``) бот отправлял ту же правку, Telegram отвечал
+«message is not modified», и ошибка попадала в ``bot.main.error_handler``.
+
+``EditCoalescer`` стоит на пути запросов к Bot API (его вызывает
+``SendScheduler`` из bot/send_scheduler.py) и для каждого сообщения
+``(chat_id, message_id)`` помнит отпечаток последнего показанного содержимого:
+текста, разметки и клавиатуры.
+
+* Правка с тем же отпечатком не отправляется.
+* Правки одного сообщения отправляются по очереди. Если, пока правка ждала
+  очереди (или бюджета отправки), пришла более новая, старая не отправляется:
+  сообщение сразу получит последнее содержимое.
+* Ответ «message is not modified» (например, после перезапуска, когда отпечатка
+  еще нет) считается успехом и не доходит до обработчика.
+
+Пропущенная правка возвращает обработчику ``True``, как правка inline-сообщения.
+Отпечатки хранятся для последних ``EDIT_CACHE_SIZE`` сообщений процесса.
+"""
+
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from telegram.error import BadRequest
+
+from bot.config import EDIT_CACHE_SIZE
+from bot.metrics import REGISTRY
+
+# Поля запроса, из которых складывается вид сообщения
+RENDER_FIELDS = (
+    "text",
+    "parse_mode",
+    "entities",
+    "reply_markup",
+    "link_preview_options",
+    "disable_web_page_preview",
+)
+
+NOT_MODIFIED = "message is not modified"
+
+edits_skipped = REGISTRY.counter(
+    "bot_telegram_edits_skipped_total",
+    "Правки сообщений, не отправленные в Bot API: identical, superseded, not_modified",
+    ("reason",),
+)
+_skipped_identical = edits_skipped.labels("identical")
+_skipped_superseded = edits_skipped.labels("superseded")
+_skipped_not_modified = edits_skipped.labels("not_modified")
+
+MessageKey = tuple[int | str, int]
+
+
+def _plain(value):
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return str(value)
+
+
+def render_digest(data: dict) -> bytes:
+    """Отпечаток вида сообщения по параметрам sendMessage/editMessageText"""
+    rendered = {name: data[name] for name in RENDER_FIELDS if name in data}
+    encoded = json.dumps(rendered, sort_keys=True, ensure_ascii=False, default=_plain)
+    return hashlib.blake2b(encoded.encode(), digest_size=16).digest()
+
+
+@dataclass(slots=True)
+class _Slot:
+    """Очередь правок одного сообщения"""
+
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    generation: int = 0
+    users: int = 0
+
+
+class EditCoalescer:
+    """Отпечатки показанных сообщений и очередь правок по сообщению"""
+
+    def __init__(self, max_messages: int = EDIT_CACHE_SIZE):
+        self.max_messages = max_messages
+        self._rendered: OrderedDict[MessageKey, bytes] = OrderedDict()
+        self._slots: dict[MessageKey, _Slot] = {}
+
+    def _remember(self, key: MessageKey, digest: bytes):
+        self._rendered[key] = digest
+        self._rendered.move_to_end(key)
+        while len(self._rendered) > self.max_messages:
+            self._rendered.popitem(last=False)
+
+    def remember_sent(self, chat_id: int | str, message_id: int, data: dict):
+        """Запомнить вид только что отправленного сообщения"""
+        self._remember((chat_id, message_id), render_digest(data))
+
+    async def edit(
+        self,
+        chat_id: int | str,
+        message_id: int,
+        data: dict,
+        send: Callable[[], Awaitable],
+    ):
+        """Отправить правку через ``send``, если она что-то меняет и не устарела"""
+        key = (chat_id, message_id)
+        digest = render_digest(data)
+        slot = self._slots.get(key)
+        if slot is None:
+            if self._rendered.get(key) == digest:
+                _skipped_identical.inc()
+                return True
+            slot = self._slots[key] = _Slot()
+
+        slot.generation += 1
+        generation = slot.generation
+        slot.users += 1
+        try:
+            async with slot.lock:
+                if slot.generation != generation:
+                    # Следом пришла более новая правка этого сообщения
+                    _skipped_superseded.inc()
+                    return True
+                if self._rendered.get(key) == digest:
+                    _skipped_identical.inc()
+                    return True
+                try:
+                    result = await send()
+                except BadRequest as e:
+                    if NOT_MODIFIED not in e.message.lower():
+                        self._rendered.pop(key, None)
+                        raise
+                    _skipped_not_modified.inc()
+                    result = True
+                except BaseException:
+                    # Неизвестно, что сейчас показано: следующую правку отправим
+                    self._rendered.pop(key, None)
+                    raise
+                self._remember(key, digest)
+                return result
+        finally:
+            slot.users -= 1
+            if not slot.users:
+                del self._slots[key]
@@ -1,20 +1,50 @@
 """Обработчики словаря"""
 
 import logging
+import time
 
 from sqlalchemy import func, or_, select
 from sqlalchemy.exc import DatabaseError, IntegrityError
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram import Document, InlineKeyboardButton, InlineKeyboardMarkup, Message, Update
+from telegram.error import TelegramError
 from telegram.ext import ContextTypes
 
-from bot.config import MAX_EXAMPLE_LENGTH, MAX_TRANSLATION_LENGTH, MAX_WORD_LENGTH
+from bot import ui
+from bot.config import (
+    IMPORT_MAX_FILE_SIZE_MB,
+    IMPORT_PROGRESS_INTERVAL,
+    MAX_EXAMPLE_LENGTH,
+    MAX_TRANSLATION_LENGTH,
+    MAX_WORD_LENGTH,
+    MY_WORDS_PAGE_SIZE,
+    SEARCH_PAGE_SIZE,
+)
 from bot.database.database import async_session_maker
-from bot.database.models import Category, User, Word
-from bot.database.repository import get_user_by_telegram_id
+from bot.database.deck import invalidate_deck
+from bot.database.models import User, Word
+from bot.database.pagination import Cursor, Page, fetch_page, fetch_user_words
+from bot.database.repository import (
+    bump_user_counters,
+    get_default_category_id,
+    get_user_id_by_telegram_id,
+)
+from bot.database.search import word_search
+from bot.database.word_import import (
+    ImportReport,
+    WordImportError,
+    decode,
+    detect_delimiter,
+    import_words,
+)
+from bot.database.word_pool import word_pool
 
 # FIX: Добавлен logger для обработки ошибок транзакций (P0.1)
 logger = logging.getLogger(__name__)
 
+# Префиксы callback_data кнопок навигации по страницам (за ними следует курсор)
+MY_WORDS_PAGE_PREFIX = "dictionary_my_words_page"
+SEARCH_PAGE_PREFIX = "dictionary_search_page"
+
 
 async def dictionary_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Главное меню словаря"""
@@ -26,9 +56,9 @@ async def dictionary_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Подсчитываем количество слов пользователя
     async with async_session_maker() as session:
         # FIX: Использование репозитория вместо дублированного кода (P1.1)
-        user = await get_user_by_telegram_id(session, telegram_id)
+        db_user_id = await get_user_id_by_telegram_id(session, telegram_id)
 
-        if not user:
+        if db_user_id is None:
             await query.edit_message_text("Ошибка: пользователь не найден.")
             return
 
@@ -36,25 +66,17 @@ async def dictionary_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
             select(func.count(Word.id)).where(
                 or_(
                     Word.user_id.is_(None),  # Общие слова
-                    Word.user_id == user.id,  # Личные слова
+                    Word.user_id == db_user_id,  # Личные слова
                 ),
                 Word.is_public,
             )
         )
         total_words = result.scalar_one()
 
-    keyboard = [
-        [InlineKeyboardButton("➕ Добавить слово", callback_data="dictionary_add")],
-        [InlineKeyboardButton("🔍 Поиск по словарю", callback_data="dictionary_search")],
-        [InlineKeyboardButton("📋 Мои слова", callback_data="dictionary_my_words")],
-        [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     await query.edit_message_text(
-        f"📚 *Мой словарь*\n\nВсего слов: {total_words}\n\nВыберите действие:",
+        ui.DICTIONARY_MENU_TEMPLATE(total_words),
         parse_mode="Markdown",
-        reply_markup=reply_markup,
+        reply_markup=ui.DICTIONARY_MENU_KEYBOARD,
     )
 
 
@@ -65,9 +87,7 @@ async def dictionary_add_start(update: Update, context: ContextTypes.DEFAULT_TYP
 
     context.user_data["dictionary_state"] = "waiting_english"
 
-    await query.edit_message_text(
-        "➕ *Добавление нового слова*\n\nВведите английское слово:", parse_mode="Markdown"
-    )
+    await query.edit_message_text(ui.ADD_WORD_TEXT, parse_mode="Markdown")
 
 
 async def dictionary_add_english(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -95,8 +115,7 @@ async def dictionary_add_english(update: Update, context: ContextTypes.DEFAULT_T
     context.user_data["dictionary_state"] = "waiting_russian"
 
     await update.message.reply_text(
-        f"✅ Английское слово: *{english_word}*\n\nТеперь введите русский перевод:",
-        parse_mode="Markdown",
+        ui.ENGLISH_WORD_ACCEPTED_TEMPLATE(english_word), parse_mode="Markdown"
     )
 
 
@@ -124,16 +143,10 @@ async def dictionary_add_russian(update: Update, context: ContextTypes.DEFAULT_T
     context.user_data["new_word_russian"] = russian_translation
     context.user_data["dictionary_state"] = "waiting_example"
 
-    keyboard = [
-        [InlineKeyboardButton("⏭️ Пропустить пример", callback_data="dictionary_add_skip_example")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     await update.message.reply_text(
-        f"✅ Русский перевод: *{russian_translation}*\n\n"
-        "Введите пример использования (или пропустите):",
+        ui.TRANSLATION_ACCEPTED_TEMPLATE(russian_translation),
         parse_mode="Markdown",
-        reply_markup=reply_markup,
+        reply_markup=ui.SKIP_EXAMPLE_KEYBOARD,
     )
 
 
@@ -178,12 +191,7 @@ async def save_new_word(update: Update, context: ContextTypes.DEFAULT_TYPE, exam
     message = update.message if update.message else (query.message if query else None)
 
     if not english_word or not russian_translation:
-        keyboard = [
-            [InlineKeyboardButton("➕ Добавить слово заново", callback_data="dictionary_add")],
-            [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-            [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = ui.ADD_WORD_AGAIN_KEYBOARD
 
         if message:
             await message.reply_text(
@@ -194,13 +202,10 @@ async def save_new_word(update: Update, context: ContextTypes.DEFAULT_TYPE, exam
     async with async_session_maker() as session:
         try:
             # FIX: Использование репозитория вместо дублированного кода (P1.1)
-            user = await get_user_by_telegram_id(session, user_id)
+            db_user_id = await get_user_id_by_telegram_id(session, user_id)
 
-            if not user:
-                keyboard = [
-                    [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
+            if db_user_id is None:
+                reply_markup = ui.BACK_TO_MAIN_MENU_KEYBOARD
 
                 if message:
                     await message.reply_text(
@@ -210,19 +215,14 @@ async def save_new_word(update: Update, context: ContextTypes.DEFAULT_TYPE, exam
 
             # Проверяем, не существует ли уже такое слово у пользователя
             result = await session.execute(
-                select(Word).where(Word.english_word == english_word, Word.user_id == user.id)
+                select(Word).where(Word.english_word == english_word, Word.user_id == db_user_id)
             )
             existing = result.scalar_one_or_none()
 
             if existing:
-                keyboard = [
-                    [InlineKeyboardButton("➕ Добавить другое слово", callback_data="dictionary_add")],
-                    [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-                    [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
+                reply_markup = ui.ADD_ANOTHER_WORD_KEYBOARD
 
-                text = f"⚠️ Слово *{english_word}* уже есть в вашем словаре!"
+                text = ui.WORD_EXISTS_TEMPLATE(english_word)
 
                 if query:
                     await query.edit_message_text(
@@ -237,22 +237,11 @@ async def save_new_word(update: Update, context: ContextTypes.DEFAULT_TYPE, exam
                 context.user_data.pop("new_word_russian", None)
                 return
 
-            # Получаем категорию "Разработка ПО" по умолчанию (или первую доступную)
-            result = await session.execute(
-                select(Category).where(Category.category_name.like("%Разработка ПО%"))
-            )
-            category = result.scalar_one_or_none()
-
-            if not category:
-                result = await session.execute(select(Category).limit(1))
-                category = result.scalar_one_or_none()
+            # Категория "Разработка ПО" по умолчанию (или первая доступная)
+            category_id = await get_default_category_id(session)
 
-            if not category:
-                keyboard = [
-                    [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-                    [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
+            if category_id is None:
+                reply_markup = ui.DICTIONARY_KEYBOARD
 
                 if message:
                     await message.reply_text(
@@ -265,18 +254,23 @@ async def save_new_word(update: Update, context: ContextTypes.DEFAULT_TYPE, exam
             new_word = Word(
                 english_word=english_word,
                 russian_translation=russian_translation,
-                category_id=category.id,
+                category_id=category_id,
                 example_sentence=example,
-                user_id=user.id,  # Личное слово пользователя
+                user_id=db_user_id,  # Личное слово пользователя
                 is_public=False,  # Не видно другим пользователям
             )
             session.add(new_word)
+            await bump_user_counters(session, user_id, words_added=1)
             await session.commit()
+            word_pool.add_user_word(db_user_id, new_word.id)
+            word_search.add_word(new_word)
+            # Новое слово должно попасть в вопросы уже начатой тренировки
+            invalidate_deck(context.user_data)
 
             # Подсчитываем общее количество слов пользователя
             result = await session.execute(
                 select(func.count(Word.id)).where(
-                    or_(Word.user_id.is_(None), Word.user_id == user.id), Word.is_public
+                    or_(Word.user_id.is_(None), Word.user_id == db_user_id), Word.is_public
                 )
             )
             total_words = result.scalar_one()
@@ -285,11 +279,7 @@ async def save_new_word(update: Update, context: ContextTypes.DEFAULT_TYPE, exam
             await session.rollback()
             error_msg = str(e.orig) if hasattr(e, 'orig') else str(e)
             logger.error(f"Integrity error in save_new_word: {error_msg}", exc_info=True)
-            keyboard = [
-                [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-                [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = ui.DICTIONARY_KEYBOARD
             # Проверяем тип ошибки целостности
             if "unique_user_word" in error_msg.lower():
                 error_text = "❌ Это слово уже существует в вашем словаре."
@@ -304,11 +294,7 @@ async def save_new_word(update: Update, context: ContextTypes.DEFAULT_TYPE, exam
             # FIX: Добавлен rollback для обработки ошибок транзакций (P0.1)
             await session.rollback()
             logger.error(f"Database error in save_new_word: {e}", exc_info=True)
-            keyboard = [
-                [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-                [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = ui.DICTIONARY_KEYBOARD
             error_text = "❌ Произошла ошибка при сохранении слова. Попробуйте еще раз."
             if query:
                 await query.edit_message_text(error_text, reply_markup=reply_markup)
@@ -319,11 +305,7 @@ async def save_new_word(update: Update, context: ContextTypes.DEFAULT_TYPE, exam
             # Общая обработка остальных исключений
             await session.rollback()
             logger.error(f"Unexpected error in save_new_word: {e}", exc_info=True)
-            keyboard = [
-                [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-                [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = ui.DICTIONARY_KEYBOARD
             error_text = "❌ Произошла неожиданная ошибка. Попробуйте еще раз."
             if query:
                 await query.edit_message_text(error_text, reply_markup=reply_markup)
@@ -336,16 +318,10 @@ async def save_new_word(update: Update, context: ContextTypes.DEFAULT_TYPE, exam
     context.user_data.pop("new_word_english", None)
     context.user_data.pop("new_word_russian", None)
 
-    keyboard = [
-        [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-        [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = ui.DICTIONARY_KEYBOARD
 
-    text = (
-        f"✅ *Слово добавлено!*\n\n"
-        f"*{english_word}* = {russian_translation}\n\n"
-        f"📊 Всего слов в словаре: {total_words}"
+    text = ui.WORD_ADDED_TEMPLATE(
+        english=english_word, russian=russian_translation, total=total_words
     )
 
     if query:
@@ -361,10 +337,7 @@ async def dictionary_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     context.user_data["dictionary_state"] = "searching"
 
-    await query.edit_message_text(
-        "🔍 *Поиск по словарю*\n\nВведите слово для поиска (английское или русское):",
-        parse_mode="Markdown",
-    )
+    await query.edit_message_text(ui.SEARCH_TEXT, parse_mode="Markdown")
 
 
 async def dictionary_search_result(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -374,106 +347,126 @@ async def dictionary_search_result(update: Update, context: ContextTypes.DEFAULT
 
     async with async_session_maker() as session:
         # FIX: Использование репозитория вместо дублированного кода (P1.1)
-        user = await get_user_by_telegram_id(session, telegram_id)
+        db_user_id = await get_user_id_by_telegram_id(session, telegram_id)
 
-        if not user:
-            keyboard = [
-                [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+        if db_user_id is None:
+            reply_markup = ui.BACK_TO_MAIN_MENU_KEYBOARD
             await update.message.reply_text(
                 "Ошибка: пользователь не найден.", reply_markup=reply_markup
             )
             return
 
-        # Ищем слова
-        result = await session.execute(
-            select(Word)
-            .where(
-                or_(Word.user_id.is_(None), Word.user_id == user.id),
-                or_(
-                    Word.english_word.ilike(f"%{search_term}%"),
-                    Word.russian_translation.ilike(f"%{search_term}%"),
-                ),
-            )
-            .limit(10)
+        # Ищем слова: точные совпадения, начало слова, подстрока, затем похожие
+        page = await fetch_page(
+            lambda page_cursor, limit: word_search.search(
+                session, db_user_id, search_term, limit, page_cursor
+            ),
+            None,
+            SEARCH_PAGE_SIZE,
         )
-        words = result.scalars().all()
-
-        if not words:
-            keyboard = [
-                [InlineKeyboardButton("🔍 Поиск еще", callback_data="dictionary_search")],
-                [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-                [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await update.message.reply_text(
-                f"❌ Слова, содержащие '{search_term}', не найдены.", reply_markup=reply_markup
-            )
+
+    if not page.items:
+        await update.message.reply_text(
+            ui.NOT_FOUND_TEMPLATE(search_term), reply_markup=ui.SEARCH_AGAIN_KEYBOARD
+        )
+        return
+
+    # Строка поиска нужна для следующих страниц: в callback_data передается только курсор
+    context.user_data["search_term"] = search_term
+    context.user_data.pop("dictionary_state", None)
+
+    text, reply_markup = search_results_message(page)
+    await update.message.reply_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+
+
+async def dictionary_search_page(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Переход по страницам результатов поиска"""
+    query = update.callback_query
+    await query.answer()
+
+    search_term = context.user_data.get("search_term")
+    cursor = Cursor.decode(query.data, SEARCH_PAGE_PREFIX)
+    if not search_term or cursor is None:
+        await query.edit_message_text(
+            "Результаты поиска устарели. Повторите поиск.",
+            reply_markup=ui.SEARCH_EXPIRED_KEYBOARD,
+        )
+        return
+
+    async with async_session_maker() as session:
+        db_user_id = await get_user_id_by_telegram_id(session, query.from_user.id)
+
+        if db_user_id is None:
+            await query.edit_message_text("Ошибка: пользователь не найден.")
             return
 
-        # Формируем список найденных слов
-        words_list = []
-        for word in words:
-            words_list.append(f"• *{word.english_word}* = {word.russian_translation}")
+        page = await fetch_page(
+            lambda page_cursor, limit: word_search.search(
+                session, db_user_id, search_term, limit, page_cursor
+            ),
+            cursor,
+            SEARCH_PAGE_SIZE,
+        )
 
-        text = f"🔍 *Найдено слов: {len(words)}*\n\n" + "\n".join(words_list)
+    text, reply_markup = search_results_message(page)
+    await query.edit_message_text(text, parse_mode="Markdown", reply_markup=reply_markup)
 
-        keyboard = [
-            [InlineKeyboardButton("🔍 Поиск еще", callback_data="dictionary_search")],
-            [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-            [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
 
-        await update.message.reply_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+def search_results_message(page: Page) -> tuple[str, InlineKeyboardMarkup]:
+    """Текст и клавиатура страницы результатов поиска"""
+    text = ui.word_list_text(ui.SEARCH_RESULTS_HEADER, page.items)
+    navigation = page_navigation(page, SEARCH_PAGE_PREFIX)
+    return text, ui.with_navigation(ui.SEARCH_AGAIN_KEYBOARD, navigation)
 
-    context.user_data.pop("dictionary_state", None)
+
+def page_navigation(page: Page, prefix: str) -> list[InlineKeyboardButton]:
+    """Кнопки «назад» / «далее» с курсорами страниц"""
+    buttons = []
+    if page.has_prev:
+        buttons.append(
+            InlineKeyboardButton("◀️ Назад", callback_data=page.prev_cursor().encode(prefix))
+        )
+    if page.has_next:
+        buttons.append(
+            InlineKeyboardButton("Далее ▶️", callback_data=page.next_cursor().encode(prefix))
+        )
+    return buttons
 
 
 async def dictionary_my_words(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Показать личные слова пользователя"""
+    """Показать личные слова пользователя (постранично)"""
     query = update.callback_query
     await query.answer()
 
     user_id = query.from_user.id
+    # Первая страница открывается из меню словаря, остальные — кнопками навигации
+    cursor = Cursor.decode(query.data, MY_WORDS_PAGE_PREFIX)
 
     async with async_session_maker() as session:
         # FIX: Использование репозитория вместо дублированного кода (P1.1)
-        user = await get_user_by_telegram_id(session, user_id)
+        db_user_id = await get_user_id_by_telegram_id(session, user_id)
 
-        if not user:
+        if db_user_id is None:
             await query.edit_message_text("Ошибка: пользователь не найден.")
             return
 
-        # Получаем личные слова пользователя
-        result = await session.execute(
-            select(Word).where(Word.user_id == user.id).order_by(Word.english_word).limit(20)
+        # Получаем страницу личных слов пользователя
+        page = await fetch_page(
+            lambda page_cursor, limit: fetch_user_words(session, db_user_id, page_cursor, limit),
+            cursor,
+            MY_WORDS_PAGE_SIZE,
         )
-        words = result.scalars().all()
 
-        if not words:
-            await query.edit_message_text(
-                "📚 *Мои слова*\n\nУ вас пока нет личных слов. Добавьте их через меню словаря!",
-                parse_mode="Markdown",
-            )
-            return
-
-        # Формируем список
-        words_list = []
-        for word in words:
-            words_list.append(f"• *{word.english_word}* = {word.russian_translation}")
-
-        text = f"📚 *Мои слова* ({len(words)})\n\n" + "\n".join(words_list)
+    if not page.items:
+        await query.edit_message_text(ui.MY_WORDS_EMPTY_TEXT, parse_mode="Markdown")
+        return
 
-        keyboard = [
-            [InlineKeyboardButton("🗑️ Удалить слово", callback_data="dictionary_delete")],
-            [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-            [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+    # Формируем список
+    text = ui.word_list_text(ui.MY_WORDS_HEADER, page.items)
+    navigation = page_navigation(page, MY_WORDS_PAGE_PREFIX)
+    reply_markup = ui.with_navigation(ui.MY_WORDS_KEYBOARD, navigation)
 
-        await query.edit_message_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+    await query.edit_message_text(text, parse_mode="Markdown", reply_markup=reply_markup)
 
 
 async def dictionary_delete_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -483,10 +476,7 @@ async def dictionary_delete_start(update: Update, context: ContextTypes.DEFAULT_
 
     context.user_data["dictionary_state"] = "deleting"
 
-    await query.edit_message_text(
-        "🗑️ *Удаление слова*\n\nВведите английское слово, которое хотите удалить:",
-        parse_mode="Markdown",
-    )
+    await query.edit_message_text(ui.DELETE_WORD_TEXT, parse_mode="Markdown")
 
 
 async def dictionary_delete_word(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -497,13 +487,10 @@ async def dictionary_delete_word(update: Update, context: ContextTypes.DEFAULT_T
     async with async_session_maker() as session:
         try:
             # FIX: Использование репозитория вместо дублированного кода (P1.1)
-            user = await get_user_by_telegram_id(session, user_id)
+            db_user_id = await get_user_id_by_telegram_id(session, user_id)
 
-            if not user:
-                keyboard = [
-                    [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
+            if db_user_id is None:
+                reply_markup = ui.BACK_TO_MAIN_MENU_KEYBOARD
                 await update.message.reply_text(
                     "Ошибка: пользователь не найден.", reply_markup=reply_markup
                 )
@@ -511,36 +498,33 @@ async def dictionary_delete_word(update: Update, context: ContextTypes.DEFAULT_T
 
             # Ищем слово пользователя
             result = await session.execute(
-                select(Word).where(Word.english_word == english_word, Word.user_id == user.id)
+                select(Word).where(Word.english_word == english_word, Word.user_id == db_user_id)
             )
             word = result.scalar_one_or_none()
 
             if not word:
-                keyboard = [
-                    [InlineKeyboardButton("🗑️ Удалить другое слово", callback_data="dictionary_delete")],
-                    [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-                    [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
+                reply_markup = ui.DELETE_ANOTHER_WORD_KEYBOARD
                 await update.message.reply_text(
-                f"❌ Слово *{english_word}* не найдено в вашем словаре.",
-                parse_mode="Markdown",
-                reply_markup=reply_markup,
-            )
-            return
+                    ui.WORD_NOT_IN_DICTIONARY_TEMPLATE(english_word),
+                    parse_mode="Markdown",
+                    reply_markup=reply_markup,
+                )
+                return
 
             # Удаляем слово
+            word_id = word.id
             await session.delete(word)
+            await bump_user_counters(session, user_id, words_added=-1)
             await session.commit()
+            word_pool.remove_user_word(db_user_id, word_id)
+            word_search.remove_word(word_id)
+            # В колоде начатой тренировки не должно остаться вопросов по удаленному слову
+            invalidate_deck(context.user_data)
         except DatabaseError as e:
             # FIX: Улучшена обработка специфичных исключений БД (P1.2)
             await session.rollback()
             logger.error(f"Database error in dictionary_delete_word: {e}", exc_info=True)
-            keyboard = [
-                [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-                [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = ui.DICTIONARY_KEYBOARD
             await update.message.reply_text(
                 "❌ Произошла ошибка при удалении слова. Попробуйте еще раз.",
                 reply_markup=reply_markup,
@@ -550,11 +534,7 @@ async def dictionary_delete_word(update: Update, context: ContextTypes.DEFAULT_T
             # Общая обработка остальных исключений
             await session.rollback()
             logger.error(f"Unexpected error in dictionary_delete_word: {e}", exc_info=True)
-            keyboard = [
-                [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-                [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = ui.DICTIONARY_KEYBOARD
             await update.message.reply_text(
                 "❌ Произошла неожиданная ошибка. Попробуйте еще раз.",
                 reply_markup=reply_markup,
@@ -563,14 +543,129 @@ async def dictionary_delete_word(update: Update, context: ContextTypes.DEFAULT_T
 
     context.user_data.pop("dictionary_state", None)
 
-    keyboard = [
-        [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-        [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     await update.message.reply_text(
-        f"✅ Слово *{english_word}* удалено из вашего словаря.",
+        ui.WORD_DELETED_TEMPLATE(english_word),
         parse_mode="Markdown",
-        reply_markup=reply_markup,
+        reply_markup=ui.DICTIONARY_KEYBOARD,
     )
+
+
+# Пользователи (telegram_id), у которых идет импорт: второй файл ждет первого
+_importing: set[int] = set()
+
+IMPORT_EXTENSIONS = (".csv", ".tsv", ".txt")
+IMPORT_MIME_TYPES = {"text/csv", "text/tab-separated-values", "text/plain"}
+
+
+async def dictionary_import_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Подсказка по формату файла для импорта"""
+    query = update.callback_query
+    await query.answer()
+
+    await query.edit_message_text(
+        ui.IMPORT_HELP_TEXT, parse_mode="Markdown", reply_markup=ui.DICTIONARY_KEYBOARD
+    )
+
+
+async def dictionary_import_document(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Прием файла со словами: проверки и запуск импорта в фоне"""
+    message = update.message
+    document = message.document
+    telegram_id = update.effective_user.id
+
+    file_name = (document.file_name or "").lower()
+    if not file_name.endswith(IMPORT_EXTENSIONS) and document.mime_type not in IMPORT_MIME_TYPES:
+        await message.reply_text(ui.IMPORT_UNSUPPORTED_TEXT, reply_markup=ui.DICTIONARY_KEYBOARD)
+        return
+    if (document.file_size or 0) > IMPORT_MAX_FILE_SIZE_MB * 1024 * 1024:
+        await message.reply_text(
+            ui.IMPORT_TOO_LARGE_TEMPLATE(IMPORT_MAX_FILE_SIZE_MB),
+            reply_markup=ui.DICTIONARY_KEYBOARD,
+        )
+        return
+    if telegram_id in _importing:
+        await message.reply_text(ui.IMPORT_IN_PROGRESS_TEXT)
+        return
+
+    async with async_session_maker() as session:
+        db_user_id = await get_user_id_by_telegram_id(session, telegram_id)
+    if db_user_id is None:
+        await message.reply_text(
+            "Ошибка: пользователь не найден.", reply_markup=ui.BACK_TO_MAIN_MENU_KEYBOARD
+        )
+        return
+
+    _importing.add(telegram_id)
+    try:
+        progress = await message.reply_text(ui.IMPORT_STARTED_TEXT)
+    except BaseException:
+        _importing.discard(telegram_id)
+        raise
+    # Импорт идет вне очереди обновлений пользователя: бот отвечает ему и
+    # остальным, пока пачки пишутся в БД
+    context.application.create_task(
+        _run_import(context, telegram_id, db_user_id, document, progress), update=update
+    )
+
+
+async def _run_import(
+    context: ContextTypes.DEFAULT_TYPE,
+    telegram_id: int,
+    db_user_id: int,
+    document: Document,
+    progress: Message,
+):
+    """Скачать файл, импортировать слова и показать итоги в сообщении прогресса"""
+    report = ImportReport()
+    last_edit = time.monotonic()
+
+    async def show_progress(report: ImportReport):
+        nonlocal last_edit
+        if time.monotonic() - last_edit < IMPORT_PROGRESS_INTERVAL:
+            return
+        last_edit = time.monotonic()
+        try:
+            await progress.edit_text(ui.IMPORT_PROGRESS_TEMPLATE(report))
+        except TelegramError as e:
+            # Прогресс необязателен, импорт продолжается
+            logger.warning(f"Import progress edit failed: {e}")
+
+    try:
+        file = await document.get_file()
+        text = decode(bytes(await file.download_as_bytearray()))
+        delimiter = detect_delimiter(text, document.file_name)
+        await import_words(telegram_id, db_user_id, text, delimiter, report, show_progress)
+    except WordImportError as e:
+        result, parse_mode = ui.IMPORT_FAILED_TEMPLATE(e), None
+    except DatabaseError as e:
+        logger.error(f"Database error in dictionary import: {e}", exc_info=True)
+        result = ui.IMPORT_INTERRUPTED_TEXT + "\n\n" + ui.import_summary(report)
+        parse_mode = "Markdown"
+    except TelegramError as e:
+        logger.error(f"Telegram error in dictionary import: {e}", exc_info=True)
+        result, parse_mode = ui.IMPORT_FAILED_TEMPLATE("не удалось скачать файл."), None
+    except Exception as e:
+        logger.error(f"Unexpected error in dictionary import: {e}", exc_info=True)
+        result, parse_mode = ui.IMPORT_FAILED_TEMPLATE("произошла неожиданная ошибка."), None
+    else:
+        result, parse_mode = ui.import_summary(report), "Markdown"
+    finally:
+        _importing.discard(telegram_id)
+        if report.added:
+            # Новые слова должны попасть в вопросы уже начатой тренировки
+            invalidate_deck(context.user_data)
+
+    try:
+        await progress.edit_text(result, parse_mode=parse_mode, reply_markup=ui.DICTIONARY_KEYBOARD)
+    except TelegramError as e:
+        # Сообщение прогресса удалено или правка не прошла: итоги отдельным сообщением
+        logger.warning(f"Import result edit failed: {e}")
+        try:
+            await context.bot.send_message(
+                progress.chat_id,
+                result,
+                parse_mode=parse_mode,
+                reply_markup=ui.DICTIONARY_KEYBOARD,
+            )
+        except TelegramError as e:
+            logger.error(f"Failed to send import result: {e}")
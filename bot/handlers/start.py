@@ -4,13 +4,13 @@ import logging
 
 from sqlalchemy import select
 from sqlalchemy.exc import DatabaseError, IntegrityError
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram import Update
 from telegram.ext import ContextTypes
 
-from bot.config import BOT_NAME
+from bot import ui
 from bot.database.database import async_session_maker
 from bot.database.models import User
-from bot.database.repository import get_user_by_telegram_id
+from bot.database.repository import get_user_id_by_telegram_id, user_identity_cache
 
 # FIX: Добавлен logger для обработки ошибок транзакций (P0.1)
 logger = logging.getLogger(__name__)
@@ -25,13 +25,15 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     async with async_session_maker() as session:
         try:
             # FIX: Использование репозитория вместо дублированного кода (P1.1)
-            db_user = await get_user_by_telegram_id(session, telegram_id)
+            db_user_id = await get_user_id_by_telegram_id(session, telegram_id)
 
-            if not db_user:
+            if db_user_id is None:
                 db_user = User(telegram_id=telegram_id)
                 session.add(db_user)
                 await session.commit()
                 await session.refresh(db_user)
+                # Следующие обработчики найдут пользователя в кэше без запроса к БД
+                user_identity_cache.remember(telegram_id, db_user.id)
         except IntegrityError as e:
             # FIX: Улучшена обработка специфичных исключений БД (P1.2)
             await session.rollback()
@@ -57,45 +59,16 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return
 
-    # Приветственное сообщение
-    welcome_text = (
-        f"👋 *Добро пожаловать в {BOT_NAME}!*\n\n"
-        "🎓 *Внимание!* настоящий бот разработан в рамках учебной программы.\n\n"
-        "✨ *Что я умею:*\n"
-        "• 📚 Тренировка со словами IT-тематики\n"
-        "• ➕ Добавление своих слов в личный словарь\n"
-        "• 🔙 Управление личной коллекцией слов\n"
-        "• 📊 Отслеживание прогресса обучения\n"
-        "• 🎮 Интерактивные тренировки с вариантами ответов\n"
-        "• 🔄 Выбор направления перевода (RU→EN или EN→RU)\n\n"
-        "Выбери действие ниже и начнем наше путешествие в мир английского! 🚀"
+    await update.message.reply_text(
+        ui.WELCOME_TEXT, parse_mode="Markdown", reply_markup=ui.MAIN_MENU_KEYBOARD
     )
 
-    # Клавиатура главного меню
-    keyboard = [
-        [InlineKeyboardButton("🎯 Начать тренировку", callback_data="training_start")],
-        [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-        [InlineKeyboardButton("📊 Моя статистика", callback_data="statistics_menu")],
-        [InlineKeyboardButton("⭐ Достижения", callback_data="achievements_menu")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    await update.message.reply_text(welcome_text, parse_mode="Markdown", reply_markup=reply_markup)
-
 
 async def main_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик возврата в главное меню"""
     query = update.callback_query
     await query.answer()
 
-    keyboard = [
-        [InlineKeyboardButton("🎯 Начать тренировку", callback_data="training_start")],
-        [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
-        [InlineKeyboardButton("📊 Моя статистика", callback_data="statistics_menu")],
-        [InlineKeyboardButton("⭐ Достижения", callback_data="achievements_menu")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     await query.edit_message_text(
-        "🏠 *Главное меню*\n\nВыберите действие:", parse_mode="Markdown", reply_markup=reply_markup
+        ui.MAIN_MENU_TEXT, parse_mode="Markdown", reply_markup=ui.MAIN_MENU_KEYBOARD
     )
@@ -1,16 +1,16 @@
 """Обработчики статистики"""
 
 import logging
-from datetime import datetime
 
 from sqlalchemy import desc, func, select
 from sqlalchemy.exc import DatabaseError
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram import Update
 from telegram.ext import ContextTypes
 
+from bot import ui
 from bot.database.database import async_session_maker
-from bot.database.models import Statistics, TrainingSession, User, Word
-from bot.database.repository import get_user_by_telegram_id
+from bot.database.models import TrainingSession, User, UserStatsSummary
+from bot.database.review import due_words_query
 
 # FIX: Добавлен logger для обработки ошибок транзакций (P0.1)
 logger = logging.getLogger(__name__)
@@ -25,54 +25,40 @@ async def statistics_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     async with async_session_maker() as session:
         try:
-            # FIX: Использование репозитория вместо дублированного кода (P1.1)
-            user = await get_user_by_telegram_id(session, user_id)
-
-            if not user:
-                await query.edit_message_text("Ошибка: пользователь не найден.")
-                return
-
-            # Общая статистика тренировок
+            # Один запрос: существование пользователя и его счетчики из user_stats_summary
             result = await session.execute(
                 select(
-                    func.count(TrainingSession.id).label("total_sessions"),
-                    func.sum(TrainingSession.total_questions).label("total_questions"),
-                    func.sum(TrainingSession.correct_answers).label("total_correct"),
-                    func.avg(TrainingSession.accuracy).label("avg_accuracy"),
-                ).where(TrainingSession.user_id == user_id)
+                    User.id,
+                    UserStatsSummary,
+                    (UserStatsSummary.today_date == func.current_date()).label("is_today"),
+                )
+                .outerjoin(UserStatsSummary, UserStatsSummary.user_id == User.telegram_id)
+                .where(User.telegram_id == user_id)
             )
-            stats = result.first()
+            row = result.first()
 
-            total_sessions = stats.total_sessions or 0
-            total_questions = stats.total_questions or 0
-            total_correct = stats.total_correct or 0
-            avg_accuracy = float(stats.avg_accuracy or 0)
+            if row is None:
+                await query.edit_message_text("Ошибка: пользователь не найден.")
+                return
 
-            # Статистика по словам
-            result = await session.execute(
-                select(func.count(Statistics.word_id)).where(Statistics.user_id == user_id)
-            )
-            words_studied = result.scalar_one() or 0
+            _, summary, is_today = row
+            if summary is None:
+                summary = UserStatsSummary()
 
-            # Слова с высоким уровнем освоения
-            result = await session.execute(
-                select(func.count(Statistics.word_id)).where(
-                    Statistics.user_id == user_id, Statistics.mastered_level >= 3
-                )
+            total_sessions = summary.sessions_count or 0
+            total_questions = summary.total_questions or 0
+            total_correct = summary.total_correct or 0
+            # Средняя точность по всем тренировкам, как avg(accuracy) по training_sessions
+            avg_accuracy = (
+                float(summary.accuracy_sum or 0) / total_sessions if total_sessions else 0.0
             )
-            words_mastered = result.scalar_one() or 0
 
-            # Статистика за сегодня
-            today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            result = await session.execute(
-                select(
-                    func.count(TrainingSession.id).label("today_sessions"),
-                    func.sum(TrainingSession.total_questions).label("today_questions"),
-                ).where(TrainingSession.user_id == user_id, TrainingSession.created_at >= today_start)
-            )
-            today_stats = result.first()
-            today_sessions = today_stats.today_sessions or 0
-            today_questions = today_stats.today_questions or 0
+            words_studied = summary.words_studied or 0
+            words_mastered = summary.words_mastered or 0
+
+            # Счетчики за сегодня относятся к дню today_date
+            today_sessions = (summary.today_sessions or 0) if is_today else 0
+            today_questions = (summary.today_questions or 0) if is_today else 0
         except DatabaseError as e:
             # FIX: Улучшена обработка специфичных исключений БД (P1.2)
             logger.error(f"Database error in statistics_menu: {e}", exc_info=True)
@@ -84,28 +70,18 @@ async def statistics_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await query.edit_message_text("❌ Произошла неожиданная ошибка. Попробуйте еще раз.")
             return
 
-    text = (
-        f"📊 *Моя статистика*\n\n"
-        f"🎯 *Общая статистика:*\n"
-        f"• Тренировок пройдено: {total_sessions}\n"
-        f"• Всего вопросов: {total_questions}\n"
-        f"• Правильных ответов: {total_correct}\n"
-        f"• Средняя точность: {avg_accuracy:.1f}%\n\n"
-        f"📚 *Словарь:*\n"
-        f"• Изучено слов: {words_studied}\n"
-        f"• Освоено слов (уровень 3+): {words_mastered}\n\n"
-        f"📅 *Сегодня:*\n"
-        f"• Тренировок: {today_sessions}\n"
-        f"• Вопросов: {today_questions}"
+    text = ui.STATISTICS_TEMPLATE(
+        total_sessions=total_sessions,
+        total_questions=total_questions,
+        total_correct=total_correct,
+        avg_accuracy=avg_accuracy,
+        words_studied=words_studied,
+        words_mastered=words_mastered,
+        today_sessions=today_sessions,
+        today_questions=today_questions,
     )
 
-    keyboard = [
-        [InlineKeyboardButton("📈 Детальная статистика", callback_data="statistics_detailed")],
-        [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    await query.edit_message_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+    await query.edit_message_text(text, parse_mode="Markdown", reply_markup=ui.STATISTICS_KEYBOARD)
 
 
 async def statistics_detailed(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -126,14 +102,8 @@ async def statistics_detailed(update: Update, context: ContextTypes.DEFAULT_TYPE
             )
             recent_sessions = result.scalars().all()
 
-            # Слова, требующие повторения
-            result = await session.execute(
-                select(Statistics, Word)
-                .join(Word, Statistics.word_id == Word.id)
-                .where(Statistics.user_id == user_id, Statistics.mastered_level < 3)
-                .order_by(Statistics.mastered_level)
-                .limit(5)
-            )
+            # Слова, срок повторения которых наступил (очередь повторения)
+            result = await session.execute(due_words_query(user_id, 5))
             words_to_review = result.all()
         except DatabaseError as e:
             # FIX: Улучшена обработка специфичных исключений БД (P1.2)
@@ -146,30 +116,20 @@ async def statistics_detailed(update: Update, context: ContextTypes.DEFAULT_TYPE
             await query.edit_message_text("❌ Произошла неожиданная ошибка. Попробуйте еще раз.")
             return
 
-        text = "📈 *Детальная статистика*\n\n"
+        parts = ["📈 *Детальная статистика*\n\n"]
 
         if recent_sessions:
-            text += "🕐 *Последние тренировки:*\n"
-            for session in recent_sessions:
-                text += (
-                    f"• {session.created_at.strftime('%d.%m %H:%M')} - "
-                    f"{session.total_questions} вопросов, "
-                    f"точность {session.accuracy:.1f}%\n"
-                )
-            text += "\n"
+            parts.append("🕐 *Последние тренировки:*\n")
+            parts.extend(map(ui.RECENT_SESSION_TEMPLATE, recent_sessions))
+            parts.append("\n")
 
         if words_to_review:
-            text += "📚 *Слова для повторения:*\n"
-            for stats, word in words_to_review:
-                level_emoji = "⭐" * stats.mastered_level + "⚪" * (5 - stats.mastered_level)
-                text += f"• {level_emoji} {word.english_word} = {word.russian_translation}\n"
+            parts.append("📚 *Слова для повторения:*\n")
+            for word, stats in words_to_review:
+                parts.append(ui.REVIEW_WORD_TEMPLATE(ui.MASTERY_LEVELS[stats.mastered_level], word))
         else:
-            text += "✅ Все слова хорошо изучены!\n"
+            parts.append("✅ Слов к повторению нет!\n")
 
-    keyboard = [
-        [InlineKeyboardButton("📊 Общая статистика", callback_data="statistics_menu")],
-        [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    await query.edit_message_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+    await query.edit_message_text(
+        "".join(parts), parse_mode="Markdown", reply_markup=ui.STATISTICS_DETAILED_KEYBOARD
+    )
@@ -1,41 +1,56 @@
 """Обработчики тренировок"""
 
+import functools
 import logging
 import random
+import time
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.exc import DatabaseError, IntegrityError
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram import Update
 from telegram.ext import ContextTypes
 
-from bot.database.database import async_session_maker
-from bot.database.models import Answer, Statistics, TrainingSession, User, Word
-from bot.database.repository import get_user_by_telegram_id
+from bot import ui
+from bot.database.answer_journal import AnswerEvent, answer_journal
+from bot.database.database import async_session_maker, autocommit_session_maker
+from bot.database.deck import (
+    DECK_KEY,
+    VERSION_KEY,
+    invalidate_deck,
+    make_deck,
+    make_question,
+    refill_deck,
+    sample_deck_words,
+    start_refill,
+    take_question,
+)
+from bot.database.models import TrainingSession, User, Word
+from bot.database.repository import (
+    get_user_id_by_telegram_id,
+    record_answer,
+    record_session_started,
+)
+from bot.database.review import fetch_due_word
+from bot.database.word_pool import word_pool
+from bot.question_prefetch import question_prefetcher
 
 # FIX: Добавлен logger для обработки ошибок транзакций (P0.1)
 logger = logging.getLogger(__name__)
 
+# Сколько последних отвеченных слов не предлагать в режиме повторения: их ответы
+# могут еще ждать записи в журнале ответов, и срок повторения еще не сдвинут
+REVIEW_RECENT_WORDS = 10
+
 
 async def training_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Начало тренировки - выбор направления перевода"""
     query = update.callback_query
     await query.answer()
 
-    keyboard = [
-        [
-            InlineKeyboardButton("🇬🇧 → 🇷🇺 EN→RU", callback_data="training_direction_en_ru"),
-            InlineKeyboardButton("🇷🇺 → 🇬🇧 RU→EN", callback_data="training_direction_ru_en"),
-        ],
-        [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     await query.edit_message_text(
-        "🎯 *Выберите направление перевода:*\n\n"
-        "• EN→RU: вам покажут английское слово, нужно выбрать русский перевод\n"
-        "• RU→EN: вам покажут русское слово, нужно выбрать английский перевод",
+        ui.TRAINING_DIRECTION_TEXT,
         parse_mode="Markdown",
-        reply_markup=reply_markup,
+        reply_markup=ui.TRAINING_DIRECTION_KEYBOARD,
     )
 
 
@@ -47,18 +62,60 @@ async def training_direction(update: Update, context: ContextTypes.DEFAULT_TYPE)
     direction = query.data.split("_")[-2:]  # ['en', 'ru'] или ['ru', 'en']
     direction_str = "_".join(direction)  # 'en_ru' или 'ru_en'
 
-    # Сохраняем направление в контексте пользователя
-    context.user_data["training_direction"] = direction_str
+    await begin_training(update, context, direction_str, "random")
+
+
+async def training_review(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Начало тренировки в режиме повторения слов по расписанию"""
+    query = update.callback_query
+    await query.answer()
+
+    async with async_session_maker() as session:
+        try:
+            due_word = await fetch_due_word(session, query.from_user.id)
+        except DatabaseError as e:
+            logger.error(f"Database error in training_review: {e}", exc_info=True)
+            await query.edit_message_text("❌ Произошла ошибка при загрузке слов. Попробуйте еще раз.")
+            return
+
+    if due_word is None:
+        await query.edit_message_text(
+            ui.NOTHING_TO_REVIEW_TEXT,
+            parse_mode="Markdown",
+            reply_markup=ui.NOTHING_TO_REVIEW_KEYBOARD,
+        )
+        return
+
+    await begin_training(update, context, "en_ru", "review")
+
+
+async def begin_training(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, direction: str, mode: str
+):
+    """Создать тренировку и задать первый вопрос
+
+    Args:
+        direction: Направление перевода ('en_ru' или 'ru_en')
+        mode: 'random' — случайные слова, 'review' — слова, срок повторения которых наступил
+    """
+    query = update.callback_query
+
+    # Сохраняем направление и режим в контексте пользователя
+    context.user_data["training_direction"] = direction
+    context.user_data["training_mode"] = mode
+    context.user_data.pop("review_recent", None)
+    invalidate_deck(context.user_data)
 
     # Создаем новую сессию тренировки
     user_id = query.from_user.id
+    question_prefetcher.cancel(user_id)
 
     async with async_session_maker() as session:
         try:
             # FIX: Использование репозитория вместо дублированного кода (P1.1)
-            user = await get_user_by_telegram_id(session, user_id)
+            db_user_id = await get_user_id_by_telegram_id(session, user_id)
 
-            if not user:
+            if db_user_id is None:
                 await query.edit_message_text("Ошибка: пользователь не найден. Используйте /start")
                 return
 
@@ -71,6 +128,7 @@ async def training_direction(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 accuracy=0.0,
             )
             session.add(training_session)
+            await record_session_started(session, user_id)
             await session.commit()
             await session.refresh(training_session)
 
@@ -79,19 +137,19 @@ async def training_direction(update: Update, context: ContextTypes.DEFAULT_TYPE)
         except IntegrityError as e:
             # FIX: Улучшена обработка специфичных исключений БД (P1.2)
             await session.rollback()
-            logger.error(f"Integrity error in training_direction: {e}", exc_info=True)
+            logger.error(f"Integrity error in begin_training: {e}", exc_info=True)
             await query.edit_message_text("❌ Ошибка целостности данных. Попробуйте еще раз.")
             return
         except DatabaseError as e:
             # FIX: Добавлен rollback для обработки ошибок транзакций (P0.1)
             await session.rollback()
-            logger.error(f"Database error in training_direction: {e}", exc_info=True)
+            logger.error(f"Database error in begin_training: {e}", exc_info=True)
             await query.edit_message_text("❌ Произошла ошибка при создании тренировки. Попробуйте еще раз.")
             return
         except Exception as e:
             # Общая обработка остальных исключений
             await session.rollback()
-            logger.error(f"Unexpected error in training_direction: {e}", exc_info=True)
+            logger.error(f"Unexpected error in begin_training: {e}", exc_info=True)
             await query.edit_message_text("❌ Произошла неожиданная ошибка. Попробуйте еще раз.")
             return
 
@@ -99,134 +157,160 @@ async def training_direction(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await ask_question(update, context)
 
 
-async def ask_question(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Задать вопрос пользователю"""
+# Почему вопрос не задать: текст, parse_mode и клавиатура под сообщением
+NO_QUESTION_REPLIES = {
+    "no_user": (
+        "Ошибка: пользователь не найден. Используйте /start",
+        None,
+        ui.BACK_TO_MAIN_MENU_KEYBOARD,
+    ),
+    "reviewed": (
+        "🎉 *Все слова повторены!*\n\nСледующие появятся, когда наступит их срок.",
+        "Markdown",
+        ui.TRAINING_OVER_KEYBOARD,
+    ),
+    "empty": (
+        "📚 *Словарь пуст*\n\nДобавьте слова в словарь, чтобы начать тренировку!",
+        "Markdown",
+        ui.BACK_TO_MAIN_MENU_KEYBOARD,
+    ),
+    "too_few": (
+        "📚 *Мало слов для тренировки*\n\nДобавьте ещё слова (нужно минимум 2 разных).",
+        "Markdown",
+        ui.BACK_TO_MAIN_MENU_KEYBOARD,
+    ),
+}
+
+
+def prefetch_version(user_data: dict) -> tuple:
+    """Версия, к которой привязан подготовленный заранее вопрос"""
+    return user_data.get("training_session_id"), user_data.get(VERSION_KEY, 0)
+
+
+async def prepare_question(user_data: dict, telegram_id: int) -> tuple[str | None, list | None]:
+    """Подготовить следующий вопрос тренировки без отправки сообщений
+
+    В обычном режиме вопрос берется из колоды в ``user_data`` без обращения к БД
+    (см. bot/database/deck.py); БД читается, только когда колода пуста. Ошибки БД
+    пробрасываются вызывающему.
+
+    Returns:
+        (None, вопрос) или (причина из NO_QUESTION_REPLIES, None)
+    """
+    direction = user_data.get("training_direction", "en_ru")
+    review = user_data.get("training_mode") == "review"
+
+    if not review:
+        question = take_question(user_data)
+        if question is not None:
+            return None, question
+
+    # Колода, сброшенная во время чтения БД (invalidate_deck), не сохраняется:
+    # подготовка может идти в фоне (bot/question_prefetch.py)
+    version = user_data.get(VERSION_KEY, 0)
+    async with async_session_maker() as session:
+        # FIX: Использование репозитория вместо дублированного кода (P1.1)
+        db_user_id = await get_user_id_by_telegram_id(session, telegram_id)
+        if db_user_id is None:
+            return "no_user", None
+
+        if review:
+            # Следующее слово из очереди повторения (индекс user_id, next_review)
+            due_word = await fetch_due_word(session, telegram_id, user_data.get("review_recent", ()))
+            if due_word is None:
+                return "reviewed", None
+
+            # Слово к повторению — правильный ответ, случайные слова из пула — варианты
+            words = await word_pool.sample(session, db_user_id, 4)
+            words = [due_word] + [w for w in words if w.id != due_word.id][:3]
+        else:
+            # Слова для всей колоды вопросов: выборка id из пула в памяти
+            # и один запрос по PK вместо ORDER BY random() на каждый вопрос
+            words = await sample_deck_words(session, db_user_id)
+
+    if not words:
+        return "empty", None
+    if len(words) < 2:
+        return "too_few", None
+
+    if review:
+        return None, make_question(words[0], words[1:], direction)
+    deck = make_deck(words, direction)
+    question = deck.pop(0)
+    if user_data.get(VERSION_KEY, 0) == version:
+        user_data[DECK_KEY] = deck
+    return None, question
+
+
+async def ask_question(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    prepared: tuple[str | None, list | None] | None = None,
+    tapped_at: float | None = None,
+):
+    """Задать вопрос пользователю
+
+    Args:
+        prepared: Результат ``prepare_question``, подготовленный заранее
+            (bot/question_prefetch.py); если None, вопрос готовится сейчас
+        tapped_at: Момент нажатия «Следующий вопрос» (time.perf_counter) для
+            метрики времени до вопроса
+    """
     query = update.callback_query if update.callback_query else None
     telegram_id = update.effective_user.id
     direction = context.user_data.get("training_direction", "en_ru")
+    review = context.user_data.get("training_mode") == "review"
 
-    async with async_session_maker() as session:
-        try:
-            # FIX: Использование репозитория вместо дублированного кода (P1.1)
-            user = await get_user_by_telegram_id(session, telegram_id)
-
-            if not user:
-                text = "Ошибка: пользователь не найден. Используйте /start"
-                keyboard = [[InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")]]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                if query:
-                    await query.edit_message_text(text, reply_markup=reply_markup)
-                elif update.message:
-                    await update.message.reply_text(text, reply_markup=reply_markup)
-                return
+    async def reply(text: str, parse_mode: str | None = None, reply_markup=None):
+        if query:
+            await query.edit_message_text(text, parse_mode=parse_mode, reply_markup=reply_markup)
+        elif update.message:
+            await update.message.reply_text(text, parse_mode=parse_mode, reply_markup=reply_markup)
 
-            # Получаем 4 случайных слова — лимит в запросе вместо загрузки 100 (экономия памяти и времени)
-            result = await session.execute(
-                select(Word)
-                .where((Word.user_id.is_(None)) | (Word.user_id == user.id), Word.is_public)
-                .order_by(func.random())
-                .limit(4)
-            )
-            words = result.scalars().all()
+    main_menu = ui.BACK_TO_MAIN_MENU_KEYBOARD
+    from_prefetch = prepared is not None
+    if prepared is None:
+        try:
+            prepared = await prepare_question(context.user_data, telegram_id)
         except DatabaseError as e:
             # FIX: Улучшена обработка специфичных исключений БД (P1.2)
-            await session.rollback()
             logger.error(f"Database error in ask_question: {e}", exc_info=True)
-            text = "❌ Произошла ошибка при загрузке слов. Попробуйте еще раз."
-            keyboard = [[InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            if query:
-                await query.edit_message_text(text, reply_markup=reply_markup)
-            elif update.message:
-                await update.message.reply_text(text, reply_markup=reply_markup)
+            await reply("❌ Произошла ошибка при загрузке слов. Попробуйте еще раз.", reply_markup=main_menu)
             return
         except Exception as e:
             # Общая обработка остальных исключений
-            await session.rollback()
             logger.error(f"Unexpected error in ask_question: {e}", exc_info=True)
-            text = "❌ Произошла неожиданная ошибка. Попробуйте еще раз."
-            keyboard = [[InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            if query:
-                await query.edit_message_text(text, reply_markup=reply_markup)
-            elif update.message:
-                await update.message.reply_text(text, reply_markup=reply_markup)
+            await reply("❌ Произошла неожиданная ошибка. Попробуйте еще раз.", reply_markup=main_menu)
             return
+    if tapped_at is not None:
+        question_prefetcher.observe(time.perf_counter() - tapped_at, from_prefetch)
 
-        if not words:
-            text = "📚 *Словарь пуст*\n\nДобавьте слова в словарь, чтобы начать тренировку!"
-            keyboard = [[InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-
-            if query:
-                await query.edit_message_text(
-                    text, parse_mode="Markdown", reply_markup=reply_markup
-                )
-            elif update.message:
-                await update.message.reply_text(
-                    text, parse_mode="Markdown", reply_markup=reply_markup
-                )
-            return
-
-        if len(words) < 2:
-            text = "📚 *Мало слов для тренировки*\n\nДобавьте ещё слова (нужно минимум 2 разных)."
-            keyboard = [[InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            if query:
-                await query.edit_message_text(
-                    text, parse_mode="Markdown", reply_markup=reply_markup
-                )
-            elif update.message:
-                await update.message.reply_text(
-                    text, parse_mode="Markdown", reply_markup=reply_markup
-                )
-            return
+    problem, question = prepared
+    if problem is not None:
+        await reply(*NO_QUESTION_REPLIES[problem])
+        return
 
-        # Работаем с 4 (или меньшим) количеством слов: одно — правильный ответ, остальные — неправильные
-        random.shuffle(words)
-        correct_word = words[0]
-        wrong_words = list(words[1:])
-        # Добиваем до 3 неправильных вариантов дубликатами, если слов меньше 4
-        while len(wrong_words) < 3:
-            wrong_words.append(wrong_words[0] if wrong_words else correct_word)
-        wrong_words = wrong_words[:3]
-
-        # Формируем варианты ответов
-        if direction == "en_ru":
-            question_text = f"🇬🇧 *Переведите слово:*\n\n*{correct_word.english_word}*"
-            correct_answer = correct_word.russian_translation
-            options = [w.russian_translation for w in wrong_words] + [correct_answer]
-        else:  # ru_en
-            question_text = f"🇷🇺 *Переведите слово:*\n\n*{correct_word.russian_translation}*"
-            correct_answer = correct_word.english_word
-            options = [w.english_word for w in wrong_words] + [correct_answer]
-
-        # Перемешиваем варианты
-        random.shuffle(options)
-        correct_index = options.index(correct_answer)
-
-        # Сохраняем правильный ответ в контексте
-        context.user_data["correct_word_id"] = correct_word.id
-        context.user_data["correct_answer_index"] = correct_index
-
-        # Создаем клавиатуру с вариантами
-        keyboard = []
-        for i, option in enumerate(options):
-            keyboard.append(
-                [InlineKeyboardButton(f"{chr(65 + i)}. {option}", callback_data=f"answer_{i}")]
-            )
-        keyboard.append(
-            [InlineKeyboardButton("❌ Завершить тренировку", callback_data="training_end")]
+    # Когда колода подходит к концу, следующие вопросы готовятся в фоне
+    if not review and start_refill(context.user_data, telegram_id):
+        context.application.create_task(
+            refill_deck(context.user_data, telegram_id, direction), update=update
         )
 
-        reply_markup = InlineKeyboardMarkup(keyboard)
+    # Вопрос: [id слова, слово, правильный ответ, 3 неправильных варианта]
+    word_id, prompt, correct_answer, *wrong_answers = question
 
-        text = f"{question_text}\n\nВыберите правильный вариант:"
+    # Перемешиваем варианты
+    options = wrong_answers + [correct_answer]
+    random.shuffle(options)
+    correct_index = options.index(correct_answer)
 
-        if query:
-            await query.edit_message_text(text, parse_mode="Markdown", reply_markup=reply_markup)
-        elif update.message:
-            await update.message.reply_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+    # Сохраняем правильный ответ в контексте
+    context.user_data["correct_word_id"] = word_id
+    context.user_data["correct_answer_index"] = correct_index
+
+    # Текст и клавиатура с вариантами по шаблонам из bot/ui.py
+    text, reply_markup = ui.question_message(direction, prompt, options)
+    await reply(text, "Markdown", reply_markup)
 
 
 async def handle_answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -249,60 +333,49 @@ async def handle_answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     is_correct = answer_index == correct_index
 
-    async with async_session_maker() as session:
-        try:
-            # Получаем слово
-            result = await session.execute(select(Word).where(Word.id == correct_word_id))
-            word = result.scalar_one_or_none()
-
-            if not word:
-                await query.edit_message_text("Ошибка: слово не найдено")
-                return
-
-            # Обновляем сессию
-            training_session = await session.get(TrainingSession, session_id)
-            if not training_session:
-                await query.edit_message_text("Ошибка: сессия тренировки не найдена.")
-                return
-
-            training_session.total_questions += 1
-            if is_correct:
-                training_session.correct_answers += 1
-            training_session.accuracy = (
-                training_session.correct_answers / training_session.total_questions * 100
-            )
+    if context.user_data.get("training_mode") == "review":
+        recent = context.user_data.setdefault("review_recent", [])
+        recent.append(correct_word_id)
+        del recent[:-REVIEW_RECENT_WORDS]
 
-            # Сохраняем ответ
-            answer = Answer(
+    # Ответ, счетчики тренировки и статистика пишутся одним оператором без BEGIN/COMMIT
+    async with autocommit_session_maker() as session:
+        try:
+            event = AnswerEvent(
                 session_id=session_id,
                 user_id=user_id,
                 word_id=correct_word_id,
-                question_type="multiple_choice",
                 user_answer=str(answer_index),
                 is_correct=is_correct,
             )
-            session.add(answer)
-
-            # Обновляем статистику
-            stats_result = await session.execute(
-                select(Statistics).where(
-                    Statistics.user_id == user_id, Statistics.word_id == correct_word_id
+            if await answer_journal.submit(event):
+                # Запись выполнит журнал, для ответа нужны поля слова и проверка
+                # тренировки (событие без тренировки журнал отбросит при записи)
+                result = await session.execute(
+                    select(
+                        Word,
+                        select(TrainingSession.id).where(TrainingSession.id == session_id).exists(),
+                    ).where(Word.id == correct_word_id)
                 )
-            )
-            stats = stats_result.scalar_one_or_none()
-
-            if not stats:
-                stats = Statistics(
-                    user_id=user_id, word_id=correct_word_id, mastered_level=0, next_review=None
+                word, session_found = result.first() or (None, False)
+            else:
+                word = await record_answer(
+                    session,
+                    session_id=session_id,
+                    user_id=user_id,
+                    word_id=correct_word_id,
+                    user_answer=str(answer_index),
+                    is_correct=is_correct,
                 )
-                session.add(stats)
+                session_found = word is not None and word.session_found
 
-            if is_correct:
-                stats.mastered_level = min(stats.mastered_level + 1, 5)
-            else:
-                stats.mastered_level = max(stats.mastered_level - 1, 0)
+            if not word:
+                await query.edit_message_text("Ошибка: слово не найдено")
+                return
 
-            await session.commit()
+            if not session_found:
+                await query.edit_message_text("Ошибка: сессия тренировки не найдена.")
+                return
         except IntegrityError as e:
             # FIX: Улучшена обработка специфичных исключений БД (P1.2)
             await session.rollback()
@@ -322,41 +395,29 @@ async def handle_answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await query.edit_message_text("❌ Произошла неожиданная ошибка. Попробуйте еще раз.")
             return
 
-        # Формируем ответ
-        direction = context.user_data.get("training_direction", "en_ru")
-        if direction == "en_ru":
-            correct_text = f"✅ *Правильно!*\n\n*{word.english_word}* = {word.russian_translation}"
-        else:
-            correct_text = f"✅ *Правильно!*\n\n*{word.russian_translation}* = {word.english_word}"
-
-        if not is_correct:
-            if direction == "en_ru":
-                correct_text = (
-                    f"❌ *Неправильно*\n\n"
-                    f"Правильный ответ: *{word.english_word}* = {word.russian_translation}"
-                )
-            else:
-                correct_text = (
-                    f"❌ *Неправильно*\n\n"
-                    f"Правильный ответ: *{word.russian_translation}* = {word.english_word}"
-                )
-
-        if word.example_sentence:
-            correct_text += f"\n\n💡 *Пример:*\n🇬🇧 {word.example_sentence}"
-            if word.example_sentence_ru:
-                correct_text += f"\n🇷🇺 {word.example_sentence_ru}"
+        # Следующий вопрос готовится в фоне, пока пользователь читает результат
+        question_prefetcher.start(
+            user_id,
+            prefetch_version(context.user_data),
+            lambda: prepare_question(context.user_data, user_id),
+            functools.partial(context.application.create_task, update=update),
+        )
 
         # Показываем результат и продолжаем
-        keyboard = [[InlineKeyboardButton("➡️ Следующий вопрос", callback_data="next_question")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
+        direction = context.user_data.get("training_direction", "en_ru")
         await query.edit_message_text(
-            correct_text, parse_mode="Markdown", reply_markup=reply_markup
+            ui.answer_feedback(word, is_correct, direction),
+            parse_mode="Markdown",
+            reply_markup=ui.NEXT_QUESTION_KEYBOARD,
         )
 
 
 async def next_question(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Переход к следующему вопросу"""
+    """Переход к следующему вопросу
+
+    Вопрос обычно уже подготовлен в фоне после ответа (см. handle_answer).
+    """
+    tapped_at = time.perf_counter()
     query = update.callback_query
     await query.answer()
 
@@ -364,7 +425,10 @@ async def next_question(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data.pop("correct_answer_index", None)
     context.user_data.pop("correct_word_id", None)
 
-    await ask_question(update, context)
+    prepared = await question_prefetcher.take(
+        query.from_user.id, prefetch_version(context.user_data)
+    )
+    await ask_question(update, context, prepared, tapped_at)
 
 
 async def training_end(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -374,6 +438,14 @@ async def training_end(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     session_id = context.user_data.get("training_session_id")
 
+    # Подготовленный заранее вопрос больше не понадобится
+    question_prefetcher.cancel(query.from_user.id)
+
+    # Итоги читаются из training_sessions, поэтому отложенные ответы этой
+    # тренировки записываем сразу (остальные ждут общего сброса)
+    if session_id:
+        await answer_journal.flush_session(session_id)
+
     async with async_session_maker() as session:
         try:
             if session_id:
@@ -386,13 +458,7 @@ async def training_end(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 total = training_session.total_questions
                 correct = training_session.correct_answers
 
-                text = (
-                    f"🏁 *Тренировка завершена!*\n\n"
-                    f"📊 *Результаты:*\n"
-                    f"• Всего вопросов: {total}\n"
-                    f"• Правильных ответов: {correct}\n"
-                    f"• Точность: {accuracy:.1f}%"
-                )
+                text = ui.TRAINING_RESULTS_TEMPLATE(total=total, correct=correct, accuracy=accuracy)
             else:
                 text = "Тренировка завершена."
         except DatabaseError as e:
@@ -409,13 +475,10 @@ async def training_end(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Очищаем данные тренировки
     context.user_data.pop("training_session_id", None)
     context.user_data.pop("training_direction", None)
+    context.user_data.pop("training_mode", None)
+    context.user_data.pop("review_recent", None)
+    invalidate_deck(context.user_data)
     context.user_data.pop("correct_answer_index", None)
     context.user_data.pop("correct_word_id", None)
 
-    keyboard = [
-        [InlineKeyboardButton("🎯 Начать новую тренировку", callback_data="training_start")],
-        [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    await query.edit_message_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+    await query.edit_message_text(text, parse_mode="Markdown", reply_markup=ui.TRAINING_END_KEYBOARD)
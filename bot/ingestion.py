@@ -0,0 +1,384 @@
+"""Получение обновлений от Telegram: long polling или webhook
+
+Режим выбирается настройкой ``BOT_MODE``:
+
+* ``polling`` — ``Application.run_polling``: бот сам запрашивает getUpdates;
+* ``webhook`` — Telegram присылает обновления POST-запросами на встроенный
+  асинхронный HTTP-сервер (``WebhookServer``). Сервер слушает
+  ``WEBHOOK_LISTEN:WEBHOOK_PORT`` по обычному HTTP, поэтому перед ним нужен
+  обратный прокси с TLS, адрес которого указан в ``WEBHOOK_URL``.
+
+Webhook-сервер принимает только POST на ``WEBHOOK_PATH`` с заголовком
+``X-Telegram-Bot-Api-Secret-Token``, равным ``WEBHOOK_SECRET_TOKEN`` (если токен
+не задан, он генерируется при запуске и передается Telegram в setWebhook).
+Тело обновления разбирается через orjson, если он установлен, иначе через json.
+
+В обоих режимах Telegram присылает только типы обновлений, для которых
+зарегистрированы обработчики (``allowed_update_types``).
+"""
+
+import asyncio
+import contextlib
+import hmac
+import json
+import logging
+import secrets
+import signal
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from telegram import Update
+from telegram.ext import (
+    Application,
+    CallbackQueryHandler,
+    CommandHandler,
+    InlineQueryHandler,
+    MessageHandler,
+    TypeHandler,
+)
+
+from bot.config import (
+    WEBHOOK_LISTEN,
+    WEBHOOK_MAX_CONNECTIONS,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET_TOKEN,
+    WEBHOOK_URL,
+)
+
+try:
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:  # orjson — необязательная зависимость
+    orjson = None
+    json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Типы обновлений, которые может обработать обработчик каждого класса.
+# MessageHandler и CommandHandler подписываются только на новые сообщения:
+# изменения сообщений бот не обрабатывает
+HANDLER_UPDATE_TYPES = {
+    CallbackQueryHandler: (Update.CALLBACK_QUERY,),
+    CommandHandler: (Update.MESSAGE,),
+    MessageHandler: (Update.MESSAGE,),
+    InlineQueryHandler: (Update.INLINE_QUERY,),
+}
+
+SECRET_TOKEN_HEADER = "x-telegram-bot-api-secret-token"
+HEALTH_PATH = "/health"
+MAX_BODY_SIZE = 1024 * 1024  # обновления Telegram намного меньше
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    502: "Bad Gateway",
+    503: "Service Unavailable",
+}
+
+
+def allowed_update_types(application: Application) -> list[str]:
+    """Типы обновлений, для которых в приложении есть обработчики
+
+    Для обработчика неизвестного класса возвращаются все типы, чтобы не
+    потерять обновления. ``TypeHandler`` (контекст логов, метрики) видит все
+    полученные обновления, но сам их не требует, поэтому не учитывается.
+    """
+    update_types = set()
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            if isinstance(handler, TypeHandler):
+                continue
+            handler_types = HANDLER_UPDATE_TYPES.get(type(handler))
+            if handler_types is None:
+                logger.warning(
+                    f"Unknown update types for {type(handler).__name__}, subscribing to all"
+                )
+                return list(Update.ALL_TYPES)
+            update_types.update(handler_types)
+    return sorted(update_types)
+
+
+class HttpError(Exception):
+    """Ошибка разбора HTTP-запроса; соединение закрывается после ответа"""
+
+    def __init__(self, status: int):
+        super().__init__(status)
+        self.status = status
+
+
+@dataclass(slots=True)
+class HttpRequest:
+    """Разобранный HTTP/1.1-запрос"""
+
+    method: str
+    path: str
+    headers: dict[str, str]
+    body: bytes
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+
+async def read_request(
+    reader: asyncio.StreamReader, max_body_size: int = MAX_BODY_SIZE
+) -> HttpRequest | None:
+    """Прочитать один запрос с телом по Content-Length; None — соединение закрыто"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HttpError(400) from None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if "transfer-encoding" in headers:
+        raise HttpError(411)
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HttpError(400) from None
+    if length > max_body_size:
+        raise HttpError(413)
+    body = await reader.readexactly(length) if length else b""
+    return HttpRequest(method, target.split("?", 1)[0], headers, body)
+
+
+def write_response(
+    writer: asyncio.StreamWriter,
+    status: int,
+    body: bytes = b"",
+    content_type: str = "text/plain",
+    keep_alive: bool = True,
+):
+    """Записать HTTP-ответ в буфер соединения (без drain)"""
+    reason = _REASONS.get(status, "")
+    connection = "keep-alive" if keep_alive else "close"
+    writer.write(
+        f"HTTP/1.1 {status} {reason}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {connection}\r\n\r\n".encode("latin-1")
+        + body
+    )
+
+
+class HttpServer(ABC):
+    """Минимальный HTTP/1.1-сервер на asyncio с постоянными соединениями"""
+
+    # Тип непустого тела ответа
+    content_type = "application/json"
+
+    def __init__(self):
+        self._server: asyncio.Server | None = None
+        self._connections: set[asyncio.StreamWriter] = set()
+        self.rejected_requests = 0
+
+    async def start(self, host: str, port: int):
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+
+    @property
+    def port(self) -> int:
+        """Фактический порт (при запуске с port=0)"""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        # Telegram держит соединения открытыми: закрываем их сами
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    @abstractmethod
+    async def handle(self, request: HttpRequest) -> tuple[int, bytes]:
+        """Обработать запрос; возвращает HTTP-статус и тело ответа (``content_type`` или пустое)"""
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as e:
+                    self.rejected_requests += 1
+                    write_response(writer, e.status, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                status, body = await self.handle(request)
+                if status != 200:
+                    self.rejected_requests += 1
+                    logger.warning(
+                        f"Request rejected with {status}: {request.method} {request.path}"
+                    )
+                content_type = self.content_type if body else "text/plain"
+                write_response(writer, status, body, content_type, keep_alive=request.keep_alive)
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+
+def check_update_request(request: HttpRequest, path: str, secret_token: str) -> int | None:
+    """Проверить путь, метод и секретный токен запроса с обновлением; None — запрос верный"""
+    if request.path != path:
+        return 404
+    if request.method != "POST":
+        return 405
+    if not hmac.compare_digest(
+        request.headers.get(SECRET_TOKEN_HEADER, "").encode(), secret_token.encode()
+    ):
+        return 403
+    return None
+
+
+class WebhookServer(HttpServer):
+    """Встроенный HTTP-сервер, передающий обновления в очередь приложения
+
+    GET на ``HEALTH_PATH`` возвращает JSON с метриками сервера и, если передана
+    функция ``health``, с ее результатом.
+    """
+
+    def __init__(
+        self,
+        application: Application,
+        path: str,
+        secret_token: str,
+        health: Callable[[], dict] | None = None,
+    ):
+        super().__init__()
+        self.application = application
+        self.path = path
+        self.secret_token = secret_token
+        self.health = health
+
+        # Метрики
+        self.received_updates = 0
+
+    def metrics(self) -> dict[str, int]:
+        """Текущие значения метрик сервера"""
+        return {
+            "received_updates": self.received_updates,
+            "rejected_requests": self.rejected_requests,
+            "open_connections": len(self._connections),
+            "update_queue": self.application.update_queue.qsize(),
+        }
+
+    async def handle(self, request: HttpRequest) -> tuple[int, bytes]:
+        if request.path == HEALTH_PATH and request.method == "GET":
+            report = self.metrics()
+            if self.health is not None:
+                report.update(self.health())
+            return 200, json.dumps(report).encode()
+
+        status = check_update_request(request, self.path, self.secret_token)
+        if status is not None:
+            return status, b""
+        try:
+            data = json_loads(request.body)
+        except ValueError:
+            return 400, b""
+        if not isinstance(data, dict):
+            return 400, b""
+        try:
+            update = Update.de_json(data, self.application.bot)
+        except Exception:
+            # Объект без обязательных полей или с полями не того типа: de_json
+            # бросает TypeError, AttributeError и т. п.
+            return 400, b""
+        if update is None:
+            return 400, b""
+        await self.application.update_queue.put(update)
+        self.received_updates += 1
+        return 200, b""
+
+
+async def serve_webhook(
+    application: Application,
+    allowed_updates: list[str],
+    url: str = WEBHOOK_URL,
+    listen: str = WEBHOOK_LISTEN,
+    port: int = WEBHOOK_PORT,
+    path: str = WEBHOOK_PATH,
+    secret_token: str | None = WEBHOOK_SECRET_TOKEN,
+    max_connections: int = WEBHOOK_MAX_CONNECTIONS,
+    register_webhook: bool = True,
+    stop_signals: Sequence[int] = (signal.SIGINT, signal.SIGTERM),
+    health: Callable[[], dict] | None = None,
+):
+    """Жизненный цикл приложения в режиме webhook (как у run_polling) до сигнала остановки
+
+    Воркеры супервизора (``bot.supervisor``) запускаются с ``register_webhook=False``:
+    setWebhook вызывает сам супервизор.
+    """
+    secret_token = secret_token or secrets.token_urlsafe(32)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in stop_signals:
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop.set)
+
+    server = WebhookServer(application, path, secret_token, health)
+    await application.initialize()
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+        await server.start(listen, port)
+        if register_webhook:
+            await application.bot.set_webhook(
+                url,
+                allowed_updates=allowed_updates,
+                secret_token=secret_token,
+                max_connections=max_connections,
+            )
+        decoder = "orjson" if orjson is not None else "json"
+        logger.info(
+            f"Webhook server listening on {listen}:{port}{path} ({decoder}), "
+            f"allowed updates: {allowed_updates}"
+        )
+        await stop.wait()
+    finally:
+        await server.stop()
+        logger.info(f"Webhook server stopped: {server.metrics()}")
+        if application.running:
+            await application.stop()
+            if application.post_stop:
+                await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+
+def run_webhook(
+    application: Application,
+    allowed_updates: list[str],
+    health: Callable[[], dict] | None = None,
+):
+    """Запустить бота в режиме webhook (блокирует до остановки)"""
+    asyncio.run(serve_webhook(application, allowed_updates, health=health))
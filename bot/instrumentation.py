@@ -0,0 +1,167 @@
+"""Сбор метрик бота и HTTP-эндпоинт ``/metrics``
+
+* ``instrument_handlers`` оборачивает обратные вызовы зарегистрированных
+  обработчиков: время выполнения пишется в гистограмму с меткой — шаблоном
+  ``callback_data``, командой или именем функции, вышедшие исключения
+  считаются по классу; SQL-операторы обработчика учитываются
+  ``track_queries`` (bot/database/query_stats.py). Обертки создаются один раз
+  при сборке приложения.
+* ``count_update`` (TypeHandler в группе -2) считает полученные обновления.
+* ``ErrorCounter`` — обработчик логов: ошибки, которые обработчики ловят сами
+  (ветки ``IntegrityError``/``DatabaseError`` с ``logger.error(..., exc_info=True)``),
+  считаются по логгеру и классу исключения.
+* ``InstrumentedRequest`` измеряет запросы к Bot API по методу.
+* ``MetricsServer`` отдает ``REGISTRY.render()`` на ``METRICS_HOST:METRICS_PORT``;
+  воркеры ``bot.supervisor`` слушают ``METRICS_PORT + номер воркера``.
+"""
+
+import functools
+import logging
+import time
+
+from telegram import Update
+from telegram.ext import Application, BaseHandler, CallbackQueryHandler, CommandHandler, TypeHandler
+from telegram.request import HTTPXRequest
+
+from bot.config import METRICS_HOST, METRICS_PORT
+from bot.database.query_stats import track_queries
+from bot.ingestion import HttpRequest, HttpServer
+from bot.metrics import (
+    REGISTRY,
+    handler_duration,
+    handler_errors,
+    logged_errors,
+    telegram_api_duration,
+    telegram_api_errors,
+    updates_total,
+)
+
+logger = logging.getLogger(__name__)
+
+METRICS_PATH = "/metrics"
+
+# Типы обновлений, которые различаются в bot_updates_total
+UPDATE_TYPES = (Update.MESSAGE, Update.CALLBACK_QUERY, Update.INLINE_QUERY)
+
+_update_counters = {update_type: updates_total.labels(update_type) for update_type in UPDATE_TYPES}
+_other_updates = updates_total.labels("other")
+
+# Сервер метрик текущего процесса
+_server: "MetricsServer | None" = None
+
+
+def handler_label(handler: BaseHandler) -> str:
+    """Метка обработчика: шаблон callback_data, команда или имя функции"""
+    if isinstance(handler, CallbackQueryHandler) and handler.pattern is not None:
+        return getattr(handler.pattern, "pattern", str(handler.pattern))
+    if isinstance(handler, CommandHandler):
+        return "/" + ",".join(sorted(handler.commands))
+    return handler.callback.__name__
+
+
+def _timed(callback, label: str):
+    duration = handler_duration.labels(label)
+
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        started = time.perf_counter()
+        try:
+            with track_queries(label):
+                return await callback(update, context)
+        except Exception as e:
+            handler_errors.labels(label, type(e).__name__).inc()
+            raise
+        finally:
+            duration.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+def instrument_handlers(application: Application):
+    """Обернуть обработчики приложения измерением времени (кроме TypeHandler)"""
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            if not isinstance(handler, TypeHandler):
+                handler.callback = _timed(handler.callback, handler_label(handler))
+
+
+async def count_update(update: object, context) -> None:
+    """Учесть полученное обновление (TypeHandler в группе -2)"""
+    for update_type, counter in _update_counters.items():
+        if getattr(update, update_type, None) is not None:
+            counter.inc()
+            return
+    _other_updates.inc()
+
+
+class ErrorCounter(logging.Handler):
+    """Счетчик записей лога с исключением (уровень ERROR и выше)"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+
+    def emit(self, record: logging.LogRecord):
+        if record.exc_info and record.exc_info[0] is not None:
+            logged_errors.labels(record.name, record.exc_info[0].__name__).inc()
+
+
+def install_error_counter():
+    """Подключить ErrorCounter к корневому логгеру (один раз; после setup_logger)"""
+    root = logging.getLogger()
+    if not any(isinstance(handler, ErrorCounter) for handler in root.handlers):
+        root.addHandler(ErrorCounter())
+
+
+class InstrumentedRequest(HTTPXRequest):
+    """HTTPXRequest с измерением времени запросов к Bot API"""
+
+    async def do_request(self, url: str, method: str, *args, **kwargs) -> tuple[int, bytes]:
+        api_method = url.rsplit("/", 1)[-1]
+        started = time.perf_counter()
+        try:
+            code, payload = await super().do_request(url, method, *args, **kwargs)
+        except Exception as e:
+            telegram_api_errors.labels(api_method, type(e).__name__).inc()
+            raise
+        finally:
+            telegram_api_duration.labels(api_method).observe(time.perf_counter() - started)
+        if code >= 400:
+            telegram_api_errors.labels(api_method, f"HTTP {code}").inc()
+        return code, payload
+
+
+class MetricsServer(HttpServer):
+    """Локальный HTTP-сервер: GET ``/metrics`` в формате Prometheus"""
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    async def handle(self, request: HttpRequest) -> tuple[int, bytes]:
+        if request.path != METRICS_PATH:
+            return 404, b""
+        if request.method != "GET":
+            return 405, b""
+        return 200, REGISTRY.render().encode()
+
+
+def metrics_port(shard: tuple[int, int] | None = None) -> int:
+    """Порт сервера метрик процесса; 0 — сервер выключен"""
+    if not METRICS_PORT:
+        return 0
+    return METRICS_PORT + (shard[0] if shard is not None else 0)
+
+
+async def start_metrics_server(port: int, host: str = METRICS_HOST):
+    """Запустить сервер метрик процесса (если port не 0)"""
+    global _server
+    if not port or _server is not None:
+        return
+    _server = MetricsServer()
+    await _server.start(host, port)
+    logger.info(f"Metrics endpoint: http://{host}:{_server.port}{METRICS_PATH}")
+
+
+async def stop_metrics_server():
+    global _server
+    if _server is not None:
+        await _server.stop()
+        _server = None
@@ -1,5 +1,7 @@
 """Главный файл запуска бота"""
 
+import functools
+
 from telegram import Update
 from telegram.ext import (
     Application,
@@ -7,12 +9,39 @@ from telegram.ext import (
     CommandHandler,
     ContextTypes,
     MessageHandler,
+    TypeHandler,
     filters,
 )
 
-from bot.config import BOT_TOKEN
+from bot.config import (
+    BOT_API_BASE_URL,
+    BOT_MODE,
+    BOT_TOKEN,
+    EDIT_COALESCING,
+    TELEGRAM_POOL_SIZE,
+    TELEGRAM_RATE_LIMIT,
+    WEBHOOK_URL,
+)
+from bot.database.achievement_engine import achievement_engine
+from bot.database.answer_journal import answer_journal
+from bot.database.database import async_session_maker
+from bot.database.persistence import create_persistence
+from bot.edit_coalescing import EditCoalescer
 from bot.handlers import achievements, dictionary, start, statistics, training
-from bot.utils.logger import setup_logger
+from bot.ingestion import allowed_update_types, run_webhook
+from bot.instrumentation import (
+    InstrumentedRequest,
+    count_update,
+    install_error_counter,
+    instrument_handlers,
+    metrics_port,
+    start_metrics_server,
+    stop_metrics_server,
+)
+from bot.question_prefetch import question_prefetcher
+from bot.send_scheduler import SendScheduler
+from bot.update_processor import UserOrderedUpdateProcessor
+from bot.utils.logger import bind_log_context, setup_logger
 
 # Настройка логирования
 logger = setup_logger()
@@ -31,14 +60,26 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE):
             logger.error(f"Error sending error message: {e}")
 
 
-def main():
-    """Основная функция запуска бота"""
-    if not BOT_TOKEN:
-        logger.error("BOT_TOKEN не установлен! Проверьте файл .env")
-        return
+async def post_init(application: Application, metrics_port: int = 0):
+    """Запуск фоновых задач после инициализации приложения"""
+    async with async_session_maker() as session:
+        await achievement_engine.load(session)
+    await answer_journal.start()
+    await start_metrics_server(metrics_port)
+
 
-    # Создаем приложение
-    application = Application.builder().token(BOT_TOKEN).build()
+async def post_stop(application: Application):
+    """Сброс отложенных записей после остановки обработки обновлений"""
+    await answer_journal.stop()
+    logger.info(f"Question prefetch stopped: {question_prefetcher.metrics()}")
+    await stop_metrics_server()
+
+
+def register_handlers(application: Application):
+    """Зарегистрировать обработчики бота (используется и нагрузочными скриптами)"""
+    # Счетчик обновлений и контекст обновления (update_id, user_id) для записей лога
+    application.add_handler(TypeHandler(Update, count_update), group=-2)
+    application.add_handler(TypeHandler(Update, bind_log_context), group=-1)
 
     # Регистрируем обработчики команд
     application.add_handler(CommandHandler("start", start.start_command))
@@ -53,6 +94,9 @@ def main():
     application.add_handler(
         CallbackQueryHandler(training.training_direction, pattern="^training_direction_")
     )
+    application.add_handler(
+        CallbackQueryHandler(training.training_review, pattern="^training_review$")
+    )
     application.add_handler(CallbackQueryHandler(training.handle_answer, pattern="^answer_"))
     application.add_handler(CallbackQueryHandler(training.next_question, pattern="^next_question$"))
     application.add_handler(CallbackQueryHandler(training.training_end, pattern="^training_end$"))
@@ -73,11 +117,19 @@ def main():
         CallbackQueryHandler(dictionary.dictionary_search, pattern="^dictionary_search$")
     )
     application.add_handler(
-        CallbackQueryHandler(dictionary.dictionary_my_words, pattern="^dictionary_my_words$")
+        CallbackQueryHandler(
+            dictionary.dictionary_my_words, pattern="^dictionary_my_words($|_page:)"
+        )
+    )
+    application.add_handler(
+        CallbackQueryHandler(dictionary.dictionary_search_page, pattern="^dictionary_search_page:")
     )
     application.add_handler(
         CallbackQueryHandler(dictionary.dictionary_delete_start, pattern="^dictionary_delete$")
     )
+    application.add_handler(
+        CallbackQueryHandler(dictionary.dictionary_import_start, pattern="^dictionary_import$")
+    )
 
     # Обработчики статистики
     application.add_handler(
@@ -95,12 +147,70 @@ def main():
     # Обработчики текстовых сообщений (для словаря)
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_message))
 
+    # Импорт словаря из присланного файла
+    application.add_handler(
+        MessageHandler(filters.Document.ALL, dictionary.dictionary_import_document)
+    )
+
     # Обработчик ошибок
     application.add_error_handler(error_handler)
 
-    # Запускаем бота
+
+def build_application(shard: tuple[int, int] | None = None) -> Application:
+    """Создать приложение с обработчиками
+
+    Args:
+        shard: (номер воркера, число воркеров) для процессов ``bot.supervisor``
+    """
+    # Состояние диалогов переживает перезапуск, если задано хранилище.
+    # Обновления разных пользователей обрабатываются параллельно, одного — по порядку.
+    # Запросы к Bot API измеряются для /metrics; отправка сообщений укладывается
+    # в лимиты Telegram планировщиком (bot/send_scheduler.py), правки, не меняющие
+    # сообщение, не отправляются (bot/edit_coalescing.py)
+    builder = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .request(InstrumentedRequest(connection_pool_size=TELEGRAM_POOL_SIZE))
+        .post_init(functools.partial(post_init, metrics_port=metrics_port(shard)))
+        .post_stop(post_stop)
+        .concurrent_updates(UserOrderedUpdateProcessor())
+    )
+    if BOT_API_BASE_URL:
+        builder = builder.base_url(BOT_API_BASE_URL)
+    if TELEGRAM_RATE_LIMIT or EDIT_COALESCING:
+        scheduler = SendScheduler(
+            rate_limit=TELEGRAM_RATE_LIMIT,
+            coalescer=EditCoalescer() if EDIT_COALESCING else None,
+        )
+        builder = builder.rate_limiter(scheduler)
+    persistence = create_persistence(shard=shard)
+    if persistence is not None:
+        builder = builder.persistence(persistence)
+    application = builder.build()
+    register_handlers(application)
+    instrument_handlers(application)
+    install_error_counter()
+    return application
+
+
+def main():
+    """Основная функция запуска бота"""
+    if not BOT_TOKEN:
+        logger.error("BOT_TOKEN не установлен! Проверьте файл .env")
+        return
+    if BOT_MODE == "webhook" and not WEBHOOK_URL:
+        logger.error("BOT_MODE=webhook требует WEBHOOK_URL! Проверьте файл .env")
+        return
+
+    application = build_application()
+
+    # Запускаем бота: Telegram присылает только типы обновлений, которые мы обрабатываем
+    allowed_updates = allowed_update_types(application)
     logger.info("Бот запущен и готов к работе!")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if BOT_MODE == "webhook":
+        run_webhook(application, allowed_updates, health=question_prefetcher.metrics)
+    else:
+        application.run_polling(allowed_updates=allowed_updates)
 
 
 async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
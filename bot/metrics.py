@@ -0,0 +1,243 @@
+"""Метрики процесса бота в формате Prometheus
+
+Небольшой реестр без внешних зависимостей: счетчики, гистограммы с
+фиксированными границами и показатели, значение которых вычисляется при
+чтении. Запись метрики — поиск дочернего объекта по меткам в словаре и
+увеличение числа в списке, без блокировок: все метрики пишутся из потока
+event loop (пул соединений SQLAlchemy работает в нем же через greenlet).
+Горячие пути (обертки обработчиков) получают дочерние объекты заранее через
+``labels``. Стоимость записи измеряет scripts/bench_metrics.py.
+
+Метрики обновлений, обработчиков и Bot API подключаются в
+bot/instrumentation.py, ожидание соединения из пула — в
+bot/database/database.py. ``REGISTRY.render()`` отдает текст для ``/metrics``.
+"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Sequence
+
+# Границы гистограмм задержек, секунды
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    """Общая часть метрик с метками"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """Дочерняя метрика для значений меток (создается при первом обращении)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def children(self) -> dict[tuple[str, ...], object]:
+        """Дочерние метрики по значениям меток"""
+        return dict(self._children)
+
+    @abstractmethod
+    def _new_child(self):
+        """Новая дочерняя метрика для ``labels``"""
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        """Строки значений в текстовом формате Prometheus"""
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(f"{line}\n" for line in self.samples())
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class Counter(_Metric):
+    """Монотонно растущий счетчик"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        """Увеличить счетчик без меток"""
+        self.labels().inc(amount)
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            for values, child in self._children.items()
+        ]
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # последний — выше всех границ
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+class Histogram(_Metric):
+    """Распределение значений по фиксированным границам"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        """Записать значение в гистограмму без меток"""
+        self.labels().observe(value)
+
+    def samples(self) -> list[str]:
+        lines = []
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), child.counts, strict=True):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Показатель, значение которого вычисляется функцией при чтении метрик"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.function = function
+
+    def _new_child(self):
+        raise ValueError(f"{self.name} is computed on read and has no labels")
+
+    def samples(self) -> list[str]:
+        try:
+            value = self.function()
+        except Exception:
+            # Источник еще не готов (например, пул соединений не создан)
+            return []
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class Registry:
+    """Набор метрик процесса"""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, function: Callable[[], float]) -> Gauge:
+        return self.register(Gauge(name, documentation, function))
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus 0.0.4"""
+        return "".join(metric.render() for metric in self._metrics.values())
+
+
+# Метрики процесса
+REGISTRY = Registry()
+
+updates_total = REGISTRY.counter("bot_updates_total", "Получено обновлений по типу", ("type",))
+handler_duration = REGISTRY.histogram(
+    "bot_handler_duration_seconds",
+    "Время выполнения обработчика (по шаблону callback_data или команде)",
+    ("handler",),
+)
+handler_errors = REGISTRY.counter(
+    "bot_handler_errors_total",
+    "Исключения, вышедшие из обработчика, по классу",
+    ("handler", "exception"),
+)
+logged_errors = REGISTRY.counter(
+    "bot_logged_errors_total",
+    "Ошибки, обработанные в коде и записанные в лог с exc_info, по логгеру и классу исключения",
+    ("logger", "exception"),
+)
+db_pool_checkout_wait = REGISTRY.histogram(
+    "bot_db_pool_checkout_wait_seconds",
+    "Ожидание соединения из пула БД (включая открытие нового соединения)",
+)
+telegram_api_duration = REGISTRY.histogram(
+    "bot_telegram_api_duration_seconds", "Время запроса к Bot API по методу", ("method",)
+)
+telegram_api_errors = REGISTRY.counter(
+    "bot_telegram_api_errors_total",
+    "Неуспешные запросы к Bot API: HTTP-статус или класс исключения",
+    ("method", "error"),
+)
@@ -0,0 +1,183 @@
+"""Упреждающая подготовка следующего вопроса тренировки
+
+Пока пользователь читает результат ответа, ``handle_answer`` запускает фоновую
+задачу, которая готовит следующий вопрос (``prepare_question``: колода, очередь
+повторения, выборка слов). Нажатие «Следующий вопрос» забирает готовый результат
+через ``take``; если задача еще выполняется, ``next_question`` дожидается ее, а не
+начинает запрос заново.
+
+* Одновременно хранится не больше ``QUESTION_PREFETCH_MAX_TASKS`` задач и
+  результатов на процесс; при переполнении сначала вытесняются готовые, но не
+  забранные результаты, затем новые задачи не запускаются.
+* ``training_end`` и начало новой тренировки отменяют задачу (``cancel``).
+* Результат привязан к версии (тренировка и версия колоды): если колода была
+  сброшена (добавлено или удалено слово), подготовленный вопрос отбрасывается.
+
+Метрики (``metrics``): доля нажатий, обслуженных подготовленным вопросом, и
+среднее время от нажатия до готового вопроса с подготовкой и без нее. Они же
+есть на ``/metrics`` в любом режиме: ``bot_question_prefetch_hit_rate``,
+``bot_question_prefetch_outstanding`` и гистограмма
+``bot_time_to_question_seconds`` по источнику вопроса.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from bot.config import QUESTION_PREFETCH_MAX_TASKS
+from bot.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+time_to_question = REGISTRY.histogram(
+    "bot_time_to_question_seconds",
+    "Время от нажатия «Следующий вопрос» до готового вопроса: prefetched, cold",
+    ("source",),
+)
+_time_prefetched = time_to_question.labels("prefetched")
+_time_cold = time_to_question.labels("cold")
+
+
+class QuestionPrefetcher:
+    """Фоновые задачи подготовки вопроса по пользователям с ограничением числа"""
+
+    def __init__(self, max_tasks: int = QUESTION_PREFETCH_MAX_TASKS):
+        self.max_tasks = max_tasks
+        # telegram_id -> (задача, версия на момент запуска)
+        self._tasks: OrderedDict[int, tuple[asyncio.Task, object]] = OrderedDict()
+
+        # Метрики
+        self.started = 0
+        self.skipped = 0
+        self.cancelled = 0
+        self.evicted = 0
+        self.failed = 0
+        self.stale = 0
+        self.hits = 0  # результат уже был готов
+        self.waits = 0  # задача еще выполнялась, нажатие ее дождалось
+        self.misses = 0
+        self._time_with = [0.0, 0]  # сумма мс, количество
+        self._time_without = [0.0, 0]
+
+    @property
+    def outstanding(self) -> int:
+        return sum(1 for task, _ in self._tasks.values() if not task.done())
+
+    def start(
+        self,
+        key: int,
+        version: object,
+        factory: Callable[[], Coroutine[Any, Any, Any]],
+        create_task: Callable[[Coroutine[Any, Any, Any]], asyncio.Task] = asyncio.create_task,
+    ) -> bool:
+        """Запустить подготовку для пользователя; False — лимит задач исчерпан"""
+        self.cancel(key, count=False)
+        if len(self._tasks) >= self.max_tasks:
+            # Вытесняем самые старые готовые результаты, которые так и не забрали
+            for old_key in [k for k, (task, _) in self._tasks.items() if task.done()]:
+                if len(self._tasks) < self.max_tasks:
+                    break
+                del self._tasks[old_key]
+                self.evicted += 1
+        if len(self._tasks) >= self.max_tasks:
+            self.skipped += 1
+            return False
+
+        task = create_task(self._run(key, factory))
+        self._tasks[key] = (task, version)
+        self.started += 1
+        return True
+
+    def cancel(self, key: int, count: bool = True):
+        """Отменить подготовку и забыть результат пользователя"""
+        entry = self._tasks.pop(key, None)
+        if entry is not None and not entry[0].done():
+            entry[0].cancel()
+            if count:
+                self.cancelled += 1
+
+    async def take(self, key: int, version: object) -> Any | None:
+        """Забрать подготовленный результат; None — его нет, подготовка не удалась
+        или версия устарела"""
+        entry = self._tasks.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        task, task_version = entry
+        if task_version != version:
+            task.cancel()
+            self.stale += 1
+            self.misses += 1
+            return None
+
+        ready = task.done()
+        result = await asyncio.shield(task)
+        if result is None:
+            # Подготовка не удалась (ошибка уже в логе)
+            self.misses += 1
+        elif ready:
+            self.hits += 1
+        else:
+            self.waits += 1
+        return result
+
+    def observe(self, elapsed: float, prefetched: bool):
+        """Учесть время от нажатия до готового вопроса (в секундах)"""
+        bucket = self._time_with if prefetched else self._time_without
+        bucket[0] += elapsed * 1000
+        bucket[1] += 1
+        (_time_prefetched if prefetched else _time_cold).observe(elapsed)
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля нажатий, обслуженных подготовленным вопросом"""
+        taken = self.hits + self.waits + self.misses
+        return (self.hits + self.waits) / taken if taken else 0.0
+
+    def metrics(self) -> dict[str, float]:
+        """Текущие значения метрик"""
+        with_ms = self._time_with[0] / self._time_with[1] if self._time_with[1] else 0.0
+        without_ms = self._time_without[0] / self._time_without[1] if self._time_without[1] else 0.0
+        return {
+            "prefetch_outstanding": self.outstanding,
+            "prefetch_started": self.started,
+            "prefetch_skipped": self.skipped,
+            "prefetch_cancelled": self.cancelled,
+            "prefetch_evicted": self.evicted,
+            "prefetch_failed": self.failed,
+            "prefetch_stale": self.stale,
+            "prefetch_hits": self.hits,
+            "prefetch_waits": self.waits,
+            "prefetch_misses": self.misses,
+            "prefetch_hit_rate": self.hit_rate,
+            "time_to_question_prefetched_ms": with_ms,
+            "time_to_question_cold_ms": without_ms,
+            "time_to_question_saved_ms": without_ms - with_ms if self._time_with[1] else 0.0,
+        }
+
+    async def _run(self, key: int, factory: Callable[[], Coroutine[Any, Any, Any]]) -> Any | None:
+        # Ошибка подготовки не доходит до error_handler: вопрос будет подготовлен
+        # заново при нажатии, и пользователь увидит ошибку только тогда
+        try:
+            return await factory()
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Question prefetch failed for {key}: {e!r}")
+            return None
+
+
+# Подготовка вопросов на процесс, общая для всех обработчиков
+question_prefetcher = QuestionPrefetcher()
+
+REGISTRY.gauge(
+    "bot_question_prefetch_hit_rate",
+    "Доля нажатий «Следующий вопрос», обслуженных подготовленным вопросом",
+    lambda: question_prefetcher.hit_rate,
+)
+REGISTRY.gauge(
+    "bot_question_prefetch_outstanding",
+    "Выполняющиеся задачи подготовки вопроса",
+    lambda: question_prefetcher.outstanding,
+)
@@ -0,0 +1,278 @@
+"""Планировщик исходящих сообщений Bot API: бюджеты отправки и повтор после 429
+
+``SendScheduler`` подключается к приложению как ``rate_limiter``
+python-telegram-bot (bot/main.py) и через него проходят все запросы бота,
+кроме getUpdates. Запросы с ``chat_id`` (sendMessage, editMessageText и т. п.)
+получают жетон в двух ведрах:
+
+* ведро чата — ``TELEGRAM_CHAT_RATE`` сообщений в секунду для личных чатов и
+  ``TELEGRAM_GROUP_RATE_PER_MINUTE`` в минуту для групп, запас на всплеск
+  ``TELEGRAM_CHAT_BURST``;
+* общее ведро бота — ``TELEGRAM_GLOBAL_RATE`` сообщений в секунду.
+
+Правки сообщений в ответ на действия пользователя (editMessage* с приоритетом
+``INTERACTIVE`` — смена вопроса тренировки, экраны меню) ведро чата не
+расходуют: лимит чата касается новых сообщений, а ожидание жетона шло бы под
+блокировкой очереди обновлений пользователя и задерживало ответ на нажатие.
+Такие правки ограничивает только общее ведро.
+
+Ожидающие жетон запросы обслуживаются по приоритету: ответы на действия
+пользователя (``INTERACTIVE``, по умолчанию) раньше массовых рассылок
+(``BULK``, передается как ``rate_limit_args=BULK``). Остальные запросы
+(answerCallbackQuery, getMe, setWebhook) не ограничиваются.
+
+Если Telegram все же ответил 429, общее ведро закрывается на ``retry_after``
+секунд (с ростом паузы при повторах), и запрос повторяется до
+``TELEGRAM_MAX_RETRIES`` раз; после этого ``RetryAfter`` уходит в обработчик.
+Проверка на заглушке Bot API с 429: scripts/bench_send_scheduler.py.
+
+С ``coalescer`` (``EDIT_COALESCING``) правки editMessageText проходят через
+``EditCoalescer`` (bot/edit_coalescing.py): повторные и устаревшие не
+отправляются и не тратят бюджет. ``rate_limit=False`` (``TELEGRAM_RATE_LIMIT=false``)
+отключает бюджеты, оставляя пропуск правок и повтор после 429.
+"""
+
+import asyncio
+import datetime as dt
+import functools
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections import OrderedDict
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from bot.config import (
+    TELEGRAM_CHAT_BURST,
+    TELEGRAM_CHAT_RATE,
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_GROUP_RATE_PER_MINUTE,
+    TELEGRAM_MAX_RETRIES,
+)
+from bot.edit_coalescing import EditCoalescer
+from bot.metrics import LATENCY_BUCKETS, REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Приоритеты запросов: меньше — раньше
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+# Сколько ведер чатов держать в памяти (простаивающие вытесняются первыми)
+MAX_CHAT_BUCKETS = 10_000
+
+send_wait = REGISTRY.histogram(
+    "bot_telegram_send_wait_seconds",
+    "Ожидание бюджета отправки перед запросом к Bot API по приоритету",
+    ("priority",),
+    buckets=(0.0, *LATENCY_BUCKETS),
+)
+retry_after_total = REGISTRY.counter(
+    "bot_telegram_retry_after_total", "Ответы 429 (RetryAfter) от Bot API по методу", ("method",)
+)
+
+
+class TokenBucket:
+    """Ведро жетонов: ``rate`` в секунду, не больше ``capacity`` про запас"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "paused_until")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Через сколько секунд будет жетон (0 — есть сейчас)"""
+        self._refill(now)
+        wait = max(self.paused_until - now, 0.0)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def take(self):
+        self.tokens -= 1
+
+    def pause(self, seconds: float):
+        """Не выдавать жетоны ``seconds`` секунд (ответ 429)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def idle(self, now: float) -> bool:
+        """Ведро полно и не на паузе: его можно забыть без потери состояния"""
+        return self.delay(now) == 0 and self.tokens >= self.capacity
+
+
+class PriorityGate:
+    """Выдача жетонов ведра ожидающим по приоритету, в порядке прихода внутри приоритета"""
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._releaser: asyncio.Task | None = None
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, priority: int = INTERACTIVE):
+        if not self._waiters and self.bucket.delay(time.monotonic()) == 0:
+            self.bucket.take()
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._releaser is None or self._releaser.done():
+            self._releaser = asyncio.create_task(self._release())
+        await future
+
+    async def _release(self):
+        while self._waiters:
+            if self._waiters[0][2].done():
+                # Ожидание отменено (например, обработчик прерван)
+                heapq.heappop(self._waiters)
+                continue
+            delay = self.bucket.delay(time.monotonic())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            self.bucket.take()
+            _, _, future = heapq.heappop(self._waiters)
+            future.set_result(None)
+
+    def idle(self, now: float) -> bool:
+        return not self._waiters and self.bucket.idle(now)
+
+    def close(self):
+        if self._releaser is not None:
+            self._releaser.cancel()
+        for _, _, future in self._waiters:
+            future.cancel()
+        self._waiters.clear()
+
+
+def retry_delay(retry_after: float | dt.timedelta, attempt: int) -> float:
+    """Пауза перед повтором: не меньше retry_after, растет с номером попытки"""
+    if isinstance(retry_after, dt.timedelta):
+        retry_after = retry_after.total_seconds()
+    return max(float(retry_after), 2.0 ** (attempt - 1)) * random.uniform(1.0, 1.1)
+
+
+class SendScheduler(BaseRateLimiter[int]):
+    """Ограничитель запросов к Bot API с бюджетами отправки и приоритетами"""
+
+    def __init__(
+        self,
+        global_rate: float = TELEGRAM_GLOBAL_RATE,
+        chat_rate: float = TELEGRAM_CHAT_RATE,
+        group_rate_per_minute: float = TELEGRAM_GROUP_RATE_PER_MINUTE,
+        chat_burst: int = TELEGRAM_CHAT_BURST,
+        max_retries: int = TELEGRAM_MAX_RETRIES,
+        max_chat_buckets: int = MAX_CHAT_BUCKETS,
+        rate_limit: bool = True,
+        coalescer: EditCoalescer | None = None,
+    ):
+        """
+        Args:
+            rate_limit: Ограничивать отправку бюджетами; False — только повтор после 429
+            coalescer: Пропуск повторных и устаревших правок (bot/edit_coalescing.py)
+        """
+        self.rate_limit = rate_limit
+        self.coalescer = coalescer
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate_per_minute / 60
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.max_chat_buckets = max_chat_buckets
+        self._global = PriorityGate(TokenBucket(global_rate, max(global_rate, 1)))
+        self._chats: OrderedDict[int | str, PriorityGate] = OrderedDict()
+
+    @property
+    def waiting(self) -> int:
+        """Запросов, ожидающих бюджета"""
+        return self._global.waiting + sum(gate.waiting for gate in self._chats.values())
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        self._global.close()
+        for gate in self._chats.values():
+            gate.close()
+        self._chats.clear()
+
+    def _chat_gate(self, chat_id: int | str) -> PriorityGate:
+        gate = self._chats.get(chat_id)
+        if gate is not None:
+            self._chats.move_to_end(chat_id)
+            return gate
+
+        if len(self._chats) >= self.max_chat_buckets:
+            # Вытесняем самые давние простаивающие ведра
+            now = time.monotonic()
+            for key in list(itertools.islice(self._chats, 16)):
+                if self._chats[key].idle(now):
+                    del self._chats[key]
+
+        # Личные чаты — положительные id, группы и каналы — отрицательные или @username
+        private = isinstance(chat_id, int) and chat_id > 0
+        rate = self.chat_rate if private else self.group_rate
+        gate = self._chats[chat_id] = PriorityGate(TokenBucket(rate, self.chat_burst))
+        return gate
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        chat_id = data.get("chat_id")
+        if chat_id is None:
+            # Не отправка сообщения в чат: ответ на нажатие, служебные методы
+            return await callback(*args, **kwargs)
+
+        priority = INTERACTIVE if rate_limit_args is None else rate_limit_args
+        send = functools.partial(self._send, callback, args, kwargs, endpoint, chat_id, priority)
+        if self.coalescer is None:
+            return await send()
+        if endpoint == "editMessageText" and "message_id" in data:
+            return await self.coalescer.edit(chat_id, data["message_id"], data, send)
+
+        result = await send()
+        if endpoint == "sendMessage" and isinstance(result, dict):
+            self.coalescer.remember_sent(chat_id, result["message_id"], data)
+        return result
+
+    async def _send(self, callback, args, kwargs, endpoint: str, chat_id, priority: int):
+        """Дождаться бюджета отправки и выполнить запрос, повторяя его после 429"""
+        if self.rate_limit:
+            started = time.perf_counter()
+            if priority != INTERACTIVE or not endpoint.startswith("editMessage"):
+                await self._chat_gate(chat_id).acquire(priority)
+            await self._global.acquire(priority)
+            send_wait.labels(PRIORITY_NAMES.get(priority, str(priority))).observe(
+                time.perf_counter() - started
+            )
+
+        for attempt in itertools.count(1):
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                retry_after_total.labels(endpoint).inc()
+                if attempt > self.max_retries:
+                    raise
+                delay = retry_delay(e.retry_after, attempt)
+                logger.warning(
+                    f"Flood limit on {endpoint}: retry {attempt}/{self.max_retries} "
+                    f"in {delay:.1f} s"
+                )
+                if self.rate_limit:
+                    # Пауза для всех запросов: лимит мог быть общим для бота
+                    self._global.bucket.pause(delay)
+                    await self._global.acquire(priority)
+                else:
+                    await asyncio.sleep(delay)
@@ -0,0 +1,480 @@
+"""Супервизор: несколько процессов бота с распределением обновлений по telegram_id
+
+Один процесс бота упирается в одно ядро. Супервизор запускает ``BOT_WORKERS``
+процессов-воркеров (``bot.main.build_application``) и сам получает обновления
+от Telegram — через webhook (``BOT_MODE=webhook``) или getUpdates. Каждое
+обновление отправляется воркеру ``telegram_id % BOT_WORKERS``
+(``bot.update_processor.shard_for``), поэтому пользователь всегда обслуживается
+одним процессом: его ``context.user_data`` и порядок нажатий остаются локальными,
+межпроцессные блокировки не нужны.
+
+Воркер i слушает ``127.0.0.1:WORKER_BASE_PORT + i`` (``bot.ingestion.serve_webhook``
+с внутренним секретным токеном) и ставит обновление в свою очередь; супервизор
+отвечает Telegram 200 только после того, как воркер принял обновление. Если
+воркер недоступен, webhook отвечает 502, и Telegram повторит доставку.
+
+Здоровье:
+
+* каждые ``WORKER_HEALTH_INTERVAL`` секунд супервизор опрашивает ``/health``
+  воркеров, пишет сводку в лог и перезапускает упавшие процессы;
+* GET ``/health`` супервизора (в режиме webhook) возвращает ту же сводку в JSON.
+
+Остановка (SIGINT/SIGTERM): новые запросы webhook получают 503 (Telegram
+повторит их позже), polling перестает запрашивать обновления; супервизор ждет
+пересылки уже принятых обновлений, затем отправляет воркерам SIGTERM. Воркеры
+обрабатывают свою очередь и сохраняют состояние, на это у них есть
+``WORKER_STOP_TIMEOUT`` секунд.
+
+Запуск:
+
+    python -m bot.supervisor
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import multiprocessing
+import secrets
+import signal
+import time
+from collections import defaultdict
+
+from telegram import Bot
+from telegram.error import TelegramError
+
+from bot.config import (
+    BOT_API_BASE_URL,
+    BOT_MODE,
+    BOT_TOKEN,
+    BOT_WORKERS,
+    WEBHOOK_LISTEN,
+    WEBHOOK_MAX_CONNECTIONS,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET_TOKEN,
+    WEBHOOK_URL,
+    WORKER_BASE_PORT,
+    WORKER_HEALTH_INTERVAL,
+    WORKER_STOP_TIMEOUT,
+)
+from bot.ingestion import (
+    HEALTH_PATH,
+    SECRET_TOKEN_HEADER,
+    HttpRequest,
+    HttpServer,
+    check_update_request,
+    json_loads,
+)
+from bot.update_processor import raw_update_key, shard_for
+
+logger = logging.getLogger(__name__)
+
+# Путь, на который супервизор пересылает обновления воркерам
+WORKER_PATH = "/update"
+
+# Повторы пересылки в режиме polling (обновление уже подтверждено смещением getUpdates)
+FORWARD_MAX_RETRIES = 5
+
+
+def run_worker(index: int, workers: int, port: int, secret_token: str):
+    """Точка входа процесса-воркера"""
+    # SIGINT из терминала получает вся группа процессов; воркер останавливает
+    # супервизор через SIGTERM, когда перешлет принятые обновления
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Свой файл лога: bot.main настраивает логирование при импорте, а ротация
+    # одного файла из нескольких процессов теряет записи
+    from bot.utils.logger import use_worker_log_file
+
+    use_worker_log_file(index)
+
+    from bot.ingestion import allowed_update_types, serve_webhook
+    from bot.main import build_application
+    from bot.question_prefetch import question_prefetcher
+
+    application = build_application(shard=(index, workers))
+    processor = application.update_processor
+
+    def health() -> dict:
+        report = {"worker": index}
+        if hasattr(processor, "metrics"):
+            report.update(processor.metrics())
+        report.update(question_prefetcher.metrics())
+        return report
+
+    asyncio.run(
+        serve_webhook(
+            application,
+            allowed_update_types(application),
+            listen="127.0.0.1",
+            port=port,
+            path=WORKER_PATH,
+            secret_token=secret_token,
+            register_webhook=False,
+            stop_signals=(signal.SIGTERM,),
+            health=health,
+        )
+    )
+
+
+class Worker:
+    """Процесс-воркер и постоянное соединение для пересылки ему обновлений"""
+
+    def __init__(self, index: int, workers: int, port: int, secret_token: str):
+        self.index = index
+        self.workers = workers
+        self.port = port
+        self.secret_token = secret_token
+        self.process: multiprocessing.Process | None = None
+        self._connection: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None = None
+        # Пересылки идут по одному соединению по очереди: порядок обновлений сохраняется
+        self._lock = asyncio.Lock()
+
+        # Метрики
+        self.restarts = 0
+        self.forwarded = 0
+        self.errors = 0
+        self.last_health: dict = {}
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        context = multiprocessing.get_context("spawn")
+        self.process = context.Process(
+            target=run_worker,
+            args=(self.index, self.workers, self.port, self.secret_token),
+            name=f"bot-worker-{self.index}",
+        )
+        self.process.start()
+        logger.info(f"Worker {self.index} started: pid={self.process.pid}, port={self.port}")
+
+    async def stop(self, timeout: float):
+        """SIGTERM и ожидание завершения; по истечении timeout процесс убивается"""
+        await self._close_connection()
+        if not self.alive:
+            return
+        self.process.terminate()
+        await asyncio.to_thread(self.process.join, timeout)
+        if self.process.is_alive():
+            logger.error(f"Worker {self.index} did not stop in {timeout}s, killing")
+            self.process.kill()
+            await asyncio.to_thread(self.process.join)
+        logger.info(f"Worker {self.index} stopped: exitcode={self.process.exitcode}")
+
+    async def _close_connection(self):
+        if self._connection is not None:
+            self._connection[1].close()
+            self._connection = None
+
+    async def _send(self, method: str, path: str, body: bytes = b"") -> tuple[int, bytes]:
+        if self._connection is None:
+            self._connection = await asyncio.open_connection("127.0.0.1", self.port)
+        reader, writer = self._connection
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: 127.0.0.1\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"{SECRET_TOKEN_HEADER}: {self.secret_token}\r\n\r\n".encode("latin-1")
+            + body
+        )
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Worker closed the connection")
+        length = 0
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return int(status_line.split()[1]), await reader.readexactly(length)
+
+    async def request(self, method: str, path: str, body: bytes = b"") -> tuple[int, bytes]:
+        """Запрос к воркеру; при обрыве соединения — одна попытка через новое"""
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    return await self._send(method, path, body)
+                except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                    await self._close_connection()
+                    if attempt:
+                        raise
+            raise AssertionError("unreachable")
+
+    async def forward(self, body: bytes) -> int:
+        """Переслать обновление; возвращает HTTP-статус для Telegram"""
+        try:
+            status, _ = await self.request("POST", WORKER_PATH, body)
+        except (OSError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+            self.errors += 1
+            logger.warning(f"Worker {self.index} is unavailable: {e!r}")
+            return 502
+        if status == 200:
+            self.forwarded += 1
+        else:
+            self.errors += 1
+        return status
+
+    async def check_health(self) -> bool:
+        """Опросить /health воркера; результат сохраняется в last_health"""
+        try:
+            status, body = await asyncio.wait_for(self.request("GET", HEALTH_PATH), 5)
+        except (OSError, asyncio.IncompleteReadError, ValueError, IndexError, TimeoutError):
+            self.last_health = {}
+            return False
+        self.last_health = json.loads(body) if status == 200 else {}
+        return status == 200
+
+    def report(self) -> dict:
+        return {
+            "index": self.index,
+            "pid": self.process.pid if self.process else None,
+            "alive": self.alive,
+            "restarts": self.restarts,
+            "forwarded": self.forwarded,
+            "errors": self.errors,
+            "health": self.last_health,
+        }
+
+
+class Supervisor(HttpServer):
+    """Прием обновлений и пересылка воркерам по telegram_id"""
+
+    def __init__(
+        self,
+        workers: int = BOT_WORKERS,
+        base_port: int = WORKER_BASE_PORT,
+        path: str = WEBHOOK_PATH,
+        secret_token: str | None = WEBHOOK_SECRET_TOKEN,
+        health_interval: float = WORKER_HEALTH_INTERVAL,
+        stop_timeout: float = WORKER_STOP_TIMEOUT,
+    ):
+        super().__init__()
+        self.path = path
+        self.secret_token = secret_token or secrets.token_urlsafe(32)
+        self.health_interval = health_interval
+        self.stop_timeout = stop_timeout
+        worker_token = secrets.token_urlsafe(32)
+        self.workers = [
+            Worker(index, workers, base_port + index, worker_token) for index in range(workers)
+        ]
+        self.stopping = False
+        self._stop = asyncio.Event()
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def worker_for(self, data: dict) -> Worker:
+        key = raw_update_key(data)
+        return self.workers[shard_for(key, len(self.workers)) if key is not None else 0]
+
+    def report(self) -> dict:
+        """Сводка здоровья супервизора и воркеров"""
+        return {
+            "stopping": self.stopping,
+            "in_flight": self._in_flight,
+            "rejected_requests": self.rejected_requests,
+            "workers": [worker.report() for worker in self.workers],
+        }
+
+    @contextlib.contextmanager
+    def _tracked(self):
+        """Учет пересылок в работе, чтобы при остановке дождаться их"""
+        self._in_flight += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            if not self._in_flight:
+                self._idle.set()
+
+    async def handle(self, request: HttpRequest) -> tuple[int, bytes]:
+        if request.path == HEALTH_PATH and request.method == "GET":
+            return 200, json.dumps(self.report()).encode()
+
+        status = check_update_request(request, self.path, self.secret_token)
+        if status is not None:
+            return status, b""
+        if self.stopping:
+            return 503, b""
+        try:
+            data = json_loads(request.body)
+        except ValueError:
+            return 400, b""
+        if not isinstance(data, dict):
+            return 400, b""
+        with self._tracked():
+            return await self.worker_for(data).forward(request.body), b""
+
+    async def _forward_in_order(self, worker: Worker, bodies: list[bytes]):
+        """Переслать пачку обновлений одного воркера по порядку с повторами"""
+        for body in bodies:
+            for attempt in range(FORWARD_MAX_RETRIES + 1):
+                if await worker.forward(body) == 200:
+                    break
+                if attempt == FORWARD_MAX_RETRIES:
+                    logger.error(f"Dropping update for worker {worker.index}: {body[:200]!r}")
+                    break
+                await asyncio.sleep(min(0.1 * 2**attempt, 5.0))
+
+    async def poll(self, bot: Bot, allowed_updates: list[str]):
+        """Получение обновлений через getUpdates до остановки"""
+        offset = 0
+        stop_wait = asyncio.create_task(self._stop.wait())
+        try:
+            while not self.stopping:
+                fetch = asyncio.create_task(
+                    bot.get_updates(offset=offset, timeout=10, allowed_updates=allowed_updates)
+                )
+                await asyncio.wait({fetch, stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+                if not fetch.done():
+                    # Неподтвержденные обновления Telegram отдаст при следующем запуске
+                    fetch.cancel()
+                    break
+                try:
+                    updates = fetch.result()
+                except TelegramError as e:
+                    logger.error(f"getUpdates failed: {e}")
+                    await asyncio.sleep(1)
+                    continue
+                if not updates:
+                    continue
+
+                # Воркеры получают пачку параллельно, каждый — в исходном порядке
+                batches: defaultdict[int, list[bytes]] = defaultdict(list)
+                for update in updates:
+                    data = update.to_dict()
+                    batches[self.worker_for(data).index].append(json.dumps(data).encode())
+                with self._tracked():
+                    await asyncio.gather(
+                        *(
+                            self._forward_in_order(self.workers[index], bodies)
+                            for index, bodies in batches.items()
+                        )
+                    )
+                offset = updates[-1].update_id + 1
+        finally:
+            stop_wait.cancel()
+            if offset:
+                # Подтверждаем пересланные обновления, чтобы Telegram не прислал их снова
+                with contextlib.suppress(TelegramError):
+                    await bot.get_updates(offset=offset, timeout=0)
+
+    async def monitor(self):
+        """Периодическая проверка воркеров: перезапуск упавших и сводка в лог"""
+        while not self.stopping:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._stop.wait(), self.health_interval)
+            if self.stopping:
+                return
+            for worker in self.workers:
+                if not worker.alive:
+                    logger.error(
+                        f"Worker {worker.index} exited with {worker.process.exitcode}, restarting"
+                    )
+                    worker.restarts += 1
+                    worker.start()
+                    continue
+                await worker.check_health()
+            logger.info(
+                "Workers: "
+                + "; ".join(
+                    f"{w.index}: {'up' if w.last_health else 'DOWN'} "
+                    f"fwd={w.forwarded} err={w.errors} "
+                    f"done={w.last_health.get('processed_updates', '-')} "
+                    f"queue={w.last_health.get('update_queue', '-')}"
+                    for w in self.workers
+                )
+            )
+
+    async def wait_ready(self, timeout: float = 60):
+        """Дождаться, пока все воркеры ответят на /health"""
+        deadline = time.monotonic() + timeout
+        pending = list(self.workers)
+        while pending:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Workers not ready: {[w.index for w in pending]}")
+            await asyncio.sleep(0.2)
+            pending = [w for w in pending if not await w.check_health()]
+            for worker in pending:
+                if not worker.alive:
+                    raise RuntimeError(f"Worker {worker.index} exited during startup")
+
+    async def run(
+        self,
+        mode: str = BOT_MODE,
+        url: str = WEBHOOK_URL,
+        listen: str = WEBHOOK_LISTEN,
+        port: int = WEBHOOK_PORT,
+    ):
+        """Запустить воркеры и прием обновлений до SIGINT/SIGTERM"""
+        from bot.ingestion import allowed_update_types
+        from bot.main import build_application
+
+        allowed_updates = allowed_update_types(build_application())
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            with contextlib.suppress(NotImplementedError):
+                loop.add_signal_handler(sig, self._stop.set)
+
+        bot = Bot(BOT_TOKEN, base_url=BOT_API_BASE_URL) if BOT_API_BASE_URL else Bot(BOT_TOKEN)
+        for worker in self.workers:
+            worker.start()
+        polling = monitor = None
+        try:
+            await self.wait_ready()
+            async with bot:
+                if mode == "webhook":
+                    await self.start(listen, port)
+                    await bot.set_webhook(
+                        url,
+                        allowed_updates=allowed_updates,
+                        secret_token=self.secret_token,
+                        max_connections=WEBHOOK_MAX_CONNECTIONS,
+                    )
+                else:
+                    await bot.delete_webhook()
+                    polling = asyncio.create_task(self.poll(bot, allowed_updates))
+                monitor = asyncio.create_task(self.monitor())
+                logger.info(
+                    f"Supervisor started: mode={mode}, workers={len(self.workers)}, "
+                    f"allowed updates: {allowed_updates}"
+                )
+                await self._stop.wait()
+
+                logger.info("Supervisor stopping: draining accepted updates")
+                self.stopping = True
+                if polling is not None:
+                    await polling
+                await self._idle.wait()
+        finally:
+            self.stopping = True
+            self._stop.set()
+            if monitor is not None:
+                await monitor
+            await self.stop()
+            await asyncio.gather(*(worker.stop(self.stop_timeout) for worker in self.workers))
+            logger.info(f"Supervisor stopped: {self.report()}")
+
+
+def main():
+    """Точка входа: python -m bot.supervisor"""
+    from bot.utils.logger import setup_logger
+
+    setup_logger()
+    if not BOT_TOKEN:
+        logger.error("BOT_TOKEN не установлен! Проверьте файл .env")
+        return
+    if BOT_MODE == "webhook" and not WEBHOOK_URL:
+        logger.error("BOT_MODE=webhook требует WEBHOOK_URL! Проверьте файл .env")
+        return
+    asyncio.run(Supervisor().run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""Каталог интерфейса бота: клавиатуры и шаблоны сообщений
+
+Неизменяемые клавиатуры (``InlineKeyboardMarkup`` после создания не меняется)
+и тексты экранов строятся один раз при импорте, обработчики bot/handlers только
+ссылаются на них. Экраны с данными (вопрос тренировки, результат ответа,
+статистика, списки слов) собираются по заготовленным шаблонам: ``str.format``
+строк, разобранных один раз, и готовых рядов кнопок.
+
+Выигрыш по памяти и времени на обновление: scripts/bench_ui.py.
+"""
+
+import functools
+from collections.abc import Iterable, Sequence
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from bot.config import BOT_NAME
+
+
+def _row(*buttons: tuple[str, str]) -> tuple[InlineKeyboardButton, ...]:
+    return tuple(InlineKeyboardButton(text, callback_data=data) for text, data in buttons)
+
+
+def _keyboard(*rows: tuple[InlineKeyboardButton, ...]) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(rows)
+
+
+# Кнопки, встречающиеся на нескольких экранах
+MAIN_MENU_ROW = _row(("🔙 Главное меню", "main_menu"))
+DICTIONARY_ROW = _row(("📚 Мой словарь", "dictionary_menu"))
+END_TRAINING_ROW = _row(("❌ Завершить тренировку", "training_end"))
+
+# --- Главное меню ---
+
+WELCOME_TEXT = (
+    f"👋 *Добро пожаловать в {BOT_NAME}!*\n\n"
+    "🎓 *Внимание!* настоящий бот разработан в рамках учебной программы.\n\n"
+    "✨ *Что я умею:*\n"
+    "• 📚 Тренировка со словами IT-тематики\n"
+    "• ➕ Добавление своих слов в личный словарь\n"
+    "• 🔙 Управление личной коллекцией слов\n"
+    "• 📊 Отслеживание прогресса обучения\n"
+    "• 🎮 Интерактивные тренировки с вариантами ответов\n"
+    "• 🔄 Выбор направления перевода (RU→EN или EN→RU)\n\n"
+    "Выбери действие ниже и начнем наше путешествие в мир английского! 🚀"
+)
+MAIN_MENU_TEXT = "🏠 *Главное меню*\n\nВыберите действие:"
+MAIN_MENU_KEYBOARD = _keyboard(
+    _row(("🎯 Начать тренировку", "training_start")),
+    DICTIONARY_ROW,
+    _row(("📊 Моя статистика", "statistics_menu")),
+    _row(("⭐ Достижения", "achievements_menu")),
+)
+BACK_TO_MAIN_MENU_KEYBOARD = _keyboard(MAIN_MENU_ROW)
+
+# --- Тренировка ---
+
+TRAINING_DIRECTION_TEXT = (
+    "🎯 *Выберите направление перевода:*\n\n"
+    "• EN→RU: вам покажут английское слово, нужно выбрать русский перевод\n"
+    "• RU→EN: вам покажут русское слово, нужно выбрать английский перевод\n"
+    "• Повторение: слова, срок повторения которых наступил (EN→RU)"
+)
+TRAINING_DIRECTION_KEYBOARD = _keyboard(
+    _row(
+        ("🇬🇧 → 🇷🇺 EN→RU", "training_direction_en_ru"),
+        ("🇷🇺 → 🇬🇧 RU→EN", "training_direction_ru_en"),
+    ),
+    _row(("🔁 Повторить слова по расписанию", "training_review")),
+    MAIN_MENU_ROW,
+)
+NOTHING_TO_REVIEW_TEXT = (
+    "✅ *Повторять пока нечего*\n\nСрок повторения ни одного слова еще не наступил."
+)
+NOTHING_TO_REVIEW_KEYBOARD = _keyboard(
+    _row(("🎯 Обычная тренировка", "training_start")), MAIN_MENU_ROW
+)
+TRAINING_OVER_KEYBOARD = _keyboard(_row(("🏁 Завершить тренировку", "training_end")))
+NEXT_QUESTION_KEYBOARD = _keyboard(_row(("➡️ Следующий вопрос", "next_question")))
+TRAINING_END_KEYBOARD = _keyboard(
+    _row(("🎯 Начать новую тренировку", "training_start")), MAIN_MENU_ROW
+)
+
+# Вопрос по направлению перевода; подставляется слово
+QUESTION_TEMPLATES = {
+    "en_ru": "🇬🇧 *Переведите слово:*\n\n*{}*\n\nВыберите правильный вариант:".format,
+    "ru_en": "🇷🇺 *Переведите слово:*\n\n*{}*\n\nВыберите правильный вариант:".format,
+}
+# Подпись и callback_data варианта ответа по его номеру: «A. …» → answer_0
+ANSWER_LABELS = tuple(f"{chr(65 + i)}. {{}}".format for i in range(4))
+ANSWER_CALLBACKS = tuple(f"answer_{i}" for i in range(4))
+# Сколько рядов «вариант ответа» держать готовыми (кнопки неизменяемы и общие)
+ANSWER_BUTTON_CACHE_SIZE = 4096
+
+# Результат ответа по (верно ли, направление); подставляется слово (Word)
+FEEDBACK_TEMPLATES = {
+    (True, "en_ru"): "✅ *Правильно!*\n\n*{0.english_word}* = {0.russian_translation}".format,
+    (True, "ru_en"): "✅ *Правильно!*\n\n*{0.russian_translation}* = {0.english_word}".format,
+    (False, "en_ru"): (
+        "❌ *Неправильно*\n\nПравильный ответ: *{0.english_word}* = {0.russian_translation}"
+    ).format,
+    (False, "ru_en"): (
+        "❌ *Неправильно*\n\nПравильный ответ: *{0.russian_translation}* = {0.english_word}"
+    ).format,
+}
+EXAMPLE_TEMPLATE = "\n\n💡 *Пример:*\n🇬🇧 {}".format
+EXAMPLE_RU_TEMPLATE = "\n🇷🇺 {}".format
+
+TRAINING_RESULTS_TEMPLATE = (
+    "🏁 *Тренировка завершена!*\n\n"
+    "📊 *Результаты:*\n"
+    "• Всего вопросов: {total}\n"
+    "• Правильных ответов: {correct}\n"
+    "• Точность: {accuracy:.1f}%"
+).format
+
+
+@functools.lru_cache(maxsize=ANSWER_BUTTON_CACHE_SIZE)
+def _answer_row(index: int, option: str) -> tuple[InlineKeyboardButton, ...]:
+    # Словарь общий, поэтому одни и те же варианты ответа встречаются часто
+    return (
+        InlineKeyboardButton(ANSWER_LABELS[index](option), callback_data=ANSWER_CALLBACKS[index]),
+    )
+
+
+def question_message(direction: str, prompt: str, options: Sequence[str]):
+    """Текст и клавиатура вопроса тренировки с вариантами ответа"""
+    rows = [_answer_row(index, option) for index, option in enumerate(options)]
+    rows.append(END_TRAINING_ROW)
+    return QUESTION_TEMPLATES[direction](prompt), InlineKeyboardMarkup(rows)
+
+
+def answer_feedback(word, is_correct: bool, direction: str) -> str:
+    """Текст результата ответа с примером использования слова, если он есть"""
+    text = FEEDBACK_TEMPLATES[is_correct, direction](word)
+    if word.example_sentence:
+        text += EXAMPLE_TEMPLATE(word.example_sentence)
+        if word.example_sentence_ru:
+            text += EXAMPLE_RU_TEMPLATE(word.example_sentence_ru)
+    return text
+
+
+# --- Словарь ---
+
+DICTIONARY_MENU_TEMPLATE = "📚 *Мой словарь*\n\nВсего слов: {}\n\nВыберите действие:".format
+DICTIONARY_MENU_KEYBOARD = _keyboard(
+    _row(("➕ Добавить слово", "dictionary_add")),
+    _row(("🔍 Поиск по словарю", "dictionary_search")),
+    _row(("📋 Мои слова", "dictionary_my_words")),
+    _row(("📥 Импорт из файла", "dictionary_import")),
+    MAIN_MENU_ROW,
+)
+# Возврат после действия со словарем
+DICTIONARY_KEYBOARD = _keyboard(DICTIONARY_ROW, MAIN_MENU_ROW)
+
+ADD_WORD_TEXT = "➕ *Добавление нового слова*\n\nВведите английское слово:"
+ENGLISH_WORD_ACCEPTED_TEMPLATE = (
+    "✅ Английское слово: *{}*\n\nТеперь введите русский перевод:".format
+)
+TRANSLATION_ACCEPTED_TEMPLATE = (
+    "✅ Русский перевод: *{}*\n\nВведите пример использования (или пропустите):"
+).format
+SKIP_EXAMPLE_KEYBOARD = _keyboard(_row(("⏭️ Пропустить пример", "dictionary_add_skip_example")))
+ADD_WORD_AGAIN_KEYBOARD = _keyboard(
+    _row(("➕ Добавить слово заново", "dictionary_add")), DICTIONARY_ROW, MAIN_MENU_ROW
+)
+ADD_ANOTHER_WORD_KEYBOARD = _keyboard(
+    _row(("➕ Добавить другое слово", "dictionary_add")), DICTIONARY_ROW, MAIN_MENU_ROW
+)
+WORD_EXISTS_TEMPLATE = "⚠️ Слово *{}* уже есть в вашем словаре!".format
+WORD_ADDED_TEMPLATE = (
+    "✅ *Слово добавлено!*\n\n*{english}* = {russian}\n\n📊 Всего слов в словаре: {total}"
+).format
+
+SEARCH_TEXT = "🔍 *Поиск по словарю*\n\nВведите слово для поиска (английское или русское):"
+SEARCH_AGAIN_KEYBOARD = _keyboard(
+    _row(("🔍 Поиск еще", "dictionary_search")), DICTIONARY_ROW, MAIN_MENU_ROW
+)
+SEARCH_EXPIRED_KEYBOARD = _keyboard(_row(("🔍 Поиск", "dictionary_search")), MAIN_MENU_ROW)
+NOT_FOUND_TEMPLATE = "❌ Слова, похожие на '{}', не найдены.".format
+
+# Строка слова в списках словаря; подставляется слово (Word)
+WORD_LINE_TEMPLATE = "• *{0.english_word}* = {0.russian_translation}".format
+SEARCH_RESULTS_HEADER = "🔍 *Результаты поиска*\n\n"
+MY_WORDS_HEADER = "📚 *Мои слова*\n\n"
+MY_WORDS_EMPTY_TEXT = (
+    "📚 *Мои слова*\n\nУ вас пока нет личных слов. Добавьте их через меню словаря!"
+)
+MY_WORDS_KEYBOARD = _keyboard(
+    _row(("🗑️ Удалить слово", "dictionary_delete")), DICTIONARY_ROW, MAIN_MENU_ROW
+)
+
+DELETE_WORD_TEXT = "🗑️ *Удаление слова*\n\nВведите английское слово, которое хотите удалить:"
+DELETE_ANOTHER_WORD_KEYBOARD = _keyboard(
+    _row(("🗑️ Удалить другое слово", "dictionary_delete")), DICTIONARY_ROW, MAIN_MENU_ROW
+)
+WORD_NOT_IN_DICTIONARY_TEMPLATE = "❌ Слово *{}* не найдено в вашем словаре.".format
+WORD_DELETED_TEMPLATE = "✅ Слово *{}* удалено из вашего словаря.".format
+
+IMPORT_HELP_TEXT = (
+    "📥 *Импорт слов из файла*\n\n"
+    "Отправьте файл .csv или .tsv, по одному слову в строке:\n"
+    "`слово, перевод, пример, перевод примера`\n\n"
+    "Пример и его перевод необязательны, строка заголовка пропускается. "
+    "Слова, которые уже есть в словаре, не дублируются."
+)
+IMPORT_UNSUPPORTED_TEXT = "❌ Поддерживаются только файлы .csv, .tsv и .txt."
+IMPORT_TOO_LARGE_TEMPLATE = "❌ Файл слишком большой: максимум {:g} МБ.".format
+IMPORT_IN_PROGRESS_TEXT = "⏳ Предыдущий импорт еще не закончен, дождитесь его результата."
+IMPORT_STARTED_TEXT = "⏳ Импорт начат..."
+IMPORT_PROGRESS_TEMPLATE = (
+    "⏳ Импорт: обработано строк {0.rows}, добавлено слов {0.added}...".format
+)
+IMPORT_FAILED_TEMPLATE = "❌ Импорт не выполнен: {}".format
+IMPORT_INTERRUPTED_TEXT = "❌ Импорт прерван из-за ошибки базы данных."
+
+
+def import_summary(report) -> str:
+    """Итоги импорта (ImportReport)"""
+    lines = [
+        "✅ *Импорт завершен*\n",
+        f"Добавлено слов: {report.added}",
+        f"Уже были в словаре: {report.existing}",
+    ]
+    if report.repeated:
+        lines.append(f"Повторы в файле: {report.repeated}")
+    if report.invalid:
+        shown = ", ".join(map(str, report.invalid_lines))
+        more = ", ..." if report.invalid > len(report.invalid_lines) else ""
+        lines.append(f"Пропущено неверных строк: {report.invalid} (строки {shown}{more})")
+    if report.truncated:
+        lines.append(f"⚠️ Импортированы только первые {report.rows} строк файла.")
+    return "\n".join(lines)
+
+
+def word_list_text(header: str, words: Iterable) -> str:
+    """Заголовок и строки слов списка"""
+    return header + "\n".join(map(WORD_LINE_TEMPLATE, words))
+
+
+def with_navigation(
+    keyboard: InlineKeyboardMarkup, navigation: Sequence[InlineKeyboardButton]
+) -> InlineKeyboardMarkup:
+    """Готовая клавиатура с рядом кнопок навигации по страницам сверху"""
+    if not navigation:
+        return keyboard
+    return InlineKeyboardMarkup((tuple(navigation), *keyboard.inline_keyboard))
+
+
+# --- Статистика и достижения ---
+
+STATISTICS_TEMPLATE = (
+    "📊 *Моя статистика*\n\n"
+    "🎯 *Общая статистика:*\n"
+    "• Тренировок пройдено: {total_sessions}\n"
+    "• Всего вопросов: {total_questions}\n"
+    "• Правильных ответов: {total_correct}\n"
+    "• Средняя точность: {avg_accuracy:.1f}%\n\n"
+    "📚 *Словарь:*\n"
+    "• Изучено слов: {words_studied}\n"
+    "• Освоено слов (уровень 3+): {words_mastered}\n\n"
+    "📅 *Сегодня:*\n"
+    "• Тренировок: {today_sessions}\n"
+    "• Вопросов: {today_questions}"
+).format
+STATISTICS_KEYBOARD = _keyboard(
+    _row(("📈 Детальная статистика", "statistics_detailed")), MAIN_MENU_ROW
+)
+STATISTICS_DETAILED_KEYBOARD = _keyboard(
+    _row(("📊 Общая статистика", "statistics_menu")), MAIN_MENU_ROW
+)
+RECENT_SESSION_TEMPLATE = "• {0.created_at:%d.%m %H:%M} - {0.total_questions} вопросов, точность {0.accuracy:.1f}%\n".format
+# Уровень освоения слова 0..5 звездами
+MASTERY_LEVELS = tuple("⭐" * level + "⚪" * (5 - level) for level in range(6))
+REVIEW_WORD_TEMPLATE = "• {0} {1.english_word} = {1.russian_translation}\n".format
+
+ACHIEVEMENTS_HEADER_TEMPLATE = "⭐ *Достижения*\n\nРазблокировано: {}/{}\n\n".format
+ACHIEVEMENT_TEMPLATES = {
+    True: "✅ {0.icon} *{0.name}*\n   {0.description}\n\n".format,
+    False: "🔒 {0.icon} *{0.name}*\n   {0.description}\n\n".format,
+}
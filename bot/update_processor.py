@@ -0,0 +1,141 @@
+"""Параллельная обработка обновлений с сохранением порядка для каждого пользователя
+
+По умолчанию ``Application`` обрабатывает обновления по одному, и медленный
+запрос одного пользователя задерживает всех остальных. ``UserOrderedUpdateProcessor``
+обрабатывает обновления разных пользователей параллельно, но обновления одного
+пользователя — строго по очереди: нажатия «ответ» и «следующий вопрос» не
+гоняются за ``training_session_id`` и счетчиками тренировки.
+
+Ограничения:
+
+* одновременно выполняется не больше ``UPDATE_CONCURRENCY`` обработчиков; слот
+  занимается только после блокировки пользователя, поэтому очередь нажатий одного
+  пользователя не отнимает слоты у других;
+* принятых, но еще не обработанных обновлений (включая ждущие своей очереди) —
+  не больше ``UPDATE_MAX_PENDING``, дальше приложение ждет освобождения;
+* блокировка пользователя удаляется, как только у него не остается обновлений
+  в работе, поэтому словарь блокировок не растет с числом пользователей.
+
+Порядок сохраняется, потому что приложение запускает обработку в порядке
+получения обновлений, а очереди ожидания asyncio.Semaphore и asyncio.Lock — FIFO.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable
+from typing import Any
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from bot.config import UPDATE_CONCURRENCY, UPDATE_MAX_PENDING
+
+logger = logging.getLogger(__name__)
+
+
+def shard_for(key: int, shards: int) -> int:
+    """Номер воркера для ключа упорядочивания (см. ``bot.supervisor``)"""
+    return key % shards
+
+
+def raw_update_key(data: dict) -> int | None:
+    """Ключ упорядочивания по JSON обновления без разбора в Update (как ``user_key``)"""
+    for field, value in data.items():
+        if field == "update_id" or not isinstance(value, dict):
+            continue
+        for name in ("from", "user"):
+            user = value.get(name)
+            if isinstance(user, dict) and "id" in user:
+                return user["id"]
+        chat = value.get("chat") or (value.get("message") or {}).get("chat")
+        if isinstance(chat, dict) and "id" in chat:
+            return chat["id"]
+    return None
+
+
+class _UserSlot:
+    """Блокировка пользователя и число его обновлений в работе"""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class UserOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Процессор обновлений: параллельно между пользователями, по порядку внутри"""
+
+    def __init__(
+        self,
+        concurrency: int = UPDATE_CONCURRENCY,
+        max_pending: int = UPDATE_MAX_PENDING,
+    ):
+        # Семафор базового класса ограничивает все принятые обновления,
+        # собственный — только выполняющиеся обработчики
+        super().__init__(max(max_pending, concurrency))
+        self.concurrency = concurrency
+        self._running = asyncio.BoundedSemaphore(concurrency)
+        self._slots: dict[int, _UserSlot] = {}
+
+        # Метрики
+        self.processed_updates = 0
+        self.active = 0
+        self.max_active = 0
+
+    def metrics(self) -> dict[str, int]:
+        """Текущие значения метрик процессора"""
+        return {
+            "locked_users": len(self._slots),
+            "active": self.active,
+            "max_active": self.max_active,
+            "processed_updates": self.processed_updates,
+        }
+
+    @staticmethod
+    def user_key(update: object) -> int | None:
+        """Ключ упорядочивания: пользователь, иначе чат; None — без упорядочивания"""
+        if not isinstance(update, Update):
+            return None
+        if update.effective_user is not None:
+            return update.effective_user.id
+        if update.effective_chat is not None:
+            return update.effective_chat.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self.user_key(update)
+        if key is None:
+            await self._run(coroutine)
+            return
+
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _UserSlot()
+        slot.users += 1
+        try:
+            async with slot.lock:
+                await self._run(coroutine)
+        finally:
+            slot.users -= 1
+            if not slot.users:
+                del self._slots[key]
+
+    async def _run(self, coroutine: Awaitable[Any]):
+        async with self._running:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            try:
+                await coroutine
+            finally:
+                self.active -= 1
+                self.processed_updates += 1
+
+    async def initialize(self) -> None:
+        logger.info(
+            f"Update processor: concurrency={self.concurrency}, "
+            f"max_pending={self.max_concurrent_updates}"
+        )
+
+    async def shutdown(self) -> None:
+        logger.info(f"Update processor stopped: {self.metrics()}")
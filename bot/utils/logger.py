@@ -1,20 +1,225 @@
-"""Настройка логирования"""
+"""Настройка логирования
 
+Записи не пишутся в файл и консоль в потоке event loop: корневой логгер
+получает ``QueueHandler``, который только кладет запись в очередь, а
+форматирование (включая traceback) и запись выполняет ``QueueListener`` в
+отдельном потоке. Поэтому ``logger.error(..., exc_info=True)`` в обработчиках не
+останавливает обработку остальных обновлений на время дискового ввода-вывода.
+
+* Ротация файла: по размеру (``LOG_MAX_BYTES``) или по времени
+  (``LOG_ROTATE_WHEN``, например ``midnight``), хранится ``LOG_BACKUP_COUNT``
+  архивов.
+* ``LOG_FORMAT=json`` — одна JSON-строка на запись с полями ``update_id`` и
+  ``user_id`` обновления, при обработке которого она сделана
+  (``bind_log_context`` регистрируется в ``bot.main`` в группе -1).
+* Одинаковые предупреждения и ошибки (тот же логгер, строка кода, тип
+  исключения и текст сообщения) пишутся не чаще раза в ``LOG_DUPLICATE_WINDOW``
+  секунд; первая запись после окна сообщает, сколько повторов было подавлено.
+  Так шквал ошибок в ``error_handler`` не забивает очередь и диск, а записи с
+  разным текстом из одной строки кода (ошибки разных пользователей, медленные
+  запросы с разным SQL) не теряются. Записи с ``extra={"deduplicate": False}``
+  не подавляются никогда.
+* Обработчики файла с ротацией не рассчитаны на запись из нескольких
+  процессов, поэтому каждый воркер супервизора пишет в свой файл
+  (``worker_log_file``: ``logs/bot.worker0.log`` и т.д.), а ``LOG_FILE``
+  остается за супервизором.
+"""
+
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import time
 from pathlib import Path
 
-from bot.config import LOG_FILE, LOG_LEVEL
+from bot.config import (
+    LOG_BACKUP_COUNT,
+    LOG_DUPLICATE_WINDOW,
+    LOG_FILE,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_MAX_BYTES,
+    LOG_ROTATE_WHEN,
+)
+
+# (update_id, user_id) обрабатываемого обновления
+_update_context: contextvars.ContextVar[tuple[int | None, int | None]] = contextvars.ContextVar(
+    "update_context", default=(None, None)
+)
+
+# Поток записи логов текущего процесса
+_listener: logging.handlers.QueueListener | None = None
+
+# Файл лога процесса по умолчанию (у воркеров супервизора — свой)
+_process_log_file = LOG_FILE
+
+
+def worker_log_file(index: int, log_file: str = LOG_FILE) -> str:
+    """Файл лога воркера: logs/bot.log -> logs/bot.worker<index>.log
+
+    Номер ставится перед расширением, чтобы не совпасть с архивами ротации
+    (bot.log.1, bot.log.2, ...).
+    """
+    path = Path(log_file)
+    return str(path.with_name(f"{path.stem}.worker{index}{path.suffix}"))
+
+
+def use_worker_log_file(index: int):
+    """Писать лог этого процесса в файл воркера (до первого ``setup_logger``)"""
+    global _process_log_file
+    _process_log_file = worker_log_file(index)
+
+
+async def bind_log_context(update: object, context) -> None:
+    """Запомнить update_id и user_id обновления для записей его обработки
+
+    Регистрируется как TypeHandler в группе -1: выполняется до остальных
+    обработчиков в той же задаче, а фоновые задачи обработчиков наследуют
+    значения.
+    """
+    update_id = getattr(update, "update_id", None)
+    user = getattr(update, "effective_user", None)
+    _update_context.set((update_id, user.id if user is not None else None))
+
+
+class DuplicateFilter(logging.Filter):
+    """Подавление повторов предупреждений и ошибок в пределах окна"""
+
+    MAX_KEYS = 1000
+
+    def __init__(self, window: float = LOG_DUPLICATE_WINDOW):
+        super().__init__()
+        self.window = window
+        # ключ -> (время первой записи в окне, подавлено повторов)
+        self._seen: dict[tuple, list] = {}
+        # Один фильтр стоит на нескольких обработчиках: решение по записи одно
+        self._last: tuple[logging.LogRecord | None, bool] = (None, True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self._last[0] is record:
+            return self._last[1]
+        allowed = self._check(record)
+        self._last = (record, allowed)
+        return allowed
+
+    def _check(self, record: logging.LogRecord) -> bool:
+        if (
+            self.window <= 0
+            or record.levelno < logging.WARNING
+            or not getattr(record, "deduplicate", True)
+        ):
+            return True
+        exc_type = record.exc_info[0] if record.exc_info else None
+        key = (record.name, record.pathname, record.lineno, exc_type, record.getMessage())
+        now = time.monotonic()
+
+        entry = self._seen.get(key)
+        if entry is not None and now - entry[0] < self.window:
+            entry[1] += 1
+            return False
 
+        suppressed = entry[1] if entry is not None else 0
+        if len(self._seen) >= self.MAX_KEYS:
+            self._seen = {k: v for k, v in self._seen.items() if now - v[0] < self.window}
+        self._seen[key] = [now, 0]
+        if suppressed:
+            record.msg = f"{record.getMessage()} (подавлено повторов: {suppressed})"
+            record.args = None
+        return True
+
+
+class LoopQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler без форматирования в вызывающем потоке
+
+    Стандартный ``prepare`` форматирует запись вместе с traceback перед
+    постановкой в очередь; здесь подставляются только аргументы сообщения и
+    контекст обновления, остальное делает поток ``QueueListener``.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.update_id, record.user_id = _update_context.get()
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-строка на запись"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        # Без очереди запись форматируется в потоке обработчика, и контекст берется напрямую
+        update_id, user_id = _update_context.get()
+        document = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "update_id": getattr(record, "update_id", update_id),
+            "user_id": getattr(record, "user_id", user_id),
+        }
+        if record.exc_info:
+            document["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(document, ensure_ascii=False)
+
+
+def _file_handler(log_file: str) -> logging.Handler:
+    """Обработчик файла с ротацией по времени, размеру или без нее"""
+    if LOG_ROTATE_WHEN:
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    if LOG_MAX_BYTES > 0:
+        return logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    return logging.FileHandler(log_file, encoding="utf-8")
+
+
+def stop_logger():
+    """Дописать записи из очереди и остановить поток записи логов"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def setup_logger(
+    log_file: str | None = None,
+    console: bool = True,
+    queued: bool = True,
+    duplicate_window: float = LOG_DUPLICATE_WINDOW,
+):
+    """Настройка логирования в файл и консоль
+
+    Args:
+        log_file: Путь к файлу лога; по умолчанию ``LOG_FILE`` или файл
+            воркера (``use_worker_log_file``)
+        console: Дублировать записи в консоль
+        queued: Писать через очередь в отдельном потоке; False — синхронно в
+            вызывающем потоке (для сравнения в scripts/bench_logging.py)
+        duplicate_window: Окно подавления повторов в секундах (0 — без подавления)
+    """
+    global _listener
+
+    log_file = log_file or _process_log_file
 
-def setup_logger():
-    """Настройка логирования в файл и консоль"""
     # Создаем директорию для логов, если её нет
-    log_dir = Path(LOG_FILE).parent
+    log_dir = Path(log_file).parent
     log_dir.mkdir(parents=True, exist_ok=True)
 
     # Настройка формата логирования
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     date_format = "%Y-%m-%d %H:%M:%S"
+    if LOG_FORMAT == "json":
+        formatter = JsonFormatter(datefmt=date_format)
+    else:
+        formatter = logging.Formatter(log_format, date_format)
 
     # Получаем уровень логирования
     log_level = getattr(logging, LOG_LEVEL.upper(), logging.INFO)
@@ -24,20 +229,35 @@ def setup_logger():
     logger.setLevel(log_level)
 
     # Очистка существующих обработчиков
+    stop_logger()
+    for handler in logger.handlers:
+        handler.close()
     logger.handlers.clear()
 
     # Обработчик для файла
-    file_handler = logging.FileHandler(LOG_FILE)
-    file_handler.setLevel(log_level)
-    file_formatter = logging.Formatter(log_format, date_format)
-    file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
+    handlers = [_file_handler(log_file)]
 
     # Обработчик для консоли
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(log_level)
-    console_formatter = logging.Formatter(log_format, date_format)
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+    if console:
+        handlers.append(logging.StreamHandler())
+
+    for handler in handlers:
+        handler.setLevel(log_level)
+        handler.setFormatter(formatter)
+
+    if queued:
+        log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        handlers = [LoopQueueHandler(log_queue)]
+
+    duplicate_filter = DuplicateFilter(duplicate_window)
+    for handler in handlers:
+        handler.addFilter(duplicate_filter)
+        logger.addHandler(handler)
 
     return logger
+
+
+# Записи, оставшиеся в очереди, дописываются при выходе из процесса
+atexit.register(stop_logger)
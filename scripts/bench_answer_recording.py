@@ -0,0 +1,172 @@
+"""Нагрузочный тест записи ответа: старый путь (несколько запросов) против record_answer
+
+Скрипт создает тестовых пользователей с тренировками, после чего ``--workers``
+параллельных корутин записывают по ``--answers`` ответов каждая сначала старым
+способом (чтение слова, сессии, статистики и отдельные изменения), затем через
+``record_answer``. Выводятся p50/p99 задержки одной записи и пропускная способность.
+В конце тестовые данные удаляются.
+
+Запуск (нужна заполненная БД из DATABASE_URL, лучше отдельная, не рабочая):
+
+    python -m scripts.bench_answer_recording --workers 20 --answers 200
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import delete, select
+
+from bot.database.database import async_session_maker, autocommit_session_maker, engine
+from bot.database.models import Answer, Statistics, TrainingSession, User, UserStatsSummary, Word
+from bot.database.repository import record_answer
+
+# Диапазон telegram_id тестовых пользователей, не пересекается с реальными
+BENCH_TELEGRAM_ID_BASE = -9_000_000_000
+
+
+async def old_record_answer(session_id: int, user_id: int, word_id: int, is_correct: bool):
+    """Запись ответа так, как это делал handle_answer до перехода на record_answer"""
+    async with async_session_maker() as session:
+        result = await session.execute(select(Word).where(Word.id == word_id))
+        word = result.scalar_one_or_none()
+        assert word is not None
+
+        training_session = await session.get(TrainingSession, session_id)
+        training_session.total_questions += 1
+        if is_correct:
+            training_session.correct_answers += 1
+        training_session.accuracy = (
+            training_session.correct_answers / training_session.total_questions * 100
+        )
+
+        session.add(
+            Answer(
+                session_id=session_id,
+                user_id=user_id,
+                word_id=word_id,
+                question_type="multiple_choice",
+                user_answer="0",
+                is_correct=is_correct,
+            )
+        )
+
+        stats_result = await session.execute(
+            select(Statistics).where(Statistics.user_id == user_id, Statistics.word_id == word_id)
+        )
+        stats = stats_result.scalar_one_or_none()
+        if not stats:
+            stats = Statistics(user_id=user_id, word_id=word_id, mastered_level=0)
+            session.add(stats)
+        if is_correct:
+            stats.mastered_level = min(stats.mastered_level + 1, 5)
+        else:
+            stats.mastered_level = max(stats.mastered_level - 1, 0)
+
+        await session.commit()
+
+
+async def new_record_answer(session_id: int, user_id: int, word_id: int, is_correct: bool):
+    """Запись ответа через record_answer"""
+    async with autocommit_session_maker() as session:
+        row = await record_answer(
+            session,
+            session_id=session_id,
+            user_id=user_id,
+            word_id=word_id,
+            user_answer="0",
+            is_correct=is_correct,
+        )
+        assert row is not None and row.session_found
+
+
+async def setup(workers: int) -> tuple[list[tuple[int, int]], list[int]]:
+    """Создать пользователей и тренировки, вернуть пары (telegram_id, session_id) и id слов"""
+    async with async_session_maker() as session:
+        result = await session.execute(select(Word.id).where(Word.user_id.is_(None)).limit(50))
+        word_ids = list(result.scalars().all())
+        if not word_ids:
+            raise SystemExit("В БД нет общих слов: запустите python -m bot.database.init_data")
+
+        pairs = []
+        for i in range(workers):
+            telegram_id = BENCH_TELEGRAM_ID_BASE - i
+            session.add(User(telegram_id=telegram_id))
+            await session.flush()
+            training_session = TrainingSession(
+                user_id=telegram_id,
+                session_type="multiple_choice",
+                total_questions=0,
+                correct_answers=0,
+                accuracy=0.0,
+            )
+            session.add(training_session)
+            await session.flush()
+            pairs.append((telegram_id, training_session.id))
+        await session.commit()
+    return pairs, word_ids
+
+
+async def cleanup(workers: int):
+    """Удалить тестовых пользователей и все их данные"""
+    telegram_ids = [BENCH_TELEGRAM_ID_BASE - i for i in range(workers)]
+    async with async_session_maker() as session:
+        await session.execute(delete(Answer).where(Answer.user_id.in_(telegram_ids)))
+        await session.execute(delete(Statistics).where(Statistics.user_id.in_(telegram_ids)))
+        await session.execute(
+            delete(TrainingSession).where(TrainingSession.user_id.in_(telegram_ids))
+        )
+        await session.execute(
+            delete(UserStatsSummary).where(UserStatsSummary.user_id.in_(telegram_ids))
+        )
+        await session.execute(delete(User).where(User.telegram_id.in_(telegram_ids)))
+        await session.commit()
+
+
+async def run_path(name: str, record, pairs, word_ids, answers: int):
+    """Запустить по одной корутине на пользователя и вывести p50/p99"""
+    timings: list[float] = []
+
+    async def worker(telegram_id: int, session_id: int):
+        for _ in range(answers):
+            word_id = random.choice(word_ids)
+            started = time.perf_counter()
+            await record(session_id, telegram_id, word_id, random.random() < 0.7)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(telegram_id, session_id) for telegram_id, session_id in pairs))
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(
+        f"{name:<14} | p50 {p50:7.2f} мс | p99 {p99:7.2f} мс | "
+        f"{len(timings) / elapsed:8.1f} ответов/с"
+    )
+
+
+async def run(workers: int, answers: int):
+    pairs, word_ids = await setup(workers)
+    try:
+        await run_path("старый путь", old_record_answer, pairs, word_ids, answers)
+        await run_path("record_answer", new_record_answer, pairs, word_ids, answers)
+    finally:
+        await cleanup(workers)
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--answers", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.workers, args.answers))
+
+
+if __name__ == "__main__":
+    main()
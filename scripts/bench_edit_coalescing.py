@@ -0,0 +1,218 @@
+"""Проверка пропуска правок сообщений на заглушке Bot API, как у Telegram отвечающей «message is not modified»
+
+Заглушка (``EditingBotApi``) хранит текст и клавиатуру каждого отправленного
+сообщения и, как Telegram, отвечает 400 «message is not modified» на правку,
+которая ничего не меняет.
+
+В каждый из ``--chats`` чатов отправляется меню, после чего пользователь
+«жмет кнопки»: ``--taps`` нажатий за ``--spread-s`` секунд, каждое —
+правка того же сообщения на один из экранов ``SCREENS``; с вероятностью
+``--repeat`` это снова последний запрошенный экран (повторное нажатие).
+Нажатия не ждут друг друга, как при обработке без очереди по пользователю
+или из фоновых задач. Режимы:
+
+* ``none`` — бот без ``SendScheduler``: каждая правка уходит в Bot API;
+* ``coalescing`` — ``SendScheduler(rate_limit=False)`` с ``EditCoalescer``;
+* ``scheduler`` — то же с бюджетами отправки по умолчанию (``TELEGRAM_CHAT_RATE``
+  и т. д.): правки ждут бюджета чата, и из ожидающих отправляется последняя.
+
+Для каждого режима выводятся отправленные правки, ответы «message is not
+modified», ошибки, дошедшие до вызывающего кода, и чаты, где сообщение в итоге
+показывает не последний запрошенный экран. Скрипт завершается с кодом 1, если
+с ``EditCoalescer`` есть ошибки или неверные итоговые экраны.
+
+Запуск (БД не нужна):
+
+    python -m scripts.bench_edit_coalescing --chats 100 --taps 8 --repeat 0.5
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
+from telegram.ext import ExtBot
+from telegram.request import HTTPXRequest
+
+from bot.edit_coalescing import EditCoalescer
+from bot.send_scheduler import SendScheduler
+from scripts.bench_ingestion import BOT_TOKEN, BOT_USER, BotApiError, FakeBotApi
+
+MODES = ("none", "coalescing", "scheduler")
+
+NOT_MODIFIED = (
+    "Bad Request: message is not modified: specified new message content and reply "
+    "markup are exactly the same as a current content and reply markup of the message"
+)
+
+
+def _screen(text: str, *buttons: tuple[str, str]) -> tuple[str, InlineKeyboardMarkup]:
+    keyboard = [[InlineKeyboardButton(label, callback_data=data)] for label, data in buttons]
+    return text, InlineKeyboardMarkup(keyboard)
+
+
+SCREENS = {
+    "main_menu": _screen(
+        "🏠 Главное меню",
+        ("🎯 Тренировка", "training_start"),
+        ("📚 Словарь", "dictionary_menu"),
+        ("📊 Статистика", "statistics_menu"),
+    ),
+    "dictionary_menu": _screen(
+        "📚 Словарь", ("➕ Добавить слово", "dictionary_add"), ("🔙 Назад", "main_menu")
+    ),
+    "statistics_menu": _screen(
+        "📊 Статистика\n\nСлов изучено: 42", ("📈 Подробнее", "statistics_detailed")
+    ),
+}
+
+
+class EditingBotApi(FakeBotApi):
+    """Заглушка Bot API, хранящая содержимое отправленных сообщений"""
+
+    def __init__(self, rtt: float):
+        super().__init__([], rate=0, rtt=rtt)
+        self.not_modified = 0
+        # (chat_id, message_id) -> (текст, клавиатура)
+        self.messages: dict[tuple[int, int], tuple[str, str | None]] = {}
+
+    def _message(self, chat_id: int, message_id: int, text: str) -> dict:
+        return {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": text,
+        }
+
+    async def respond(self, method: str, params: dict):
+        if method not in ("sendMessage", "editMessageText"):
+            return await super().respond(method, params)
+
+        chat_id = int(params["chat_id"])
+        content = (params["text"], params.get("reply_markup"))
+        if method == "sendMessage":
+            message_id = len(self.messages) + 1
+        else:
+            message_id = int(params["message_id"])
+            if self.messages[chat_id, message_id] == content:
+                self.not_modified += 1
+                raise BotApiError(400, NOT_MODIFIED)
+        self.messages[chat_id, message_id] = content
+        return self._message(chat_id, message_id, params["text"])
+
+
+def make_taps(args: argparse.Namespace) -> dict[int, list[tuple[float, str]]]:
+    """chat_id -> [(задержка от начала, экран)] по возрастанию задержки"""
+    names = list(SCREENS)
+    taps = {}
+    for chat_id in range(1, args.chats + 1):
+        delays = sorted(random.uniform(0, args.spread_s) for _ in range(args.taps))
+        screen = "main_menu"
+        chat_taps = []
+        for delay in delays:
+            if random.random() >= args.repeat:
+                screen = random.choice([name for name in names if name != screen])
+            chat_taps.append((delay, screen))
+        taps[chat_id] = chat_taps
+    return taps
+
+
+def make_rate_limiter(mode: str) -> SendScheduler | None:
+    if mode == "coalescing":
+        return SendScheduler(rate_limit=False, coalescer=EditCoalescer())
+    if mode == "scheduler":
+        return SendScheduler(coalescer=EditCoalescer())
+    return None
+
+
+async def run_mode(mode: str, taps: dict[int, list[tuple[float, str]]], args) -> bool:
+    api = EditingBotApi(rtt=args.rtt_ms / 1000)
+    api_port = await api.start()
+    bot = ExtBot(
+        BOT_TOKEN,
+        base_url=f"http://127.0.0.1:{api_port}/bot",
+        request=HTTPXRequest(connection_pool_size=args.pool_size),
+        rate_limiter=make_rate_limiter(mode),
+    )
+    errors = 0
+
+    async def tap(chat_id: int, message_id: int, delay: float, screen: str):
+        nonlocal errors
+        await asyncio.sleep(delay)
+        text, markup = SCREENS[screen]
+        try:
+            await bot.edit_message_text(
+                text, chat_id=chat_id, message_id=message_id, reply_markup=markup
+            )
+        except BadRequest:
+            errors += 1
+
+    async def chat(chat_id: int) -> int:
+        text, markup = SCREENS["main_menu"]
+        message = await bot.send_message(chat_id, text, reply_markup=markup)
+        await asyncio.gather(*(tap(chat_id, message.message_id, *item) for item in taps[chat_id]))
+        return message.message_id
+
+    try:
+        async with bot:
+            started = time.perf_counter()
+            message_ids = await asyncio.gather(*(chat(chat_id) for chat_id in taps))
+            elapsed = time.perf_counter() - started
+    finally:
+        await api.stop()
+
+    wrong = 0
+    for (chat_id, chat_taps), message_id in zip(taps.items(), message_ids, strict=True):
+        expected = SCREENS[chat_taps[-1][1]][0]
+        wrong += api.messages[chat_id, message_id][0] != expected
+
+    total = sum(len(chat_taps) for chat_taps in taps.values())
+    edits = api.calls["editMessageText"]
+    print(
+        f"{mode:<10} | {elapsed:5.1f} с | правок отправлено {edits:5d} из {total:5d} | "
+        f"not modified {api.not_modified:5d} | ошибок {errors:5d} | неверный экран {wrong:4d}"
+    )
+    return mode == "none" or not (errors or wrong)
+
+
+async def run(args: argparse.Namespace) -> bool:
+    taps = make_taps(args)
+    print(
+        f"Чатов: {args.chats}, нажатий в чате: {args.taps} за {args.spread_s:g} с, "
+        f"повторных нажатий: {args.repeat:.0%}"
+    )
+    ok = True
+    for mode in args.modes:
+        ok = await run_mode(mode, taps, args) and ok
+    print("OK: правки без ошибок, экраны верные" if ok else "ОШИБКА: ошибки или неверные экраны")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--taps", type=int, default=8, help="нажатий в каждом чате")
+    parser.add_argument("--spread-s", type=float, default=2.0, help="нажатия за столько секунд")
+    parser.add_argument(
+        "--repeat", type=float, default=0.5, help="доля повторных нажатий того же экрана"
+    )
+    parser.add_argument("--rtt-ms", type=float, default=50, help="задержка ответа Bot API")
+    parser.add_argument("--pool-size", type=int, default=256, help="соединений к Bot API")
+    parser.add_argument(
+        "--modes",
+        type=lambda value: value.split(","),
+        default=list(MODES),
+        help="режимы через запятую: " + ",".join(MODES),
+    )
+    args = parser.parse_args()
+
+    if not asyncio.run(run(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""Бенчмарк получения обновлений: long polling против webhook на локальной заглушке Bot API
+
+Скрипт поднимает локальную заглушку Bot API (``FakeBotApi``: getMe, getUpdates,
+setWebhook и т. п.) и приложение python-telegram-bot, направленное на нее через
+``base_url``. Обновления берутся из файла JSONL (``--updates``, одно обновление
+на строку, например сохраненные ответы getUpdates) или генерируются: нажатия
+кнопок ответа и текстовые сообщения от ``--users`` пользователей.
+
+Обновления «поступают» в заглушку с частотой ``--rate`` в секунду (0 — все сразу)
+и доставляются боту:
+
+* polling — ``Updater.start_polling``: бот запрашивает getUpdates, заглушка
+  отвечает пачкой до 100 обновлений через ``--rtt-ms`` мс;
+* webhook — ``WebhookServer`` из ``bot.ingestion``: заглушка отправляет POST
+  с секретным токеном по ``--connections`` соединениям, каждый запрос
+  задерживается на ``--rtt-ms`` мс.
+
+Обработчик только считает обновления. Выводятся обновлений в секунду от первого
+поступления до обработки последнего и p50/p99 задержки от поступления до обработчика.
+БД не используется.
+
+Запуск:
+
+    python -m scripts.bench_ingestion --count 20000 --rtt-ms 30
+    python -m scripts.bench_ingestion --mode webhook --rate 2000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from urllib.parse import parse_qs
+
+from telegram import Update
+from telegram.ext import Application, TypeHandler
+
+from bot.ingestion import (
+    SECRET_TOKEN_HEADER,
+    WebhookServer,
+    json_loads,
+    orjson,
+    read_request,
+    write_response,
+)
+
+BOT_TOKEN = "123456:bench"
+SECRET_TOKEN = "bench-secret"
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+
+def generate_updates(count: int, users: int) -> list[dict]:
+    """Нажатия кнопок ответа и текстовые сообщения, как в тренировке и словаре"""
+    updates = []
+    for update_id in range(1, count + 1):
+        user_id = random.randrange(1, users + 1)
+        user = {"id": user_id, "is_bot": False, "first_name": f"User {user_id}"}
+        message = {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": user,
+        }
+        if update_id % 5:
+            message["from"] = BOT_USER
+            message["text"] = "❓ Как переводится слово: apple"
+            updates.append(
+                {
+                    "update_id": update_id,
+                    "callback_query": {
+                        "id": str(update_id),
+                        "from": user,
+                        "chat_instance": str(user_id),
+                        "message": message,
+                        "data": f"answer_{random.randrange(4)}",
+                    },
+                }
+            )
+        else:
+            message["text"] = random.choice(("apple", "яблоко", "house"))
+            updates.append({"update_id": update_id, "message": message})
+    return updates
+
+
+def load_updates(path: str, count: int) -> list[dict]:
+    """Обновления из файла JSONL с переписанными по порядку update_id"""
+    with open(path, encoding="utf-8") as file:
+        recorded = [json.loads(line) for line in file if line.strip()]
+    updates = []
+    for update_id in range(1, count + 1):
+        update = dict(recorded[(update_id - 1) % len(recorded)])
+        update["update_id"] = update_id
+        updates.append(update)
+    return updates
+
+
+class BotApiError(Exception):
+    """Ошибка, которую заглушка возвращает вместо результата метода (например, 429)"""
+
+    def __init__(self, status: int, description: str, parameters: dict | None = None):
+        super().__init__(description)
+        self.status = status
+        self.description = description
+        self.parameters = parameters
+
+
+class FakeBotApi:
+    """Заглушка Bot API: отдает поступившие обновления через getUpdates"""
+
+    def __init__(self, updates: list[dict], rate: float, rtt: float):
+        self.updates = updates
+        self.rate = rate
+        self.rtt = rtt
+        # update_id -> время поступления (perf_counter)
+        self.arrived_at: dict[int, float] = {}
+        # Метод Bot API -> число вызовов
+        self.calls: Counter[str] = Counter()
+        self._arrived = 0
+        self._new_updates = asyncio.Event()
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle_connection, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+
+    async def feed(self, on_arrival=None):
+        """Выпускать обновления с заданной частотой; on_arrival(update) — для webhook"""
+        started = time.perf_counter()
+        for index, update in enumerate(self.updates):
+            if self.rate:
+                delay = started + index / self.rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self.arrived_at[update["update_id"]] = time.perf_counter()
+            self._arrived = index + 1
+            if on_arrival is not None:
+                await on_arrival(update)
+            elif index % 100 == 99 or index == len(self.updates) - 1 or self.rate:
+                self._new_updates.set()
+
+    async def get_updates(self, params: dict) -> list[dict]:
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 100))
+        timeout = float(params.get("timeout", 0))
+        deadline = time.perf_counter() + timeout
+        while True:
+            # update_id идут подряд с 1, поэтому смещение — это индекс
+            available = self.updates[max(offset - 1, 0) : self._arrived]
+            if available or time.perf_counter() >= deadline:
+                return available[:limit]
+            self._new_updates.clear()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._new_updates.wait(), deadline - time.perf_counter())
+
+    async def respond(self, method: str, params: dict):
+        """Результат вызова метода Bot API"""
+        if method == "getMe":
+            return BOT_USER
+        if method == "getUpdates":
+            return await self.get_updates(params)
+        return True
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while (request := await read_request(reader)) is not None:
+                method = request.path.rsplit("/", 1)[-1]
+                self.calls[method] += 1
+                if request.headers.get("content-type", "").startswith("application/json"):
+                    params = json.loads(request.body or b"{}")
+                else:
+                    params = {
+                        key: values[0] for key, values in parse_qs(request.body.decode()).items()
+                    }
+
+                status = 200
+                try:
+                    payload = {"ok": True, "result": await self.respond(method, params)}
+                except BotApiError as e:
+                    status = e.status
+                    payload = {"ok": False, "error_code": e.status, "description": e.description}
+                    if e.parameters:
+                        payload["parameters"] = e.parameters
+                await asyncio.sleep(self.rtt)
+                write_response(writer, status, json.dumps(payload).encode(), "application/json")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+class WebhookSender:
+    """Отправка обновлений на webhook по нескольким постоянным соединениям"""
+
+    def __init__(self, port: int, path: str, connections: int, rtt: float):
+        self.port = port
+        self.path = path
+        self.connections = connections
+        self.rtt = rtt
+        self.queue: asyncio.Queue[dict | None] = asyncio.Queue()
+        self.errors = 0
+
+    async def submit(self, update: dict):
+        await self.queue.put(update)
+
+    async def run(self):
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.connections)]
+        await asyncio.gather(*workers)
+
+    async def close(self):
+        for _ in range(self.connections):
+            await self.queue.put(None)
+
+    async def _worker(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        try:
+            while (update := await self.queue.get()) is not None:
+                body = json.dumps(update).encode()
+                writer.write(
+                    f"POST {self.path} HTTP/1.1\r\n"
+                    f"Host: 127.0.0.1\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"{SECRET_TOKEN_HEADER}: {SECRET_TOKEN}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+                status_line = await reader.readline()
+                length = 0
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                if b" 200 " not in status_line:
+                    self.errors += 1
+                await asyncio.sleep(self.rtt)
+        finally:
+            writer.close()
+
+
+async def run_mode(mode: str, updates: list[dict], rate: float, rtt: float, connections: int):
+    api = FakeBotApi(updates, rate, rtt)
+    api_port = await api.start()
+
+    latencies = []
+    done = asyncio.Event()
+
+    async def count_update(update: Update, context):
+        latencies.append((time.perf_counter() - api.arrived_at[update.update_id]) * 1000)
+        if len(latencies) == len(updates):
+            done.set()
+
+    application = (
+        Application.builder().token(BOT_TOKEN).base_url(f"http://127.0.0.1:{api_port}/bot").build()
+    )
+    application.add_handler(TypeHandler(Update, count_update))
+
+    async with application:
+        await application.start()
+        server = None
+        sender = None
+        if mode == "polling":
+            await application.updater.start_polling(
+                allowed_updates=[Update.MESSAGE, Update.CALLBACK_QUERY]
+            )
+            feeder = asyncio.create_task(api.feed())
+        else:
+            server = WebhookServer(application, "/telegram", SECRET_TOKEN)
+            await server.start("127.0.0.1", 0)
+            sender = WebhookSender(server.port, "/telegram", connections, rtt)
+            sending = asyncio.create_task(sender.run())
+            feeder = asyncio.create_task(api.feed(sender.submit))
+
+        started = time.perf_counter()
+        await feeder
+        await done.wait()
+        elapsed = time.perf_counter() - started
+
+        if mode == "polling":
+            await application.updater.stop()
+        else:
+            await sender.close()
+            await sending
+            await server.stop()
+        await application.stop()
+    await api.stop()
+
+    latencies.sort()
+    errors = f", ошибок отправки: {sender.errors}" if sender else ""
+    print(
+        f"{mode:<8} | {len(updates) / elapsed:9.0f} обн/с | "
+        f"задержка p50 {statistics.median(latencies):7.1f} мс, "
+        f"p99 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]:7.1f} мс{errors}"
+    )
+
+
+async def run(args: argparse.Namespace):
+    if args.updates:
+        updates = load_updates(args.updates, args.count)
+    else:
+        updates = generate_updates(args.count, args.users)
+    # Проверка, что обновления разбираются тем же декодером, что и на webhook
+    json_loads(json.dumps(updates[0]))
+    decoder = "orjson" if orjson is not None else "json"
+    print(
+        f"Обновлений: {len(updates)}, частота: {args.rate or 'все сразу'}, "
+        f"RTT: {args.rtt_ms} мс, декодер webhook: {decoder}"
+    )
+
+    modes = ("polling", "webhook") if args.mode == "both" else (args.mode,)
+    for mode in modes:
+        await run_mode(mode, updates, args.rate, args.rtt_ms / 1000, args.connections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("polling", "webhook", "both"), default="both")
+    parser.add_argument("--count", type=int, default=20000, help="количество обновлений")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--updates", help="файл JSONL с записанными обновлениями")
+    parser.add_argument("--rate", type=float, default=0, help="обновлений в секунду, 0 — все сразу")
+    parser.add_argument("--rtt-ms", type=float, default=30, help="задержка сети до Bot API")
+    parser.add_argument("--connections", type=int, default=40, help="соединений webhook")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Бенчмарк логирования: задержки цикла событий во время всплеска ошибок
+
+Скрипт имитирует шквал ошибок в обработчиках: ``--tasks`` задач записывают
+всего ``--records`` записей ``logger.error(..., exc_info=True)`` с traceback,
+уступая цикл событий каждые 10 записей. Параллельно тикер просыпается каждую
+миллисекунду и замеряет, насколько позже срока он получил управление, — это
+время, на которое остановилась бы обработка обновлений.
+
+Сравниваются три настройки ``setup_logger`` (файл во временном каталоге, без
+консоли):
+
+* синхронно — обработчик файла в потоке цикла событий, как было раньше;
+* очередь — ``QueueHandler`` + ``QueueListener``, форматирование и запись в
+  отдельном потоке;
+* очередь + подавление повторов — вдобавок одинаковые ошибки пишутся раз в окно.
+
+Выводятся максимальная и p99 задержка тикера, суммарное время остановки цикла,
+длительность всплеска и число записей в файле (с архивами ротации) после
+дозаписи очереди.
+
+Запуск:
+
+    python -m scripts.bench_logging --records 20000 --tasks 10
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from bot.utils.logger import DuplicateFilter, setup_logger, stop_logger
+
+TICK = 0.001  # секунд
+
+MODES = [
+    ("синхронно", {"queued": False, "duplicate_window": 0}),
+    ("очередь", {"queued": True, "duplicate_window": 0}),
+    ("очередь + повторы", {"queued": True, "duplicate_window": 60}),
+]
+
+
+def fail(depth: int):
+    """Исключение с traceback в несколько кадров, как из обработчика"""
+    if depth:
+        fail(depth - 1)
+    raise ValueError("Database error: connection reset")
+
+
+async def burst(records: int, tasks: int):
+    """Всплеск записей об ошибках из нескольких задач"""
+    log = logging.getLogger("bench")
+
+    async def worker(count: int):
+        for i in range(count):
+            try:
+                fail(5)
+            except ValueError as e:
+                log.error(f"Exception while handling an update: {e}", exc_info=True)
+            if i % 10 == 0:
+                await asyncio.sleep(0)
+
+    await asyncio.gather(*(worker(records // tasks) for _ in range(tasks)))
+
+
+async def measure(records: int, tasks: int) -> tuple[list[float], float]:
+    """Провести всплеск и вернуть задержки тикера (мс) и длительность (с)"""
+    lateness = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lateness.append(max(0.0, (time.perf_counter() - started - TICK) * 1000))
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK * 10)
+    started = time.perf_counter()
+    await burst(records, tasks)
+    duration = time.perf_counter() - started
+    done.set()
+    await ticker_task
+    return lateness, duration
+
+
+def check_duplicate_filter():
+    """Разные сообщения из одной строки кода проходят, одинаковые подавляются"""
+    duplicate_filter = DuplicateFilter(60)
+
+    def record(message: str) -> logging.LogRecord:
+        return logging.LogRecord("bench", logging.WARNING, __file__, 1, message, None, None)
+
+    distinct = [duplicate_filter.filter(record(f"Slow query: SELECT {i}")) for i in range(3)]
+    assert distinct == [True, True, True], f"разные сообщения подавлены: {distinct}"
+    repeated = [duplicate_filter.filter(record("Slow query: SELECT 0")) for _ in range(2)]
+    assert repeated == [False, False], f"повторы не подавлены: {repeated}"
+
+
+def run(records: int, tasks: int):
+    check_duplicate_filter()
+    print(f"Записей: {records}, задач: {tasks}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, options in MODES:
+            log_file = Path(directory) / f"{options['queued']}_{options['duplicate_window']}.log"
+            setup_logger(str(log_file), console=False, **options)
+            lateness, duration = asyncio.run(measure(records, tasks))
+            stop_logger()  # дописать очередь, чтобы посчитать строки
+            for handler in logging.getLogger().handlers:
+                handler.close()
+            logging.getLogger().handlers.clear()
+
+            written = 0
+            for path in Path(directory).glob(f"{log_file.name}*"):  # вместе с архивами ротации
+                with open(path, encoding="utf-8") as f:
+                    written += sum(1 for line in f if "Exception while handling" in line)
+            lateness.sort()
+            p99 = lateness[min(len(lateness) - 1, int(len(lateness) * 0.99))]
+            print(
+                f"{name:<18} | макс {lateness[-1]:7.2f} мс | p99 {p99:6.2f} мс | "
+                f"медиана {statistics.median(lateness):5.2f} мс | "
+                f"остановка {sum(lateness):7.1f} мс | всплеск {duration:5.2f} с | "
+                f"в файле {written}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--tasks", type=int, default=10)
+    args = parser.parse_args()
+
+    run(args.records, args.tasks)
+
+
+if __name__ == "__main__":
+    main()
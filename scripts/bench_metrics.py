@@ -0,0 +1,135 @@
+"""Бенчмарк накладных расходов метрик на обработку обновления
+
+Скрипт измеряет, сколько добавляет к обработке одного обновления сбор
+метрик из bot/instrumentation.py:
+
+* запись в гистограмму и увеличение счетчика;
+* обертка обработчика (``instrument_handlers``) — разница между вызовом
+  обернутого и исходного обработчика-заглушки;
+* ``count_update`` — TypeHandler, считающий обновления;
+* формирование ответа ``/metrics`` для приложения со всеми обработчиками
+  бота (``register_handlers``) после ``--updates`` наблюдений.
+
+Итог — накладные расходы на обновление в микросекундах и их доля от
+обработчика длительностью ``--handler-ms`` (типичный обработчик с одним
+запросом к БД и одним вызовом Bot API).
+
+Запуск (БД и Bot API не нужны):
+
+    python -m scripts.bench_metrics --updates 200000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from telegram import Update
+from telegram.ext import Application
+
+from bot.instrumentation import _timed, count_update, instrument_handlers
+from bot.main import register_handlers
+from bot.metrics import REGISTRY, handler_duration, updates_total
+
+CALLBACK_UPDATE = {
+    "update_id": 1,
+    "callback_query": {
+        "id": "1",
+        "from": {"id": 1, "is_bot": False, "first_name": "Bench"},
+        "chat_instance": "1",
+        "data": "next_question",
+    },
+}
+
+
+def per_call_ns(started: float, calls: int) -> float:
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def bench_primitives(calls: int) -> tuple[float, float]:
+    """Стоимость observe и inc, нс"""
+    histogram = handler_duration.labels("bench")
+    counter = updates_total.labels("bench")
+    values = [random.random() / 10 for _ in range(1024)]
+
+    started = time.perf_counter()
+    for i in range(calls):
+        histogram.observe(values[i & 1023])
+    observe = per_call_ns(started, calls)
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        counter.inc()
+    inc = per_call_ns(started, calls)
+    return observe, inc
+
+
+async def bench_handler(calls: int) -> tuple[float, float]:
+    """Стоимость обертки обработчика и count_update на обновление, нс"""
+
+    async def callback(update, context):
+        return None
+
+    wrapped = _timed(callback, "bench")
+    update = Update.de_json(CALLBACK_UPDATE, None)
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        await callback(update, None)
+    plain = per_call_ns(started, calls)
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        await wrapped(update, None)
+    wrapper = per_call_ns(started, calls) - plain
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        await count_update(update, None)
+    counting = per_call_ns(started, calls)
+    return wrapper, counting
+
+
+def bench_render(updates: int) -> tuple[float, int, int]:
+    """Время формирования /metrics для приложения бота, мс, и размер ответа"""
+    application = Application.builder().token("1:bench").build()
+    register_handlers(application)
+    instrument_handlers(application)
+
+    handlers = [
+        handler.callback.__name__ for group in application.handlers.values() for handler in group
+    ]
+    for i in range(updates):
+        handler_duration.labels(f"handler_{i % len(handlers)}").observe(random.random())
+
+    repeat = 50
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = REGISTRY.render()
+    return (time.perf_counter() - started) / repeat * 1000, len(body), len(handlers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=200_000)
+    parser.add_argument("--handler-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    observe, inc = bench_primitives(args.updates)
+    wrapper, counting = asyncio.run(bench_handler(args.updates))
+    render_ms, size, handlers = bench_render(args.updates)
+
+    per_update_us = (wrapper + counting) / 1000
+    print(f"observe гистограммы:        {observe:7.0f} нс")
+    print(f"inc счетчика:               {inc:7.0f} нс")
+    print(f"обертка обработчика:        {wrapper:7.0f} нс")
+    print(f"count_update:               {counting:7.0f} нс")
+    print(
+        f"итого на обновление:        {per_update_us:7.2f} мкс "
+        f"({per_update_us / (args.handler_ms * 10):.3f}% от обработчика {args.handler_ms:g} мс)"
+    )
+    print(f"/metrics ({handlers} обработчиков): {render_ms:7.2f} мс, {size} байт")
+
+
+if __name__ == "__main__":
+    main()
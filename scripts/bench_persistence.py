@@ -0,0 +1,142 @@
+"""Бенчмарк хранения состояния диалогов: накладные расходы на одно обновление
+
+Скрипт создает приложение python-telegram-bot со ``StatePersistence`` и
+имитирует тренировку ``--users`` пользователей: за каждый интервал сохранения
+каждый пользователь отвечает на ``--updates-per-interval`` вопросов (состояние
+в ``context.user_data`` меняется так же, как в ``bot/handlers/training.py``),
+затем вызывается ``Application.update_persistence`` — как это делает приложение
+раз в ``PERSISTENCE_UPDATE_INTERVAL`` секунд — и дожидается пакетной записи.
+
+Выводится:
+
+* время цикла событий на обновление — сколько обработка обновлений теряет на
+  копирование и сериализацию состояния (запись SQLite идет в отдельном потоке);
+* полная стоимость на обновление — включая ожидание записи в хранилище;
+* p50/p99 времени записи пакета и время загрузки всех состояний при старте.
+
+Запуск:
+
+    python -m scripts.bench_persistence --backend sqlite
+    python -m scripts.bench_persistence --backend postgres   # нужна БД из DATABASE_URL
+
+Для sqlite по умолчанию используется временный файл; данные postgres удаляются
+в конце.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import text
+from telegram.ext import Application
+
+from bot.database.database import async_session_maker, engine
+from bot.database.persistence import (
+    PostgresStateStore,
+    SQLiteStateStore,
+    StatePersistence,
+)
+
+# Диапазон telegram_id тестовых пользователей, не пересекается с реальными
+BENCH_TELEGRAM_ID_BASE = -9_300_000_000
+
+DELETE_BENCH_STATE_SQL = text("DELETE FROM bot_user_state WHERE user_id BETWEEN :low AND :high")
+
+
+def answer_question(user_data: dict, session_id: int):
+    """Изменить состояние так же, как обработка ответа и следующего вопроса"""
+    user_data["training_session_id"] = session_id
+    user_data["training_direction"] = "en_ru"
+    user_data["correct_word_id"] = random.randrange(1, 1_000_000)
+    user_data["correct_answer_index"] = random.randrange(4)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(backend: str, users: int, intervals: int, updates_per_interval: int, path: str):
+    store = SQLiteStateStore(path) if backend == "sqlite" else PostgresStateStore()
+    persistence = StatePersistence(store)
+    application = Application.builder().token("1:bench").persistence(persistence).build()
+    user_ids = [BENCH_TELEGRAM_ID_BASE - i for i in range(users)]
+
+    try:
+        loop_ms = 0.0
+        total_ms = 0.0
+        write_timings = []
+        updates = 0
+        for interval in range(intervals):
+            for user_id in user_ids:
+                for _ in range(updates_per_interval):
+                    answer_question(application.user_data[user_id], interval)
+                    updates += 1
+            application.mark_data_for_update_persistence(user_ids=user_ids)
+
+            started = time.perf_counter()
+            await application.update_persistence()
+            scheduled = time.perf_counter()
+            await persistence.drain()
+            finished = time.perf_counter()
+
+            loop_ms += (scheduled - started) * 1000
+            total_ms += (finished - started) * 1000
+            write_timings.append(persistence.last_write_ms)
+
+        # Завершенные тренировки: состояние очищается и удаляется из хранилища
+        for user_id in user_ids:
+            application.user_data[user_id].clear()
+        application.mark_data_for_update_persistence(user_ids=user_ids)
+        await application.update_persistence()
+        await persistence.drain()
+        for user_id in user_ids:
+            answer_question(application.user_data[user_id], intervals)
+        application.mark_data_for_update_persistence(user_ids=user_ids)
+        await application.update_persistence()
+        await persistence.drain()
+
+        started = time.perf_counter()
+        loaded = await persistence.get_user_data()
+        load_ms = (time.perf_counter() - started) * 1000
+
+        print(f"Хранилище: {store.name}, пользователей: {users}, обновлений: {updates}")
+        print(f"Цикл событий на обновление:   {loop_ms / updates * 1000:8.1f} мкс")
+        print(f"Полная стоимость на обновление: {total_ms / updates * 1000:8.1f} мкс")
+        print(
+            f"Запись пакета ({users} состояний): p50 {statistics.median(write_timings):.2f} мс, "
+            f"p99 {percentile(write_timings, 0.99):.2f} мс"
+        )
+        print(f"Загрузка {len(loaded)} состояний: {load_ms:.1f} мс")
+        print(f"Метрики: {persistence.metrics()}")
+    finally:
+        if backend == "postgres":
+            async with async_session_maker() as session:
+                await session.execute(
+                    DELETE_BENCH_STATE_SQL,
+                    {"low": BENCH_TELEGRAM_ID_BASE - users, "high": BENCH_TELEGRAM_ID_BASE},
+                )
+                await session.commit()
+        await store.close()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=("sqlite", "postgres"), default="sqlite")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--intervals", type=int, default=50)
+    parser.add_argument("--updates-per-interval", type=int, default=3)
+    parser.add_argument("--path", help="файл SQLite (по умолчанию временный)")
+    args = parser.parse_args()
+
+    path = args.path or os.path.join(tempfile.mkdtemp(), "bench_state.sqlite3")
+    asyncio.run(run(args.backend, args.users, args.intervals, args.updates_per_interval, path))
+
+
+if __name__ == "__main__":
+    main()
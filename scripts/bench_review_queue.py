@@ -0,0 +1,184 @@
+"""Бенчмарк очереди повторения: выборка следующего слова по индексу (user_id, next_review)
+
+Скрипт создает тестового пользователя с ``--words`` личными словами и строкой
+``statistics`` для каждого; сроки повторения равномерно разбросаны на ±30 дней,
+так что примерно половина слов уже ждет повторения. Затем ``--repeat`` раз
+выбирается следующее слово двумя способами:
+
+* ``fetch_due_word`` — как в режиме повторения: спуск по индексу
+  ``(user_id, next_review)`` и чтение первой строки;
+* сортировка — тот же запрос, но порядок по выражению от ``next_review``, которое
+  индекс не покрывает: БД читает все просроченные слова пользователя и сортирует их
+  (так ведет себя очередь без подходящего индекса).
+
+Выводятся p50/p99 задержки и план запроса ``fetch_due_word``: в нем должен быть
+Index Scan по ``ix_statistics_user_id_next_review`` без узла Sort. В конце
+тестовые данные удаляются.
+
+Запуск (нужна БД из DATABASE_URL с примененными миграциями, лучше отдельная):
+
+    python -m scripts.bench_review_queue --words 50000 --repeat 500
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from sqlalchemy import delete, func, select, text
+
+from bot.database.database import async_session_maker, engine
+from bot.database.models import Category, Statistics, User, Word
+from bot.database.review import due_words_query, fetch_due_word
+
+# telegram_id тестового пользователя, не пересекается с реальными
+BENCH_TELEGRAM_ID = -9_500_000_000
+
+SEED_WORDS_SQL = text(
+    """
+    INSERT INTO words (english_word, russian_translation, category_id, user_id, is_public)
+    SELECT 'review_' || n, 'повторение_' || n, :category_id, :user_id, true
+    FROM generate_series(1, :words) AS n
+    """
+)
+
+SEED_STATISTICS_SQL = text(
+    """
+    INSERT INTO statistics (user_id, word_id, mastered_level, next_review)
+    SELECT :telegram_id, w.id, w.id % 6,
+           LOCALTIMESTAMP + make_interval(mins => CAST(random() * 86400 - 43200 AS integer))
+    FROM words w
+    WHERE w.user_id = :user_id
+    """
+)
+
+
+async def fetch_sorted(session, telegram_id: int) -> Word | None:
+    """Следующее слово с сортировкой всех просроченных (порядок не из индекса)"""
+    result = await session.execute(
+        select(Word)
+        .join(Statistics, Statistics.word_id == Word.id)
+        .where(
+            Statistics.user_id == telegram_id,
+            Statistics.next_review <= func.localtimestamp(),
+        )
+        .order_by(Statistics.next_review + text("interval '0'"))
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def setup(words: int) -> int:
+    """Создать тестового пользователя со словами и расписанием; возвращает users.id"""
+    async with async_session_maker() as session:
+        result = await session.execute(select(Category.id).limit(1))
+        category_id = result.scalar_one_or_none()
+        if category_id is None:
+            raise SystemExit("В БД нет категорий: запустите python -m bot.database.init_data")
+
+        user = User(telegram_id=BENCH_TELEGRAM_ID)
+        session.add(user)
+        await session.flush()
+        params = {
+            "telegram_id": BENCH_TELEGRAM_ID,
+            "user_id": user.id,
+            "category_id": category_id,
+            "words": words,
+        }
+        await session.execute(SEED_WORDS_SQL, params)
+        await session.execute(SEED_STATISTICS_SQL, params)
+        await session.commit()
+        await session.execute(text("ANALYZE words"))
+        await session.execute(text("ANALYZE statistics"))
+        await session.commit()
+        return user.id
+
+
+async def cleanup(user_id: int | None):
+    """Удалить тестового пользователя, его слова и статистику"""
+    async with async_session_maker() as session:
+        await session.execute(delete(Statistics).where(Statistics.user_id == BENCH_TELEGRAM_ID))
+        if user_id is not None:
+            await session.execute(delete(Word).where(Word.user_id == user_id))
+        await session.execute(delete(User).where(User.telegram_id == BENCH_TELEGRAM_ID))
+        await session.commit()
+
+
+async def measure(name: str, fetch, repeat: int):
+    """Выполнить выборку repeat раз в одной сессии и вывести p50/p99"""
+    async with async_session_maker() as session:
+        assert await fetch(session, BENCH_TELEGRAM_ID) is not None  # прогрев
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await fetch(session, BENCH_TELEGRAM_ID)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{name:<14} | p50 {p50:7.2f} мс | p99 {p99:7.2f} мс")
+
+
+def plan_nodes(plan: dict) -> list[str]:
+    """Узлы плана в виде «тип (индекс)»"""
+    node = plan["Node Type"]
+    if "Index Name" in plan:
+        node += f" ({plan['Index Name']})"
+    nodes = [node]
+    for child in plan.get("Plans", ()):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+async def show_plan():
+    """План запроса fetch_due_word и проверка, что он не сортирует строки"""
+    compiled = due_words_query(BENCH_TELEGRAM_ID, 1).compile(
+        dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    async with async_session_maker() as session:
+        connection = await session.connection()
+        result = await connection.exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {compiled}")
+        document = result.scalar_one()
+    if isinstance(document, str):
+        document = json.loads(document)
+    nodes = plan_nodes(document[0]["Plan"])
+    ok = "Sort" not in nodes and any("ix_statistics_user_id_next_review" in n for n in nodes)
+    print(f"План fetch_due_word: {' -> '.join(nodes)}")
+    print("OK: выборка по индексу без сортировки" if ok else "ОШИБКА: очередь сортирует строки")
+
+
+async def run(words: int, repeat: int):
+    user_id = None
+    try:
+        user_id = await setup(words)
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(func.count()).where(
+                    Statistics.user_id == BENCH_TELEGRAM_ID,
+                    Statistics.next_review <= func.localtimestamp(),
+                )
+            )
+            due = result.scalar_one()
+        print(f"Слов у пользователя: {words}, ждут повторения: {due}")
+        await measure("fetch_due_word", fetch_due_word, repeat)
+        await measure("сортировка", fetch_sorted, repeat)
+        await show_plan()
+    finally:
+        await cleanup(user_id)
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.words, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Проверка планировщика отправки на заглушке Bot API, отвечающей 429 при превышении лимитов
+
+Заглушка (``FloodingBotApi``) ограничивает sendMessage так же, как Telegram:
+общий лимит бота ``--global-limit`` сообщений в секунду и лимит личного чата
+``--chat-limit`` в секунду с запасом ``--chat-burst``; сверх лимита отвечает
+429 с ``retry_after`` = ``--retry-after`` секунд.
+
+Одновременно отправляются ответы пользователям — по ``--replies`` сообщений в
+каждый из ``--chats`` чатов — и рассылка ``--bulk`` сообщений в разные чаты с
+приоритетом ``BULK``. Режимы:
+
+* ``none`` — бот без ограничителя, как было до ``SendScheduler``: ответы 429
+  доходят до обработчика как ``RetryAfter``;
+* ``scheduler`` — ``bot.send_scheduler.SendScheduler`` с бюджетами на 10% ниже
+  лимитов заглушки.
+
+Для каждого режима выводятся доставленные и потерянные сообщения, число
+ответов 429 и p50/p99 времени отправки для ответов и рассылки. Скрипт
+завершается с кодом 1, если с планировщиком потеряно хоть одно сообщение.
+
+Запуск (БД не нужна):
+
+    python -m scripts.bench_send_scheduler --chats 50 --replies 3 --bulk 150
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import defaultdict
+
+from telegram.error import RetryAfter
+from telegram.ext import ExtBot
+from telegram.request import HTTPXRequest
+
+from bot.send_scheduler import BULK, INTERACTIVE, SendScheduler, TokenBucket
+from scripts.bench_ingestion import BOT_TOKEN, BOT_USER, BotApiError, FakeBotApi
+
+MODES = ("none", "scheduler")
+
+# Бюджеты планировщика относительно лимитов заглушки
+BUDGET_SHARE = 0.9
+
+
+class FloodingBotApi(FakeBotApi):
+    """Заглушка Bot API с лимитами отправки Telegram"""
+
+    def __init__(self, args: argparse.Namespace):
+        super().__init__([], rate=0, rtt=args.rtt_ms / 1000)
+        self.args = args
+        self.flood_errors = 0
+        self.delivered = 0
+        self._global = TokenBucket(args.global_limit, args.global_limit)
+        self._chats: dict[int, TokenBucket] = {}
+
+    async def respond(self, method: str, params: dict):
+        if method != "sendMessage":
+            return await super().respond(method, params)
+
+        chat_id = int(params["chat_id"])
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = TokenBucket(self.args.chat_limit, self.args.chat_burst)
+        now = time.monotonic()
+        if self._global.delay(now) > 0 or chat.delay(now) > 0:
+            self.flood_errors += 1
+            retry_after = self.args.retry_after
+            raise BotApiError(
+                429, f"Too Many Requests: retry after {retry_after}", {"retry_after": retry_after}
+            )
+        self._global.take()
+        chat.take()
+
+        self.delivered += 1
+        return {
+            "message_id": self.delivered,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+
+
+def make_sends(args: argparse.Namespace) -> list[tuple[float, int, int]]:
+    """(задержка от начала, chat_id, приоритет): ответы в чаты и рассылка"""
+    sends = []
+    for chat_id in range(1, args.chats + 1):
+        for _ in range(args.replies):
+            sends.append((random.uniform(0, args.spread_s), chat_id, INTERACTIVE))
+    for n in range(args.bulk):
+        sends.append((random.uniform(0, args.spread_s), 1_000_000 + n, BULK))
+    return sends
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def run_mode(mode: str, sends: list[tuple[float, int, int]], args) -> int:
+    api = FloodingBotApi(args)
+    api_port = await api.start()
+    rate_limiter = None
+    if mode == "scheduler":
+        rate_limiter = SendScheduler(
+            global_rate=args.global_limit * BUDGET_SHARE,
+            chat_rate=args.chat_limit * BUDGET_SHARE,
+            chat_burst=args.chat_burst,
+            max_retries=args.max_retries,
+        )
+    bot = ExtBot(
+        BOT_TOKEN,
+        base_url=f"http://127.0.0.1:{api_port}/bot",
+        request=HTTPXRequest(connection_pool_size=args.pool_size),
+        rate_limiter=rate_limiter,
+    )
+
+    timings: dict[int, list[float]] = defaultdict(list)
+    lost = 0
+
+    async def send(delay: float, chat_id: int, priority: int):
+        nonlocal lost
+        await asyncio.sleep(delay)
+        started = time.perf_counter()
+        try:
+            if rate_limiter is None:
+                await bot.send_message(chat_id, "LinguaFlow")
+            else:
+                await bot.send_message(chat_id, "LinguaFlow", rate_limit_args=priority)
+        except RetryAfter:
+            lost += 1
+            return
+        timings[priority].append(time.perf_counter() - started)
+
+    try:
+        async with bot:
+            started = time.perf_counter()
+            await asyncio.gather(*(send(*item) for item in sends))
+            elapsed = time.perf_counter() - started
+    finally:
+        await api.stop()
+
+    interactive, bulk = timings[INTERACTIVE], timings[BULK]
+    print(
+        f"{mode:<9} | {elapsed:5.1f} с | доставлено {api.delivered:5d} | потеряно {lost:5d} | "
+        f"429: {api.flood_errors:5d} | ответы p50 {percentile(interactive, 0.5) * 1000:7.0f} "
+        f"p99 {percentile(interactive, 0.99) * 1000:7.0f} мс | рассылка p50 "
+        f"{percentile(bulk, 0.5) * 1000:7.0f} p99 {percentile(bulk, 0.99) * 1000:7.0f} мс"
+    )
+    return lost
+
+
+async def run(args: argparse.Namespace) -> bool:
+    sends = make_sends(args)
+    print(
+        f"Сообщений: {len(sends)} (ответов {args.chats * args.replies}, рассылка {args.bulk}), "
+        f"лимиты заглушки: {args.global_limit:g}/с на бота, {args.chat_limit:g}/с на чат"
+    )
+    lost = {}
+    for mode in args.modes:
+        lost[mode] = await run_mode(mode, sends, args)
+    ok = not lost.get("scheduler")
+    print("OK: с планировщиком сообщения не потеряны" if ok else "ОШИБКА: потеряны сообщения")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--replies", type=int, default=3, help="ответов в каждый чат")
+    parser.add_argument("--bulk", type=int, default=150, help="сообщений рассылки")
+    parser.add_argument("--spread-s", type=float, default=1.0, help="всплеск за столько секунд")
+    parser.add_argument("--global-limit", type=float, default=30)
+    parser.add_argument("--chat-limit", type=float, default=1)
+    parser.add_argument("--chat-burst", type=int, default=3)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--rtt-ms", type=float, default=20, help="задержка ответа Bot API")
+    parser.add_argument("--pool-size", type=int, default=256, help="соединений к Bot API")
+    parser.add_argument(
+        "--modes",
+        type=lambda value: value.split(","),
+        default=list(MODES),
+        help="режимы через запятую: " + ",".join(MODES),
+    )
+    args = parser.parse_args()
+
+    if not asyncio.run(run(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
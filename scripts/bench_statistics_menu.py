@@ -0,0 +1,163 @@
+"""Бенчмарк чтения статистики: агрегаты по истории против строки user_stats_summary
+
+Скрипт создает тестового пользователя с ``--sessions`` тренировками и статистикой
+по общим словам, пересчитывает его счетчики через ``rebuild_user_stats`` и затем
+``--repeat`` раз читает данные меню статистики двумя способами: четырьмя
+агрегатными запросами (как statistics_menu до перехода на счетчики) и одним
+чтением user_stats_summary. Выводятся p50/p99 задержки. В конце тестовые данные
+удаляются.
+
+Запуск (нужна заполненная БД из DATABASE_URL, лучше отдельная, не рабочая):
+
+    python -m scripts.bench_statistics_menu --sessions 10000 --repeat 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+from sqlalchemy import delete, func, select, text
+
+from bot.database.database import async_session_maker, engine
+from bot.database.models import Statistics, TrainingSession, User, UserStatsSummary
+from bot.database.rebuild_stats import rebuild_user_stats
+
+# telegram_id тестового пользователя, не пересекается с реальными
+BENCH_TELEGRAM_ID = -9_100_000_000
+
+SEED_SESSIONS_SQL = text(
+    """
+    INSERT INTO training_sessions (user_id, session_type, total_questions, correct_answers,
+                                   accuracy, created_at)
+    SELECT :telegram_id, 'multiple_choice', 10, n % 11, (n % 11) * 10.0,
+           now() - make_interval(mins => n)
+    FROM generate_series(1, :sessions) AS n
+    """
+)
+
+SEED_STATISTICS_SQL = text(
+    """
+    INSERT INTO statistics (user_id, word_id, mastered_level)
+    SELECT :telegram_id, w.id, w.id % 6
+    FROM words w
+    WHERE w.user_id IS NULL
+    ON CONFLICT (user_id, word_id) DO NOTHING
+    """
+)
+
+
+async def read_aggregates(telegram_id: int):
+    """Чтение так, как это делал statistics_menu до перехода на user_stats_summary"""
+    async with async_session_maker() as session:
+        await session.execute(select(User.id).where(User.telegram_id == telegram_id))
+        await session.execute(
+            select(
+                func.count(TrainingSession.id),
+                func.sum(TrainingSession.total_questions),
+                func.sum(TrainingSession.correct_answers),
+                func.avg(TrainingSession.accuracy),
+            ).where(TrainingSession.user_id == telegram_id)
+        )
+        await session.execute(
+            select(func.count(Statistics.word_id)).where(Statistics.user_id == telegram_id)
+        )
+        await session.execute(
+            select(func.count(Statistics.word_id)).where(
+                Statistics.user_id == telegram_id, Statistics.mastered_level >= 3
+            )
+        )
+        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        await session.execute(
+            select(
+                func.count(TrainingSession.id),
+                func.sum(TrainingSession.total_questions),
+            ).where(
+                TrainingSession.user_id == telegram_id, TrainingSession.created_at >= today_start
+            )
+        )
+
+
+async def read_summary(telegram_id: int):
+    """Чтение одной строки счетчиков, как в текущем statistics_menu"""
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(
+                User.id,
+                UserStatsSummary,
+                (UserStatsSummary.today_date == func.current_date()).label("is_today"),
+            )
+            .outerjoin(UserStatsSummary, UserStatsSummary.user_id == User.telegram_id)
+            .where(User.telegram_id == telegram_id)
+        )
+        assert result.first() is not None
+
+
+async def setup(sessions: int):
+    """Создать тестового пользователя с историей тренировок"""
+    async with async_session_maker() as session:
+        session.add(User(telegram_id=BENCH_TELEGRAM_ID))
+        await session.flush()
+        params = {"telegram_id": BENCH_TELEGRAM_ID, "sessions": sessions}
+        await session.execute(SEED_SESSIONS_SQL, params)
+        await session.execute(SEED_STATISTICS_SQL, params)
+        await rebuild_user_stats(session, BENCH_TELEGRAM_ID)
+        await session.commit()
+        await session.execute(text("ANALYZE training_sessions"))
+        await session.execute(text("ANALYZE statistics"))
+        await session.commit()
+
+
+async def cleanup():
+    """Удалить тестового пользователя и все его данные"""
+    async with async_session_maker() as session:
+        await session.execute(
+            delete(UserStatsSummary).where(UserStatsSummary.user_id == BENCH_TELEGRAM_ID)
+        )
+        await session.execute(delete(Statistics).where(Statistics.user_id == BENCH_TELEGRAM_ID))
+        await session.execute(
+            delete(TrainingSession).where(TrainingSession.user_id == BENCH_TELEGRAM_ID)
+        )
+        await session.execute(delete(User).where(User.telegram_id == BENCH_TELEGRAM_ID))
+        await session.commit()
+
+
+async def measure(name: str, read, repeat: int):
+    """Выполнить чтение repeat раз и вывести p50/p99"""
+    await read(BENCH_TELEGRAM_ID)  # прогрев соединения и кэша планов
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await read(BENCH_TELEGRAM_ID)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{name:<18} | p50 {p50:7.2f} мс | p99 {p99:7.2f} мс")
+
+
+async def run(sessions: int, repeat: int):
+    await setup(sessions)
+    try:
+        print(f"Тренировок у пользователя: {sessions}")
+        await measure("агрегаты", read_aggregates, repeat)
+        await measure("user_stats_summary", read_summary, repeat)
+    finally:
+        await cleanup()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.sessions, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
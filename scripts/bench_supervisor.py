@@ -0,0 +1,163 @@
+"""Бенчмарк супервизора с несколькими воркерами на локальной заглушке Bot API
+
+Для каждого значения ``--workers`` скрипт запускает ``python -m bot.supervisor``
+в режиме webhook, направив Bot API на локальную заглушку
+(``scripts.bench_ingestion.FakeBotApi``, задержка ответа ``--rtt-ms``), и
+отправляет на webhook ``--count`` нажатий «Тренировка» от ``--users``
+пользователей по ``--connections`` соединениям. Как только все обновления
+приняты, супервизору отправляется SIGTERM: он должен дождаться обработки
+очередей воркеров и завершиться с кодом 0.
+
+Выводятся обновлений в секунду (от первой отправки до завершения супервизора)
+и проверка остановки: число вызовов answerCallbackQuery в заглушке должно
+совпасть с числом отправленных обновлений — ни одно принятое обновление не
+потеряно.
+
+Запуск (нужна БД из DATABASE_URL: воркеры загружают достижения при старте):
+
+    python -m scripts.bench_supervisor --workers 1,4 --count 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import sys
+import time
+
+from scripts.bench_ingestion import BOT_TOKEN, BOT_USER, SECRET_TOKEN, FakeBotApi, WebhookSender
+
+WEBHOOK_PATH = "/telegram"
+
+
+def make_updates(count: int, users: int) -> list[dict]:
+    """Нажатия кнопки «Тренировка»: обработчику не нужна БД"""
+    updates = []
+    for update_id in range(1, count + 1):
+        user_id = random.randrange(1, users + 1)
+        updates.append(
+            {
+                "update_id": update_id,
+                "callback_query": {
+                    "id": str(update_id),
+                    "from": {"id": user_id, "is_bot": False, "first_name": f"User {user_id}"},
+                    "chat_instance": str(user_id),
+                    "data": "training_start",
+                    "message": {
+                        "message_id": 1,
+                        "date": int(time.time()),
+                        "chat": {"id": user_id, "type": "private"},
+                        "from": BOT_USER,
+                        "text": "LinguaFlow",
+                    },
+                },
+            }
+        )
+    return updates
+
+
+async def get_health(port: int) -> dict | None:
+    """GET /health супервизора; None — еще не отвечает"""
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    except OSError:
+        return None
+    try:
+        writer.write(b"GET /health HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return json.loads(body) if b" 200 " in head.split(b"\r\n", 1)[0] else None
+
+
+async def run_workers(workers: int, updates: list[dict], args: argparse.Namespace):
+    api = FakeBotApi([], rate=0, rtt=args.rtt_ms / 1000)
+    api_port = await api.start()
+    env = {
+        **os.environ,
+        "BOT_TOKEN": BOT_TOKEN,
+        "BOT_API_BASE_URL": f"http://127.0.0.1:{api_port}/bot",
+        "BOT_MODE": "webhook",
+        "WEBHOOK_URL": f"https://bench.invalid{WEBHOOK_PATH}",
+        "WEBHOOK_LISTEN": "127.0.0.1",
+        "WEBHOOK_PORT": str(args.port),
+        "WEBHOOK_PATH": WEBHOOK_PATH,
+        "WEBHOOK_SECRET_TOKEN": SECRET_TOKEN,
+        "BOT_WORKERS": str(workers),
+        "WORKER_BASE_PORT": str(args.worker_base_port),
+        "PERSISTENCE_BACKEND": "none",
+        # Заглушка не ограничивает отправку: меряем сам бот, а не лимиты Telegram
+        "TELEGRAM_RATE_LIMIT": "false",
+    }
+    process = await asyncio.create_subprocess_exec(sys.executable, "-m", "bot.supervisor", env=env)
+    try:
+        deadline = time.monotonic() + 60
+        while await get_health(args.port) is None:
+            if process.returncode is not None or time.monotonic() > deadline:
+                raise SystemExit(f"Супервизор не запустился (код {process.returncode})")
+            await asyncio.sleep(0.2)
+
+        sender = WebhookSender(args.port, WEBHOOK_PATH, args.connections, rtt=0)
+        started = time.perf_counter()
+        sending = asyncio.create_task(sender.run())
+        for update in updates:
+            await sender.submit(update)
+        await sender.close()
+        await sending
+        accepted = time.perf_counter() - started
+        health = await get_health(args.port)
+
+        # Все обновления приняты воркерами, но еще не обработаны: проверяем остановку
+        process.send_signal(signal.SIGTERM)
+        returncode = await process.wait()
+        elapsed = time.perf_counter() - started
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        await api.stop()
+
+    answered = api.calls["answerCallbackQuery"]
+    forwarded = [worker["forwarded"] for worker in health["workers"]]
+    ok = returncode == 0 and answered == len(updates) and not sender.errors
+    status = "OK" if ok else "ОШИБКА"
+    print(
+        f"воркеров {workers:<3} | {len(updates) / elapsed:8.0f} обн/с | "
+        f"принято за {accepted:5.1f} с, всего {elapsed:5.1f} с | "
+        f"по воркерам {forwarded} | {status}: код выхода {returncode}, "
+        f"answerCallbackQuery {answered}/{len(updates)}, ошибок webhook {sender.errors}"
+    )
+
+
+async def run(args: argparse.Namespace):
+    updates = make_updates(args.count, args.users)
+    print(f"Обновлений: {len(updates)}, пользователей: {args.users}, RTT: {args.rtt_ms} мс")
+    for workers in args.workers:
+        await run_workers(workers, updates, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--workers",
+        type=lambda value: [int(item) for item in value.split(",")],
+        default=[1, 4],
+        help="число воркеров через запятую",
+    )
+    parser.add_argument("--count", type=int, default=20000, help="количество обновлений")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--rtt-ms", type=float, default=5, help="задержка ответа Bot API")
+    parser.add_argument("--connections", type=int, default=40, help="соединений webhook")
+    parser.add_argument("--port", type=int, default=8090, help="порт webhook супервизора")
+    parser.add_argument("--worker-base-port", type=int, default=8100)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
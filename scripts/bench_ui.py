@@ -0,0 +1,375 @@
+"""Микробенчмарк каталога интерфейса: память и время на отрисовку экрана до и после bot/ui.py
+
+Для каждого экрана сравниваются два способа получить текст и клавиатуру:
+
+* ``before`` — как обработчики делали до bot/ui.py: списки
+  ``InlineKeyboardButton`` и ``InlineKeyboardMarkup`` на каждый вызов, текст
+  через f-строки и ``+=``;
+* ``after`` — готовые клавиатуры и шаблоны из bot/ui.py.
+
+Выводятся байты и блоки памяти, выделенные на одну отрисовку и живые до
+отправки ответа (tracemalloc, результаты ``--iterations`` вызовов удерживаются),
+и время отрисовки в микросекундах. Перед замером результаты обоих способов
+сравниваются (``to_dict`` клавиатуры и текст): скрипт завершается с кодом 1,
+если каталог рисует экран иначе, чем прежний код.
+
+Запуск (БД не нужна):
+
+    python -m scripts.bench_ui --iterations 10000
+"""
+
+import argparse
+import datetime as dt
+import gc
+import itertools
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from types import SimpleNamespace
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from bot import ui
+from bot.config import BOT_NAME
+
+# Данные экранов с содержимым: слово с примером, варианты ответа, страница слов
+WORD = SimpleNamespace(
+    english_word="deployment",
+    russian_translation="развертывание",
+    example_sentence="The deployment finished in five minutes.",
+    example_sentence_ru="Развертывание заняло пять минут.",
+)
+OPTIONS = ["развертывание", "репозиторий", "зависимость", "отладка"]
+WORDS_PAGE = [
+    SimpleNamespace(english_word=f"word{i}", russian_translation=f"слово{i}") for i in range(10)
+]
+STATISTICS = {
+    "total_sessions": 42,
+    "total_questions": 420,
+    "total_correct": 377,
+    "avg_accuracy": 89.76,
+    "words_studied": 150,
+    "words_mastered": 64,
+    "today_sessions": 3,
+    "today_questions": 30,
+}
+RECENT_SESSIONS = [
+    SimpleNamespace(
+        created_at=dt.datetime(2026, 10, day, 9, 30), total_questions=10, accuracy=80.0 + day
+    )
+    for day in range(1, 6)
+]
+
+
+# --- Как экраны строились до bot/ui.py ---
+
+
+def _before_main_menu():
+    keyboard = [
+        [InlineKeyboardButton("🎯 Начать тренировку", callback_data="training_start")],
+        [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
+        [InlineKeyboardButton("📊 Моя статистика", callback_data="statistics_menu")],
+        [InlineKeyboardButton("⭐ Достижения", callback_data="achievements_menu")],
+    ]
+    return "🏠 *Главное меню*\n\nВыберите действие:", InlineKeyboardMarkup(keyboard)
+
+
+def _before_start():
+    welcome_text = (
+        f"👋 *Добро пожаловать в {BOT_NAME}!*\n\n"
+        "🎓 *Внимание!* настоящий бот разработан в рамках учебной программы.\n\n"
+        "✨ *Что я умею:*\n"
+        "• 📚 Тренировка со словами IT-тематики\n"
+        "• ➕ Добавление своих слов в личный словарь\n"
+        "• 🔙 Управление личной коллекцией слов\n"
+        "• 📊 Отслеживание прогресса обучения\n"
+        "• 🎮 Интерактивные тренировки с вариантами ответов\n"
+        "• 🔄 Выбор направления перевода (RU→EN или EN→RU)\n\n"
+        "Выбери действие ниже и начнем наше путешествие в мир английского! 🚀"
+    )
+    return welcome_text, _before_main_menu()[1]
+
+
+def _before_training_start():
+    keyboard = [
+        [
+            InlineKeyboardButton("🇬🇧 → 🇷🇺 EN→RU", callback_data="training_direction_en_ru"),
+            InlineKeyboardButton("🇷🇺 → 🇬🇧 RU→EN", callback_data="training_direction_ru_en"),
+        ],
+        [InlineKeyboardButton("🔁 Повторить слова по расписанию", callback_data="training_review")],
+        [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
+    ]
+    return (
+        "🎯 *Выберите направление перевода:*\n\n"
+        "• EN→RU: вам покажут английское слово, нужно выбрать русский перевод\n"
+        "• RU→EN: вам покажут русское слово, нужно выбрать английский перевод\n"
+        "• Повторение: слова, срок повторения которых наступил (EN→RU)"
+    ), InlineKeyboardMarkup(keyboard)
+
+
+def _before_ask_question(options=OPTIONS):
+    direction, prompt = "en_ru", WORD.english_word
+    flag = "🇬🇧" if direction == "en_ru" else "🇷🇺"
+    question_text = f"{flag} *Переведите слово:*\n\n*{prompt}*"
+    keyboard = []
+    for i, option in enumerate(options):
+        keyboard.append(
+            [InlineKeyboardButton(f"{chr(65 + i)}. {option}", callback_data=f"answer_{i}")]
+        )
+    keyboard.append([InlineKeyboardButton("❌ Завершить тренировку", callback_data="training_end")])
+    text = f"{question_text}\n\nВыберите правильный вариант:"
+    return text, InlineKeyboardMarkup(keyboard)
+
+
+def _before_handle_answer():
+    word, is_correct, direction = WORD, False, "en_ru"
+    if direction == "en_ru":
+        correct_text = f"✅ *Правильно!*\n\n*{word.english_word}* = {word.russian_translation}"
+    else:
+        correct_text = f"✅ *Правильно!*\n\n*{word.russian_translation}* = {word.english_word}"
+    if not is_correct:
+        if direction == "en_ru":
+            correct_text = (
+                f"❌ *Неправильно*\n\n"
+                f"Правильный ответ: *{word.english_word}* = {word.russian_translation}"
+            )
+        else:
+            correct_text = (
+                f"❌ *Неправильно*\n\n"
+                f"Правильный ответ: *{word.russian_translation}* = {word.english_word}"
+            )
+    if word.example_sentence:
+        correct_text += f"\n\n💡 *Пример:*\n🇬🇧 {word.example_sentence}"
+        if word.example_sentence_ru:
+            correct_text += f"\n🇷🇺 {word.example_sentence_ru}"
+    keyboard = [[InlineKeyboardButton("➡️ Следующий вопрос", callback_data="next_question")]]
+    return correct_text, InlineKeyboardMarkup(keyboard)
+
+
+def _before_statistics_menu():
+    s = STATISTICS
+    text = (
+        f"📊 *Моя статистика*\n\n"
+        f"🎯 *Общая статистика:*\n"
+        f"• Тренировок пройдено: {s['total_sessions']}\n"
+        f"• Всего вопросов: {s['total_questions']}\n"
+        f"• Правильных ответов: {s['total_correct']}\n"
+        f"• Средняя точность: {s['avg_accuracy']:.1f}%\n\n"
+        f"📚 *Словарь:*\n"
+        f"• Изучено слов: {s['words_studied']}\n"
+        f"• Освоено слов (уровень 3+): {s['words_mastered']}\n\n"
+        f"📅 *Сегодня:*\n"
+        f"• Тренировок: {s['today_sessions']}\n"
+        f"• Вопросов: {s['today_questions']}"
+    )
+    keyboard = [
+        [InlineKeyboardButton("📈 Детальная статистика", callback_data="statistics_detailed")],
+        [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
+    ]
+    return text, InlineKeyboardMarkup(keyboard)
+
+
+def _before_statistics_detailed():
+    text = "📈 *Детальная статистика*\n\n"
+    text += "🕐 *Последние тренировки:*\n"
+    for session in RECENT_SESSIONS:
+        text += (
+            f"• {session.created_at.strftime('%d.%m %H:%M')} - "
+            f"{session.total_questions} вопросов, "
+            f"точность {session.accuracy:.1f}%\n"
+        )
+    text += "\n"
+    text += "📚 *Слова для повторения:*\n"
+    for level, word in enumerate(WORDS_PAGE[:5]):
+        level_emoji = "⭐" * level + "⚪" * (5 - level)
+        text += f"• {level_emoji} {word.english_word} = {word.russian_translation}\n"
+    keyboard = [
+        [InlineKeyboardButton("📊 Общая статистика", callback_data="statistics_menu")],
+        [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
+    ]
+    return text, InlineKeyboardMarkup(keyboard)
+
+
+def _before_dictionary_menu():
+    keyboard = [
+        [InlineKeyboardButton("➕ Добавить слово", callback_data="dictionary_add")],
+        [InlineKeyboardButton("🔍 Поиск по словарю", callback_data="dictionary_search")],
+        [InlineKeyboardButton("📋 Мои слова", callback_data="dictionary_my_words")],
+        [InlineKeyboardButton("📥 Импорт из файла", callback_data="dictionary_import")],
+        [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
+    ]
+    total_words = 150
+    return (
+        f"📚 *Мой словарь*\n\nВсего слов: {total_words}\n\nВыберите действие:",
+        InlineKeyboardMarkup(keyboard),
+    )
+
+
+def _before_my_words():
+    words_list = []
+    for word in WORDS_PAGE:
+        words_list.append(f"• *{word.english_word}* = {word.russian_translation}")
+    text = "📚 *Мои слова*\n\n" + "\n".join(words_list)
+    keyboard = [
+        [InlineKeyboardButton("🗑️ Удалить слово", callback_data="dictionary_delete")],
+        [InlineKeyboardButton("📚 Мой словарь", callback_data="dictionary_menu")],
+        [InlineKeyboardButton("🔙 Главное меню", callback_data="main_menu")],
+    ]
+    keyboard.insert(0, [InlineKeyboardButton("Далее ▶️", callback_data="page:next")])
+    return text, InlineKeyboardMarkup(keyboard)
+
+
+# --- Те же экраны через bot/ui.py ---
+
+
+def _after_ask_question(options=OPTIONS):
+    return ui.question_message("en_ru", WORD.english_word, options)
+
+
+_new_words = itertools.count()
+
+
+def _new_options() -> list[str]:
+    return [f"вариант{next(_new_words)}" for _ in range(4)]
+
+
+def _restart_new_words():
+    global _new_words
+    _new_words = itertools.count()
+
+
+def _after_statistics_detailed():
+    parts = ["📈 *Детальная статистика*\n\n", "🕐 *Последние тренировки:*\n"]
+    parts.extend(map(ui.RECENT_SESSION_TEMPLATE, RECENT_SESSIONS))
+    parts.append("\n")
+    parts.append("📚 *Слова для повторения:*\n")
+    for level, word in enumerate(WORDS_PAGE[:5]):
+        parts.append(ui.REVIEW_WORD_TEMPLATE(ui.MASTERY_LEVELS[level], word))
+    return "".join(parts), ui.STATISTICS_DETAILED_KEYBOARD
+
+
+def _after_my_words():
+    navigation = [InlineKeyboardButton("Далее ▶️", callback_data="page:next")]
+    return (
+        ui.word_list_text(ui.MY_WORDS_HEADER, WORDS_PAGE),
+        ui.with_navigation(ui.MY_WORDS_KEYBOARD, navigation),
+    )
+
+
+Render = Callable[[], tuple[str, InlineKeyboardMarkup]]
+
+# Экран: (до, после)
+SCREENS: dict[str, tuple[Render, Render]] = {
+    "start_command": (_before_start, lambda: (ui.WELCOME_TEXT, ui.MAIN_MENU_KEYBOARD)),
+    "main_menu_callback": (_before_main_menu, lambda: (ui.MAIN_MENU_TEXT, ui.MAIN_MENU_KEYBOARD)),
+    "training_start": (
+        _before_training_start,
+        lambda: (ui.TRAINING_DIRECTION_TEXT, ui.TRAINING_DIRECTION_KEYBOARD),
+    ),
+    "ask_question": (_before_ask_question, _after_ask_question),
+    # Варианты, которых еще не было: ряды кнопок не найдены в кэше
+    "ask_question_new": (
+        lambda: _before_ask_question(_new_options()),
+        lambda: _after_ask_question(_new_options()),
+    ),
+    "handle_answer": (
+        _before_handle_answer,
+        lambda: (ui.answer_feedback(WORD, False, "en_ru"), ui.NEXT_QUESTION_KEYBOARD),
+    ),
+    "statistics_menu": (
+        _before_statistics_menu,
+        lambda: (ui.STATISTICS_TEMPLATE(**STATISTICS), ui.STATISTICS_KEYBOARD),
+    ),
+    "statistics_detailed": (_before_statistics_detailed, _after_statistics_detailed),
+    "dictionary_menu": (
+        _before_dictionary_menu,
+        lambda: (ui.DICTIONARY_MENU_TEMPLATE(150), ui.DICTIONARY_MENU_KEYBOARD),
+    ),
+    "dictionary_my_words": (_before_my_words, _after_my_words),
+}
+
+
+def same_screen(before: Render, after: Render) -> bool:
+    _restart_new_words()
+    text_before, markup_before = before()
+    _restart_new_words()
+    text_after, markup_after = after()
+    return text_before == text_after and markup_before.to_dict() == markup_after.to_dict()
+
+
+def allocations(render: Render, iterations: int) -> tuple[float, float]:
+    """Байты и блоки, выделенные на одну отрисовку и живые, пока живет результат"""
+    results = [None] * iterations
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc_filter = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    before = tracemalloc.take_snapshot().filter_traces(tracemalloc_filter)
+    for i in range(iterations):
+        results[i] = render()
+    after = tracemalloc.take_snapshot().filter_traces(tracemalloc_filter)
+    tracemalloc.stop()
+    diff = after.compare_to(before, "filename")
+    size = sum(stat.size_diff for stat in diff)
+    count = sum(stat.count_diff for stat in diff)
+    del results
+    return size / iterations, count / iterations
+
+
+def timing(render: Render, iterations: int) -> float:
+    """Среднее время отрисовки, мкс"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        render()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run(args: argparse.Namespace) -> bool:
+    names = args.screens or list(SCREENS)
+    different = [name for name in names if not same_screen(*SCREENS[name])]
+    for name in different:
+        print(f"ОШИБКА: экран {name} в bot/ui.py отличается от прежнего")
+
+    print(
+        f"{'экран':<20} | {'байт до':>8} → {'после':>6} | {'блоков до':>9} → {'после':>5} | "
+        f"{'мкс до':>7} → {'после':>6}"
+    )
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for name in names:
+        before, after = SCREENS[name]
+        bytes_before, blocks_before = allocations(before, args.iterations)
+        bytes_after, blocks_after = allocations(after, args.iterations)
+        us_before, us_after = timing(before, args.iterations), timing(after, args.iterations)
+        for index, value in enumerate((bytes_before, bytes_after, blocks_before, blocks_after)):
+            totals[index] += value
+        print(
+            f"{name:<20} | {bytes_before:8.0f} → {bytes_after:6.0f} | "
+            f"{blocks_before:9.1f} → {blocks_after:5.1f} | {us_before:7.2f} → {us_after:6.2f}"
+        )
+
+    # Средний экран, как если бы обновления распределялись по экранам поровну
+    count = len(names)
+    print(
+        f"{'в среднем':<20} | {totals[0] / count:8.0f} → {totals[1] / count:6.0f} | "
+        f"{totals[2] / count:9.1f} → {totals[3] / count:5.1f} |"
+    )
+    return not different
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument(
+        "--screens",
+        type=lambda value: value.split(","),
+        default=None,
+        help="экраны через запятую: " + ",".join(SCREENS),
+    )
+    args = parser.parse_args()
+
+    if not run(args):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Бенчмарк импорта словаря из CSV: время импорта и задержки других пользователей
+
+Скрипт создает тестового пользователя, генерирует CSV на ``--rows`` строк (часть
+строк — повторы и неверные строки) и импортирует его через ``import_words``,
+как обработчик присланного файла. Одновременно ``--probes`` виртуальных
+пользователей непрерывно выполняют короткий запрос (поиск пользователя по
+telegram_id): их p50/p99 до и во время импорта показывают, мешает ли импорт
+остальным. Затем тот же файл импортируется повторно — все слова уже есть в
+словаре, и ON CONFLICT DO NOTHING пропускает их. В конце тестовые данные
+удаляются.
+
+Запуск (нужна заполненная БД из DATABASE_URL, лучше отдельная, не рабочая):
+
+    python -m scripts.bench_word_import --rows 50000 --chunk-size 1000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import delete, select
+
+from bot.database.database import async_session_maker, engine
+from bot.database.models import User, UserStatsSummary, Word
+from bot.database.word_import import ImportReport, import_words
+
+# telegram_id тестового пользователя, не пересекается с реальными
+BENCH_TELEGRAM_ID = -9_900_000_000
+
+
+def make_csv(rows: int) -> str:
+    """CSV с заголовком; каждая 50-я строка — повтор, каждая 100-я — без перевода"""
+    lines = ["english,russian,example"]
+    for n in range(rows):
+        if n % 100 == 99:
+            lines.append(f"broken{n},")
+        elif n % 50 == 49:
+            lines.append(f"import{n - 1},повтор {n},")
+        else:
+            lines.append(f"import{n},импорт {n},This is example number {n}.")
+    return "\n".join(lines) + "\n"
+
+
+async def setup() -> int:
+    """Создать тестового пользователя"""
+    async with async_session_maker() as session:
+        user = User(telegram_id=BENCH_TELEGRAM_ID)
+        session.add(user)
+        await session.commit()
+        return user.id
+
+
+async def cleanup(user_id: int | None):
+    """Удалить тестового пользователя и его слова"""
+    async with async_session_maker() as session:
+        await session.execute(
+            delete(UserStatsSummary).where(UserStatsSummary.user_id == BENCH_TELEGRAM_ID)
+        )
+        if user_id is not None:
+            await session.execute(delete(Word).where(Word.user_id == user_id))
+        await session.execute(delete(User).where(User.telegram_id == BENCH_TELEGRAM_ID))
+        await session.commit()
+
+
+async def probe(timings: list[float], stop: asyncio.Event):
+    """Короткий запрос другого пользователя в цикле до stop"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        async with async_session_maker() as session:
+            await session.execute(select(User.id).where(User.telegram_id == BENCH_TELEGRAM_ID))
+        timings.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.005)
+
+
+async def with_probes(work, probes: int) -> tuple[float, list[float]]:
+    """Выполнить work() под нагрузкой probes пользователей: (секунды, задержки мс)"""
+    timings: list[float] = []
+    stop = asyncio.Event()
+    tasks = [asyncio.create_task(probe(timings, stop)) for _ in range(probes)]
+    started = time.perf_counter()
+    try:
+        await work()
+    finally:
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*tasks)
+    return elapsed, timings
+
+
+def percentiles(timings: list[float]) -> str:
+    timings = sorted(timings)
+    p50 = statistics.median(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    return f"p50 {p50:6.2f} мс | p99 {p99:6.2f} мс"
+
+
+async def run(rows: int, chunk_size: int, probes: int):
+    text = make_csv(rows)
+    user_id = None
+    try:
+        user_id = await setup()
+        _, idle = await with_probes(lambda: asyncio.sleep(1), probes)
+        print(f"Строк в файле: {rows}, пачка: {chunk_size}, пользователей-проб: {probes}")
+        print(f"без импорта          | {percentiles(idle)}")
+
+        for name in ("импорт", "повторный импорт"):
+            report = ImportReport()
+
+            async def work(report=report):
+                await import_words(
+                    BENCH_TELEGRAM_ID, user_id, text, ",", report, chunk_size=chunk_size
+                )
+
+            elapsed, busy = await with_probes(work, probes)
+            print(
+                f"{name:<20} | {percentiles(busy)} | {elapsed:6.2f} с "
+                f"({report.rows / elapsed:,.0f} строк/с) | добавлено {report.added}, "
+                f"уже были {report.existing}, повторы {report.repeated}, "
+                f"неверных {report.invalid}"
+            )
+    finally:
+        await cleanup(user_id)
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--probes", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.rows, args.chunk_size, args.probes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Бенчмарк выборки слов для вопроса: ORDER BY random() против пула id
+
+Для каждого размера словаря скрипт добавляет во временную категорию нужное
+количество общих слов, замеряет задержку на вопрос для старого запроса и для
+``WordPool.sample`` и удаляет тестовые данные.
+
+Запуск (нужна БД из DATABASE_URL, лучше отдельная, не рабочая):
+
+    python -m scripts.bench_word_sampling --sizes 1000,100000,1000000 --questions 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import delete, func, select, text
+
+from bot.database.database import async_session_maker, engine
+from bot.database.models import Category, Word
+from bot.database.word_pool import WordPool
+
+BENCH_CATEGORY = "__bench_word_sampling__"
+
+
+async def seed_words(category_id: int, start: int, end: int):
+    """Добавить общие слова с номерами [start, end] одним INSERT ... SELECT"""
+    async with async_session_maker() as session:
+        await session.execute(
+            text(
+                "INSERT INTO words (english_word, russian_translation, category_id, user_id, is_public) "
+                "SELECT 'bench_' || g, 'бенч_' || g, :category_id, NULL, true "
+                "FROM generate_series(:start, :end) AS g"
+            ),
+            {"category_id": category_id, "start": start, "end": end},
+        )
+        await session.execute(text("ANALYZE words"))
+        await session.commit()
+
+
+async def clear_words(category_id: int):
+    """Удалить тестовые слова"""
+    async with async_session_maker() as session:
+        await session.execute(delete(Word).where(Word.category_id == category_id))
+        await session.commit()
+
+
+async def measure(name: str, questions: int, sample) -> list[float]:
+    """Замерить задержку ``questions`` выборок, мс"""
+    timings = []
+    for _ in range(questions):
+        async with async_session_maker() as session:
+            started = time.perf_counter()
+            words = await sample(session)
+            timings.append((time.perf_counter() - started) * 1000)
+            assert len(words) == 4, f"{name}: получено {len(words)} слов"
+    return timings
+
+
+def report(size: int, name: str, timings: list[float]):
+    timings = sorted(timings)
+    p50 = statistics.median(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{size:>10} | {name:<18} | p50 {p50:8.2f} мс | p99 {p99:8.2f} мс")
+
+
+async def run(sizes: list[int], questions: int):
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Category).where(Category.category_name == BENCH_CATEGORY)
+        )
+        category = result.scalar_one_or_none()
+        if not category:
+            category = Category(category_name=BENCH_CATEGORY)
+            session.add(category)
+            await session.commit()
+            await session.refresh(category)
+        category_id = category.id
+
+    # Личные слова не участвуют: пользователь с несуществующим users.id
+    user_id = -1
+
+    async def old_query(session):
+        result = await session.execute(
+            select(Word)
+            .where((Word.user_id.is_(None)) | (Word.user_id == user_id), Word.is_public)
+            .order_by(func.random())
+            .limit(4)
+        )
+        return result.scalars().all()
+
+    print(f"{'слов':>10} | {'способ':<18} | задержка на вопрос")
+    try:
+        seeded = 0
+        for size in sorted(sizes):
+            if size > seeded:
+                await seed_words(category_id, seeded + 1, size)
+                seeded = size
+
+            pool = WordPool()
+
+            async def pool_sample(session, pool=pool):
+                return await pool.sample(session, user_id, 4)
+
+            # Первая выборка загружает пул; в боте это происходит раз в TTL
+            async with async_session_maker() as session:
+                started = time.perf_counter()
+                await pool.sample(session, user_id, 4)
+                warmup = (time.perf_counter() - started) * 1000
+
+            report(size, "ORDER BY random()", await measure("old", questions, old_query))
+            report(size, "WordPool.sample", await measure("pool", questions, pool_sample))
+            print(f"{size:>10} | {'загрузка пула':<18} | {warmup:8.2f} мс (однократно)")
+    finally:
+        await clear_words(category_id)
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--questions", type=int, default=200)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    asyncio.run(run(sizes, args.questions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Бенчмарк поиска по словарю: ILIKE '%...%' против pg_trgm и индекса в памяти
+
+Скрипт добавляет во временную категорию ``--size`` общих слов (по умолчанию
+1 000 000) со случайными английскими и русскими строками, затем для
+``--queries`` запросов каждого вида (точное слово, начало, подстрока, слово с
+опечаткой) замеряет задержку старого запроса с ILIKE и ``PostgresSearchBackend``,
+а с ``--with-memory`` — и ``MemorySearchBackend`` (индекс строится в памяти,
+для миллиона слов нужно несколько гигабайт). Для каждого вида выводится доля
+запросов, в которых исходное слово попало в результаты. В конце тестовые
+данные удаляются.
+
+Запуск (нужна БД из DATABASE_URL с примененными миграциями, лучше отдельная):
+
+    python -m scripts.bench_word_search --size 1000000 --queries 200
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import delete, or_, select, text
+
+from bot.database.database import async_session_maker, engine
+from bot.database.models import Category, Word
+from bot.database.search import MemorySearchBackend, PostgresSearchBackend
+
+BENCH_CATEGORY = "__bench_word_search__"
+
+# Буквенные строки из md5: цифры заменяются буквами, чтобы триграммы были как у слов
+SEED_WORDS_SQL = text(
+    """
+    INSERT INTO words (english_word, russian_translation, category_id, user_id, is_public)
+    SELECT translate(substr(md5(g::text), 1, 6 + g % 6), '0123456789', 'ghijklmnop'),
+           translate(substr(md5((-g)::text), 1, 6 + g % 5), '0123456789abcdef',
+                     'абвгдежзиклмнопр'),
+           :category_id, NULL, true
+    FROM generate_series(1, :size) AS g
+    ON CONFLICT DO NOTHING
+    """
+)
+
+# Личные слова не участвуют: пользователь с несуществующим users.id
+USER_ID = -1
+
+
+def make_typo(word: str) -> str:
+    """Слово с одной опечаткой: замена, пропуск или перестановка букв"""
+    position = random.randrange(1, len(word) - 1)
+    kind = random.choice(("replace", "drop", "swap"))
+    if kind == "replace":
+        return word[:position] + random.choice("abcdefghijklmnop") + word[position + 1 :]
+    if kind == "drop":
+        return word[:position] + word[position + 1 :]
+    return word[: position - 1] + word[position] + word[position - 1] + word[position + 1 :]
+
+
+def make_queries(words: list[str]) -> dict[str, list[tuple[str, str]]]:
+    """Пары (запрос, искомое слово) для каждого вида запроса"""
+    return {
+        "точное": [(word, word) for word in words],
+        "начало": [(word[:5], word) for word in words],
+        "подстрока": [(word[1:5], word) for word in words],
+        "опечатка": [(make_typo(word), word) for word in words],
+    }
+
+
+async def ilike_search(session, user_id: int, term: str, limit: int = 10) -> list[Word]:
+    """Поиск так, как это делал dictionary_search_result до перехода на word_search"""
+    result = await session.execute(
+        select(Word)
+        .where(
+            or_(Word.user_id.is_(None), Word.user_id == user_id),
+            or_(
+                Word.english_word.ilike(f"%{term}%"),
+                Word.russian_translation.ilike(f"%{term}%"),
+            ),
+        )
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def measure(name: str, search, queries: dict[str, list[tuple[str, str]]]):
+    """Замерить задержку и долю найденных слов для каждого вида запроса"""
+    for kind, pairs in queries.items():
+        timings = []
+        found = 0
+        for term, expected in pairs:
+            async with async_session_maker() as session:
+                started = time.perf_counter()
+                words = await search(session, USER_ID, term, 10)
+                timings.append((time.perf_counter() - started) * 1000)
+            found += any(word.english_word == expected for word in words)
+
+        timings.sort()
+        p50 = statistics.median(timings)
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        print(
+            f"{name:<10} | {kind:<9} | p50 {p50:8.2f} мс | p99 {p99:8.2f} мс | "
+            f"найдено {found / len(pairs):6.1%}"
+        )
+
+
+async def run(size: int, queries_count: int, with_memory: bool):
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Category).where(Category.category_name == BENCH_CATEGORY)
+        )
+        category = result.scalar_one_or_none()
+        if not category:
+            category = Category(category_name=BENCH_CATEGORY)
+            session.add(category)
+            await session.commit()
+            await session.refresh(category)
+        category_id = category.id
+
+    try:
+        started = time.perf_counter()
+        async with async_session_maker() as session:
+            await session.execute(SEED_WORDS_SQL, {"category_id": category_id, "size": size})
+            await session.commit()
+            await session.execute(text("ANALYZE words"))
+            await session.commit()
+
+            result = await session.execute(
+                select(Word.english_word)
+                .where(Word.category_id == category_id)
+                .order_by(Word.id)
+                .offset(random.randrange(max(size - queries_count, 1)))
+                .limit(queries_count)
+            )
+            words = [word for word in result.scalars().all() if len(word) >= 6]
+        print(f"Добавлено слов: {size} за {time.perf_counter() - started:.1f} с")
+
+        queries = make_queries(words)
+        await measure("ILIKE", ilike_search, queries)
+        await measure("pg_trgm", PostgresSearchBackend().search, queries)
+
+        if with_memory:
+            memory = MemorySearchBackend()
+            started = time.perf_counter()
+            async with async_session_maker() as session:
+                await memory.search(session, USER_ID, "warmup", 10)
+            print(f"Индекс в памяти построен за {time.perf_counter() - started:.1f} с")
+            await measure("memory", memory.search, queries)
+    finally:
+        async with async_session_maker() as session:
+            await session.execute(delete(Word).where(Word.category_id == category_id))
+            await session.execute(delete(Category).where(Category.id == category_id))
+            await session.commit()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200, help="запросов каждого вида")
+    parser.add_argument("--with-memory", action="store_true", help="замерить и индекс в памяти")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.size, args.queries, args.with_memory))
+
+
+if __name__ == "__main__":
+    main()
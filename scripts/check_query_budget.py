@@ -0,0 +1,189 @@
+"""Проверка бюджета SQL-запросов обработчиков: число операторов на обновление
+
+Скрипт проводит ``--users`` тестовых пользователей через все основные
+обработчики бота (``bot.main.register_handlers`` с оберткой
+``instrument_handlers``): /start, меню, статистика, достижения, словарь,
+тренировка из ``--questions`` вопросов и режим повторения. Запросы к Bot API
+уходят в локальную заглушку (``scripts.bench_ingestion.FakeBotApi``).
+
+Для каждого обработчика по метрикам ``bot/database/query_stats.py`` выводятся
+число обновлений, среднее число SQL-операторов и время БД на обновление.
+Скрипт завершается с кодом 1, если хотя бы одно обновление выполнило больше
+``SQL_QUERY_BUDGET`` операторов, — так N+1 в ``bot/handlers`` видны в CI.
+Бюджет задается переменной окружения, например ``SQL_QUERY_BUDGET=6``.
+В конце тестовые данные удаляются.
+
+Запуск (нужна заполненная БД из DATABASE_URL, лучше отдельная, не рабочая):
+
+    python -m scripts.check_query_budget --users 5 --questions 5
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from sqlalchemy import delete
+from telegram import Update
+from telegram.ext import Application, TypeHandler
+
+from bot.config import SQL_QUERY_BUDGET
+from bot.database.database import async_session_maker, engine
+from bot.database.models import UserAchievement
+from bot.database.query_stats import db_time_per_update, queries_per_update, query_budget_exceeded
+from bot.instrumentation import instrument_handlers
+from bot.main import register_handlers
+from scripts.bench_ingestion import BOT_TOKEN, BOT_USER, FakeBotApi
+from scripts.stress_update_processing import cleanup_users
+
+# Диапазон telegram_id тестовых пользователей, не пересекается с реальными
+BENCH_TELEGRAM_ID_BASE = -9_600_000_000
+
+
+def user_taps(questions: int) -> list[str]:
+    """Нажатия одного пользователя: все основные экраны и одна тренировка"""
+    taps = [
+        "/start",
+        "main_menu",
+        "statistics_menu",
+        "statistics_detailed",
+        "achievements_menu",
+        "dictionary_menu",
+        "dictionary_my_words",
+        "training_start",
+        "training_direction_en_ru",
+    ]
+    for _ in range(questions):
+        taps += [f"answer_{random.randrange(4)}", "next_question"]
+    taps += ["training_end", "training_review", "training_end", "achievements_menu"]
+    return taps
+
+
+def make_update(update_id: int, telegram_id: int, tap: str) -> dict:
+    user = {"id": telegram_id, "is_bot": False, "first_name": "Bench"}
+    chat = {"id": telegram_id, "type": "private"}
+    if tap.startswith("/"):
+        return {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": chat,
+                "from": user,
+                "text": tap,
+                "entities": [{"type": "bot_command", "offset": 0, "length": len(tap)}],
+            },
+        }
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": user,
+            "chat_instance": str(telegram_id),
+            "data": tap,
+            "message": {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": chat,
+                "from": BOT_USER,
+                "text": "LinguaFlow",
+            },
+        },
+    }
+
+
+async def drive(telegram_ids: list[int], questions: int, api_port: int) -> int:
+    """Провести пользователей по обработчикам; возвращает число обновлений"""
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .base_url(f"http://127.0.0.1:{api_port}/bot")
+        .concurrent_updates(False)
+        .build()
+    )
+    register_handlers(application)
+    instrument_handlers(application)
+
+    updates = [
+        make_update(len(telegram_ids) * i + n + 1, telegram_id, tap)
+        for n, telegram_id in enumerate(telegram_ids)
+        for i, tap in enumerate(user_taps(questions))
+    ]
+    processed = 0
+    done = asyncio.Event()
+
+    async def count_update(update: Update, context):
+        nonlocal processed
+        processed += 1
+        if processed == len(updates):
+            done.set()
+
+    # Группа 1 выполняется после обработчика из группы 0
+    application.add_handler(TypeHandler(Update, count_update), group=1)
+
+    async with application:
+        await application.start()
+        for data in sorted(updates, key=lambda u: u["update_id"]):
+            await application.update_queue.put(Update.de_json(data, application.bot))
+        await done.wait()
+        await application.stop()
+    return len(updates)
+
+
+async def cleanup(telegram_ids: list[int]):
+    """Удалить тестовых пользователей вместе с достижениями, тренировками и статистикой"""
+    async with async_session_maker() as session:
+        await session.execute(
+            delete(UserAchievement).where(UserAchievement.user_id.in_(telegram_ids))
+        )
+        await session.commit()
+    await cleanup_users(telegram_ids)
+
+
+def report() -> bool:
+    """Таблица по обработчикам; True — бюджет нигде не превышен"""
+    print(f"{'обработчик':<36} | обн. | операторов | БД, мс | сверх бюджета")
+    ok = True
+    for (handler,), child in sorted(queries_per_update.children().items()):
+        count = child.count
+        if not count:
+            continue
+        db_time = db_time_per_update.labels(handler)
+        exceeded = query_budget_exceeded.labels(handler).value
+        ok = ok and not exceeded
+        print(
+            f"{handler:<36} | {count:4d} | {child.sum / count:10.1f} | "
+            f"{db_time.sum / count * 1000:6.1f} | {exceeded}"
+        )
+    return ok
+
+
+async def run(users: int, questions: int) -> bool:
+    api = FakeBotApi([], rate=0, rtt=0)
+    api_port = await api.start()
+    telegram_ids = [BENCH_TELEGRAM_ID_BASE - i for i in range(users)]
+    try:
+        total = await drive(telegram_ids, questions, api_port)
+        print(f"Обновлений: {total}, бюджет: {SQL_QUERY_BUDGET} операторов на обновление")
+        ok = report()
+    finally:
+        await cleanup(telegram_ids)
+        await api.stop()
+        await engine.dispose()
+    print("OK: бюджет не превышен" if ok else "ОШИБКА: есть обновления сверх бюджета")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=5, help="вопросов на пользователя")
+    args = parser.parse_args()
+
+    if not asyncio.run(run(args.users, args.questions)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+"""Проверка планов запросов обработчиков: EXPLAIN ANALYZE без Seq Scan на больших таблицах
+
+Скрипт заполняет БД тестовыми пользователями с личными словами, тренировками,
+ответами и статистикой, выполняет ``EXPLAIN (ANALYZE, FORMAT JSON)`` для каждого
+запроса из ``bot/handlers`` (и используемых ими функций репозитория, пула слов и
+журнала ответов) и завершается с кодом 1, если хотя бы в одном плане есть
+последовательное сканирование таблицы, в которой больше ``--min-rows`` строк.
+Изменяющие запросы выполняются в транзакции, которая откатывается. В конце
+тестовые данные удаляются.
+
+Запуск (нужна БД из DATABASE_URL с примененными миграциями, лучше отдельная):
+
+    python -m scripts.explain_handler_queries --users 200 --words 500 --sessions 50
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+
+from sqlalchemy import desc, func, or_, select, text
+
+from bot.database.answer_journal import (
+    INSERT_ANSWERS_SQL,
+    UPDATE_SESSIONS_SQL,
+    UPSERT_STATISTICS_SQL,
+)
+from bot.database.database import async_session_maker, engine
+from bot.database.models import (
+    Answer,
+    Category,
+    Statistics,
+    TrainingSession,
+    User,
+    UserAchievement,
+    UserStatsSummary,
+    Word,
+)
+from bot.database.pagination import NEXT, PREV, Cursor, user_words_query
+from bot.database.repository import RECORD_ANSWER_SQL, RECORD_SESSION_STARTED_SQL
+from bot.database.review import due_words_query
+from bot.database.search import SEARCH_WORDS_AFTER_SQL, SEARCH_WORDS_SQL, escape_like
+
+# Диапазон telegram_id тестовых пользователей, не пересекается с реальными
+BENCH_TELEGRAM_ID_BASE = -9_200_000_000
+
+SEED_USERS_SQL = text(
+    """
+    INSERT INTO users (telegram_id)
+    SELECT :base - n FROM generate_series(0, :users - 1) AS n
+    """
+)
+
+SEED_WORDS_SQL = text(
+    """
+    INSERT INTO words (english_word, russian_translation, category_id, user_id, is_public)
+    SELECT 'explain_' || u.id || '_' || n, 'проверка_' || n, :category_id, u.id, true
+    FROM users u, generate_series(1, :words) AS n
+    WHERE u.telegram_id <= :base AND u.telegram_id > :base - :users
+    """
+)
+
+SEED_SESSIONS_SQL = text(
+    """
+    INSERT INTO training_sessions (user_id, session_type, total_questions, correct_answers,
+                                   accuracy, created_at)
+    SELECT u.telegram_id, 'multiple_choice', 10, n % 11, (n % 11) * 10.0,
+           now() - make_interval(hours => n)
+    FROM users u, generate_series(1, :sessions) AS n
+    WHERE u.telegram_id <= :base AND u.telegram_id > :base - :users
+    """
+)
+
+SEED_STATISTICS_SQL = text(
+    """
+    INSERT INTO statistics (user_id, word_id, mastered_level, next_review)
+    SELECT u.telegram_id, w.id, w.id % 6, LOCALTIMESTAMP + make_interval(hours => w.id % 97 - 48)
+    FROM users u
+    JOIN words w ON w.user_id = u.id
+    WHERE u.telegram_id <= :base AND u.telegram_id > :base - :users
+    """
+)
+
+# По 10 ответов на каждую тренировку на личные слова ее пользователя
+SEED_ANSWERS_SQL = text(
+    """
+    INSERT INTO answers (session_id, user_id, word_id, question_type, user_answer, is_correct)
+    SELECT ts.id, ts.user_id, w.id, 'multiple_choice', '0', (ts.id + n) % 3 > 0
+    FROM training_sessions ts
+    JOIN users u ON u.telegram_id = ts.user_id
+    CROSS JOIN generate_series(1, 10) AS n
+    JOIN LATERAL (
+        SELECT id FROM words WHERE user_id = u.id ORDER BY id OFFSET n - 1 LIMIT 1
+    ) w ON true
+    WHERE ts.user_id <= :base AND ts.user_id > :base - :users
+    """
+)
+
+CLEANUP_SQL = [
+    "DELETE FROM answers WHERE user_id <= :base AND user_id > :base - :users",
+    "DELETE FROM statistics WHERE user_id <= :base AND user_id > :base - :users",
+    "DELETE FROM training_sessions WHERE user_id <= :base AND user_id > :base - :users",
+    "DELETE FROM user_achievements WHERE user_id <= :base AND user_id > :base - :users",
+    "DELETE FROM user_stats_summary WHERE user_id <= :base AND user_id > :base - :users",
+    """
+    DELETE FROM words
+    WHERE user_id IN (
+        SELECT id FROM users WHERE telegram_id <= :base AND telegram_id > :base - :users
+    )
+    """,
+    "DELETE FROM users WHERE telegram_id <= :base AND telegram_id > :base - :users",
+]
+
+
+def orm_queries(
+    telegram_id: int, db_user_id: int, session_id: int, word_id: int
+) -> list[tuple[str, object]]:
+    """Запросы обработчиков в том виде, в котором они строятся в bot/handlers"""
+    search_term = "explain_1"
+    return [
+        (
+            "repository.get_user_id_by_telegram_id",
+            select(User.id).where(User.telegram_id == telegram_id),
+        ),
+        (
+            "achievements_menu",
+            select(
+                User.id,
+                UserStatsSummary,
+                select(func.array_agg(UserAchievement.achievement_id))
+                .where(UserAchievement.user_id == User.telegram_id)
+                .scalar_subquery(),
+            )
+            .outerjoin(UserStatsSummary, UserStatsSummary.user_id == User.telegram_id)
+            .where(User.telegram_id == telegram_id),
+        ),
+        (
+            "statistics_menu",
+            select(
+                User.id,
+                UserStatsSummary,
+                (UserStatsSummary.today_date == func.current_date()).label("is_today"),
+            )
+            .outerjoin(UserStatsSummary, UserStatsSummary.user_id == User.telegram_id)
+            .where(User.telegram_id == telegram_id),
+        ),
+        (
+            "statistics_detailed: последние тренировки",
+            select(TrainingSession)
+            .where(TrainingSession.user_id == telegram_id)
+            .order_by(desc(TrainingSession.created_at))
+            .limit(5),
+        ),
+        (
+            "statistics_detailed: слова для повторения",
+            due_words_query(telegram_id, 5),
+        ),
+        (
+            "ask_question / training_review: review.fetch_due_word",
+            due_words_query(telegram_id, 1, [word_id, word_id + 1]),
+        ),
+        (
+            "dictionary_menu / save_new_word: количество слов",
+            select(func.count(Word.id)).where(
+                or_(Word.user_id.is_(None), Word.user_id == db_user_id), Word.is_public
+            ),
+        ),
+        (
+            "save_new_word / dictionary_delete_word: поиск слова пользователя",
+            select(Word).where(Word.english_word == search_term, Word.user_id == db_user_id),
+        ),
+        (
+            "save_new_word: категория",
+            select(Category).where(Category.category_name.like("%Разработка ПО%")),
+        ),
+        (
+            "dictionary_my_words: первая страница",
+            user_words_query(db_user_id, None, 21),
+        ),
+        (
+            "dictionary_my_words: следующая страница",
+            user_words_query(db_user_id, Cursor(NEXT, word_id), 21),
+        ),
+        (
+            "dictionary_my_words: предыдущая страница",
+            user_words_query(db_user_id, Cursor(PREV, word_id + 100), 21),
+        ),
+        (
+            "dictionary_delete_word: ответы на слово",
+            select(Answer).where(Answer.word_id == word_id),
+        ),
+        (
+            "dictionary_delete_word: статистика слова",
+            select(Statistics).where(Statistics.word_id == word_id),
+        ),
+        (
+            "word_pool: общие слова",
+            select(Word.id).where(Word.user_id.is_(None), Word.is_public),
+        ),
+        (
+            "word_pool: слова пользователя",
+            select(Word.id).where(Word.user_id == db_user_id),
+        ),
+        (
+            "word_pool.sample",
+            select(Word).where(Word.id.in_([word_id, word_id + 1, word_id + 2, word_id + 3])),
+        ),
+        (
+            "handle_answer / training_end: тренировка",
+            select(TrainingSession).where(TrainingSession.id == session_id),
+        ),
+    ]
+
+
+def text_queries(
+    telegram_id: int, db_user_id: int, session_id: int, word_id: int
+) -> list[tuple[str, object, dict]]:
+    """Запросы из text(), которые выполняют обработчики и журнал ответов"""
+    now = datetime.now()
+    return [
+        (
+            "dictionary_search_result: word_search",
+            SEARCH_WORDS_SQL,
+            {
+                "user_id": db_user_id,
+                "term": "explain_1",
+                "prefix": f"{escape_like('explain_1')}%",
+                "contains": f"%{escape_like('explain_1')}%",
+                "limit": 10,
+            },
+        ),
+        (
+            "dictionary_search_page: word_search, следующая страница",
+            SEARCH_WORDS_AFTER_SQL,
+            {
+                "user_id": db_user_id,
+                "term": "explain_1",
+                "prefix": f"{escape_like('explain_1')}%",
+                "contains": f"%{escape_like('explain_1')}%",
+                "limit": 10,
+                "cursor_id": word_id,
+            },
+        ),
+        (
+            "handle_answer: record_answer",
+            RECORD_ANSWER_SQL,
+            {
+                "session_id": session_id,
+                "user_id": telegram_id,
+                "word_id": word_id,
+                "question_type": "multiple_choice",
+                "user_answer": "0",
+                "correct": 1,
+            },
+        ),
+        (
+            "training_direction: record_session_started",
+            RECORD_SESSION_STARTED_SQL,
+            {"telegram_id": telegram_id},
+        ),
+        (
+            "answer_journal: ответы",
+            INSERT_ANSWERS_SQL,
+            {
+                "session_ids": [session_id],
+                "user_ids": [telegram_id],
+                "word_ids": [word_id],
+                "question_types": ["multiple_choice"],
+                "user_answers": ["0"],
+                "is_correct": [True],
+                "answered_at": [now],
+            },
+        ),
+        (
+            "answer_journal: тренировки",
+            UPDATE_SESSIONS_SQL,
+            {"session_ids": [session_id], "answered": [1], "correct": [1]},
+        ),
+        (
+            "answer_journal: статистика",
+            UPSERT_STATISTICS_SQL,
+            {
+                "user_ids": [telegram_id],
+                "word_ids": [word_id],
+                "shifts": [1],
+                "lows": [1],
+                "highs": [5],
+            },
+        ),
+    ]
+
+
+def seq_scans(plan: dict) -> list[str]:
+    """Имена таблиц, которые план читает последовательным сканированием"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", ()):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def explain(session, statement, params: dict | None = None) -> dict:
+    """Выполнить EXPLAIN ANALYZE и вернуть корневой узел плана
+
+    Запросы ORM подставляются в SQL с литералами, запросы из text() выполняются
+    с параметрами.
+    """
+    if params is None:
+        compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+        connection = await session.connection()
+        result = await connection.exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {compiled}")
+    else:
+        result = await session.execute(
+            text(f"EXPLAIN (ANALYZE, FORMAT JSON) {statement.text}"), params
+        )
+    document = result.scalar_one()
+    if isinstance(document, str):
+        document = json.loads(document)
+    return document[0]
+
+
+async def table_sizes(session) -> dict[str, float]:
+    """Оценка числа строк в таблицах по статистике планировщика"""
+    result = await session.execute(
+        text(
+            "SELECT relname, reltuples FROM pg_class "
+            "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+        )
+    )
+    return dict(result.all())
+
+
+async def setup(users: int, words: int, sessions: int):
+    """Заполнить БД тестовыми данными и обновить статистику планировщика"""
+    params = {"base": BENCH_TELEGRAM_ID_BASE, "users": users, "words": words, "sessions": sessions}
+    async with async_session_maker() as session:
+        result = await session.execute(select(Category.id).limit(1))
+        category_id = result.scalar_one_or_none()
+        if category_id is None:
+            raise SystemExit("В БД нет категорий: запустите python -m bot.database.init_data")
+        params["category_id"] = category_id
+
+        for statement in (
+            SEED_USERS_SQL,
+            SEED_WORDS_SQL,
+            SEED_SESSIONS_SQL,
+            SEED_STATISTICS_SQL,
+            SEED_ANSWERS_SQL,
+        ):
+            await session.execute(statement, params)
+        await session.commit()
+
+        for table in ("users", "words", "training_sessions", "statistics", "answers"):
+            await session.execute(text(f"ANALYZE {table}"))
+        await session.commit()
+
+
+async def cleanup(users: int):
+    """Удалить тестовых пользователей и все их данные"""
+    params = {"base": BENCH_TELEGRAM_ID_BASE, "users": users}
+    async with async_session_maker() as session:
+        for statement in CLEANUP_SQL:
+            await session.execute(text(statement), params)
+        await session.commit()
+
+
+async def check(users: int, min_rows: int) -> bool:
+    """Проверить планы всех запросов, вернуть True, если Seq Scan на больших таблицах нет"""
+    telegram_id = BENCH_TELEGRAM_ID_BASE - users // 2
+    ok = True
+
+    async with async_session_maker() as session:
+        sizes = await table_sizes(session)
+
+        result = await session.execute(select(User.id).where(User.telegram_id == telegram_id))
+        db_user_id = result.scalar_one()
+        result = await session.execute(
+            select(Word.id).where(Word.user_id == db_user_id).order_by(Word.id).limit(1)
+        )
+        word_id = result.scalar_one()
+        result = await session.execute(
+            select(func.max(TrainingSession.id)).where(TrainingSession.user_id == telegram_id)
+        )
+        session_id = result.scalar_one()
+
+        plans = []
+        for name, statement in orm_queries(telegram_id, db_user_id, session_id, word_id):
+            plans.append((name, await explain(session, statement)))
+        for name, statement, params in text_queries(telegram_id, db_user_id, session_id, word_id):
+            plans.append((name, await explain(session, statement, params)))
+
+        # Изменения, сделанные EXPLAIN ANALYZE, не сохраняются
+        await session.rollback()
+
+    for name, document in plans:
+        large = [table for table in seq_scans(document["Plan"]) if sizes.get(table, 0) >= min_rows]
+        status = "ok" if not large else "SEQ SCAN: " + ", ".join(sorted(set(large)))
+        print(f"{document['Execution Time']:9.3f} мс | {status:<30} | {name}")
+        ok = ok and not large
+
+    return ok
+
+
+async def run(users: int, words: int, sessions: int, min_rows: int) -> bool:
+    await setup(users, words, sessions)
+    try:
+        return await check(users, min_rows)
+    finally:
+        await cleanup(users)
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--words", type=int, default=500, help="личных слов на пользователя")
+    parser.add_argument("--sessions", type=int, default=50, help="тренировок на пользователя")
+    parser.add_argument(
+        "--min-rows", type=int, default=10_000, help="с какого размера таблица считается большой"
+    )
+    args = parser.parse_args()
+
+    ok = asyncio.run(run(args.users, args.words, args.sessions, args.min_rows))
+    if not ok:
+        print("Найдены последовательные сканирования больших таблиц")
+        sys.exit(1)
+    print("Все запросы используют индексы")
+
+
+if __name__ == "__main__":
+    main()
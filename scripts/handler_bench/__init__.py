@@ -0,0 +1 @@
+"""Микробенчмарк обработчиков бота: python -m scripts.handler_bench (см. __main__.py)"""
@@ -0,0 +1,134 @@
+"""Микробенчмарк обработчиков: прямой вызов корутин bot/handlers с поддельными Update
+
+Команды:
+
+* ``run`` — заполнить БД данными масштаба ``--scale`` (или ``--users``,
+  ``--words``, ``--sessions``), выполнить каждый случай ``--iterations`` раз
+  после ``--warmup`` прогревочных вызовов, вывести таблицу и записать JSON в
+  ``--output``. ``--cases`` ограничивает список случаев. В конце тестовые
+  данные удаляются.
+* ``compare`` — сравнить JSON текущего прогона с базовым; код выхода 1, если
+  p50/p95 выросли больше чем на ``--threshold`` (и на ``--min-delta-ms`` мс),
+  выросло число SQL-операторов или вызовов Telegram или появились ошибки.
+
+Запуск (нужна заполненная БД из DATABASE_URL, лучше отдельная, не рабочая):
+
+    python -m scripts.handler_bench run --scale medium --output baseline.json
+    python -m scripts.handler_bench run --scale medium --output current.json
+    python -m scripts.handler_bench compare baseline.json current.json
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+from bot.database.database import engine
+from scripts.handler_bench.cases import CASES, run_case
+from scripts.handler_bench.compare import load, print_comparison, regressions, save
+from scripts.handler_bench.seed import SCALES, cleanup, seed
+
+
+def git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+async def run(args: argparse.Namespace) -> dict:
+    scale = SCALES[args.scale]
+    overrides = {
+        key: getattr(args, key) for key in ("users", "words", "sessions") if getattr(args, key)
+    }
+    scale = dataclasses.replace(scale, **overrides)
+    cases = [case for case in CASES if not args.cases or case.name in args.cases]
+
+    user = await seed(scale)
+    try:
+        print(
+            f"Масштаб {args.scale}: пользователей {scale.users}, слов {scale.words}, "
+            f"тренировок {scale.sessions} на пользователя; итераций {args.iterations}"
+        )
+        print(
+            f"{'случай':<26} | p50, мс | p95, мс | p99, мс | операторов | БД, мс "
+            f"| Telegram | ошибок"
+        )
+        results = {}
+        for case in cases:
+            result = await run_case(case, user, args.iterations, args.warmup)
+            results[case.name] = result
+            print(
+                f"{case.name:<26} | {result['p50_ms']:7.2f} | {result['p95_ms']:7.2f} | "
+                f"{result['p99_ms']:7.2f} | {result['statements']:10.1f} | "
+                f"{result['db_ms']:6.2f} | {result['telegram_calls']:8.1f} | {result['errors']}"
+            )
+    finally:
+        await cleanup(scale)
+        await engine.dispose()
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "scale": {"name": args.scale, **scale.to_dict()},
+        "iterations": args.iterations,
+        "cases": results,
+    }
+
+
+def compare(args: argparse.Namespace) -> bool:
+    baseline = load(args.baseline)
+    current = load(args.current)
+    print_comparison(baseline, current)
+    found = regressions(baseline, current, args.threshold, args.min_delta_ms)
+    for line in found:
+        print(f"РЕГРЕССИЯ {line}")
+    print("OK: регрессий нет" if not found else f"ОШИБКА: регрессий {len(found)}")
+    return not found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="выполнить бенчмарк")
+    run_parser.add_argument("--scale", choices=SCALES, default="small")
+    run_parser.add_argument("--users", type=int, help="пользователей вместо значения масштаба")
+    run_parser.add_argument("--words", type=int, help="личных слов на пользователя")
+    run_parser.add_argument("--sessions", type=int, help="тренировок на пользователя")
+    run_parser.add_argument("--iterations", type=int, default=200)
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument(
+        "--cases",
+        type=lambda value: value.split(","),
+        help="случаи через запятую: " + ",".join(case.name for case in CASES),
+    )
+    run_parser.add_argument("--output", help="файл JSON с результатами")
+
+    compare_parser = commands.add_parser("compare", help="сравнить с базовой линией")
+    compare_parser.add_argument("baseline", help="JSON базового прогона")
+    compare_parser.add_argument("current", help="JSON текущего прогона")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.2, help="допустимый рост времени, доля"
+    )
+    compare_parser.add_argument("--min-delta-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = asyncio.run(run(args))
+        if args.output:
+            save(args.output, results)
+            print(f"Результаты записаны в {args.output}")
+    elif not compare(args):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Случаи бенчмарка: обработчик, подготовка состояния и проверка ответа
+
+Каждый случай вызывает корутину из bot/handlers напрямую с поддельными
+``Update`` и контекстом (scripts/handler_bench/fakes.py). Подготовка
+``user_data`` и ожидание фоновых задач обработчика не входят в замер. Для
+каждого вызова записываются время, SQL-операторы (``track_queries``) и
+исходящие вызовы Telegram. Ошибкой случая считается вызов, во время которого
+(вместе с фоновыми задачами) код бота записал в лог ошибку, или ответ,
+начинающийся с «Ошибка» (пользователь не найден). Эмодзи «❌» признаком не
+служит: с него начинается и обычный ответ «Неправильно» в ``handle_answer``.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from bot.database.deck import DECK_KEY
+from bot.database.query_stats import track_queries
+from bot.handlers import achievements, dictionary, start, statistics, training
+from bot.question_prefetch import question_prefetcher
+from scripts.handler_bench.fakes import (
+    FakeApplication,
+    FakeContext,
+    FakeUpdate,
+    TelegramRecorder,
+)
+from scripts.handler_bench.seed import BenchUser
+
+# Начало текста ответа, по которому вызов считается неуспешным
+ERROR_PREFIXES = ("Ошибка",)
+
+
+class _ErrorCounter(logging.Handler):
+    """Число записей уровня ERROR и выше в логгерах бота"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord):
+        self.count += 1
+
+
+@dataclass(slots=True)
+class Call:
+    """Вызов обработчика: обновление, контекст и корутина"""
+
+    update: FakeUpdate
+    context: FakeContext
+    handler: Callable[[FakeUpdate, FakeContext], Awaitable]
+
+
+@dataclass(frozen=True, slots=True)
+class Case:
+    """Случай бенчмарка: ``prepare`` строит вызов для очередной итерации"""
+
+    name: str
+    prepare: Callable[[BenchUser, TelegramRecorder, FakeApplication, int], Call]
+    description: str
+
+
+def _callback(handler, data: str, user_data: dict | None = None):
+    def prepare(user: BenchUser, recorder, application, iteration: int) -> Call:
+        update = FakeUpdate(recorder, user.telegram_id, data=data)
+        return Call(update, FakeContext(application, user_data or {}), handler)
+
+    return prepare
+
+
+def _message(handler, text: str):
+    def prepare(user: BenchUser, recorder, application, iteration: int) -> Call:
+        update = FakeUpdate(recorder, user.telegram_id, text=text)
+        return Call(update, FakeContext(application), handler)
+
+    return prepare
+
+
+def _ask_question(cold: bool):
+    # Колода переживает итерации, как user_data одного пользователя между вопросами
+    user_data = {"training_direction": "en_ru", "training_mode": "random"}
+
+    def prepare(user: BenchUser, recorder, application, iteration: int) -> Call:
+        if cold:
+            user_data.pop(DECK_KEY, None)
+        update = FakeUpdate(recorder, user.telegram_id, data="next_question")
+        return Call(update, FakeContext(application, user_data), training.ask_question)
+
+    return prepare
+
+
+def _handle_answer(user: BenchUser, recorder, application, iteration: int) -> Call:
+    user_data = {
+        "training_direction": "en_ru",
+        "training_mode": "random",
+        "training_session_id": user.session_id,
+        "correct_word_id": user.word_ids[iteration % len(user.word_ids)],
+        "correct_answer_index": iteration % 4,
+    }
+    update = FakeUpdate(recorder, user.telegram_id, data=f"answer_{iteration % 3}")
+    return Call(update, FakeContext(application, user_data), training.handle_answer)
+
+
+def _dictionary_search_result(user: BenchUser, recorder, application, iteration: int) -> Call:
+    # Слова пользователя засеяны как explain_<users.id>_<n>
+    term = f"explain_{user.db_user_id}_{iteration % 10 + 1}"
+    update = FakeUpdate(recorder, user.telegram_id, text=term)
+    context = FakeContext(application, {"dictionary_state": "searching"})
+    return Call(update, context, dictionary.dictionary_search_result)
+
+
+_new_words = itertools.count(1)
+
+
+def _save_new_word(user: BenchUser, recorder, application, iteration: int) -> Call:
+    user_data = {
+        "dictionary_state": "waiting_example",
+        "new_word_english": f"handlerbench{next(_new_words)}",
+        "new_word_russian": "замер",
+    }
+    update = FakeUpdate(recorder, user.telegram_id, data="dictionary_add_skip_example")
+    return Call(update, FakeContext(application, user_data), dictionary.save_new_word)
+
+
+CASES = [
+    Case(
+        "start_command",
+        _message(start.start_command, "/start"),
+        "/start существующего пользователя",
+    ),
+    Case("ask_question", _ask_question(cold=False), "вопрос из колоды в user_data"),
+    Case("ask_question_cold", _ask_question(cold=True), "вопрос с выборкой колоды из БД"),
+    Case("handle_answer", _handle_answer, "запись ответа и подготовка следующего вопроса"),
+    Case(
+        "dictionary_search_result",
+        _dictionary_search_result,
+        "поиск по словарю с первой страницей результатов",
+    ),
+    Case(
+        "statistics_menu",
+        _callback(statistics.statistics_menu, "statistics_menu"),
+        "меню статистики",
+    ),
+    Case(
+        "statistics_detailed",
+        _callback(statistics.statistics_detailed, "statistics_detailed"),
+        "последние тренировки и слова к повторению",
+    ),
+    Case(
+        "achievements_menu",
+        _callback(achievements.achievements_menu, "achievements_menu"),
+        "достижения по счетчикам пользователя",
+    ),
+    Case("save_new_word", _save_new_word, "сохранение нового слова без примера"),
+]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def run_case(case: Case, user: BenchUser, iterations: int, warmup: int) -> dict:
+    """Выполнить случай и вернуть сводку замеров"""
+    recorder = TelegramRecorder()
+    application = FakeApplication()
+    timings = []
+    statements = []
+    db_times = []
+    calls = 0
+    errors = 0
+    logged = _ErrorCounter()
+    bot_logger = logging.getLogger("bot")
+    bot_logger.addHandler(logged)
+    try:
+        for iteration in range(warmup + iterations):
+            call = case.prepare(user, recorder, application, iteration)
+            recorder.clear()
+            logged_before = logged.count
+            started = time.perf_counter()
+            with track_queries(f"bench:{case.name}") as stats:
+                await call.handler(call.update, call.context)
+            elapsed = time.perf_counter() - started
+
+            # Фоновые задачи (догрузка колоды, подготовка вопроса) — вне замера
+            question_prefetcher.cancel(user.telegram_id, count=False)
+            await application.drain()
+            await asyncio.sleep(0)
+
+            if iteration < warmup:
+                continue
+            timings.append(elapsed * 1000)
+            statements.append(stats.statements)
+            db_times.append(stats.db_time * 1000)
+            calls += len(recorder.calls)
+            failed = any(c.text.startswith(ERROR_PREFIXES) for c in recorder.calls)
+            errors += failed or logged.count > logged_before
+    finally:
+        bot_logger.removeHandler(logged)
+
+    return {
+        "description": case.description,
+        "iterations": iterations,
+        "mean_ms": sum(timings) / iterations,
+        "p50_ms": percentile(timings, 0.5),
+        "p95_ms": percentile(timings, 0.95),
+        "p99_ms": percentile(timings, 0.99),
+        "statements": sum(statements) / iterations,
+        "db_ms": sum(db_times) / iterations,
+        "telegram_calls": calls / iterations,
+        "errors": errors,
+    }
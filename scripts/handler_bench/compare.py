@@ -0,0 +1,59 @@
+"""Сравнение результатов бенчмарка с сохраненной базовой линией"""
+
+import json
+
+# Показатели времени, по которым ищется регрессия
+TIMING_KEYS = ("p50_ms", "p95_ms")
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save(path: str, results: dict):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+def regressions(baseline: dict, current: dict, threshold: float, min_delta_ms: float) -> list[str]:
+    """Описания регрессий текущего прогона относительно базового
+
+    Время считается выросшим, если оно больше базового и на долю ``threshold``,
+    и на ``min_delta_ms`` мс (шум на коротких обработчиках не учитывается).
+    Любой рост числа SQL-операторов или вызовов Telegram и новые ошибки — тоже
+    регрессия.
+    """
+    found = []
+    for name, base in baseline["cases"].items():
+        case = current["cases"].get(name)
+        if case is None:
+            found.append(f"{name}: нет в текущем прогоне")
+            continue
+        for key in TIMING_KEYS:
+            delta = case[key] - base[key]
+            if delta > min_delta_ms and delta > base[key] * threshold:
+                growth = f" (+{delta / base[key]:.0%})" if base[key] else ""
+                found.append(f"{name}: {key} {base[key]:.2f} → {case[key]:.2f} мс{growth}")
+        for key in ("statements", "telegram_calls"):
+            if case[key] > base[key] + 1e-9:
+                found.append(f"{name}: {key} {base[key]:.1f} → {case[key]:.1f}")
+        if case["errors"] > base["errors"]:
+            found.append(f"{name}: ошибок {base['errors']} → {case['errors']}")
+    return found
+
+
+def print_comparison(baseline: dict, current: dict):
+    if baseline.get("scale") != current.get("scale"):
+        print(f"Внимание: масштабы различаются: {baseline.get('scale')} и {current.get('scale')}")
+    print(f"{'случай':<26} | p50 база → сейчас, мс | p95 база → сейчас, мс | операторов")
+    for name, case in current["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            print(f"{name:<26} | новый случай")
+            continue
+        print(
+            f"{name:<26} | {base['p50_ms']:8.2f} → {case['p50_ms']:8.2f} | "
+            f"{base['p95_ms']:8.2f} → {case['p95_ms']:8.2f} | "
+            f"{base['statements']:.1f} → {case['statements']:.1f}"
+        )
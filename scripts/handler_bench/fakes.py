@@ -0,0 +1,123 @@
+"""Легкие заменители Update, CallbackQuery и контекста для прямого вызова обработчиков
+
+Обработчики из bot/handlers используют небольшую часть API python-telegram-bot:
+``update.effective_user``, ``update.message.reply_text``, ``update.callback_query``
+(``answer``, ``edit_message_text``, ``from_user``, ``data``), ``context.user_data``
+и ``context.application.create_task``. Здесь эти объекты заменены простыми
+классами: исходящие вызовы не идут в сеть, а записываются в ``TelegramRecorder``.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class TelegramCall:
+    """Исходящий вызов Bot API, который сделал обработчик"""
+
+    method: str
+    text: str = ""
+    kwargs: dict = field(default_factory=dict)
+
+
+class TelegramRecorder:
+    """Заглушка Telegram: записывает вызовы вместо отправки"""
+
+    def __init__(self):
+        self.calls: list[TelegramCall] = []
+
+    def record(self, method: str, text: str = "", **kwargs):
+        self.calls.append(TelegramCall(method, text, kwargs))
+
+    def clear(self):
+        self.calls.clear()
+
+
+@dataclass(slots=True)
+class FakeUser:
+    id: int
+    is_bot: bool = False
+    first_name: str = "Bench"
+
+
+class FakeMessage:
+    def __init__(self, recorder: TelegramRecorder, chat_id: int, text: str = ""):
+        self.recorder = recorder
+        self.chat_id = chat_id
+        self.message_id = 1
+        self.date = int(time.time())
+        self.text = text
+
+    async def reply_text(self, text: str, **kwargs):
+        self.recorder.record("sendMessage", text, chat_id=self.chat_id, **kwargs)
+        return FakeMessage(self.recorder, self.chat_id, text)
+
+
+class FakeCallbackQuery:
+    def __init__(self, recorder: TelegramRecorder, user: FakeUser, data: str):
+        self.recorder = recorder
+        self.id = "1"
+        self.from_user = user
+        self.data = data
+        self.message = FakeMessage(recorder, user.id, "LinguaFlow")
+
+    async def answer(self, text: str | None = None, **kwargs) -> bool:
+        self.recorder.record("answerCallbackQuery", text or "", **kwargs)
+        return True
+
+    async def edit_message_text(self, text: str, **kwargs):
+        self.recorder.record("editMessageText", text, chat_id=self.from_user.id, **kwargs)
+        return FakeMessage(self.recorder, self.from_user.id, text)
+
+
+class FakeUpdate:
+    """Обновление с сообщением или нажатием кнопки"""
+
+    def __init__(
+        self,
+        recorder: TelegramRecorder,
+        telegram_id: int,
+        text: str | None = None,
+        data: str | None = None,
+    ):
+        self.effective_user = FakeUser(telegram_id)
+        self.message = FakeMessage(recorder, telegram_id, text) if text is not None else None
+        self.callback_query = (
+            FakeCallbackQuery(recorder, self.effective_user, data) if data is not None else None
+        )
+
+    @property
+    def effective_message(self) -> FakeMessage | None:
+        if self.message is not None:
+            return self.message
+        return self.callback_query.message if self.callback_query is not None else None
+
+
+class FakeApplication:
+    """Приложение с ``create_task``: фоновые задачи обработчика собираются для ожидания"""
+
+    def __init__(self):
+        self.tasks: set[asyncio.Task] = set()
+
+    def create_task(self, coroutine, update=None, *, name: str | None = None) -> asyncio.Task:
+        task = asyncio.create_task(coroutine, name=name)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def drain(self):
+        """Дождаться фоновых задач (вне замера)"""
+        while self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+
+class FakeContext:
+    """Контекст обработчика: user_data пользователя и приложение"""
+
+    def __init__(self, application: FakeApplication, user_data: dict | None = None):
+        self.application = application
+        self.user_data = user_data if user_data is not None else {}
+        self.chat_data: dict = {}
+        self.bot_data: dict = {}
+        self.error: Exception | None = None
@@ -0,0 +1,109 @@
+"""Тестовые данные бенчмарка обработчиков в локальной БД
+
+Пользователи с личными словами, тренировками, ответами и статистикой создаются
+теми же запросами, что и в scripts/explain_handler_queries.py, в своем
+диапазоне telegram_id. Объем задается масштабом из ``SCALES``.
+"""
+
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import func, select, text
+
+from bot.database.database import async_session_maker
+from bot.database.models import Category, TrainingSession, User, Word
+from bot.database.rebuild_stats import rebuild_user_stats
+from scripts.explain_handler_queries import (
+    CLEANUP_SQL,
+    SEED_ANSWERS_SQL,
+    SEED_SESSIONS_SQL,
+    SEED_STATISTICS_SQL,
+    SEED_USERS_SQL,
+    SEED_WORDS_SQL,
+)
+
+# Диапазон telegram_id тестовых пользователей, не пересекается с реальными
+BENCH_TELEGRAM_ID_BASE = -9_800_000_000
+
+
+@dataclass(frozen=True, slots=True)
+class Scale:
+    """Объем данных: пользователи и личные слова, тренировки на пользователя"""
+
+    users: int
+    words: int
+    sessions: int
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+SCALES = {
+    "small": Scale(users=100, words=100, sessions=20),
+    "medium": Scale(users=1000, words=300, sessions=50),
+    "large": Scale(users=2000, words=500, sessions=100),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class BenchUser:
+    """Пользователь, от имени которого вызываются обработчики"""
+
+    telegram_id: int
+    db_user_id: int
+    session_id: int
+    word_ids: tuple[int, ...]
+
+
+def _params(scale: Scale) -> dict:
+    return {"base": BENCH_TELEGRAM_ID_BASE, **scale.to_dict()}
+
+
+async def seed(scale: Scale) -> BenchUser:
+    """Заполнить БД и вернуть пользователя из середины диапазона"""
+    params = _params(scale)
+    async with async_session_maker() as session:
+        result = await session.execute(select(Category.id).limit(1))
+        category_id = result.scalar_one_or_none()
+        if category_id is None:
+            raise SystemExit("В БД нет категорий: запустите python -m bot.database.init_data")
+        params["category_id"] = category_id
+
+        for statement in (
+            SEED_USERS_SQL,
+            SEED_WORDS_SQL,
+            SEED_SESSIONS_SQL,
+            SEED_STATISTICS_SQL,
+            SEED_ANSWERS_SQL,
+        ):
+            await session.execute(statement, params)
+
+        telegram_id = BENCH_TELEGRAM_ID_BASE - scale.users // 2
+        # Счетчики меню статистики и достижений (user_stats_summary)
+        await rebuild_user_stats(session, telegram_id)
+        await session.commit()
+
+        for table in ("users", "words", "training_sessions", "statistics", "answers"):
+            await session.execute(text(f"ANALYZE {table}"))
+        await session.commit()
+
+        result = await session.execute(select(User.id).where(User.telegram_id == telegram_id))
+        db_user_id = result.scalar_one()
+        result = await session.execute(
+            select(func.max(TrainingSession.id)).where(TrainingSession.user_id == telegram_id)
+        )
+        session_id = result.scalar_one()
+        result = await session.execute(
+            select(Word.id).where(Word.user_id == db_user_id).order_by(Word.id).limit(20)
+        )
+        word_ids = tuple(result.scalars().all())
+
+    return BenchUser(telegram_id, db_user_id, session_id, word_ids)
+
+
+async def cleanup(scale: Scale):
+    """Удалить тестовых пользователей и все их данные"""
+    params = _params(scale)
+    async with async_session_maker() as session:
+        for statement in CLEANUP_SQL:
+            await session.execute(text(statement), params)
+        await session.commit()
@@ -0,0 +1,519 @@
+"""Нагрузочный тест бота виртуальными пользователями на локальной заглушке Bot API
+
+Скрипт запускает ``python -m bot.main`` (long polling, ``PERSISTENCE_BACKEND=none``,
+без ``TELEGRAM_RATE_LIMIT``, сервер метрик на ``--metrics-port``), направив Bot API на локальную заглушку
+(``VirtualBotApi``: getUpdates, sendMessage, editMessageText,
+answerCallbackQuery), и проводит ``--users`` виртуальных пользователей через
+сценарии бота. Пользователи подключаются равномерно за ``--ramp-s`` секунд и
+работают ``--duration`` секунд; каждый ждет ответ бота, «думает» около
+``--think-ms`` мс и нажимает кнопку из полученной клавиатуры:
+
+* /start (``start_command``) — один раз в начале;
+* тренировка: ``training_start`` → ``training_direction`` → ``--questions`` пар
+  ``handle_answer`` + ``next_question`` → ``training_end``;
+* добавление слова: ``dictionary_menu`` → ``dictionary_add_start`` → английское
+  слово и перевод сообщениями → ``dictionary_add_skip_example``;
+* статистика: ``statistics_menu``.
+
+После сценария пользователь возвращается в главное меню (``main_menu_callback``).
+
+Выводятся:
+
+* ответов бота в секунду и p50/p95/p99 задержки от поступления обновления в
+  заглушку до ответа бота по каждому шагу (со стороны пользователя, вместе с
+  ожиданием getUpdates);
+* по ``/metrics`` бота — среднее время обработчика, SQL-операторов и время БД
+  на обновление, ожидание пула соединений, медленные запросы;
+* по ``pg_stat_database`` — транзакции, строки и попадания в буферный кэш за прогон.
+
+``--output`` сохраняет итог в JSON, чтобы сравнивать версии бота между собой.
+Скрипт завершается с кодом 1, если были ответы «❌», ответы не пришли за
+``--timeout`` секунд или бот завершился с ошибкой. В конце тестовые данные удаляются.
+
+Запуск (нужна заполненная локальная БД из DATABASE_URL, лучше отдельная, не рабочая):
+
+    python -m scripts.load_test --users 2000 --duration 120 --output release.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import signal
+import sys
+import time
+from collections import Counter, defaultdict
+
+from sqlalchemy import delete, func, select, text
+
+from bot.database.database import async_session_maker, engine
+from bot.database.models import User, UserAchievement, Word
+from scripts.bench_ingestion import BOT_TOKEN, BOT_USER, FakeBotApi
+from scripts.stress_update_processing import cleanup_training, cleanup_users
+
+# Диапазон telegram_id тестовых пользователей, не пересекается с реальными
+BENCH_TELEGRAM_ID_BASE = -9_700_000_000
+
+# Сценарии и их доли среди сценариев пользователя
+FLOWS = {"training": 6, "dictionary": 2, "statistics": 2}
+
+PG_STAT_COLUMNS = (
+    "xact_commit",
+    "xact_rollback",
+    "tup_returned",
+    "tup_fetched",
+    "tup_inserted",
+    "tup_updated",
+    "tup_deleted",
+    "blks_read",
+    "blks_hit",
+    "deadlocks",
+)
+
+_SAMPLE = re.compile(r"^(\w+)(?:\{(.*)\})? (\S+)$")
+_HANDLER_LABEL = re.compile(r'handler="((?:[^"\\]|\\.)*)"')
+
+
+class VirtualBotApi(FakeBotApi):
+    """Заглушка Bot API для виртуальных пользователей
+
+    Обновления добавляются пользователями по одному (``push``) и отдаются боту
+    через getUpdates. Сообщения бота (sendMessage, editMessageText) передаются
+    пользователю, который ждет ответа в этом чате (``expect``).
+    """
+
+    def __init__(self, rtt: float):
+        super().__init__([], rate=0, rtt=rtt)
+        # chat_id -> ожидание ответа бота
+        self.waiters: dict[int, asyncio.Future] = {}
+        self._message_ids = itertools.count(1_000_000)
+
+    def push(self, update: dict) -> int:
+        """Добавить обновление; возвращает его update_id"""
+        update_id = len(self.updates) + 1
+        update["update_id"] = update_id
+        self.updates.append(update)
+        self.arrived_at[update_id] = time.perf_counter()
+        self._arrived = update_id
+        self._new_updates.set()
+        return update_id
+
+    def next_message_id(self) -> int:
+        return next(self._message_ids)
+
+    def expect(self, chat_id: int) -> asyncio.Future:
+        """Ожидание следующего сообщения бота в чате"""
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[chat_id] = future
+        return future
+
+    async def respond(self, method: str, params: dict):
+        if method not in ("sendMessage", "editMessageText"):
+            return await super().respond(method, params)
+
+        chat_id = int(params["chat_id"])
+        reply_markup = params.get("reply_markup")
+        if isinstance(reply_markup, str):
+            reply_markup = json.loads(reply_markup)
+        message_id = params.get("message_id") or self.next_message_id()
+        message = {
+            "message_id": int(message_id),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+        if reply_markup:
+            message["reply_markup"] = reply_markup
+
+        # Сообщения без ожидающего пользователя (фоновые) не учитываются
+        future = self.waiters.pop(chat_id, None)
+        if future is not None and not future.done():
+            future.set_result(message)
+        return message
+
+
+class LoadStats:
+    """Задержки и ошибки по шагам сценариев"""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+        self.timeouts: Counter[str] = Counter()
+        self.flows: Counter[str] = Counter()
+
+    @property
+    def replies(self) -> int:
+        return sum(len(values) for values in self.latencies.values())
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def callbacks(message: dict | None) -> list[str]:
+    """callback_data кнопок сообщения бота"""
+    if not message:
+        return []
+    rows = message.get("reply_markup", {}).get("inline_keyboard", [])
+    return [button["callback_data"] for row in rows for button in row if "callback_data" in button]
+
+
+class VirtualUser:
+    """Пользователь, проходящий сценарии бота до истечения времени прогона"""
+
+    def __init__(self, telegram_id: int, api: VirtualBotApi, stats: LoadStats, args):
+        self.telegram_id = telegram_id
+        self.api = api
+        self.stats = stats
+        self.args = args
+        self.user = {"id": telegram_id, "is_bot": False, "first_name": "Load"}
+        # Последнее сообщение бота: к нему относятся нажатия кнопок
+        self.message: dict | None = None
+        self.words = 0
+
+    async def step(self, label: str, update: dict) -> dict | None:
+        """Отправить обновление и дождаться ответа бота; None — ошибка или таймаут"""
+        future = self.api.expect(self.telegram_id)
+        started = time.perf_counter()
+        self.api.push(update)
+        try:
+            reply = await asyncio.wait_for(future, self.args.timeout)
+        except TimeoutError:
+            self.api.waiters.pop(self.telegram_id, None)
+            self.stats.timeouts[label] += 1
+            return None
+        self.stats.latencies[label].append(time.perf_counter() - started)
+        if reply["text"].startswith("❌"):
+            self.stats.errors[label] += 1
+            return None
+        self.message = reply
+        return reply
+
+    async def send_text(self, label: str, message_text: str) -> dict | None:
+        message = {
+            "message_id": self.api.next_message_id(),
+            "date": int(time.time()),
+            "chat": {"id": self.telegram_id, "type": "private"},
+            "from": self.user,
+            "text": message_text,
+        }
+        if message_text.startswith("/"):
+            message["entities"] = [
+                {"type": "bot_command", "offset": 0, "length": len(message_text)}
+            ]
+        return await self.step(label, {"message": message})
+
+    async def tap(self, label: str, data: str) -> dict | None:
+        update_id = len(self.api.updates) + 1
+        callback_query = {
+            "id": str(update_id),
+            "from": self.user,
+            "chat_instance": str(self.telegram_id),
+            "data": data,
+            "message": self.message,
+        }
+        return await self.step(label, {"callback_query": callback_query})
+
+    async def think(self):
+        await asyncio.sleep(self.args.think_ms / 1000 * random.uniform(0.5, 1.5))
+
+    async def training(self) -> bool:
+        if not await self.tap("training_start", "training_start"):
+            return False
+        await self.think()
+        direction = random.choice(("training_direction_en_ru", "training_direction_ru_en"))
+        reply = await self.tap("training_direction", direction)
+        for _ in range(self.args.questions):
+            answers = [data for data in callbacks(reply) if data.startswith("answer_")]
+            if not answers:
+                # Вопросов нет (например, мало слов): сценарий заканчивается
+                return reply is not None
+            await self.think()
+            if not await self.tap("handle_answer", random.choice(answers)):
+                return False
+            await self.think()
+            reply = await self.tap("next_question", "next_question")
+        await self.think()
+        return await self.tap("training_end", "training_end") is not None
+
+    async def dictionary(self) -> bool:
+        if not await self.tap("dictionary_menu", "dictionary_menu"):
+            return False
+        await self.think()
+        if not await self.tap("dictionary_add_start", "dictionary_add"):
+            return False
+        await self.think()
+        self.words += 1
+        english = f"load{-self.telegram_id}w{self.words}"
+        if not await self.send_text("dictionary_add_english", english):
+            return False
+        await self.think()
+        if not await self.send_text("dictionary_add_russian", "нагрузка"):
+            return False
+        await self.think()
+        reply = await self.tap("dictionary_add_skip_example", "dictionary_add_skip_example")
+        return reply is not None
+
+    async def statistics(self) -> bool:
+        return await self.tap("statistics_menu", "statistics_menu") is not None
+
+    async def run(self, deadline: float):
+        if not await self.send_text("start_command", "/start"):
+            return
+        flows = list(FLOWS)
+        weights = list(FLOWS.values())
+        while time.perf_counter() < deadline:
+            await self.think()
+            flow = random.choices(flows, weights)[0]
+            if await getattr(self, flow)():
+                self.stats.flows[flow] += 1
+            await self.think()
+            await self.tap("main_menu_callback", "main_menu")
+
+
+async def check_words():
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(func.count()).select_from(Word).where(Word.user_id.is_(None))
+        )
+        if result.scalar_one() < 4:
+            raise SystemExit("В БД мало общих слов: запустите python -m bot.database.init_data")
+
+
+async def pg_stats() -> dict[str, int]:
+    """Счетчики pg_stat_database текущей БД"""
+    columns = ", ".join(PG_STAT_COLUMNS)
+    async with async_session_maker() as session:
+        result = await session.execute(
+            text(f"SELECT {columns} FROM pg_stat_database WHERE datname = current_database()")
+        )
+        return dict(result.mappings().one())
+
+
+async def fetch_metrics(port: int) -> str | None:
+    """Текст /metrics бота; None — сервер не отвечает"""
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    except OSError:
+        return None
+    try:
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return body.decode() if b" 200 " in head.split(b"\r\n", 1)[0] else None
+
+
+def parse_metrics(body: str) -> dict[str, dict[str, float]]:
+    """Метрика -> значение по метке handler ("" — без метки); бакеты пропускаются"""
+    metrics: dict[str, dict[str, float]] = defaultdict(dict)
+    for line in body.splitlines():
+        match = _SAMPLE.match(line)
+        if match is None or match.group(1).endswith("_bucket"):
+            continue
+        name, labels, value = match.groups()
+        handler = _HANDLER_LABEL.search(labels or "")
+        key = handler.group(1) if handler else ""
+        metrics[name][key] = metrics[name].get(key, 0.0) + float(value)
+    return metrics
+
+
+async def cleanup(telegram_ids: list[int]):
+    """Удалить тестовых пользователей вместе со словами, достижениями и тренировками"""
+    await cleanup_training(telegram_ids)
+    async with async_session_maker() as session:
+        await session.execute(
+            delete(UserAchievement).where(UserAchievement.user_id.in_(telegram_ids))
+        )
+        await session.execute(
+            delete(Word).where(
+                Word.user_id.in_(select(User.id).where(User.telegram_id.in_(telegram_ids)))
+            )
+        )
+        await session.commit()
+    await cleanup_users(telegram_ids)
+
+
+def client_report(stats: LoadStats, elapsed: float) -> dict:
+    print(
+        f"\nОтветов бота: {stats.replies} за {elapsed:.1f} с ({stats.replies / elapsed:.0f} в с), "
+        f"сценариев: {dict(stats.flows)}"
+    )
+    print(f"{'шаг':<28} | ответов |  p50, мс |  p95, мс |  p99, мс | «❌» | таймаутов")
+    steps = {}
+    for label in sorted(set(stats.latencies) | set(stats.timeouts)):
+        values = stats.latencies[label]
+        p50, p95, p99 = (percentile(values, q) * 1000 if values else 0.0 for q in (0.5, 0.95, 0.99))
+        steps[label] = {
+            "replies": len(values),
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "errors": stats.errors[label],
+            "timeouts": stats.timeouts[label],
+        }
+        print(
+            f"{label:<28} | {len(values):7d} | {p50:8.1f} | {p95:8.1f} | {p99:8.1f} | "
+            f"{stats.errors[label]:4d} | {stats.timeouts[label]:9d}"
+        )
+    return {"replies": stats.replies, "replies_per_second": stats.replies / elapsed, "steps": steps}
+
+
+def server_report(metrics: dict[str, dict[str, float]]) -> dict:
+    durations = metrics["bot_handler_duration_seconds_sum"]
+    counts = metrics["bot_handler_duration_seconds_count"]
+    queries = metrics["bot_db_queries_per_update_sum"]
+    db_time = metrics["bot_db_time_per_update_seconds_sum"]
+    print(f"\n{'обработчик (/metrics)':<36} | обн. | среднее, мс | операторов | БД, мс")
+    handlers = {}
+    for handler, count in sorted(counts.items()):
+        if not count:
+            continue
+        handlers[handler] = {
+            "updates": int(count),
+            "mean_ms": durations[handler] / count * 1000,
+            "statements": queries.get(handler, 0.0) / count,
+            "db_ms": db_time.get(handler, 0.0) / count * 1000,
+        }
+        row = handlers[handler]
+        print(
+            f"{handler:<36} | {row['updates']:4d} | {row['mean_ms']:11.1f} | "
+            f"{row['statements']:10.1f} | {row['db_ms']:6.1f}"
+        )
+
+    checkouts = metrics["bot_db_pool_checkout_wait_seconds_count"].get("", 0.0)
+    wait = metrics["bot_db_pool_checkout_wait_seconds_sum"].get("", 0.0)
+    totals = {
+        "pool_checkout_wait_ms": wait / checkouts * 1000 if checkouts else 0.0,
+        "slow_queries": int(sum(metrics["bot_db_slow_queries_total"].values())),
+        "query_budget_exceeded": int(sum(metrics["bot_db_query_budget_exceeded_total"].values())),
+        "handler_errors": int(sum(metrics["bot_handler_errors_total"].values())),
+        "logged_errors": int(sum(metrics["bot_logged_errors_total"].values())),
+    }
+    print(
+        f"Ожидание пула БД: {totals['pool_checkout_wait_ms']:.2f} мс в среднем, "
+        f"медленных запросов: {totals['slow_queries']}, "
+        f"сверх бюджета: {totals['query_budget_exceeded']}, "
+        f"исключений в обработчиках: {totals['handler_errors']}, "
+        f"ошибок в логе: {totals['logged_errors']}"
+    )
+    return {"handlers": handlers, **totals}
+
+
+def database_report(before: dict[str, int], after: dict[str, int], elapsed: float) -> dict:
+    delta = {column: after[column] - before[column] for column in PG_STAT_COLUMNS}
+    blocks = delta["blks_hit"] + delta["blks_read"]
+    delta["cache_hit_ratio"] = delta["blks_hit"] / blocks if blocks else 1.0
+    print(
+        f"\nPostgreSQL: {delta['xact_commit'] / elapsed:.0f} транзакций в с "
+        f"(откатов {delta['xact_rollback']}), строк прочитано {delta['tup_returned']}, "
+        f"выбрано {delta['tup_fetched']}, вставлено {delta['tup_inserted']}, "
+        f"обновлено {delta['tup_updated']}, удалено {delta['tup_deleted']}, "
+        f"попаданий в кэш {delta['cache_hit_ratio']:.1%}, взаимоблокировок {delta['deadlocks']}"
+    )
+    return delta
+
+
+async def wait_for_bot(api: VirtualBotApi, process: asyncio.subprocess.Process):
+    """Дождаться первого getUpdates бота"""
+    deadline = time.monotonic() + 60
+    while not api.calls["getUpdates"]:
+        if process.returncode is not None or time.monotonic() > deadline:
+            raise SystemExit(f"Бот не запустился (код {process.returncode})")
+        await asyncio.sleep(0.2)
+
+
+async def run(args: argparse.Namespace) -> bool:
+    await check_words()
+    api = VirtualBotApi(rtt=args.rtt_ms / 1000)
+    api_port = await api.start()
+    env = {
+        **os.environ,
+        "BOT_TOKEN": BOT_TOKEN,
+        "BOT_API_BASE_URL": f"http://127.0.0.1:{api_port}/bot",
+        "BOT_MODE": "polling",
+        "PERSISTENCE_BACKEND": "none",
+        "METRICS_HOST": "127.0.0.1",
+        "METRICS_PORT": str(args.metrics_port),
+        # Заглушка не ограничивает отправку: меряем сам бот, а не лимиты Telegram
+        "TELEGRAM_RATE_LIMIT": "false",
+    }
+    telegram_ids = [BENCH_TELEGRAM_ID_BASE - i for i in range(args.users)]
+    stats = LoadStats()
+    process = await asyncio.create_subprocess_exec(sys.executable, "-m", "bot.main", env=env)
+    try:
+        await wait_for_bot(api, process)
+        print(
+            f"Пользователей: {args.users}, подключение за {args.ramp_s:g} с, "
+            f"прогон {args.duration:g} с, пауза {args.think_ms:g} мс, RTT {args.rtt_ms:g} мс"
+        )
+        before = await pg_stats()
+        started = time.perf_counter()
+        deadline = started + args.duration
+
+        async def start_user(index: int, telegram_id: int):
+            await asyncio.sleep(args.ramp_s * index / args.users)
+            await VirtualUser(telegram_id, api, stats, args).run(deadline)
+
+        await asyncio.gather(
+            *(start_user(index, telegram_id) for index, telegram_id in enumerate(telegram_ids))
+        )
+        elapsed = time.perf_counter() - started
+        after = await pg_stats()
+        metrics = await fetch_metrics(args.metrics_port)
+
+        process.send_signal(signal.SIGTERM)
+        returncode = await process.wait()
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        await api.stop()
+        await cleanup(telegram_ids)
+        await engine.dispose()
+
+    summary = {
+        "users": args.users,
+        "duration_s": elapsed,
+        "client": client_report(stats, elapsed),
+        "server": server_report(parse_metrics(metrics)) if metrics else None,
+        "database": database_report(before, after, elapsed),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+
+    errors = sum(stats.errors.values())
+    timeouts = sum(stats.timeouts.values())
+    ok = returncode == 0 and not errors and not timeouts
+    status = "OK" if ok else "ОШИБКА"
+    print(f"\n{status}: код выхода бота {returncode}, ответов «❌» {errors}, таймаутов {timeouts}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000, help="виртуальных пользователей")
+    parser.add_argument("--duration", type=float, default=60, help="длительность прогона, с")
+    parser.add_argument("--ramp-s", type=float, default=10, help="подключение пользователей, с")
+    parser.add_argument("--think-ms", type=float, default=1000, help="пауза между нажатиями")
+    parser.add_argument("--questions", type=int, default=10, help="вопросов в тренировке")
+    parser.add_argument("--rtt-ms", type=float, default=5, help="задержка ответа Bot API")
+    parser.add_argument("--timeout", type=float, default=30, help="ожидание ответа бота, с")
+    parser.add_argument("--metrics-port", type=int, default=9390, help="порт /metrics бота")
+    parser.add_argument("--output", help="файл JSON с итогами прогона")
+    args = parser.parse_args()
+
+    if not asyncio.run(run(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Нагрузочный тест обработки обновлений: по одному, параллельно и параллельно с порядком
+
+Скрипт создает ``--users`` тестовых пользователей и для каждого формирует
+нажатия кнопок одной тренировки: меню статистики, выбор направления,
+``--questions`` пар «ответ» + «следующий вопрос» и завершение. Нажатия разных
+пользователей перемешаны, порядок нажатий одного пользователя сохранен. Все
+обновления сразу ставятся в очередь приложения с настоящими обработчиками
+(``bot.main.register_handlers``); запросы к Bot API уходят в локальную заглушку
+(``scripts.bench_ingestion.FakeBotApi``) с задержкой ``--rtt-ms``.
+
+Режимы:
+
+* ``sequential`` — обработка по одному, как было до ``UserOrderedUpdateProcessor``;
+* ``unordered`` — параллельно без упорядочивания (``concurrent_updates=N``);
+* ``ordered`` — ``UserOrderedUpdateProcessor``.
+
+Для каждого режима выводятся обновлений в секунду и проверка по БД: у каждого
+пользователя одна тренировка, в ней ровно ``--questions`` ответов, и счетчик
+``total_questions`` совпадает с числом строк ``answers`` (нет потерянных и
+посчитанных дважды ответов). Между режимами и в конце тестовые данные удаляются.
+
+Запуск (нужна заполненная БД из DATABASE_URL, лучше отдельная, не рабочая):
+
+    python -m scripts.stress_update_processing --users 300 --questions 10
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import delete, func, select
+from telegram import Update
+from telegram.ext import Application, TypeHandler
+
+from bot.config import UPDATE_CONCURRENCY
+from bot.database.database import async_session_maker, engine
+from bot.database.models import Answer, Statistics, TrainingSession, User, UserStatsSummary, Word
+from bot.main import register_handlers
+from bot.update_processor import UserOrderedUpdateProcessor
+from scripts.bench_ingestion import BOT_TOKEN, BOT_USER, FakeBotApi
+
+# Диапазон telegram_id тестовых пользователей, не пересекается с реальными
+BENCH_TELEGRAM_ID_BASE = -9_400_000_000
+
+MODES = ("sequential", "unordered", "ordered")
+
+
+def user_taps(questions: int) -> list[str]:
+    """callback_data нажатий одного пользователя за тренировку"""
+    taps = ["statistics_menu", "training_direction_en_ru"]
+    for _ in range(questions):
+        taps += [f"answer_{random.randrange(4)}", "next_question"]
+    taps.append("training_end")
+    return taps
+
+
+def make_updates(telegram_ids: list[int], questions: int) -> list[dict]:
+    """Перемешанные нажатия всех пользователей с сохранением порядка каждого"""
+    pending = {telegram_id: user_taps(questions) for telegram_id in telegram_ids}
+    positions = dict.fromkeys(telegram_ids, 0)
+    updates = []
+    while pending:
+        telegram_id = random.choice(list(pending))
+        taps = pending[telegram_id]
+        data = taps[positions[telegram_id]]
+        positions[telegram_id] += 1
+        if positions[telegram_id] == len(taps):
+            del pending[telegram_id]
+
+        update_id = len(updates) + 1
+        user = {"id": telegram_id, "is_bot": False, "first_name": "Bench"}
+        updates.append(
+            {
+                "update_id": update_id,
+                "callback_query": {
+                    "id": str(update_id),
+                    "from": user,
+                    "chat_instance": str(telegram_id),
+                    "data": data,
+                    "message": {
+                        "message_id": 1,
+                        "date": int(time.time()),
+                        "chat": {"id": telegram_id, "type": "private"},
+                        "from": BOT_USER,
+                        "text": "LinguaFlow",
+                    },
+                },
+            }
+        )
+    return updates
+
+
+async def setup(users: int) -> list[int]:
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(func.count()).select_from(Word).where(Word.user_id.is_(None))
+        )
+        if result.scalar_one() < 4:
+            raise SystemExit("В БД мало общих слов: запустите python -m bot.database.init_data")
+
+        telegram_ids = [BENCH_TELEGRAM_ID_BASE - i for i in range(users)]
+        session.add_all(User(telegram_id=telegram_id) for telegram_id in telegram_ids)
+        await session.commit()
+    return telegram_ids
+
+
+async def cleanup_training(telegram_ids: list[int]):
+    """Удалить тренировки, ответы и статистику тестовых пользователей"""
+    async with async_session_maker() as session:
+        await session.execute(delete(Answer).where(Answer.user_id.in_(telegram_ids)))
+        await session.execute(delete(Statistics).where(Statistics.user_id.in_(telegram_ids)))
+        await session.execute(
+            delete(TrainingSession).where(TrainingSession.user_id.in_(telegram_ids))
+        )
+        await session.execute(
+            delete(UserStatsSummary).where(UserStatsSummary.user_id.in_(telegram_ids))
+        )
+        await session.commit()
+
+
+async def cleanup_users(telegram_ids: list[int]):
+    await cleanup_training(telegram_ids)
+    async with async_session_maker() as session:
+        await session.execute(delete(User).where(User.telegram_id.in_(telegram_ids)))
+        await session.commit()
+
+
+async def verify(telegram_ids: list[int], questions: int) -> str:
+    """Сверить тренировки с ожидаемым числом ответов"""
+    answers_count = (
+        select(func.count())
+        .select_from(Answer)
+        .where(Answer.session_id == TrainingSession.id)
+        .scalar_subquery()
+    )
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(TrainingSession.user_id, TrainingSession.total_questions, answers_count).where(
+                TrainingSession.user_id.in_(telegram_ids)
+            )
+        )
+        rows = result.all()
+
+    sessions_by_user: dict[int, int] = {}
+    for user_id, _, _ in rows:
+        sessions_by_user[user_id] = sessions_by_user.get(user_id, 0) + 1
+    recorded = sum(answers for _, _, answers in rows)
+    mismatched = sum(1 for _, total, answers in rows if total != answers)
+    wrong_sessions = sum(
+        1 for telegram_id in telegram_ids if sessions_by_user.get(telegram_id, 0) != 1
+    )
+    expected = len(telegram_ids) * questions
+    lost = sum(max(questions - answers, 0) for _, _, answers in rows)
+    extra = sum(max(answers - questions, 0) for _, _, answers in rows)
+    missing = sum(1 for telegram_id in telegram_ids if telegram_id not in sessions_by_user)
+    lost += questions * missing
+
+    ok = recorded == expected and not (mismatched or wrong_sessions or lost or extra)
+    status = "OK" if ok else "ОШИБКА"
+    return (
+        f"{status}: ответов {recorded}/{expected}, потеряно {lost}, лишних {extra}, "
+        f"счетчик не совпал {mismatched}, пользователей без одной тренировки {wrong_sessions}"
+    )
+
+
+async def run_mode(mode: str, telegram_ids: list[int], questions: int, api_port: int):
+    builder = Application.builder().token(BOT_TOKEN).base_url(f"http://127.0.0.1:{api_port}/bot")
+    if mode == "sequential":
+        builder = builder.concurrent_updates(False)
+    elif mode == "unordered":
+        builder = builder.concurrent_updates(UPDATE_CONCURRENCY)
+    else:
+        builder = builder.concurrent_updates(UserOrderedUpdateProcessor())
+    application = builder.build()
+    register_handlers(application)
+
+    updates = make_updates(telegram_ids, questions)
+    processed = 0
+    done = asyncio.Event()
+
+    async def count_update(update: Update, context):
+        nonlocal processed
+        processed += 1
+        if processed == len(updates):
+            done.set()
+
+    # Группа 1 выполняется после обработчика из группы 0
+    application.add_handler(TypeHandler(Update, count_update), group=1)
+
+    async with application:
+        await application.start()
+        started = time.perf_counter()
+        for data in updates:
+            await application.update_queue.put(Update.de_json(data, application.bot))
+        await done.wait()
+        elapsed = time.perf_counter() - started
+        await application.stop()
+
+    result = await verify(telegram_ids, questions)
+    print(f"{mode:<10} | {len(updates) / elapsed:8.1f} обн/с | {elapsed:6.1f} с | {result}")
+
+
+async def run(users: int, questions: int, modes: tuple[str, ...], rtt: float):
+    api = FakeBotApi([], rate=0, rtt=rtt)
+    api_port = await api.start()
+    telegram_ids = await setup(users)
+    try:
+        for mode in modes:
+            await run_mode(mode, telegram_ids, questions, api_port)
+            await cleanup_training(telegram_ids)
+    finally:
+        await cleanup_users(telegram_ids)
+        await api.stop()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--questions", type=int, default=10, help="вопросов на пользователя")
+    parser.add_argument("--mode", choices=(*MODES, "all"), default="all")
+    parser.add_argument("--rtt-ms", type=float, default=20, help="задержка ответа Bot API")
+    args = parser.parse_args()
+
+    modes = MODES if args.mode == "all" else (args.mode,)
+    asyncio.run(run(args.users, args.questions, modes, args.rtt_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()